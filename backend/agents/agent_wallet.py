@@ -278,7 +278,7 @@ class AgentWalletManager:
     # WITHDRAWALS (24/7 ACCESS)
     # ===========================================
     
-    def request_withdrawal(
+    async def request_withdrawal(
         self,
         user_address: str,
         token: str,
@@ -323,6 +323,8 @@ class AgentWalletManager:
         try:
             from web3 import Web3
             from eth_account import Account
+            from infrastructure.rpc import run_rpc
+            from infrastructure.tx_manager import tx_manager
             
             rpc_url = os.environ.get("ALCHEMY_RPC_URL", "https://mainnet.base.org")
             w3 = Web3(Web3.HTTPProvider(rpc_url))
@@ -359,12 +361,12 @@ class AgentWalletManager:
                 # Native ETH transfer
                 # Use higher gas limit (50k) to handle smart contract wallets
                 # (Safe, Argent, Coinbase Wallet, etc.) that need more gas for receive()
-                gas_price = w3.eth.gas_price
+                gas_price = await run_rpc(lambda: w3.eth.gas_price)
                 gas_limit = 50000  # 21000 is not enough for smart contract wallets
                 gas_cost_wei = gas_price * gas_limit
                 
                 # Check agent's ETH balance
-                agent_eth_balance = w3.eth.get_balance(agent_account.address)
+                agent_eth_balance = await run_rpc(w3.eth.get_balance, agent_account.address)
                 amount_wei = int(amount * 1e18)
                 
                 logger.info(f"[AgentWallet] Agent address: {agent_account.address}")
@@ -386,17 +388,15 @@ class AgentWalletManager:
                     'value': amount_wei,
                     'gas': gas_limit,
                     'gasPrice': gas_price,
-                    'nonce': w3.eth.get_transaction_count(agent_account.address),
-                    'chainId': 8453  # Base
+                    'chainId': 8453  # Base (nonce assigned by tx_manager)
                 }
                 
                 logger.info(f"[AgentWallet] ETH transfer: {amount_wei / 1e18:.6f} ETH to {dest_address[:10]}...")
                 logger.info(f"[AgentWallet] Agent balance: {agent_eth_balance / 1e18:.6f} ETH, gas price: {gas_price / 1e9:.2f} Gwei")
                 
-                signed = agent_account.sign_transaction(tx)
-                tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+                tx_hash = await tx_manager.send(w3, tx, agent_account)
                 logger.info(f"[AgentWallet] TX sent: {tx_hash.hex()}")
-                receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                receipt = await tx_manager.wait_for_receipt(w3, tx_hash, timeout=120)
                 
                 # Log status for debugging - Base L2 may return different formats
                 logger.info(f"[AgentWallet] Receipt status: {receipt.status} (type: {type(receipt.status).__name__})")
@@ -433,14 +433,12 @@ class AgentWalletManager:
                 ).build_transaction({
                     'from': agent_account.address,
                     'gas': 100000,
-                    'gasPrice': w3.eth.gas_price,
-                    'nonce': w3.eth.get_transaction_count(agent_account.address),
+                    'gasPrice': await run_rpc(lambda: w3.eth.gas_price),
+                    'nonce': 0,  # Placeholder - assigned by tx_manager
                     'chainId': 8453
                 })
                 
-                signed = agent_account.sign_transaction(tx)
-                tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-                receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                tx_hash, receipt = await tx_manager.send_and_wait(w3, tx, agent_account, timeout=120)
                 
                 if receipt.status != 1:
                     return {"success": False, "error": f"{token} transfer failed on-chain"}
@@ -523,7 +521,7 @@ class AgentWalletManager:
         
         return None
     
-    def emergency_drain(self, user_address: str) -> Dict:
+    async def emergency_drain(self, user_address: str) -> Dict:
         """
         Emergency: Withdraw all funds to user's wallet - EXECUTES REAL ON-CHAIN TRANSFERS
         Always available 24/7
@@ -597,7 +595,7 @@ class AgentWalletManager:
         for token, balance in list(balances_to_withdraw.items()):
             if balance > 0:
                 # Use request_withdrawal which now does real on-chain transfer
-                result = self.request_withdrawal(
+                result = await self.request_withdrawal(
                     user_address=user_address,
                     token=token,
                     amount=balance,
@@ -7,8 +7,9 @@ Supports CSV export for tax reporting
 import os
 import json
 import csv
+import sqlite3
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -50,45 +51,143 @@ class AuditTrail:
     Comprehensive audit logging for agent operations
     
     Features:
-    - JSON file storage
-    - CSV export for tax reporting
+    - Append-only JSONL segments (rotated by size) - logging is O(1) regardless of history
+    - SQLite index by agent_id / wallet / time - queries read only matching entries
+    - CSV export for tax reporting (streamed)
     - Per-agent filtering
     - Date range queries
     """
     
-    def __init__(self, data_dir: str = None):
+    SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+    
+    def __init__(self, data_dir: str = None, segment_max_bytes: int = None):
         if data_dir is None:
             data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "audit")
         
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        self.log_file = self.data_dir / "audit_log.json"
-        self.entries: List[AuditEntry] = []
+        self.segment_dir = self.data_dir / "segments"
+        self.segment_dir.mkdir(exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes or self.SEGMENT_MAX_BYTES
+        self.legacy_file = self.data_dir / "audit_log.json"
+        # Lives with the segments (not the rebuildable index) that hold the imported entries
+        self.legacy_marker = self.segment_dir / "legacy_migrated"
+        
+        self._db = sqlite3.connect(str(self.data_dir / "audit_index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                agent_id TEXT,
+                wallet_address TEXT,
+                value_usd REAL,
+                segment INTEGER NOT NULL,
+                seg_offset INTEGER NOT NULL,
+                seg_length INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_audit_agent ON entries(agent_id, timestamp)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_audit_wallet ON entries(wallet_address, timestamp)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_audit_time ON entries(timestamp)")
+        self._db.commit()
         
-        # Load existing entries
+        self._segment_id = 0
+        self._segment = None  # Open append handle of the active segment
+        
+        # Recover index/segment drift and import the old single-file log
         self._load()
     
-    def _load(self):
-        """Load existing audit entries from file"""
-        if self.log_file.exists():
-            try:
-                with open(self.log_file, 'r') as f:
-                    data = json.load(f)
-                    self.entries = [
-                        AuditEntry(**entry) for entry in data
-                    ]
-            except Exception as e:
-                print(f"[AuditTrail] Error loading: {e}")
-                self.entries = []
+    # ==========================================
+    # STORAGE
+    # ==========================================
     
-    def _save(self):
-        """Save audit entries to file"""
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.segment_dir / f"audit-{segment_id:06d}.jsonl"
+    
+    def _load(self):
+        """Open the active segment, re-index any tail written after the last index commit"""
         try:
-            with open(self.log_file, 'w') as f:
-                json.dump([asdict(e) for e in self.entries], f, indent=2)
+            segments = sorted(int(p.stem.split("-")[1]) for p in self.segment_dir.glob("audit-*.jsonl"))
+            self._segment_id = segments[-1] if segments else 1
+            
+            row = self._db.execute("SELECT segment, seg_offset + seg_length FROM entries ORDER BY id DESC LIMIT 1").fetchone()
+            indexed_segment, indexed_end = row if row else (segments[0] if segments else 1, 0)
+            for segment_id in (s for s in segments if s >= indexed_segment):
+                self._reindex_segment(segment_id, indexed_end if segment_id == indexed_segment else 0)
+            
+            if self.legacy_file.exists() and not self.legacy_marker.exists():
+                self._migrate_legacy()
         except Exception as e:
-            print(f"[AuditTrail] Error saving: {e}")
+            print(f"[AuditTrail] Error loading: {e}")
+    
+    def _reindex_segment(self, segment_id: int, from_offset: int):
+        """Index entries appended to a segment but not yet in the index (crash recovery)"""
+        count = 0
+        with open(self._segment_path(segment_id), "r+b") as f:
+            f.seek(from_offset)
+            offset = from_offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn write at the tail - drop it so the next append starts clean
+                    f.truncate(offset)
+                    break
+                try:
+                    self._index(AuditEntry(**json.loads(line)), segment_id, offset, len(line))
+                    count += 1
+                except (ValueError, TypeError):
+                    pass
+                offset += len(line)
+        self._db.commit()
+        if count:
+            print(f"[AuditTrail] Re-indexed {count} entries from segment {segment_id}")
+    
+    def _migrate_legacy(self):
+        """One-time import of the old audit_log.json (left in place, no longer written)"""
+        with open(self.legacy_file, 'r') as f:
+            data = json.load(f)
+        for entry in data:
+            self._append(AuditEntry(**entry), commit=False)
+        self._db.commit()
+        self.legacy_marker.write_text(datetime.utcnow().isoformat())
+        print(f"[AuditTrail] Migrated {len(data)} entries from {self.legacy_file.name}")
+    
+    def _index(self, entry: AuditEntry, segment_id: int, offset: int, length: int):
+        self._db.execute(
+            "INSERT INTO entries (timestamp, action_type, agent_id, wallet_address, value_usd, segment, seg_offset, seg_length) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.timestamp, entry.action_type, entry.agent_id, entry.wallet_address,
+             entry.value_usd, segment_id, offset, length)
+        )
+    
+    def _append(self, entry: AuditEntry, commit: bool = True):
+        """Append one entry to the active segment and index it - O(1)"""
+        line = (json.dumps(asdict(entry), default=str) + "\n").encode()
+        
+        if self._segment is None:
+            self._segment = open(self._segment_path(self._segment_id), "ab")
+        if self._segment.tell() > 0 and self._segment.tell() + len(line) > self.segment_max_bytes:
+            self._segment.close()
+            self._segment_id += 1
+            self._segment = open(self._segment_path(self._segment_id), "ab")
+        
+        offset = self._segment.tell()
+        self._segment.write(line)
+        self._segment.flush()
+        
+        self._index(entry, self._segment_id, offset, len(line))
+        if commit:
+            self._db.commit()
+    
+    def close(self):
+        """Close the active segment and the index"""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self._db.close()
     
     def log(
         self,
@@ -116,8 +215,10 @@ class AuditTrail:
             error=error
         )
         
-        self.entries.append(entry)
-        self._save()
+        try:
+            self._append(entry)
+        except Exception as e:
+            print(f"[AuditTrail] Error saving: {e}")
         
         print(f"[AuditTrail] {action_type.value}: {agent_id[:8]}... | ${value_usd or 0:.2f}")
         
@@ -131,7 +232,8 @@ class AuditTrail:
                     action_type=action_type.value,
                     tx_hash=tx_hash,
                     details=details,
-                    status="success" if success else "error"
+                    status="success" if success else "error",
+                    defer=True
                 ))
         except Exception as e:
             print(f"[AuditTrail] Supabase log failed: {e}")
@@ -191,58 +293,111 @@ class AuditTrail:
             {"alert_type": alert_type, "message": message}
         )
     
-    def get_entries(
+    def _query(
         self,
+        columns: str,
         agent_id: str = None,
         wallet_address: str = None,
         action_type: ActionType = None,
         start_date: str = None,
-        end_date: str = None
-    ) -> List[AuditEntry]:
-        """Query audit entries with filters"""
-        results = self.entries
-        
+        end_date: str = None,
+        suffix: str = ""
+    ):
+        """Run a filtered query against the index"""
+        where, params = [], []
         if agent_id:
-            results = [e for e in results if e.agent_id == agent_id]
-        
+            where.append("agent_id = ?")
+            params.append(agent_id)
         if wallet_address:
-            results = [e for e in results if e.wallet_address == wallet_address]
-        
+            where.append("wallet_address = ?")
+            params.append(wallet_address)
         if action_type:
-            results = [e for e in results if e.action_type == action_type.value]
-        
+            where.append("action_type = ?")
+            params.append(action_type.value)
         if start_date:
-            results = [e for e in results if e.timestamp >= start_date]
-        
+            where.append("timestamp >= ?")
+            params.append(start_date)
         if end_date:
-            results = [e for e in results if e.timestamp <= end_date]
+            where.append("timestamp <= ?")
+            params.append(end_date)
         
-        return results
+        sql = f"SELECT {columns} FROM entries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._db.execute(f"{sql} {suffix}", params)
     
-    def get_summary(self, agent_id: str = None) -> Dict:
-        """Get summary statistics"""
-        entries = self.get_entries(agent_id=agent_id)
+    def iter_entries(
+        self,
+        agent_id: str = None,
+        wallet_address: str = None,
+        action_type: ActionType = None,
+        start_date: str = None,
+        end_date: str = None,
+        limit: int = None
+    ) -> Iterator[AuditEntry]:
+        """Stream matching entries in log order (only the last `limit` if given)"""
+        suffix = "ORDER BY id"
+        if limit:
+            suffix = f"ORDER BY id DESC LIMIT {int(limit)}"
+        rows = self._query("segment, seg_offset, seg_length", agent_id, wallet_address, action_type,
+                           start_date, end_date, suffix).fetchall()
+        if limit:
+            rows.reverse()
         
-        total_deposits = sum(
-            e.value_usd or 0 for e in entries 
-            if e.action_type == ActionType.DEPOSIT.value
-        )
-        total_withdrawals = sum(
-            e.value_usd or 0 for e in entries 
-            if e.action_type == ActionType.WITHDRAW.value
-        )
-        total_swaps = len([e for e in entries if e.action_type == ActionType.SWAP.value])
-        total_lp_entries = len([e for e in entries if e.action_type == ActionType.ENTER_LP.value])
-        stop_losses = len([e for e in entries if e.action_type == ActionType.STOP_LOSS.value])
+        if self._segment is not None:
+            self._segment.flush()
+        
+        handles = {}
+        try:
+            for segment_id, offset, length in rows:
+                f = handles.get(segment_id)
+                if f is None:
+                    f = handles[segment_id] = open(self._segment_path(segment_id), "rb")
+                f.seek(offset)
+                yield AuditEntry(**json.loads(f.read(length)))
+        finally:
+            for f in handles.values():
+                f.close()
+    
+    def get_entries(
+        self,
+        agent_id: str = None,
+        wallet_address: str = None,
+        action_type: ActionType = None,
+        start_date: str = None,
+        end_date: str = None,
+        limit: int = None
+    ) -> List[AuditEntry]:
+        """Query audit entries with filters"""
+        return list(self.iter_entries(agent_id, wallet_address, action_type, start_date, end_date, limit))
+    
+    def get_summary(self, agent_id: str = None, wallet_address: str = None) -> Dict:
+        """Get summary statistics (aggregated in the index, no entry payloads read)"""
+        totals = {
+            action: (count, value)
+            for action, count, value in self._query(
+                "action_type, COUNT(*), COALESCE(SUM(value_usd), 0)", agent_id=agent_id, wallet_address=wallet_address,
+                suffix="GROUP BY action_type"
+            )
+        }
+        
+        def count(action: ActionType) -> int:
+            return totals.get(action.value, (0, 0))[0]
+        
+        def value(action: ActionType) -> float:
+            return totals.get(action.value, (0, 0))[1]
+        
+        total_deposits = value(ActionType.DEPOSIT)
+        total_withdrawals = value(ActionType.WITHDRAW)
         
         return {
-            "total_entries": len(entries),
+            "total_entries": sum(c for c, _ in totals.values()),
             "total_deposits_usd": total_deposits,
             "total_withdrawals_usd": total_withdrawals,
             "net_flow_usd": total_deposits - total_withdrawals,
-            "total_swaps": total_swaps,
-            "total_lp_entries": total_lp_entries,
-            "stop_losses_triggered": stop_losses
+            "total_swaps": count(ActionType.SWAP),
+            "total_lp_entries": count(ActionType.ENTER_LP),
+            "stop_losses_triggered": count(ActionType.STOP_LOSS)
         }
     
     def export_csv(self, filepath: str = None, agent_id: str = None) -> str:
@@ -251,8 +406,7 @@ class AuditTrail:
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             filepath = self.data_dir / f"audit_export_{timestamp}.csv"
         
-        entries = self.get_entries(agent_id=agent_id)
-        
+        count = 0
         with open(filepath, 'w', newline='') as f:
             writer = csv.writer(f)
             
@@ -263,7 +417,8 @@ class AuditTrail:
             ])
             
             # Data rows
-            for e in entries:
+            for e in self.iter_entries(agent_id=agent_id):
+                count += 1
                 writer.writerow([
                     e.timestamp,
                     e.action_type,
@@ -276,7 +431,7 @@ class AuditTrail:
                     json.dumps(e.details)
                 ])
         
-        print(f"[AuditTrail] Exported {len(entries)} entries to {filepath}")
+        print(f"[AuditTrail] Exported {count} entries to {filepath}")
         return str(filepath)
 
 
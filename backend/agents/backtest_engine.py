@@ -0,0 +1,301 @@
+"""
+Backtest Engine
+Replays agent strategies over stored daily pool history
+
+WHY: scripts/*backtest*.py re-implemented pool selection with their own
+filters and simulated day by day in Python loops, so results drifted from
+what agents actually do and a single configuration took minutes to run.
+
+DESIGN:
+- Input: a HistoryPanel (pools x days) from data_sources.pool_history
+- Vectorized over pools x days once per engine: daily yield minus an IL
+  estimate per pair type, as cumulative log growth, so any position's value
+  path is exp(cum[t] - cum[entry]) with no day loop
+- Candidate pools per config: one [pools, days] mask combining the same
+  filters as StrategyExecutor.find_matching_pools (static PoolTable mask +
+  APY/TVL bounds per day)
+- Selection replays the real StrategyExecutor.rank_and_select on that day's
+  candidates; exits replay PositionMonitor.exit_rules (duration, APY below
+  range, stop-loss, take-profit - in the monitor's order). An exited
+  position is reinvested whole into the best pool except the one it left,
+  like PositionMonitor.execute_exit_and_reinvest
+- Event-driven: each position's exit day is found with one vectorized scan
+  over its remaining days, so a run costs O(trades), not O(days x positions)
+- sweep() reuses the precomputed arrays and static masks across configs
+"""
+
+import heapq
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from data_sources.pool_history import HistoryPanel
+from data_sources.pool_table import PoolTable
+
+logger = logging.getLogger(__name__)
+
+GAS_COST_USD = 0.02  # Per deposit/withdraw on Base
+
+# Estimated impermanent loss per month (%) by pair type
+IL_MONTHLY_PERCENT = {
+    "single": 0.0,
+    "stablecoin": 0.5,    # USDC-USDT etc
+    "correlated": 3.0,    # WETH-CBBTC (both crypto)
+    "volatile": 8.0,      # USDC-random
+}
+
+STABLES = ("USDC", "USDT", "DAI", "EURC", "FRAX")
+MAJORS = ("WETH", "ETH", "WBTC", "CBBTC", "BTC")
+
+# Trusted protocols for only_audited (same list as find_matching_pools)
+TRUSTED_PROTOCOLS = ["aave", "compound", "curve", "uniswap", "morpho", "lido", "aerodrome", "velodrome"]
+
+
+def classify_pair(symbol: str) -> str:
+    """Pair type for IL estimation"""
+    symbol = (symbol or "").upper()
+    if "-" not in symbol and "/" not in symbol:
+        return "single"
+    parts = [p.strip() for p in symbol.replace("-", "/").split("/")]
+    if all(any(s in p for s in STABLES) for p in parts):
+        return "stablecoin"
+    if all(any(m in p for m in MAJORS) for p in parts):
+        return "correlated"
+    return "volatile"
+
+
+@dataclass
+class BacktestResult:
+    """Outcome of one configuration"""
+    agent: dict
+    initial_capital: float
+    final_value: float
+    days: int
+    gas_costs: float = 0.0
+    exits: Dict[str, int] = field(default_factory=dict)   # trigger -> count
+    trades: List[dict] = field(default_factory=list)
+
+    @property
+    def net_yield(self) -> float:
+        return self.final_value - self.initial_capital
+
+    @property
+    def roi_percent(self) -> float:
+        return self.net_yield / self.initial_capital * 100 if self.initial_capital else 0.0
+
+    @property
+    def annualized_apy(self) -> float:
+        return self.roi_percent * 365 / self.days if self.days else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            **asdict(self),
+            "net_yield": self.net_yield,
+            "roi_percent": self.roi_percent,
+            "annualized_apy": self.annualized_apy,
+        }
+
+
+class BacktestEngine:
+    """
+    Replays StrategyExecutor selection and PositionMonitor exits on history.
+
+    USAGE:
+        panel = get_pool_history_store().load_panel(pool_ids, start="2025-01-01")
+        engine = BacktestEngine(panel)
+        result = engine.run({"chain": "base", "min_apy": 20, "vault_count": 5})
+        results = engine.sweep(agent_configs, capital=10_000)
+    """
+
+    def __init__(self, panel: HistoryPanel, executor=None, monitor=None,
+                 gas_cost_usd: float = GAS_COST_USD, il_monthly: Optional[Dict[str, float]] = None):
+        if executor is None:
+            from agents.strategy_executor import StrategyExecutor
+            executor = StrategyExecutor()
+        if monitor is None:
+            from agents.position_monitor import PositionMonitor
+            monitor = PositionMonitor()
+        self.executor = executor
+        self.monitor = monitor
+        self.panel = panel
+        self.gas_cost_usd = gas_cost_usd
+
+        # Static columns (chain/project/symbol/stablecoin) for find_matching_pools filters
+        self.table = PoolTable.from_pools(panel.pools)
+        self._static_masks: Dict[tuple, np.ndarray] = {}
+
+        # pools x days: NaN APY = no data point (no yield, no APY exit)
+        self.has_apy = ~np.isnan(panel.apy)
+        self.apy = np.nan_to_num(panel.apy)
+        self.tvl = np.nan_to_num(panel.tvl)
+
+        il_monthly = il_monthly or IL_MONTHLY_PERCENT
+        il_daily = np.array([
+            il_monthly.get(classify_pair(p.get("symbol")), 0.0) / 30 / 100 for p in panel.pools
+        ])
+        daily_return = self.apy / 365 / 100 - il_daily[:, None]
+        # Value of a position on day t entered on day e: exp(cum[t] - cum[e])
+        self.cum_log_growth = np.cumsum(np.log1p(np.maximum(daily_return, -0.99)), axis=1)
+
+    # ==========================================
+    # CANDIDATES
+    # ==========================================
+
+    def _static_mask(self, agent: Dict) -> np.ndarray:
+        """Day-independent filters from find_matching_pools (cached per config key)"""
+        chain = agent.get("chain", "base")
+        pool_type = agent.get("pool_type", "all")
+        key = (
+            chain.lower(),
+            tuple(sorted(p.lower() for p in agent.get("protocols", []))),
+            tuple(sorted(a.upper() for a in agent.get("preferred_assets", []))),
+            pool_type,
+            bool(agent.get("only_audited", False)),
+        )
+        if key not in self._static_masks:
+            mask = self.table.mask(
+                chain=chain,
+                projects=agent.get("protocols", []),
+                symbols=agent.get("preferred_assets", []),
+                stablecoin=True if pool_type == "stablecoin" else None,
+                lp={"single": False, "dual": True}.get(pool_type),
+            )
+            if agent.get("only_audited", False):
+                mask &= self.table.mask(projects=TRUSTED_PROTOCOLS)
+            self._static_masks[key] = mask
+        return self._static_masks[key]
+
+    def candidates(self, agent: Dict) -> np.ndarray:
+        """[pools, days] mask of pools find_matching_pools would return each day"""
+        # Scout call defaults: min_apy 50, max_apy 50000, min_tvl $500k
+        mask = (
+            self.has_apy
+            & (self.apy >= agent.get("min_apy", 50))
+            & (self.apy <= agent.get("max_apy", 50000))
+            & (self.tvl >= agent.get("min_tvl", 500000))
+        )
+        return mask & self._static_mask(agent)[:, None]
+
+    def _pool_dicts(self, rows: np.ndarray, day: int) -> List[dict]:
+        """Candidate rows as the pool dicts Scout would return on that day"""
+        return [{
+            **self.panel.pools[i],
+            "pool_address": self.panel.pool_ids[i],
+            "apy": float(self.apy[i, day]),
+            "tvl": float(self.tvl[i, day]),
+            "_row": int(i),
+        } for i in rows]
+
+    def _select(self, candidates: np.ndarray, agent: Dict, day: int,
+                excluded: Iterable[int] = ()) -> List[dict]:
+        """Real filter_avoid_il + rank_and_select on the day's candidates"""
+        mask = candidates[:, day].copy()
+        mask[list(excluded)] = False
+        pools = self._pool_dicts(np.flatnonzero(mask), day)
+        if not pools:
+            return []
+        pools = self.executor.filter_avoid_il(pools, agent, verbose=False)
+        return self.executor.rank_and_select(pools, agent, verbose=False)
+
+    # ==========================================
+    # SIMULATION
+    # ==========================================
+
+    def _exit(self, row: int, entry_day: int, entry_value: float, end_day: int, rules: Dict):
+        """First day (and trigger) PositionMonitor would exit this position"""
+        if end_day <= entry_day:
+            return end_day, entry_value, "end"
+        t = np.arange(entry_day + 1, end_day + 1)
+        value = entry_value * np.exp(self.cum_log_growth[row, t] - self.cum_log_growth[row, entry_day])
+        pnl_percent = (value - entry_value) / entry_value * 100
+
+        # In check_position_exit order: apy, stop_loss, take_profit
+        triggers = [("apy", self.has_apy[row, t] & (self.apy[row, t] < rules["min_apy"]))]
+        if rules["stop_loss_percent"] is not None:
+            triggers.append(("stop_loss", -pnl_percent >= rules["stop_loss_percent"]))
+        take_profit = np.zeros(len(t), dtype=bool)
+        if rules["take_profit_percent"] > 0:
+            take_profit |= pnl_percent >= rules["take_profit_percent"]
+        if rules["take_profit_usd"] > 0:
+            take_profit |= value - entry_value >= rules["take_profit_usd"]
+        triggers.append(("take_profit", take_profit))
+
+        fired = np.logical_or.reduce([hit for _, hit in triggers])
+        if fired.any():
+            k = int(np.argmax(fired))
+            trigger = next(name for name, hit in triggers if hit[k])
+            return int(t[k]), float(value[k]), trigger
+        return end_day, float(value[-1]), "end"
+
+    def run(self, agent: Dict, capital: float = 10_000, start: int = 0,
+            days: Optional[int] = None) -> BacktestResult:
+        """Simulate one agent config from panel day `start` for `days` days"""
+        n_days = self.panel.apy.shape[1]
+        last_day = n_days - 1 if days is None else min(n_days - 1, start + days)
+        rules = self.monitor.exit_rules(agent)
+        # Duration expiry closes everything (and wins over other triggers that day)
+        expires = rules["duration_days"] > 0 and start + rules["duration_days"] <= last_day
+        end_day = start + rules["duration_days"] if expires else last_day
+
+        result = BacktestResult(agent=agent, initial_capital=capital, final_value=capital,
+                                days=max(end_day - start, 0))
+        if start >= n_days:
+            return result
+
+        candidates = self.candidates(agent)
+        cash = capital
+        events = []  # (exit_day, seq, position)
+
+        def enter(pool: dict, amount: float, day: int):
+            amount -= self.gas_cost_usd
+            result.gas_costs += self.gas_cost_usd
+            exit_day, exit_value, trigger = self._exit(pool["_row"], day, amount, end_day, rules)
+            position = {"pool": pool["pool_address"], "symbol": pool.get("symbol"), "_row": pool["_row"],
+                        "entry_day": day, "entry_value": amount, "entry_apy": pool["apy"],
+                        "exit_day": exit_day, "exit_value": exit_value, "trigger": trigger}
+            heapq.heappush(events, (exit_day, len(result.trades), position))
+            result.trades.append(position)
+
+        # Initial allocation (execute_agent_strategy)
+        for pool in self._select(candidates, agent, start):
+            amount = capital * pool["_allocation"] / 100
+            if amount > cash:
+                break
+            cash -= amount
+            enter(pool, amount, start)
+
+        final_value = cash
+        while events:
+            exit_day, _, position = heapq.heappop(events)
+            if expires and exit_day == end_day:
+                position["trigger"] = "duration"
+            trigger = position["trigger"]
+            result.exits[trigger] = result.exits.get(trigger, 0) + 1
+
+            proceeds = position["exit_value"] - self.gas_cost_usd
+            result.gas_costs += self.gas_cost_usd
+            if exit_day >= end_day:
+                final_value += proceeds
+                continue
+
+            # Reinvest everything into the best pool except the one just exited
+            selected = self._select(candidates, agent, exit_day, excluded=[position["_row"]])
+            if selected and proceeds > self.gas_cost_usd:
+                enter(selected[0], proceeds, exit_day)
+            else:
+                final_value += proceeds
+
+        for trade in result.trades:
+            trade.pop("_row", None)
+            trade["entry_date"] = str(self.panel.days[trade["entry_day"]])
+            trade["exit_date"] = str(self.panel.days[trade["exit_day"]])
+        result.final_value = final_value
+        return result
+
+    def sweep(self, agents: Iterable[Dict], **kwargs) -> List[BacktestResult]:
+        """Run many configs over the same precomputed panel"""
+        results = [self.run(agent, **kwargs) for agent in agents]
+        logger.info(f"[Backtest] Swept {len(results)} configs over {len(self.panel)} pools")
+        return results
@@ -5,70 +5,208 @@ Saves to Supabase to reduce RPC calls on frontend requests.
 """
 import asyncio
 import logging
+import os
+import time
 from datetime import datetime
+from typing import Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Refresh interval: 10 minutes
 REFRESH_INTERVAL_SECONDS = 600
 
+# Multicall3 batching: calls per aggregate3 request, parallel requests
+CHUNK_SIZE = int(os.getenv("BALANCE_REFRESH_CHUNK_SIZE", "500"))
+MAX_CONCURRENT_CHUNKS = int(os.getenv("BALANCE_REFRESH_CONCURRENCY", "4"))
+
 # Flag to control the refresh loop
 _refresh_running = False
 
+# Stats of the last completed cycle (stage timings etc.)
+last_refresh_stats: Dict = {}
+
+
+def _collect_agents() -> List[Tuple[str, str]]:
+    """(user_address, agent_address) for every deployed agent"""
+    from api.agent_config_router import DEPLOYED_AGENTS
+    
+    targets = []
+    for user_address, agents in DEPLOYED_AGENTS.items():
+        for agent in agents:
+            agent_address = agent.get("agent_address") or agent.get("address")
+            if agent_address:
+                targets.append((user_address, agent_address))
+    return targets
+
+
+async def _fetch_balances_batched(agent_addresses: List[str]):
+    """
+    All ERC20 + ETH + LP balances for all agents, plus LP reserves/supply,
+    as Multicall3 aggregates (one RPC request per CHUNK_SIZE calls).
+    Returns (per-agent raw results, lp_state, rpc_requests).
+    """
+    from web3 import Web3
+    from api.portfolio_router import w3, ALL_TOKENS, ERC20_ABI, LP_TOKENS, LP_ABI
+    from data_sources.multicall import Multicall3, execute_batched
+    
+    tokens = [w3.eth.contract(address=Web3.to_checksum_address(addr), abi=ERC20_ABI) for addr, _, _ in ALL_TOKENS]
+    lps = [w3.eth.contract(address=Web3.to_checksum_address(lp["address"]), abi=LP_ABI) for lp in LP_TOKENS]
+    multicall = Multicall3(w3).multicall
+    
+    # Pool state is shared by all agents - read once per cycle
+    calls = []
+    for lp in lps:
+        calls.append((lp, "getReserves", ()))
+        calls.append((lp, "totalSupply", ()))
+    
+    per_agent = len(tokens) + 1 + len(lps)
+    for agent_address in agent_addresses:
+        owner = Web3.to_checksum_address(agent_address)
+        calls.extend((token, "balanceOf", (owner,)) for token in tokens)
+        calls.append((multicall, "getEthBalance", (owner,)))
+        calls.extend((lp, "balanceOf", (owner,)) for lp in lps)
+    
+    results = await execute_batched(w3, calls, chunk_size=CHUNK_SIZE, max_concurrency=MAX_CONCURRENT_CHUNKS)
+    
+    lp_state = []
+    for i in range(len(lps)):
+        (ok_r, reserves), (ok_s, supply) = results[2 * i], results[2 * i + 1]
+        lp_state.append((reserves if ok_r else None, supply if ok_s else None))
+    
+    offset = 2 * len(lps)
+    agent_results = [
+        results[offset + n * per_agent: offset + (n + 1) * per_agent]
+        for n in range(len(agent_addresses))
+    ]
+    rpc_requests = (len(calls) + CHUNK_SIZE - 1) // CHUNK_SIZE
+    return agent_results, lp_state, rpc_requests
+
 
 async def refresh_agent_balances():
     """
     Refresh balances for all active agents.
     Called every 10 minutes by background loop.
+    
+    Pipeline (timed per stage, see last_refresh_stats):
+    collect -> rpc (Multicall3 chunks in parallel) + apy (once per cycle)
+    -> build -> persist (write-behind bulk upsert)
     """
     from infrastructure.supabase_client import supabase
-    from api.agent_config_router import DEPLOYED_AGENTS
-    from api.portfolio_router import fetch_all_balances, fetch_lp_positions
+    from infrastructure.write_behind import write_behind
+    from services.portfolio_stream import portfolio_stream
+    from api.portfolio_router import ALL_TOKENS, LP_TOKENS, build_holdings, build_lp_position, fetch_lp_apys
     
     logger.info("[BalanceRefresh] Starting balance refresh cycle...")
-    start = datetime.now()
+    start = time.time()
+    stages = {}
+    
+    # 1. Collect targets
+    stage_start = time.time()
+    targets = _collect_agents()
+    stages["collect_ms"] = round((time.time() - stage_start) * 1000, 1)
     
     refreshed = 0
+    skipped = 0
     errors = 0
+    rpc_requests = 0
     
-    # Get all users with deployed agents
-    for user_address, agents in DEPLOYED_AGENTS.items():
-        for agent in agents:
-            agent_address = agent.get("agent_address") or agent.get("address")
-            if not agent_address:
-                continue
-            
+    if targets:
+        # 2. RPC balances and LP APYs concurrently
+        async def timed(name, coro):
+            stage_start = time.time()
+            try:
+                return await coro
+            finally:
+                stages[f"{name}_ms"] = round((time.time() - stage_start) * 1000, 1)
+        
+        (agent_results, lp_state, rpc_requests), pool_apy = await asyncio.gather(
+            timed("rpc", _fetch_balances_batched([agent for _, agent in targets])),
+            timed("apy", fetch_lp_apys())
+        )
+        
+        # 3. Build holdings / positions
+        stage_start = time.time()
+        rows = []
+        n_tokens = len(ALL_TOKENS)
+        for (user_address, agent_address), results in zip(targets, agent_results):
             try:
-                # Fetch fresh balances from RPC (parallel)
-                holdings_task = fetch_all_balances(agent_address)
-                positions_task = fetch_lp_positions(user_address, agent_address)
+                if not all(ok for ok, _ in results):
+                    # An agent's calls can span two chunks - if any read failed,
+                    # keep the stored balances rather than saving zeros for it
+                    errors += 1
+                    logger.error(f"[BalanceRefresh] RPC failed for {agent_address[:10]}...")
+                    continue
+                
+                token_balances = [
+                    raw / (10 ** decimals)
+                    for (_, raw), (_, _, decimals) in zip(results[:n_tokens], ALL_TOKENS)
+                ]
+                _, raw_eth = results[n_tokens]
+                holdings = build_holdings(token_balances, raw_eth / 1e18)
                 
-                holdings, positions = await asyncio.gather(holdings_task, positions_task)
+                positions = []
+                for lp, (_, balance), (reserves, total_supply) in zip(LP_TOKENS, results[n_tokens + 1:], lp_state):
+                    position = build_lp_position(
+                        lp, balance, reserves, total_supply,
+                        pool_apy.get(lp["address"].lower(), 0), len(positions)
+                    )
+                    if position:
+                        positions.append(position)
                 
                 # Calculate total
                 total = sum(h.value_usd for h in holdings) + sum(p.value_usd for p in positions)
                 
                 # Only save to Supabase if we have actual data (not empty results)
-                has_data = len(holdings) > 0 or len(positions) > 0 or total > 0
-                if has_data:
-                    await supabase.save_agent_balances(
-                        agent_address=agent_address,
-                        user_address=user_address,
-                        holdings=[h.model_dump() for h in holdings],
-                        positions=[p.model_dump() for p in positions],
-                        total_value_usd=total
-                    )
-                    refreshed += 1
-                    logger.info(f"[BalanceRefresh] Refreshed {agent_address[:10]}... (${total:.2f})")
+                if holdings or positions or total > 0:
+                    rows.append((user_address, agent_address, holdings, positions, total))
                 else:
-                    logger.warning(f"[BalanceRefresh] Skipping empty data for {agent_address[:10]}...")
-                
+                    skipped += 1
+                    logger.debug(f"[BalanceRefresh] Skipping empty data for {agent_address[:10]}...")
             except Exception as e:
                 errors += 1
                 logger.error(f"[BalanceRefresh] Error refreshing {agent_address[:10]}...: {e}")
+        stages["build_ms"] = round((time.time() - stage_start) * 1000, 1)
+        
+        # 4. Persist - queued balance rows go out as bulk upserts
+        stage_start = time.time()
+        for user_address, agent_address, holdings, positions, total in rows:
+            try:
+                holdings = [h.model_dump() for h in holdings]
+                positions = [p.model_dump() for p in positions]
+                await supabase.save_agent_balances(
+                    agent_address=agent_address,
+                    user_address=user_address,
+                    holdings=holdings,
+                    positions=positions,
+                    total_value_usd=total,
+                    defer=True
+                )
+                # Open dashboards get a delta only if the wallet actually changed
+                portfolio_stream.publish_agent_balances(user_address, agent_address, holdings, positions, total)
+                refreshed += 1
+            except Exception as e:
+                errors += 1
+                logger.error(f"[BalanceRefresh] Error saving {agent_address[:10]}...: {e}")
+        await write_behind.flush()
+        stages["persist_ms"] = round((time.time() - stage_start) * 1000, 1)
     
-    elapsed = (datetime.now() - start).total_seconds()
-    logger.info(f"[BalanceRefresh] Cycle complete: {refreshed} agents, {errors} errors, {elapsed:.1f}s")
+    elapsed = time.time() - start
+    last_refresh_stats.clear()
+    last_refresh_stats.update({
+        "agents": len(targets),
+        "refreshed": refreshed,
+        "skipped": skipped,
+        "errors": errors,
+        "rpc_requests": rpc_requests,
+        "elapsed_s": round(elapsed, 2),
+        "stages": stages,
+        "finished_at": datetime.now().isoformat(),
+    })
+    logger.info(
+        f"[BalanceRefresh] Cycle complete: {refreshed}/{len(targets)} agents, {errors} errors, "
+        f"{rpc_requests} RPC requests, {elapsed:.1f}s | stages: {stages}"
+    )
+    return last_refresh_stats
 
 
 async def balance_refresh_loop():
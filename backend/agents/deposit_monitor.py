@@ -92,10 +92,16 @@ class DepositMonitor:
                 if agent.get("is_active", False):
                     active_agents.append(agent)
         
+        # One batched read for every agent (a few Multicall3 requests, off the event loop)
+        addresses = [a["agent_address"] for a in active_agents if a.get("agent_address")]
+        all_balances = await self.get_balances_batch(addresses)
+        
         for agent in active_agents:
-            await self.check_agent_balance(agent)
+            address = agent.get("agent_address")
+            if address and address in all_balances:
+                await self.check_agent_balance(agent, all_balances[address])
     
-    async def check_agent_balance(self, agent: dict):
+    async def check_agent_balance(self, agent: dict, current: Dict[str, int] = None):
         """Check and compare balance for an agent"""
         agent_address = agent.get("agent_address")
         user_address = agent.get("user_address")
@@ -104,8 +110,11 @@ class DepositMonitor:
             return
         
         # Get current balances
-        current = await self.get_balances(agent_address)
+        if current is None:
+            current = await self.get_balances(agent_address)
         previous = self.last_balances.get(agent_address, {})
+        # Tokens whose read failed keep their last known balance (no phantom deposits)
+        current = {**previous, **current}
         
         # Detect deposits
         deposits = []
@@ -128,39 +137,69 @@ class DepositMonitor:
             for d in deposits:
                 print(f"  + {d['formatted']} {d['token']}")
             
+            self._portfolio_changed(agent, "deposit")
+            
             await self.trigger_allocation(agent, deposits)
     
     async def get_balances(self, address: str) -> Dict[str, int]:
         """Get token balances for an address"""
+        balances = await self.get_balances_batch([address])
+        return balances.get(address, {})
+    
+    async def get_balances_batch(self, addresses: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Get ETH + TOKENS balances for many addresses via Multicall3.
+        
+        All reads are pinned to one block and executed in worker threads, so the
+        event loop never blocks on RPC. Failed reads are left out of the result;
+        addresses whose reads all failed are left out entirely.
+        """
+        from data_sources.multicall import Multicall3, execute_batched
+        
+        if not addresses:
+            return {}
+        
         w3 = self._get_web3()
-        balances = {}
+        result: Dict[str, Dict[str, int]] = {}
         
         try:
-            # Ensure address is checksum formatted
-            checksum_address = Web3.to_checksum_address(address)
+            loop = asyncio.get_running_loop()
+            block = await loop.run_in_executor(None, lambda: w3.eth.block_number)
             
-            # ETH balance
-            eth_balance = w3.eth.get_balance(checksum_address)
-            balances["ETH"] = eth_balance
+            multicall = Multicall3(w3).multicall
+            tokens = [
+                (symbol, w3.eth.contract(address=Web3.to_checksum_address(token_address), abi=ERC20_ABI))
+                for symbol, token_address in TOKENS.items()
+            ]
             
-            # ERC20 balances
-            for symbol, token_address in TOKENS.items():
-                try:
-                    contract = w3.eth.contract(
-                        address=Web3.to_checksum_address(token_address),
-                        abi=ERC20_ABI
-                    )
-                    balance = contract.functions.balanceOf(
-                        Web3.to_checksum_address(address)
-                    ).call()
-                    balances[symbol] = balance
-                except Exception as e:
-                    balances[symbol] = 0
+            calls = []
+            for address in addresses:
+                # Ensure address is checksum formatted
+                checksum_address = Web3.to_checksum_address(address)
+                calls.append((multicall, "getEthBalance", (checksum_address,)))
+                calls.extend((contract, "balanceOf", (checksum_address,)) for _, contract in tokens)
+            
+            results = await execute_batched(w3, calls, block_identifier=block)
+            
+            symbols = ["ETH"] + [symbol for symbol, _ in tokens]
+            for n, address in enumerate(addresses):
+                row = results[n * len(symbols):(n + 1) * len(symbols)]
+                balances = {symbol: value for symbol, (ok, value) in zip(symbols, row) if ok}
+                if balances:
+                    result[address] = balances
                     
         except Exception as e:
             print(f"[DepositMonitor] Balance check error: {e}")
         
-        return balances
+        return result
+    
+    def _portfolio_changed(self, agent: dict, reason: str):
+        """Push a fresh portfolio delta to the owner's open dashboards"""
+        try:
+            from services.portfolio_stream import portfolio_stream
+            portfolio_stream.invalidate(agent.get("user_address"), reason=reason)
+        except Exception as e:
+            print(f"[DepositMonitor] Portfolio stream update failed: {e}")
     
     def format_amount(self, token: str, amount: int) -> str:
         """Format amount with proper decimals"""
@@ -249,6 +288,7 @@ class DepositMonitor:
                 
                 # Update agent status
                 agent["last_allocation"] = datetime.utcnow().isoformat()
+                self._portfolio_changed(agent, "allocation")
                 agent["allocation_count"] = agent.get("allocation_count", 0) + successful
                 agent["total_allocated_usd"] = agent.get("total_allocated_usd", 0) + total_usd
                 
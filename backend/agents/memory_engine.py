@@ -19,8 +19,9 @@ Key Features:
 import json
 import sqlite3
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
@@ -71,6 +72,65 @@ class Memory:
             self.tags = []
 
 
+class MemoryStore:
+    """
+    Persistent SQLite backend for the memory engine.
+    
+    - ONE connection in WAL mode, owned by a single worker thread:
+      queries never block the event loop and never race each other
+    - Constant SQL strings -> sqlite3's statement cache reuses prepared statements
+    - FTS5 index over content + tags (external content table kept in sync by
+      triggers), so recall() is an index lookup instead of LIKE '%q%' scans
+    - Falls back to LIKE when the SQLite build has no FTS5
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts_enabled = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn = conn
+        return self._conn
+    
+    def run_sync(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(conn) on the DB thread and wait (for startup / sync callers)"""
+        return self._executor.submit(lambda: fn(self._connect())).result()
+    
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(conn) on the DB thread without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connect()))
+    
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        def _execute(conn):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        return await self.run(_execute)
+    
+    async def executemany(self, sql: str, rows: List[tuple]) -> None:
+        def _executemany(conn):
+            conn.executemany(sql, rows)
+            conn.commit()
+        await self.run(_executemany)
+    
+    async def fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+    
+    def close(self):
+        if self._conn is not None:
+            self._executor.submit(self._conn.close).result()
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+
 class OutcomeBasedMemory:
     """
     Outcome-Based Memory Engine with 5-Tier Architecture.
@@ -91,14 +151,25 @@ class OutcomeBasedMemory:
     WORKING_RETENTION = timedelta(hours=24)
     HISTORY_RETENTION = timedelta(days=30)
     
+    # Access-count updates are batched (one executemany per flush)
+    ACCESS_FLUSH_DELAY = 1.0   # seconds
+    ACCESS_FLUSH_SIZE = 256    # pending ids that force an immediate flush
+    
+    MEMORY_COLUMNS = """
+        m.id, m.tier, m.memory_type, m.content, m.score, m.created_at,
+        m.updated_at, m.access_count, m.user_id, m.agent_id, m.tags
+    """
+    
     def __init__(self, db_path: str = "techne_memory.db"):
         self.db_path = db_path
-        self._init_database()
-        logger.info("🧠 Outcome-Based Memory Engine initialized")
+        self._store = MemoryStore(db_path)
+        self._pending_access: Dict[str, Tuple[int, str]] = {}  # id -> (hits, last access time)
+        self._access_flush_task: Optional[asyncio.Task] = None
+        self._store.run_sync(self._init_database)
+        logger.info(f"🧠 Outcome-Based Memory Engine initialized (fts5={self._store.fts_enabled})")
     
-    def _init_database(self):
+    def _init_database(self, conn: sqlite3.Connection):
         """Initialize SQLite database for memory persistence"""
-        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -129,9 +200,45 @@ class OutcomeBasedMemory:
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_score ON memories(score)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_score ON memories(user_id, score)
+        """)
+        
+        # Full-text index over content + tags (external content, synced by triggers)
+        try:
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories_fts'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts
+                USING fts5(content, tags, content='memories', content_rowid='rowid')
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, content, tags) VALUES (new.rowid, new.content, new.tags);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content, tags)
+                    VALUES ('delete', old.rowid, old.content, old.tags);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF content, tags ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content, tags)
+                    VALUES ('delete', old.rowid, old.content, old.tags);
+                    INSERT INTO memories_fts(rowid, content, tags) VALUES (new.rowid, new.content, new.tags);
+                END
+            """)
+            if not exists:
+                # Existing database: index rows stored before FTS was added
+                cursor.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+            self._store.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, recall falls back to LIKE: {e}")
         
         conn.commit()
-        conn.close()
     
     # ==========================================
     # CORE MEMORY OPERATIONS
@@ -176,14 +283,18 @@ class OutcomeBasedMemory:
             tags=tags or []
         )
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO memories 
+        # Upsert (not INSERT OR REPLACE) so the FTS update trigger fires
+        await self._store.execute("""
+            INSERT INTO memories 
             (id, tier, memory_type, content, score, created_at, updated_at, 
              access_count, user_id, agent_id, tags)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                tier = excluded.tier, memory_type = excluded.memory_type,
+                content = excluded.content, score = excluded.score,
+                created_at = excluded.created_at, updated_at = excluded.updated_at,
+                access_count = excluded.access_count, user_id = excluded.user_id,
+                agent_id = excluded.agent_id, tags = excluded.tags
         """, (
             memory.id,
             memory.tier.value,
@@ -198,9 +309,6 @@ class OutcomeBasedMemory:
             json.dumps(memory.tags)
         ))
         
-        conn.commit()
-        conn.close()
-        
         logger.debug(f"Stored memory: {memory_id} ({memory_type.value})")
         return memory
     
@@ -225,54 +333,57 @@ class OutcomeBasedMemory:
         Returns:
             List of matching memories, sorted by relevance
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        sql = """
-            SELECT id, tier, memory_type, content, score, created_at, 
-                   updated_at, access_count, user_id, agent_id, tags
-            FROM memories
-            WHERE score >= ? AND user_id = ?
+        sql = f"""
+            SELECT {self.MEMORY_COLUMNS}
+            FROM memories m
+            WHERE m.score >= ? AND m.user_id = ?
         """
         params = [min_score, user_id]
         
         if memory_type:
-            sql += " AND memory_type = ?"
+            sql += " AND m.memory_type = ?"
             params.append(memory_type.value)
         
-        if query:
-            sql += " AND content LIKE ?"
+        if query and self._store.fts_enabled:
+            sql += " AND m.rowid IN (SELECT rowid FROM memories_fts WHERE memories_fts MATCH ?)"
+            params.append(self._fts_query(query))
+        elif query:
+            sql += " AND m.content LIKE ?"
             params.append(f"%{query}%")
         
-        sql += " ORDER BY score DESC, updated_at DESC LIMIT ?"
+        sql += " ORDER BY m.score DESC, m.updated_at DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        conn.close()
+        rows = await self._store.fetchall(sql, tuple(params))
+        memories = [self._row_to_memory(row) for row in rows]
         
-        memories = []
-        for row in rows:
-            memory = Memory(
-                id=row[0],
-                tier=MemoryTier(row[1]),
-                memory_type=MemoryType(row[2]),
-                content=json.loads(row[3]),
-                score=row[4],
-                created_at=datetime.fromisoformat(row[5]),
-                updated_at=datetime.fromisoformat(row[6]),
-                access_count=row[7],
-                user_id=row[8],
-                agent_id=row[9],
-                tags=json.loads(row[10])
-            )
-            memories.append(memory)
-            
-            # Update access count
-            await self._update_access(memory.id)
+        # Update access counts (batched)
+        self._queue_access([m.id for m in memories])
         
         return memories
     
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Each word becomes a quoted prefix term (implicit AND) - no FTS syntax injection"""
+        terms = [t.replace('"', '""') for t in query.split()]
+        return " ".join(f'"{t}"*' for t in terms) or '""'
+    
+    @staticmethod
+    def _row_to_memory(row: tuple) -> Memory:
+        return Memory(
+            id=row[0],
+            tier=MemoryTier(row[1]),
+            memory_type=MemoryType(row[2]),
+            content=json.loads(row[3]),
+            score=row[4],
+            created_at=datetime.fromisoformat(row[5]),
+            updated_at=datetime.fromisoformat(row[6]),
+            access_count=row[7],
+            user_id=row[8],
+            agent_id=row[9],
+            tags=json.loads(row[10])
+        )
+    
     # ==========================================
     # OUTCOME TRACKING - THE KEY INNOVATION
     # ==========================================
@@ -294,38 +405,38 @@ class OutcomeBasedMemory:
         Returns:
             New score after adjustment
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get current memory
-        cursor.execute("SELECT score, tier FROM memories WHERE id = ?", (memory_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
+        def _apply(conn) -> Optional[Tuple[float, float, str]]:
+            # Read-modify-write in one DB-thread job (atomic w.r.t. other calls)
+            row = conn.execute("SELECT score, tier FROM memories WHERE id = ?", (memory_id,)).fetchone()
+            if not row:
+                return None
+            current_score, current_tier = row
+            
+            # Apply outcome adjustment
+            if success:
+                new_score = min(1.0, current_score + self.SUCCESS_BOOST)
+            else:
+                new_score = max(0.0, current_score + self.FAILURE_PENALTY)
+            
+            # Update score
+            conn.execute("""
+                UPDATE memories 
+                SET score = ?, updated_at = ?
+                WHERE id = ?
+            """, (new_score, datetime.now().isoformat(), memory_id))
+            conn.commit()
+            return current_score, new_score, current_tier
+        
+        result = await self._store.run(_apply)
+        if result is None:
             return 0.0
+        current_score, new_score, current_tier = result
         
-        current_score = row[0]
-        current_tier = row[1]
-        
-        # Apply outcome adjustment
         if success:
-            new_score = min(1.0, current_score + self.SUCCESS_BOOST)
             logger.info(f"✅ Memory {memory_id[:8]}... SUCCESS: {current_score:.2f} → {new_score:.2f}")
         else:
-            new_score = max(0.0, current_score + self.FAILURE_PENALTY)
             logger.info(f"❌ Memory {memory_id[:8]}... FAILED: {current_score:.2f} → {new_score:.2f}")
         
-        # Update score
-        cursor.execute("""
-            UPDATE memories 
-            SET score = ?, updated_at = ?
-            WHERE id = ?
-        """, (new_score, datetime.now().isoformat(), memory_id))
-        
-        conn.commit()
-        conn.close()
-        
         # Check for promotion or deletion
         await self._check_promotion(memory_id, new_score, current_tier)
         
@@ -346,33 +457,46 @@ class OutcomeBasedMemory:
     
     async def _promote_memory(self, memory_id: str, new_tier: MemoryTier):
         """Promote memory to a higher tier"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
+        await self._store.execute("""
             UPDATE memories SET tier = ?, updated_at = ? WHERE id = ?
         """, (new_tier.value, datetime.now().isoformat(), memory_id))
-        conn.commit()
-        conn.close()
     
     async def _archive_memory(self, memory_id: str):
         """Archive low-scoring memory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
-        conn.commit()
-        conn.close()
+        self._pending_access.pop(memory_id, None)
+        await self._store.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
     
-    async def _update_access(self, memory_id: str):
-        """Update access count and timestamp"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE memories 
-            SET access_count = access_count + 1, updated_at = ?
-            WHERE id = ?
-        """, (datetime.now().isoformat(), memory_id))
-        conn.commit()
-        conn.close()
+    def _queue_access(self, memory_ids: List[str]):
+        """Record recall hits in memory; written by one executemany in _update_access"""
+        now = datetime.now().isoformat()
+        for memory_id in memory_ids:
+            hits, _ = self._pending_access.get(memory_id, (0, now))
+            self._pending_access[memory_id] = (hits + 1, now)
+        
+        if not self._pending_access:
+            return
+        if len(self._pending_access) >= self.ACCESS_FLUSH_SIZE:
+            asyncio.create_task(self._update_access())
+        elif self._access_flush_task is None or self._access_flush_task.done():
+            self._access_flush_task = asyncio.create_task(self._delayed_access_flush())
+    
+    async def _delayed_access_flush(self):
+        await asyncio.sleep(self.ACCESS_FLUSH_DELAY)
+        await self._update_access()
+    
+    async def _update_access(self):
+        """Update access counts and timestamps for all pending recall hits"""
+        if not self._pending_access:
+            return
+        pending, self._pending_access = self._pending_access, {}
+        try:
+            await self._store.executemany("""
+                UPDATE memories 
+                SET access_count = access_count + ?, updated_at = ?
+                WHERE id = ?
+            """, [(hits, accessed_at, memory_id) for memory_id, (hits, accessed_at) in pending.items()])
+        except Exception as e:
+            logger.error(f"Access count update failed: {e}")
     
     # ==========================================
     # SPECIALIZED MEMORY OPERATIONS
@@ -575,28 +699,29 @@ class OutcomeBasedMemory:
     
     async def cleanup_expired(self):
         """Remove expired memories based on retention policies"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        await self._update_access()
         
         now = datetime.now()
         working_cutoff = (now - self.WORKING_RETENTION).isoformat()
         history_cutoff = (now - self.HISTORY_RETENTION).isoformat()
         
-        # Delete expired working memories
-        cursor.execute("""
-            DELETE FROM memories 
-            WHERE tier = 'working' AND created_at < ?
-        """, (working_cutoff,))
-        
-        # Delete expired history memories (unless promoted)
-        cursor.execute("""
-            DELETE FROM memories 
-            WHERE tier = 'history' AND created_at < ? AND score < ?
-        """, (history_cutoff, self.PROMOTE_THRESHOLD))
+        def _cleanup(conn) -> int:
+            # Delete expired working memories
+            working = conn.execute("""
+                DELETE FROM memories 
+                WHERE tier = 'working' AND created_at < ?
+            """, (working_cutoff,)).rowcount
+            
+            # Delete expired history memories (unless promoted)
+            history = conn.execute("""
+                DELETE FROM memories 
+                WHERE tier = 'history' AND created_at < ? AND score < ?
+            """, (history_cutoff, self.PROMOTE_THRESHOLD)).rowcount
+            
+            conn.commit()
+            return working + history
         
-        conn.commit()
-        deleted = cursor.rowcount
-        conn.close()
+        deleted = await self._store.run(_cleanup)
         
         if deleted > 0:
             logger.info(f"🧹 Cleaned up {deleted} expired memories")
@@ -605,27 +730,28 @@ class OutcomeBasedMemory:
     
     async def get_stats(self, user_id: str = "default") -> Dict[str, Any]:
         """Get memory statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        rows = await self._store.fetchall("""
             SELECT tier, COUNT(*), AVG(score) 
             FROM memories 
             WHERE user_id = ?
             GROUP BY tier
         """, (user_id,))
         
-        stats = {"tiers": {}, "total": 0}
-        for row in cursor.fetchall():
+        stats = {"tiers": {}, "total": 0, "fts_enabled": self._store.fts_enabled}
+        for row in rows:
             stats["tiers"][row[0]] = {
                 "count": row[1],
                 "avg_score": round(row[2], 2) if row[2] else 0
             }
             stats["total"] += row[1]
         
-        conn.close()
         return stats
     
+    async def close(self):
+        """Flush pending access counts and close the connection"""
+        await self._update_access()
+        self._store.close()
+    
     def _generate_id(self, content: Dict) -> str:
         """Generate unique ID for memory"""
         content_str = json.dumps(content, sort_keys=True)
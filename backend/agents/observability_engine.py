@@ -8,14 +8,28 @@ Features:
 - Metrics Collection: Success/failure rates, latency
 - Event Logging: Structured logging for debugging
 - Dashboard Data: Aggregated stats for visualization
+- Buffered Export: spans/events/metrics go to an in-memory ring buffer and a
+  background thread writes them in batched transactions (no fsync per span)
+- Sampling: OBSERVABILITY_SAMPLE_RATE keeps a fraction of traces (metrics and
+  error events are always recorded)
+- Rollups: per agent/operation counts, errors and latency histograms at
+  1m / 1h / 1d resolution, maintained as spans complete (dashboards read a
+  bounded number of rollup rows instead of scanning raw data)
+- Retention: raw spans are downsampled after a day and dropped after a week,
+  rollups expire per resolution - the database stops growing without bound
 
 No external dependencies - fully self-contained!
 """
 
 import asyncio
+import bisect
+import os
+import random
+import threading
 import time
 import json
 import sqlite3
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, asdict, field
@@ -29,6 +43,24 @@ import traceback
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Observability")
 
+# Export settings (env-tunable so tracing can stay on in production)
+SAMPLE_RATE = float(os.getenv("OBSERVABILITY_SAMPLE_RATE", "1.0"))
+BUFFER_SIZE = int(os.getenv("OBSERVABILITY_BUFFER_SIZE", "10000"))
+DROP_POLICY = os.getenv("OBSERVABILITY_DROP_POLICY", "drop_oldest")  # or "drop_newest"
+FLUSH_INTERVAL = float(os.getenv("OBSERVABILITY_FLUSH_INTERVAL", "1.0"))
+
+# Rollup resolutions (seconds) and how long each is kept
+ROLLUP_RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+ROLLUP_RETENTION = {"1m": 86400, "1h": 30 * 86400, "1d": 365 * 86400}
+
+# Raw data retention: full detail for a day, then errors + 1/16 of traces for a week
+RAW_RETENTION = 86400
+DOWNSAMPLED_RETENTION = 7 * 86400
+PRUNE_INTERVAL = 600
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000]
+
 
 class SpanStatus(Enum):
     """Status of a span/operation"""
@@ -68,6 +100,7 @@ class Span:
     duration_ms: Optional[float] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
+    sampled: bool = True
     
     def finish(self, status: SpanStatus = SpanStatus.SUCCESS, error: str = None):
         """Finish the span with final status"""
@@ -91,6 +124,317 @@ class Trace:
     span_count: int = 0
     status: SpanStatus = SpanStatus.RUNNING
     user_id: str = "default"
+    sampled: bool = True
+
+
+def histogram_percentile(histogram: List[int], q: float, max_ms: float = None) -> float:
+    """Upper bound of the bucket holding the q-quantile (capped at the observed max)"""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    target = q * total
+    seen = 0
+    for i, n in enumerate(histogram):
+        seen += n
+        if seen >= target:
+            bound = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else max_ms or LATENCY_BUCKETS_MS[-1]
+            return float(min(bound, max_ms)) if max_ms is not None else float(bound)
+    return float(max_ms or 0.0)
+
+
+class MetricsRollup:
+    """
+    Incremental per-agent/per-operation rollups.
+    
+    observe() only touches in-memory deltas (a few dict updates under an
+    uncontended lock); the exporter merges the deltas into the `rollups` table
+    in the same transaction as the raw rows.
+    
+    Row: (resolution, bucket_start, agent, operation) ->
+         count, errors, latency_sum, latency_max, histogram (JSON bucket counts)
+    """
+    
+    def __init__(self, resolutions: Dict[str, int] = None):
+        self.resolutions = resolutions or ROLLUP_RESOLUTIONS
+        self._deltas: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, agent: str, operation: str, latency_ms: float, error: bool, ts: float = None):
+        ts = ts or time.time()
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+        with self._lock:
+            for name, seconds in self.resolutions.items():
+                key = (name, int(ts // seconds) * seconds, agent, operation)
+                row = self._deltas.get(key)
+                if row is None:
+                    row = self._deltas[key] = [0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS_MS) + 1)]
+                row[0] += 1
+                row[1] += 1 if error else 0
+                row[2] += latency_ms
+                row[3] = max(row[3], latency_ms)
+                row[4][bucket] += 1
+    
+    @property
+    def pending(self) -> int:
+        return len(self._deltas)
+    
+    def drain(self) -> Dict[tuple, list]:
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        return deltas
+    
+    @staticmethod
+    def merge_into(conn: sqlite3.Connection, deltas: Dict[tuple, list]):
+        """Add deltas to the stored rows (call inside the exporter transaction)"""
+        for key, (count, errors, latency_sum, latency_max, histogram) in deltas.items():
+            existing = conn.execute("""
+                SELECT count, errors, latency_sum, latency_max, histogram FROM rollups
+                WHERE resolution = ? AND bucket_start = ? AND agent = ? AND operation = ?
+            """, key).fetchone()
+            if existing:
+                stored = json.loads(existing[4])
+                histogram = [a + b for a, b in zip(histogram, stored + [0] * (len(histogram) - len(stored)))]
+                count += existing[0]
+                errors += existing[1]
+                latency_sum += existing[2]
+                latency_max = max(latency_max, existing[3])
+            conn.execute("""
+                INSERT OR REPLACE INTO rollups (resolution, bucket_start, agent, operation,
+                                                count, errors, latency_sum, latency_max, histogram)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (*key, count, errors, latency_sum, latency_max, json.dumps(histogram)))
+    
+    @staticmethod
+    def summarize(rows: List[tuple]) -> Dict[str, Any]:
+        """Combine (count, errors, latency_sum, latency_max, histogram_json) rows"""
+        count = errors = 0
+        latency_sum = latency_max = 0.0
+        histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for row_count, row_errors, row_sum, row_max, row_hist in rows:
+            count += row_count
+            errors += row_errors
+            latency_sum += row_sum
+            latency_max = max(latency_max, row_max)
+            for i, n in enumerate(json.loads(row_hist)):
+                histogram[i] += n
+        return {
+            "count": count,
+            "errors": errors,
+            "avg_latency_ms": round(latency_sum / count, 1) if count else 0,
+            "max_latency_ms": round(latency_max, 1),
+            "p50_ms": histogram_percentile(histogram, 0.50, latency_max),
+            "p95_ms": histogram_percentile(histogram, 0.95, latency_max),
+            "p99_ms": histogram_percentile(histogram, 0.99, latency_max),
+        }
+
+
+class SpanExporter:
+    """
+    Ring buffer + background writer for observability rows.
+    
+    - record() is a deque append: no I/O, no lock on the hot path
+    - A daemon thread drains the buffer every flush_interval seconds (or as soon
+      as batch_size rows are waiting) and writes everything in ONE transaction
+    - Bounded memory: when the buffer is full, drop_oldest evicts the oldest
+      row, drop_newest rejects the new one; both are counted in stats
+    - flush() can be called synchronously (reads flush first so they see
+      just-finished spans)
+    - Rollup deltas are merged in the same transaction; retention pruning runs
+      on the exporter thread every prune_interval seconds
+    """
+    
+    INSERTS = {
+        "trace": """
+            INSERT OR REPLACE INTO traces (trace_id, root_span_id, agent, operation, start_time,
+                                           end_time, total_duration_ms, span_count, status, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        "span": """
+            INSERT OR REPLACE INTO spans (span_id, trace_id, parent_id, agent, operation, status,
+                                          start_time, end_time, duration_ms, metadata, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        "event": """
+            INSERT INTO events (trace_id, span_id, agent, event_type, message, timestamp, level, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        "metric": """
+            INSERT INTO metrics (agent, operation, metric_type, value, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+    }
+    
+    def __init__(
+        self,
+        db_path: str,
+        max_buffer: int = BUFFER_SIZE,
+        drop_policy: str = DROP_POLICY,
+        flush_interval: float = FLUSH_INTERVAL,
+        batch_size: int = 500,
+        rollups: MetricsRollup = None,
+        prune_interval: float = PRUNE_INTERVAL
+    ):
+        if drop_policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.db_path = db_path
+        self.max_buffer = max_buffer
+        self.drop_policy = drop_policy
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.rollups = rollups or MetricsRollup()
+        self.prune_interval = prune_interval
+        self._last_prune = time.monotonic()
+        
+        self._buffer: deque = deque()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self._stats = {
+            "recorded": 0,
+            "exported": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "export_errors": 0,
+            "rollup_rows_merged": 0,
+            "pruned_rows": 0,
+        }
+    
+    def record(self, kind: str, row: tuple):
+        """Queue one row ("trace" | "span" | "event" | "metric")"""
+        if len(self._buffer) >= self.max_buffer:
+            self._stats["dropped"] += 1
+            if self.drop_policy == "drop_newest":
+                return
+            try:
+                self._buffer.popleft()
+            except IndexError:
+                pass
+        self._buffer.append((kind, row))
+        self._stats["recorded"] += 1
+        
+        if self._thread is None:
+            self._start()
+        elif len(self._buffer) >= self.batch_size:
+            self._wake.set()
+    
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+    
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self.prune()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+    
+    def flush(self) -> int:
+        """Write everything buffered in one transaction. Returns rows written."""
+        with self._write_lock:
+            rows: Dict[str, List[tuple]] = {}
+            count = 0
+            while True:
+                try:
+                    kind, row = self._buffer.popleft()
+                except IndexError:
+                    break
+                rows.setdefault(kind, []).append(row)
+                count += 1
+            deltas = self.rollups.drain()
+            if not count and not deltas:
+                return 0
+            
+            try:
+                conn = self._connect()
+                with conn:
+                    # Traces before spans before metrics: same order the engine produced them
+                    for kind in ("trace", "span", "event", "metric"):
+                        if kind in rows:
+                            conn.executemany(self.INSERTS[kind], rows[kind])
+                    MetricsRollup.merge_into(conn, deltas)
+                self._stats["exported"] += count
+                self._stats["rollup_rows_merged"] += len(deltas)
+                self._stats["flushes"] += 1
+            except Exception as e:
+                self._stats["export_errors"] += 1
+                self._stats["dropped"] += count
+                logger.error(f"[SpanExporter] Export of {count} rows failed: {e}")
+            return count
+    
+    def prune(self, now: float = None) -> int:
+        """
+        Apply retention: full raw detail for RAW_RETENTION, then only errors and
+        1/16 of traces (trace_id starting with '0') until DOWNSAMPLED_RETENTION.
+        Rollups expire per resolution. Freed pages are reused, so the file stops growing.
+        """
+        now = now or time.time()
+        raw_cutoff = now - RAW_RETENTION
+        keep_cutoff = now - DOWNSAMPLED_RETENTION
+        raw_iso = datetime.fromtimestamp(raw_cutoff).isoformat()
+        keep_iso = datetime.fromtimestamp(keep_cutoff).isoformat()
+        
+        with self._write_lock:
+            self._last_prune = time.monotonic()
+            try:
+                conn = self._connect()
+                with conn:
+                    deleted = conn.execute("""
+                        DELETE FROM spans WHERE start_time < ?
+                           OR (start_time < ? AND status = 'success' AND substr(trace_id, 1, 1) != '0')
+                    """, (keep_cutoff, raw_cutoff)).rowcount
+                    deleted += conn.execute("""
+                        DELETE FROM traces WHERE start_time < ?
+                           OR (start_time < ? AND status = 'success' AND substr(trace_id, 1, 1) != '0')
+                    """, (keep_iso, raw_iso)).rowcount
+                    deleted += conn.execute("DELETE FROM events WHERE timestamp < ?", (keep_iso,)).rowcount
+                    deleted += conn.execute("DELETE FROM metrics WHERE timestamp < ?", (raw_iso,)).rowcount
+                    for name, seconds in ROLLUP_RETENTION.items():
+                        deleted += conn.execute(
+                            "DELETE FROM rollups WHERE resolution = ? AND bucket_start < ?", (name, now - seconds)
+                        ).rowcount
+                self._stats["pruned_rows"] += deleted
+                return deleted
+            except Exception as e:
+                logger.error(f"[SpanExporter] Retention prune failed: {e}")
+                return 0
+    
+    def close(self):
+        """Stop the exporter thread and write whatever is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._stop.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self._buffer),
+            "pending_rollups": self.rollups.pending,
+            "max_buffer": self.max_buffer,
+            "drop_policy": self.drop_policy,
+        }
 
 
 class ObservabilityEngine:
@@ -99,16 +443,25 @@ class ObservabilityEngine:
     Self-contained, no external dependencies.
     """
     
-    def __init__(self, db_path: str = "techne_observability.db"):
+    def __init__(
+        self,
+        db_path: str = "techne_observability.db",
+        sample_rate: float = SAMPLE_RATE,
+        exporter: SpanExporter = None
+    ):
         self.db_path = db_path
+        self.sample_rate = sample_rate
         self.active_spans: Dict[str, Span] = {}
         self.active_traces: Dict[str, Trace] = {}
         self._init_database()
-        logger.info("🔍 Observability Engine initialized")
+        self.exporter = exporter or SpanExporter(db_path)
+        self.rollups = self.exporter.rollups
+        logger.info(f"🔍 Observability Engine initialized (sample_rate={sample_rate})")
     
     def _init_database(self):
         """Initialize SQLite database for trace storage"""
         conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
         
         # Traces table
@@ -172,8 +525,28 @@ class ObservabilityEngine:
             )
         """)
         
+        # Pre-aggregated rollups (1m / 1h / 1d buckets)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollups (
+                resolution TEXT NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                agent TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                errors INTEGER NOT NULL,
+                latency_sum REAL NOT NULL,
+                latency_max REAL NOT NULL,
+                histogram TEXT NOT NULL,
+                PRIMARY KEY (resolution, bucket_start, agent, operation)
+            )
+        """)
+        
         # Create indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_traces_agent ON traces(agent)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_traces_start ON traces(start_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_spans_start ON spans(start_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_time ON events(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_time ON metrics(timestamp)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_spans_trace ON spans(trace_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_trace ON events(trace_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_agent ON metrics(agent)")
@@ -219,13 +592,13 @@ class ObservabilityEngine:
             user_id=user_id
         )
         
+        # Head sampling: unsampled traces are still timed (metrics) but never exported
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            span.sampled = trace.sampled = False
+        
         self.active_spans[span_id] = span
         self.active_traces[trace_id] = trace
         
-        # Persist
-        self._save_trace(trace)
-        self._save_span(span)
-        
         logger.debug(f"Started trace {trace_id} for {agent}.{operation}")
         return trace_id
     
@@ -251,13 +624,13 @@ class ObservabilityEngine:
             metadata=metadata or {}
         )
         
-        self.active_spans[span_id] = span
-        
-        # Update trace span count
-        if trace_id in self.active_traces:
-            self.active_traces[trace_id].span_count += 1
+        # Update trace span count (spans inherit the trace's sampling decision)
+        trace = self.active_traces.get(trace_id)
+        if trace is not None:
+            trace.span_count += 1
+            span.sampled = trace.sampled
         
-        self._save_span(span)
+        self.active_spans[span_id] = span
         return span_id
     
     def end_span(
@@ -278,24 +651,12 @@ class ObservabilityEngine:
         if metadata:
             span.metadata.update(metadata)
         
-        self._update_span(span)
+        if span.sampled:
+            self._export_span(span)
         del self.active_spans[span_id]
         
-        # Record latency metric
-        self._record_metric(
-            agent=span.agent,
-            operation=span.operation,
-            metric_type="latency_ms",
-            value=span.duration_ms
-        )
-        
-        # Record success/failure
-        self._record_metric(
-            agent=span.agent,
-            operation=span.operation,
-            metric_type="success" if status == SpanStatus.SUCCESS else "error",
-            value=1
-        )
+        # Latency + success/failure go into the rollups (every span, sampled or not)
+        self.rollups.observe(span.agent, span.operation, span.duration_ms, status != SpanStatus.SUCCESS)
     
     def end_trace(
         self,
@@ -314,7 +675,8 @@ class ObservabilityEngine:
         end_ts = trace.end_time.timestamp()
         trace.total_duration_ms = (end_ts - start_ts) * 1000
         
-        self._update_trace(trace)
+        if trace.sampled:
+            self._export_trace(trace)
         del self.active_traces[trace_id]
         
         # End root span if still active
@@ -409,15 +771,11 @@ class ObservabilityEngine:
         level: str = "info",
         metadata: Dict[str, Any] = None
     ):
-        """Log a structured event"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Log a structured event (errors are kept even for unsampled traces)"""
+        if level != "error" and trace_id in self.active_traces and not self.active_traces[trace_id].sampled:
+            return
         
-        cursor.execute("""
-            INSERT INTO events (trace_id, span_id, agent, event_type, message, 
-                               timestamp, level, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self.exporter.record("event", (
             trace_id,
             span_id,
             agent,
@@ -427,9 +785,6 @@ class ObservabilityEngine:
             level,
             json.dumps(metadata or {})
         ))
-        
-        conn.commit()
-        conn.close()
     
     def log_error(
         self,
@@ -462,89 +817,100 @@ class ObservabilityEngine:
         value: float
     ):
         """Record a metric value"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO metrics (agent, operation, metric_type, value, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        """, (agent, operation, metric_type, value, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        self.exporter.record("metric", (agent, operation, metric_type, value, datetime.now().isoformat()))
+    
+    def _rollup_rows(self, cursor, since: float, agent: str = None) -> tuple:
+        """Rollup rows covering [since, now] at the coarsest resolution that fits"""
+        span_seconds = time.time() - since
+        resolution = "1m" if span_seconds <= 2 * 3600 else "1h" if span_seconds <= 72 * 3600 else "1d"
+        seconds = ROLLUP_RESOLUTIONS[resolution]
+        sql = """
+            SELECT agent, operation, count, errors, latency_sum, latency_max, histogram
+            FROM rollups
+            WHERE resolution = ? AND bucket_start >= ?
+        """
+        params = [resolution, int(since // seconds) * seconds]
+        if agent:
+            sql += " AND agent = ?"
+            params.append(agent)
+        return resolution, cursor.execute(sql, params).fetchall()
     
     async def get_agent_metrics(
         self,
         agent: str,
         hours: int = 24
     ) -> Dict[str, Any]:
-        """Get aggregated metrics for an agent"""
+        """Get aggregated metrics for an agent (from rollups - cost independent of history size)"""
+        self.exporter.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
-        
-        # Get counts
-        cursor.execute("""
-            SELECT metric_type, COUNT(*), AVG(value), SUM(value)
-            FROM metrics
-            WHERE agent = ? AND timestamp > ?
-            GROUP BY metric_type
-        """, (agent, cutoff))
-        
-        metrics = {}
-        for row in cursor.fetchall():
-            metrics[row[0]] = {
-                "count": row[1],
-                "avg": round(row[2], 2) if row[2] else 0,
-                "sum": round(row[3], 2) if row[3] else 0
-            }
-        
+        resolution, rows = self._rollup_rows(cursor, time.time() - hours * 3600, agent)
         conn.close()
         
-        # Calculate success rate
-        success = metrics.get("success", {}).get("count", 0)
-        errors = metrics.get("error", {}).get("count", 0)
-        total = success + errors
+        by_operation: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_operation.setdefault(row[1], []).append(row[2:])
+        
+        summary = MetricsRollup.summarize([row[2:] for row in rows])
+        total = summary["count"]
+        errors = summary["errors"]
+        success = total - errors
         
         return {
             "agent": agent,
             "period_hours": hours,
+            "resolution": resolution,
             "total_operations": total,
             "success_count": success,
             "error_count": errors,
             "success_rate": round(success / total * 100, 1) if total > 0 else 100,
-            "avg_latency_ms": metrics.get("latency_ms", {}).get("avg", 0),
-            "metrics": metrics
+            "avg_latency_ms": summary["avg_latency_ms"],
+            "p50_latency_ms": summary["p50_ms"],
+            "p95_latency_ms": summary["p95_ms"],
+            "p99_latency_ms": summary["p99_ms"],
+            "throughput_per_min": round(total / (hours * 60), 3) if hours else 0,
+            "metrics": {
+                "latency_ms": {
+                    "count": total,
+                    "avg": summary["avg_latency_ms"],
+                    "sum": round(summary["avg_latency_ms"] * total, 2)
+                },
+                "success": {"count": success, "avg": 1 if success else 0, "sum": success},
+                "error": {"count": errors, "avg": 1 if errors else 0, "sum": errors}
+            },
+            "operations": {
+                operation: MetricsRollup.summarize(op_rows) for operation, op_rows in by_operation.items()
+            }
         }
     
     async def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get aggregated data for dashboard"""
+        """Get aggregated data for dashboard (rollups + one indexed query)"""
+        self.exporter.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cutoff_24h = (datetime.now() - timedelta(hours=24)).isoformat()
-        
-        # Get per-agent stats
-        cursor.execute("""
-            SELECT agent, 
-                   COUNT(CASE WHEN metric_type = 'success' THEN 1 END) as success,
-                   COUNT(CASE WHEN metric_type = 'error' THEN 1 END) as errors,
-                   AVG(CASE WHEN metric_type = 'latency_ms' THEN value END) as avg_latency
-            FROM metrics
-            WHERE timestamp > ?
-            GROUP BY agent
-        """, (cutoff_24h,))
+        # Get per-agent stats (24 hourly rollup rows per agent/operation)
+        _, rows = self._rollup_rows(cursor, time.time() - 24 * 3600)
+        by_agent: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_agent.setdefault(row[0], []).append(row[2:])
         
         agents = []
-        for row in cursor.fetchall():
-            total = row[1] + row[2]
+        total_errors = 0
+        for agent, agent_rows in by_agent.items():
+            summary = MetricsRollup.summarize(agent_rows)
+            total = summary["count"]
+            success = total - summary["errors"]
+            total_errors += summary["errors"]
             agents.append({
-                "agent": row[0],
-                "success": row[1],
-                "errors": row[2],
-                "success_rate": round(row[1] / total * 100, 1) if total > 0 else 100,
-                "avg_latency_ms": round(row[3], 1) if row[3] else 0
+                "agent": agent,
+                "success": success,
+                "errors": summary["errors"],
+                "success_rate": round(success / total * 100, 1) if total > 0 else 100,
+                "avg_latency_ms": summary["avg_latency_ms"],
+                "p95_latency_ms": summary["p95_ms"],
+                "throughput_per_min": round(total / (24 * 60), 3)
             })
         
         # Get recent traces
@@ -566,32 +932,34 @@ class ObservabilityEngine:
                 "timestamp": row[5]
             })
         
-        # Get error count
-        cursor.execute("""
-            SELECT COUNT(*) FROM events 
-            WHERE level = 'error' AND timestamp > ?
-        """, (cutoff_24h,))
-        error_count = cursor.fetchone()[0]
-        
         conn.close()
         
         return {
             "period": "24h",
             "agents": agents,
             "recent_traces": recent_traces,
-            "total_errors": error_count,
+            "total_errors": total_errors,
             "generated_at": datetime.now().isoformat()
         }
     
     async def get_trace_details(self, trace_id: str) -> Dict[str, Any]:
         """Get detailed view of a trace with all spans"""
+        self.exporter.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        # Get trace
+        # Get trace (still-running traces only live in memory)
         cursor.execute("SELECT * FROM traces WHERE trace_id = ?", (trace_id,))
         trace_row = cursor.fetchone()
         
+        if not trace_row and trace_id in self.active_traces:
+            active = self.active_traces[trace_id]
+            trace_row = (
+                active.trace_id, active.root_span_id, active.agent, active.operation,
+                active.start_time.isoformat(), None, None, active.span_count,
+                active.status.value, active.user_id
+            )
+        
         if not trace_row:
             conn.close()
             return None
@@ -617,6 +985,18 @@ class ObservabilityEngine:
                 "metadata": json.loads(row[8]) if row[8] else {},
                 "error": row[9]
             })
+        for span in self.active_spans.values():
+            if span.trace_id == trace_id:
+                spans.append({
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "agent": span.agent,
+                    "operation": span.operation,
+                    "status": span.status.value,
+                    "duration_ms": None,
+                    "metadata": span.metadata,
+                    "error": span.error
+                })
         
         # Get events
         cursor.execute("""
@@ -654,50 +1034,22 @@ class ObservabilityEngine:
     # PERSISTENCE HELPERS
     # ==========================================
     
-    def _save_trace(self, trace: Trace):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO traces (trace_id, root_span_id, agent, operation, 
-                               start_time, status, user_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+    def _export_trace(self, trace: Trace):
+        self.exporter.record("trace", (
             trace.trace_id,
             trace.root_span_id,
             trace.agent,
             trace.operation,
             trace.start_time.isoformat(),
-            trace.status.value,
-            trace.user_id
-        ))
-        conn.commit()
-        conn.close()
-    
-    def _update_trace(self, trace: Trace):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE traces 
-            SET end_time = ?, total_duration_ms = ?, span_count = ?, status = ?
-            WHERE trace_id = ?
-        """, (
             trace.end_time.isoformat() if trace.end_time else None,
             trace.total_duration_ms,
             trace.span_count,
             trace.status.value,
-            trace.trace_id
+            trace.user_id
         ))
-        conn.commit()
-        conn.close()
     
-    def _save_span(self, span: Span):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO spans (span_id, trace_id, parent_id, agent, operation,
-                              status, start_time, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    def _export_span(self, span: Span):
+        self.exporter.record("span", (
             span.span_id,
             span.trace_id,
             span.parent_id,
@@ -705,28 +1057,23 @@ class ObservabilityEngine:
             span.operation,
             span.status.value,
             span.start_time,
-            json.dumps(span.metadata)
-        ))
-        conn.commit()
-        conn.close()
-    
-    def _update_span(self, span: Span):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE spans 
-            SET end_time = ?, duration_ms = ?, status = ?, error = ?, metadata = ?
-            WHERE span_id = ?
-        """, (
             span.end_time,
             span.duration_ms,
-            span.status.value,
-            span.error,
             json.dumps(span.metadata),
-            span.span_id
+            span.error
         ))
-        conn.commit()
-        conn.close()
+    
+    def get_exporter_stats(self) -> Dict[str, Any]:
+        return {
+            **self.exporter.get_stats(),
+            "sample_rate": self.sample_rate,
+            "active_traces": len(self.active_traces),
+            "active_spans": len(self.active_spans),
+        }
+    
+    def close(self):
+        """Flush buffered rows (call on shutdown)"""
+        self.exporter.close()
 
 
 # ==========================================
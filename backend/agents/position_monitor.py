@@ -77,6 +77,33 @@ class PositionMonitor:
         
         logger.info("[PositionMonitor] Initialized")
     
+    def exit_rules(self, agent: Dict) -> Dict:
+        """
+        Exit thresholds for an agent - shared by the live checks below and the
+        backtest engine, so both apply the same rules.
+        
+        Returns:
+            {duration_days, min_apy, stop_loss_percent, take_profit_percent,
+             take_profit_usd}; disabled rules are None / 0
+        """
+        duration_config = agent.get("duration", {})
+        if isinstance(duration_config, dict):
+            duration_days = duration_config.get("days", self.default_duration_days)
+        else:
+            duration_days = self.default_duration_days
+        
+        pro_config = agent.get("pro_config") or {}
+        stop_loss_enabled = pro_config.get("stopLossEnabled", True)  # Default enabled
+        take_profit_enabled = pro_config.get("takeProfitEnabled", False)  # Default disabled
+        
+        return {
+            "duration_days": duration_days,
+            "min_apy": agent.get("min_apy", 10.0),
+            "stop_loss_percent": pro_config.get("stopLossPercent", self.default_stop_loss_percent) if stop_loss_enabled else None,
+            "take_profit_percent": pro_config.get("takeProfitPercent", 0) if take_profit_enabled else 0,  # % profit target
+            "take_profit_usd": pro_config.get("takeProfitUsd", 0) if take_profit_enabled else 0,  # $ profit target
+        }
+    
     async def start(self):
         """Start the monitoring loop"""
         self.running = True
@@ -203,11 +230,7 @@ class PositionMonitor:
             return {"expired": False, "reason": "Invalid deployment date"}
         
         # Get duration from agent config (default 30 days)
-        duration_config = agent.get("duration", {})
-        if isinstance(duration_config, dict):
-            duration_days = duration_config.get("days", self.default_duration_days)
-        else:
-            duration_days = self.default_duration_days
+        duration_days = self.exit_rules(agent)["duration_days"]
         
         # If duration is 0 or infinity, no expiry
         if duration_days <= 0:
@@ -230,7 +253,7 @@ class PositionMonitor:
         
         Uses The Graph subgraph to get current APY.
         """
-        min_apy = agent.get("min_apy", 10.0)
+        min_apy = self.exit_rules(agent)["min_apy"]
         pool_address = position.get("pool_address") or position.get("protocol_address")
         
         if not pool_address:
@@ -271,11 +294,9 @@ class PositionMonitor:
         For PRO mode: uses configured stopLossPercent
         """
         # Get stop-loss config
-        pro_config = agent.get("pro_config") or {}
-        stop_loss_enabled = pro_config.get("stopLossEnabled", True)  # Default enabled
-        stop_loss_percent = pro_config.get("stopLossPercent", self.default_stop_loss_percent)
+        stop_loss_percent = self.exit_rules(agent)["stop_loss_percent"]
         
-        if not stop_loss_enabled:
+        if stop_loss_percent is None:
             return {"triggered": False, "reason": "Stop-loss disabled"}
         
         entry_value = position.get("entry_value", 0)
@@ -304,11 +325,11 @@ class PositionMonitor:
         - Dollar-based: takeProfitUsd (e.g., 100 = take profit when profit >= $100)
         """
         pro_config = agent.get("pro_config") or {}
-        take_profit_enabled = pro_config.get("takeProfitEnabled", False)  # Default disabled
-        take_profit_percent = pro_config.get("takeProfitPercent", 0)  # % profit target
-        take_profit_usd = pro_config.get("takeProfitUsd", 0)  # $ profit target
+        rules = self.exit_rules(agent)
+        take_profit_percent = rules["take_profit_percent"]
+        take_profit_usd = rules["take_profit_usd"]
         
-        if not take_profit_enabled:
+        if not pro_config.get("takeProfitEnabled", False):  # Default disabled
             return {"triggered": False, "reason": "Take-profit disabled"}
         
         entry_value = position.get("entry_value", 0)
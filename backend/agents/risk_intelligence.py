@@ -13,6 +13,8 @@ Risk Factors:
 
 import asyncio
 import httpx
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
@@ -81,15 +83,35 @@ class RiskIntelligence:
         "cream": {"reason": "Multiple exploits", "severity": "critical"},
     }
     
+    # Protocol-level factors (age, audits, reputation) only move by days
+    PROTOCOL_FACTOR_TTL = 3600
+    MAX_CACHED_POOLS = 5000
+    
     def __init__(self):
-        self.cache = {}
+        # pool key -> (expires_at, fingerprint, assessment)
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.cache_ttl = 300  # 5 minutes
+        # project -> (expires_at, {factor: score dict})
+        self._protocol_factors: Dict[str, tuple] = {}
         self.alerts = []
+        self._stats = {"cache_hits": 0, "computed": 0, "protocol_hits": 0}
         logger.info("🛡️ Risk Intelligence Engine initialized")
     
+    @staticmethod
+    def _pool_key(pool: Dict[str, Any]) -> str:
+        return str(pool.get("id") or pool.get("pool") or
+                   f"{pool.get('chain')}:{pool.get('project')}:{pool.get('symbol')}")
+    
+    @staticmethod
+    def _fingerprint(pool: Dict[str, Any]) -> tuple:
+        """Inputs of the assessment - any change (TVL, APY...) invalidates the cached score"""
+        return (pool.get("project"), pool.get("chain"), pool.get("tvl"), pool.get("apy"),
+                pool.get("tvlChange7d"), pool.get("id"))
+    
     async def get_risk_score(self, pool: Dict[str, Any]) -> Dict[str, Any]:
         """
         Calculate comprehensive risk score for a pool.
+        Cached per pool for cache_ttl seconds; a change in TVL/APY recomputes it.
         
         Args:
             pool: Pool data with project, apy, tvl, chain info
@@ -97,6 +119,56 @@ class RiskIntelligence:
         Returns:
             Risk assessment with overall score, factors, and warnings
         """
+        key = self._pool_key(pool)
+        fingerprint = self._fingerprint(pool)
+        now = time.monotonic()
+        
+        cached = self.cache.get(key)
+        if cached and cached[0] > now and cached[1] == fingerprint:
+            self._stats["cache_hits"] += 1
+            self.cache.move_to_end(key)
+            return self._copy_assessment(cached[2])
+        
+        assessment = await self._compute_risk_score(pool)
+        self._stats["computed"] += 1
+        self.cache[key] = (now + self.cache_ttl, fingerprint, assessment)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.MAX_CACHED_POOLS:
+            self.cache.popitem(last=False)
+        return self._copy_assessment(assessment)
+    
+    @staticmethod
+    def _copy_assessment(assessment: Dict[str, Any]) -> Dict[str, Any]:
+        """Callers may edit the result (e.g. /risk/protocol) - never hand out the cached one"""
+        return {
+            **assessment,
+            "factors": {name: dict(factor) for name, factor in assessment["factors"].items()},
+            "warnings": list(assessment["warnings"]),
+        }
+    
+    async def get_bulk_risk_scores(self, pools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Risk assessments for many pools (concurrently, cached, in input order)"""
+        return list(await asyncio.gather(*(self.get_risk_score(pool) for pool in pools)))
+    
+    def _get_protocol_factors(self, project: str) -> Dict[str, Dict[str, Any]]:
+        """Protocol age / audit / smart contract scores, memoized per project"""
+        now = time.monotonic()
+        cached = self._protocol_factors.get(project)
+        if cached and cached[0] > now:
+            self._stats["protocol_hits"] += 1
+            return cached[1]
+        factors = {
+            "protocol_age": self._score_protocol_age(project),
+            "audit_status": self._score_audit_status(project),
+            "smart_contract": self._score_smart_contract(project),
+        }
+        self._protocol_factors[project] = (now + self.PROTOCOL_FACTOR_TTL, factors)
+        return factors
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "cached_pools": len(self.cache), "cached_protocols": len(self._protocol_factors)}
+    
+    async def _compute_risk_score(self, pool: Dict[str, Any]) -> Dict[str, Any]:
         project = pool.get("project", "").lower()
         tvl = pool.get("tvl", 0)
         apy = pool.get("apy", 0)
@@ -107,13 +179,14 @@ class RiskIntelligence:
             return self._blacklisted_response(project)
         
         # Calculate individual factor scores
+        protocol_factors = self._get_protocol_factors(project)
         factors = {
             "tvl_stability": await self._score_tvl_stability(pool),
-            "protocol_age": self._score_protocol_age(project),
-            "audit_status": self._score_audit_status(project),
+            "protocol_age": dict(protocol_factors["protocol_age"]),
+            "audit_status": dict(protocol_factors["audit_status"]),
             "concentration": self._score_concentration(tvl),
             "apy_sustainability": self._score_apy_sustainability(apy),
-            "smart_contract": self._score_smart_contract(project)
+            "smart_contract": dict(protocol_factors["smart_contract"])
         }
         
         # Calculate weighted overall score
@@ -457,4 +530,4 @@ async def get_pool_risk(pool: Dict[str, Any]) -> Dict[str, Any]:
 
 async def get_bulk_risk(pools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Get risk assessments for multiple pools"""
-    return [await risk_engine.get_risk_score(pool) for pool in pools]
+    return await risk_engine.get_bulk_risk_scores(pools)
@@ -10,6 +10,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
 
+import numpy as np
+
+from data_sources.pool_table import PoolTable, top_k_indices
+
 # Import agent config storage
 try:
     from api.agent_config_router import DEPLOYED_AGENTS
@@ -78,6 +82,15 @@ class StrategyExecutor:
         self.execution_interval = 600  # 10 minutes (scan for pools)
         self.last_execution: Dict[str, datetime] = {}
         
+        # CYCLE SCHEDULER - bounded concurrency across agents
+        # Per-user cap defaults to 1: agents of one user share the same idle balance,
+        # so running them in parallel could allocate the same USDC twice.
+        self.max_concurrent_agents = int(os.getenv("EXECUTOR_MAX_CONCURRENT_AGENTS", "16"))
+        self.max_concurrent_per_user = int(os.getenv("EXECUTOR_MAX_CONCURRENT_PER_USER", "1"))
+        self.agent_timeout = float(os.getenv("EXECUTOR_AGENT_TIMEOUT", "300"))
+        self._cycle_pool_cache: Optional[Dict[tuple, asyncio.Future]] = None  # scout key → shared fetch
+        self.last_cycle_stats: Dict = {}
+        
         # PARK THRESHOLDS - auto-deposit to Aave USDC
         self.park_min_amount = 100  # $100 USDC minimum to trigger Park (covers tx fees)
         self.park_lock_hours = 1  # Funds locked in Aave for minimum 1 hour
@@ -225,7 +238,7 @@ class StrategyExecutor:
         
         return False
     
-    def filter_avoid_il(self, pools: list, agent: dict) -> list:
+    def filter_avoid_il(self, pools: list, agent: dict, verbose: bool = True) -> list:
         """
         Filter out pools that may cause impermanent loss if avoid_il is enabled.
         Single-sided lending pools are preferred.
@@ -248,7 +261,8 @@ class StrategyExecutor:
                 filtered.append(pool)
             # Skip DEX LP pools (high IL risk)
         
-        print(f"[StrategyExecutor] Avoid IL filter: {len(pools)} -> {len(filtered)} pools")
+        if verbose:
+            print(f"[StrategyExecutor] Avoid IL filter: {len(pools)} -> {len(filtered)} pools")
         return filtered if filtered else pools[:3]  # Fallback to top 3 if all filtered
     
     def check_park_conditions(self, agent: dict, pools_found: bool, idle_balance: float, has_allocations: bool = False) -> dict:
@@ -355,12 +369,15 @@ class StrategyExecutor:
         print("[StrategyExecutor] Starting executor loop...")
         
         while self.running:
+            cycle_start = asyncio.get_event_loop().time()
             try:
                 await self.execute_all_agents()
             except Exception as e:
                 print(f"[StrategyExecutor] Execution error: {e}")
             
-            await asyncio.sleep(self.execution_interval)
+            # Keep a fixed cadence: a long cycle eats into the wait, not on top of it
+            elapsed = asyncio.get_event_loop().time() - cycle_start
+            await asyncio.sleep(max(0.0, self.execution_interval - elapsed))
     
     def stop(self):
         """Stop the executor"""
@@ -368,7 +385,14 @@ class StrategyExecutor:
         print("[StrategyExecutor] Stopped")
     
     async def execute_all_agents(self):
-        """Execute strategies for all active agents"""
+        """
+        Execute strategies for all active agents.
+        
+        Agents run concurrently, capped globally (max_concurrent_agents) and per
+        user (max_concurrent_per_user). Scout results are shared within a cycle
+        between agents with the same chain/protocol filter. Timing of the cycle
+        is kept in last_cycle_stats.
+        """
         # DEPLOYED_AGENTS now stores: user_address -> [list of agents]
         all_agents = []
         for user_agents in DEPLOYED_AGENTS.values():
@@ -382,27 +406,77 @@ class StrategyExecutor:
         
         print(f"[StrategyExecutor] Processing {len(all_agents)} active agents")
         
-        for agent in all_agents:
-            try:
-                # Check existing positions for risk (stop-loss, take-profit)
-                await self.check_position_risks(agent)
-                
-                # Check if compound timing is right based on compound_frequency
-                if not self.check_should_compound(agent):
-                    print(f"[StrategyExecutor] Skipping {agent.get('id', 'unknown')[:15]} - not compound time yet")
-                    continue
-                
-                # Execute strategy
-                await self.execute_agent_strategy(agent)
-                
-                # Update last compound time
-                agent["last_compound_time"] = datetime.utcnow().isoformat()
-                
-                # Check if rebalancing needed
-                if agent.get("auto_rebalance", True):
-                    await self.check_rebalance_needed(agent)
-            except Exception as e:
-                print(f"[StrategyExecutor] Error for {agent.get('id', 'unknown')}: {e}")
+        loop = asyncio.get_event_loop()
+        cycle_start = loop.time()
+        global_slots = asyncio.Semaphore(max(1, self.max_concurrent_agents))
+        user_slots: Dict[str, asyncio.Semaphore] = {}
+        self._cycle_pool_cache = {}
+        
+        async def run_one(agent: dict) -> str:
+            user_key = (agent.get("user_address") or agent.get("id") or "").lower()
+            if user_key not in user_slots:
+                user_slots[user_key] = asyncio.Semaphore(max(1, self.max_concurrent_per_user))
+            async with user_slots[user_key]:
+                async with global_slots:
+                    try:
+                        return await asyncio.wait_for(self._run_agent_cycle(agent), timeout=self.agent_timeout)
+                    except asyncio.TimeoutError:
+                        print(f"[StrategyExecutor] Timeout for {agent.get('id', 'unknown')} after {self.agent_timeout:.0f}s")
+                        return "timeout"
+                    except Exception as e:
+                        print(f"[StrategyExecutor] Error for {agent.get('id', 'unknown')}: {e}")
+                        return "error"
+        
+        try:
+            outcomes = await asyncio.gather(*(run_one(agent) for agent in all_agents))
+        finally:
+            scout_fetches = len(self._cycle_pool_cache)
+            self._cycle_pool_cache = None
+        
+        wall_time = loop.time() - cycle_start
+        self.last_cycle_stats = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "agents": len(all_agents),
+            "users": len(user_slots),
+            "executed": outcomes.count("executed"),
+            "skipped": outcomes.count("skipped"),
+            "errors": outcomes.count("error"),
+            "timeouts": outcomes.count("timeout"),
+            "scout_fetches": scout_fetches,
+            "wall_time_s": round(wall_time, 3),
+            "interval_s": self.execution_interval,
+        }
+        print(
+            f"[StrategyExecutor] Cycle done: {len(all_agents)} agents in {wall_time:.1f}s "
+            f"({scout_fetches} scout fetches, {self.last_cycle_stats['errors']} errors, "
+            f"{self.last_cycle_stats['timeouts']} timeouts)"
+        )
+        if wall_time > self.execution_interval:
+            print(
+                f"[StrategyExecutor] ⚠️ Cycle took longer than interval ({self.execution_interval}s) - "
+                f"consider raising EXECUTOR_MAX_CONCURRENT_AGENTS"
+            )
+    
+    async def _run_agent_cycle(self, agent: dict) -> str:
+        """Run one scheduler cycle for a single agent. Returns 'executed' or 'skipped'."""
+        # Check existing positions for risk (stop-loss, take-profit)
+        await self.check_position_risks(agent)
+        
+        # Check if compound timing is right based on compound_frequency
+        if not self.check_should_compound(agent):
+            print(f"[StrategyExecutor] Skipping {agent.get('id', 'unknown')[:15]} - not compound time yet")
+            return "skipped"
+        
+        # Execute strategy
+        await self.execute_agent_strategy(agent)
+        
+        # Update last compound time
+        agent["last_compound_time"] = datetime.utcnow().isoformat()
+        
+        # Check if rebalancing needed
+        if agent.get("auto_rebalance", True):
+            await self.check_rebalance_needed(agent)
+        return "executed"
     
     async def execute_agent_strategy(self, agent: dict):
         """Execute strategy for a single agent"""
@@ -825,13 +899,13 @@ class StrategyExecutor:
             return []
         
         try:
-            # Get pools from Scout - returns {"pools": [...], "total": N, ...}
+            # Get pools from Scout as a columnar table (shared between agents in a cycle)
             chain = agent.get("chain", "base")
             # Normalize chain name for DefiLlama
             chain_map = {"base": "Base", "ethereum": "Ethereum", "arbitrum": "Arbitrum"}
             normalized_chain = chain_map.get(chain.lower(), chain.title())
             
-            result = await get_scout_pools(
+            table = await self._get_scout_table_shared(
                 chain=normalized_chain,
                 min_tvl=agent.get("min_tvl", 500000),  # $500k minimum (user wants quality)
                 min_apy=agent.get("min_apy", 50),  # 50% minimum APY
@@ -839,68 +913,35 @@ class StrategyExecutor:
                 protocols=agent.get("protocols", []),
                 stablecoin_only=agent.get("pool_type") == "stablecoin"
             )
+            print(f"[StrategyExecutor] Got {len(table)} pools from Scout")
             
-            # CRITICAL: Extract pools from result dict
-            if isinstance(result, dict):
-                pools = result.get("pools", [])
-                print(f"[StrategyExecutor] Got {len(pools)} pools from Scout")
-            elif isinstance(result, list):
-                pools = result
-            else:
-                pools = []
-            
-            if not pools:
+            if not len(table):
                 print(f"[StrategyExecutor] No pools returned from Scout for {normalized_chain}")
                 return []
             
-            # Filter by agent preferences
-            filtered = []
+            # Filter by agent preferences - one vectorized mask
+            # If max_apy is 500 or higher, treat as "unlimited" (no upper limit)
+            max_apy_setting = agent.get("max_apy", 1000)
+            # Pool type (default: allow ALL pools) - LP = symbol with "-" or "/"
+            pool_type = agent.get("pool_type", "all")
             
-            for pool in pools:
-                # Check APY range
-                apy = pool.get("apy", 0)
-                if apy < agent.get("min_apy", 0):
-                    continue
-                # If max_apy is 500 or higher, treat as "unlimited" (no upper limit)
-                max_apy_setting = agent.get("max_apy", 1000)
-                if max_apy_setting < 500 and apy > max_apy_setting:
-                    continue
-                
-                # Check protocols
-                project = (pool.get("project") or "").lower()
-                allowed_protocols = [p.lower() for p in agent.get("protocols", [])]
-                if allowed_protocols and not any(p in project for p in allowed_protocols):
-                    continue
-                
-                # Check assets (if specified)
-                symbol = (pool.get("symbol") or "").upper()
-                preferred_assets = [a.upper() for a in agent.get("preferred_assets", [])]
-                if preferred_assets and not any(a in symbol for a in preferred_assets):
-                    continue
-                
-                # Check pool type (default: allow ALL pools)
-                pool_type = agent.get("pool_type", "all")
-                is_lp = any(sep in symbol for sep in ["-", "/", " / "])
-                if pool_type == "single" and is_lp:
-                    continue
-                if pool_type == "dual" and not is_lp:
-                    continue
-                # pool_type == "all" allows everything
-                
+            mask = table.mask(
+                min_apy=agent.get("min_apy", 0),
+                max_apy=max_apy_setting if max_apy_setting < 500 else None,
+                projects=agent.get("protocols", []),
+                symbols=agent.get("preferred_assets", []),
+                lp={"single": False, "dual": True}.get(pool_type),
                 # Check risk score (from Scout)
-                risk_score = pool.get("risk_score", "Medium")
-                risk_level = agent.get("risk_level", "medium")
-                if risk_level == "low" and risk_score == "High":
-                    continue
-                
-                # Check audit status if required
-                if agent.get("only_audited", False):
-                    # Trusted protocols are considered audited
-                    trusted = ['aave', 'compound', 'curve', 'uniswap', 'morpho', 'lido', 'aerodrome', 'velodrome']
-                    if not any(t in project for t in trusted):
-                        continue
-                
-                filtered.append(pool)
+                flags={"risk_high": False} if agent.get("risk_level", "medium") == "low" else None
+            )
+            
+            # Check audit status if required - trusted protocols are considered audited
+            if agent.get("only_audited", False):
+                trusted = ['aave', 'compound', 'curve', 'uniswap', 'morpho', 'lido', 'aerodrome', 'velodrome']
+                mask &= table.mask(projects=trusted)
+            
+            # Copies - rank_and_select annotates them with per-agent scores
+            filtered = table.rows(np.flatnonzero(mask), copy=True)
             
             # Apply avoid_il filter if enabled
             filtered = self.filter_avoid_il(filtered, agent)
@@ -912,8 +953,48 @@ class StrategyExecutor:
             print(f"[StrategyExecutor] Error finding pools: {e}")
             return []
     
-    def rank_and_select(self, pools: List[dict], agent: dict) -> List[dict]:
-        """Rank pools and select top N based on agent config"""
+    @staticmethod
+    async def _fetch_scout_table(**kwargs) -> PoolTable:
+        """Call Scout and load the result into a PoolTable"""
+        result = await get_scout_pools(**kwargs)
+        # Scout returns {"pools": [...], "total": N, ...}
+        if isinstance(result, dict):
+            pools = result.get("pools", [])
+        elif isinstance(result, list):
+            pools = result
+        else:
+            pools = []
+        return PoolTable.from_pools(
+            pools,
+            flags={"risk_high": lambda p: p.get("risk_score", "Medium") == "High"}
+        )
+    
+    async def _get_scout_table_shared(self, **kwargs) -> PoolTable:
+        """
+        Call Scout, sharing the result table between agents with identical filters.
+        
+        Only active during execute_all_agents: concurrent agents with the same
+        key await one in-flight fetch, and the table is built once for all of
+        them. Callers copy the rows they keep (table.rows(..., copy=True)).
+        """
+        if self._cycle_pool_cache is None:
+            return await self._fetch_scout_table(**kwargs)
+        
+        key = (
+            kwargs.get("chain"),
+            kwargs.get("min_tvl"),
+            kwargs.get("min_apy"),
+            kwargs.get("max_apy"),
+            tuple(sorted(p.lower() for p in (kwargs.get("protocols") or []))),
+            kwargs.get("stablecoin_only"),
+        )
+        cache = self._cycle_pool_cache
+        if key not in cache:
+            cache[key] = asyncio.ensure_future(self._fetch_scout_table(**kwargs))
+        return await asyncio.shield(cache[key])
+    
+    def rank_and_select(self, pools: List[dict], agent: dict, verbose: bool = True) -> List[dict]:
+        """Rank pools and select top N based on agent config (verbose=False: no log line, for backtests)"""
         vault_count = agent.get("vault_count", 5)
         max_allocation = agent.get("max_allocation", 25)
         risk_level = agent.get("risk_level", "medium")
@@ -925,49 +1006,38 @@ class StrategyExecutor:
             "high": "aggressive"
         }.get(risk_level, "moderate"))
         
-        # Score each pool
-        for pool in pools:
-            score = 0
-            
-            # APY contribution (normalized to 0-40 points)
-            apy = pool.get("apy", 0)
-            score += min(apy, 100) * 0.4
-            
-            # TVL contribution (normalized to 0-30 points)
-            tvl = pool.get("tvl", 0)
-            if tvl > 10_000_000:
-                score += 30
-            elif tvl > 1_000_000:
-                score += 20
-            elif tvl > 100_000:
-                score += 10
-            
-            # Risk adjustment based on trading_style
-            if trading_style == "conservative":
-                # Prefer lower APY, higher TVL, penalize high APY
-                if apy > 100:
-                    score -= 20  # Suspicious APY for conservative
-                score = score * 0.7 + (30 - min(apy, 30))
-            elif trading_style == "aggressive":
-                # Prefer higher APY
-                score = score * 1.3
-            # moderate keeps default scoring
-            
-            pool["_score"] = score
-            pool["_trading_style"] = trading_style
-        
-        # Sort by score
-        pools.sort(key=lambda p: p.get("_score", 0), reverse=True)
-        
-        # Select top N
-        selected = pools[:vault_count]
+        # Score all pools at once
+        apy = np.fromiter((p.get("apy", 0) or 0 for p in pools), dtype=np.float64, count=len(pools))
+        tvl = np.fromiter((p.get("tvl", 0) or 0 for p in pools), dtype=np.float64, count=len(pools))
+        
+        # APY contribution (normalized to 0-40 points)
+        score = np.minimum(apy, 100) * 0.4
+        # TVL contribution (normalized to 0-30 points)
+        score += np.select([tvl > 10_000_000, tvl > 1_000_000, tvl > 100_000], [30, 20, 10], 0)
+        
+        # Risk adjustment based on trading_style
+        if trading_style == "conservative":
+            # Prefer lower APY, higher TVL, penalize high APY
+            score -= np.where(apy > 100, 20, 0)  # Suspicious APY for conservative
+            score = score * 0.7 + (30 - np.minimum(apy, 30))
+        elif trading_style == "aggressive":
+            # Prefer higher APY
+            score = score * 1.3
+        # moderate keeps default scoring
+        
+        # Select top N by score (ties keep Scout order)
+        top = top_k_indices(score, vault_count)
+        selected = [pools[i] for i in top]
         
         # Calculate allocation per pool
-        for i, pool in enumerate(selected):
+        for pool, pool_score in zip(selected, score[top]):
+            pool["_score"] = float(pool_score)
+            pool["_trading_style"] = trading_style
             # Distribute allocation (higher score = higher allocation)
             pool["_allocation"] = min(max_allocation, 100 // vault_count)
         
-        print(f"[StrategyExecutor] Selected {len(selected)} pools with trading_style={trading_style}")
+        if verbose:
+            print(f"[StrategyExecutor] Selected {len(selected)} pools with trading_style={trading_style}")
         return selected
     
     async def analyze_pools_with_llm(self, pools: List[dict], agent: dict) -> List[dict]:
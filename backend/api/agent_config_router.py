@@ -1037,7 +1037,8 @@ async def harvest_rewards(request: HarvestRequest):
                 agent_address=request.agentAddress,
                 tx_type="claim",
                 token="REWARDS",
-                amount=harvested_amount
+                amount=harvested_amount,
+                defer=True
             )
             await supabase.log_audit_trail(
                 agent_address=request.agentAddress,
@@ -1080,7 +1081,8 @@ async def rebalance_portfolio(request: RebalanceRequest):
                 tx_type="rebalance",
                 token="PORTFOLIO",
                 amount=0,
-                metadata={"strategy": request.strategy}
+                metadata={"strategy": request.strategy},
+                defer=True
             )
             await supabase.log_audit_trail(
                 agent_address=request.agentAddress,
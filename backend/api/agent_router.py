@@ -1910,10 +1910,9 @@ async def get_recent_audit(
     Get recent audit log entries.
     """
     try:
-        from agents.audit_trail import AuditTrail
+        from agents.audit_trail import audit_trail
         
-        trail = AuditTrail()
-        entries = trail.get_entries(wallet_address=wallet)[-limit:]
+        entries = audit_trail.get_entries(wallet_address=wallet, limit=limit)
         
         return {
             "success": True,
@@ -1947,10 +1946,9 @@ async def export_audit_csv(
     Export audit log to CSV for tax reporting.
     """
     try:
-        from agents.audit_trail import AuditTrail
+        from agents.audit_trail import audit_trail
         
-        trail = AuditTrail()
-        entries = trail.get_entries(wallet_address=wallet if wallet != 'all' else None)
+        entries = audit_trail.iter_entries(wallet_address=wallet if wallet != 'all' else None)
         
         # Generate CSV
         output = io.StringIO()
@@ -1995,10 +1993,9 @@ async def get_audit_summary(wallet: Optional[str] = None):
     Get summary statistics from audit trail.
     """
     try:
-        from agents.audit_trail import AuditTrail
+        from agents.audit_trail import audit_trail
         
-        trail = AuditTrail()
-        summary = trail.get_summary(wallet_address=wallet if wallet != 'all' else None)
+        summary = audit_trail.get_summary(wallet_address=wallet if wallet != 'all' else None)
         
         return {
             "success": True,
@@ -441,7 +441,7 @@ async def request_withdrawal(request: WithdrawRequest):
         }
     
     # Process immediate withdrawal
-    result = agent_wallet_manager.request_withdrawal(
+    result = await agent_wallet_manager.request_withdrawal(
         user_address=request.user_address,
         token=request.token,
         amount=request.amount,
@@ -574,7 +574,7 @@ async def emergency_drain(
         if not two_factor_auth.verify_totp(user_address, totp_code):
             raise HTTPException(status_code=401, detail="Invalid 2FA code")
     
-    result = agent_wallet_manager.emergency_drain(user_address)
+    result = await agent_wallet_manager.emergency_drain(user_address)
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -723,7 +723,7 @@ async def approve_multisig(request: ApproveMultiSigRequest):
     if msig_request and msig_request.is_approved():
         # Execute the withdrawal
         if msig_request.action == "withdraw":
-            result = agent_wallet_manager.request_withdrawal(
+            result = await agent_wallet_manager.request_withdrawal(
                 user_address=msig_request.user_id,
                 token=msig_request.token,
                 amount=msig_request.amount_usd,  # Convert back from USD
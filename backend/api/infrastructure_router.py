@@ -132,6 +132,36 @@ async def get_error_stats():
         return {"error": str(e)}
 
 
+@router.get("/supabase/pool")
+async def get_supabase_pool_stats():
+    """Supabase HTTP connection pool counters (reuse vs. new handshakes)"""
+    try:
+        from infrastructure.supabase_client import supabase
+        return supabase.get_pool_stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/supabase/write-behind")
+async def get_write_behind_stats():
+    """Write-behind queue counters (pending rows, bulk requests, spills)"""
+    try:
+        from infrastructure.write_behind import write_behind
+        return write_behind.get_stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@router.get("/balance-refresh")
+async def get_balance_refresh_stats():
+    """Last balance refresh cycle (agents, RPC requests, per-stage timings)"""
+    try:
+        from agents.balance_refresh_job import last_refresh_stats
+        return last_refresh_stats or {"status": "no cycle completed yet"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
 # ============================================
 # CONFIGURATION
 # ============================================
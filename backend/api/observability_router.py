@@ -149,7 +149,8 @@ async def health_check():
             "success": True,
             "status": "healthy",
             "agents_tracked": len(data.get("agents", [])),
-            "recent_traces": len(data.get("recent_traces", []))
+            "recent_traces": len(data.get("recent_traces", [])),
+            "exporter": observability.get_exporter_stats()
         }
     except Exception as e:
         return {
@@ -88,6 +88,25 @@ ALL_TOKENS = [
 # Minimum value threshold to show in portfolio
 MIN_VALUE_USD = 0.10
 
+# Known Aerodrome LP tokens on Base with pool addresses for APY lookup
+LP_TOKENS = [
+    {"name": "cbBTC/USDC", "address": "0x9c38b55f9a9aba91bbcedeb12bf4428f47a6a0b8", "protocol": "Aerodrome", 
+     "token0": "cbBTC", "token0_decimals": 8, "token0_price": 100000,
+     "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
+    {"name": "WETH/USDC", "address": "0xb4cb800910B228ED3d0834cF79D697127BBB00e5", "protocol": "Aerodrome",
+     "token0": "WETH", "token0_decimals": 18, "token0_price": 3300,
+     "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
+    {"name": "AERO/USDC", "address": "0x6cDcb1C4A4D1C3C6d054b27AC5B77e89eAFb971d", "protocol": "Aerodrome",
+     "token0": "AERO", "token0_decimals": 18, "token0_price": 1.5,
+     "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
+]
+
+# LP ABI (balanceOf, getReserves, totalSupply) - used by batched refresh via Multicall3
+LP_ABI = ERC20_ABI + [
+    {"constant": True, "inputs": [], "name": "getReserves", "outputs": [{"name": "_reserve0", "type": "uint256"}, {"name": "_reserve1", "type": "uint256"}, {"name": "_blockTimestampLast", "type": "uint256"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
+]
+
 class Holding(BaseModel):
     asset: str
     balance: float
@@ -155,11 +174,17 @@ async def fetch_all_balances(agent_address: str) -> List[Holding]:
     # Execute all in parallel
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
+    token_balances = [r if not isinstance(r, Exception) else 0 for r in results[:-1]]
+    eth_balance = results[-1] if not isinstance(results[-1], Exception) else 0
+    return build_holdings(token_balances, eth_balance)
+
+
+def build_holdings(token_balances: List[float], eth_balance: float) -> List[Holding]:
+    """Turn balances (aligned with ALL_TOKENS) + native ETH into priced holdings"""
     holdings = []
     
     # Process ERC20 tokens
-    for i, (token_addr, symbol, decimals) in enumerate(ALL_TOKENS):
-        balance = results[i] if not isinstance(results[i], Exception) else 0
+    for (token_addr, symbol, decimals), balance in zip(ALL_TOKENS, token_balances):
         if balance > 0:
             price = TOKEN_PRICES.get(symbol, 0)  # Default to 0 if no price (skip unknown)
             if price > 0:
@@ -173,7 +198,6 @@ async def fetch_all_balances(agent_address: str) -> List[Holding]:
                     ))
     
     # Process native ETH
-    eth_balance = results[-1] if not isinstance(results[-1], Exception) else 0
     if eth_balance > 0:
         eth_value = eth_balance * TOKEN_PRICES.get("ETH", 3300)
         if eth_value >= MIN_VALUE_USD:
@@ -187,44 +211,93 @@ async def fetch_all_balances(agent_address: str) -> List[Holding]:
     return holdings
 
 
+async def fetch_lp_apys() -> Dict[str, float]:
+    """Get real APY for LP_TOKENS from The Graph (pool address lowercase -> APY)"""
+    pool_apy_cache = {}
+    try:
+        from data_sources.thegraph import TheGraphClient
+        graph_client = TheGraphClient()
+        
+        for lp in LP_TOKENS:
+            try:
+                apy = await graph_client.get_pool_apy(lp["address"])
+                if apy is not None and apy > 0:
+                    pool_apy_cache[lp['address'].lower()] = round(apy, 2)
+                    print(f"[Portfolio] Got APY for {lp['name']}: {apy:.2f}%")
+            except Exception as e:
+                print(f"[Portfolio] APY fetch error for {lp['name']}: {e}")
+    except Exception as e:
+        print(f"[Portfolio] TheGraphClient init error: {e}")
+    return pool_apy_cache
+
+
+def build_lp_position(
+    lp: dict,
+    balance: int,
+    reserves: Optional[tuple],
+    total_supply: Optional[int],
+    apy: float,
+    position_index: int
+) -> Optional[Position]:
+    """Value an LP balance from pool reserves. Returns None for dust / < $0.10."""
+    # Skip dust amounts (less than 0.000001 LP tokens)
+    if balance <= 1e12:  # At least 0.000001 LP tokens (1e12 of 1e18)
+        return None
+    
+    lp_tokens = balance / 1e18
+    
+    # Calculate USD value + token amounts from reserves
+    token0_amount = 0
+    token1_amount = 0
+    if reserves is None or total_supply is None:
+        estimated_value = lp_tokens * 1.0
+    elif total_supply > 0:
+        reserve0, reserve1 = reserves[0], reserves[1]
+        share = balance / total_supply
+        # Original value calculation (proven to work)
+        # reserve1 is USDC side, multiply by 2 for both sides
+        estimated_value = (reserve1 / 1e6) * share * 2
+        
+        # Calculate token amounts for display only
+        token0_amount = (reserve0 / (10 ** lp["token0_decimals"])) * share
+        token1_amount = (reserve1 / (10 ** lp["token1_decimals"])) * share
+    else:
+        estimated_value = lp_tokens
+    
+    # Entry value - for now use current value (no historical data)
+    # TODO: Get real entry_value from user_positions table
+    entry_value = estimated_value
+    pnl = estimated_value - entry_value  # Will be 0 until we track entry
+    
+    if estimated_value <= 0.10:  # Only show if > $0.10
+        return None
+    
+    return Position(
+        id=f"lp_{position_index}",
+        protocol=lp["protocol"],
+        pool_name=lp["name"],
+        value_usd=round(estimated_value, 2),
+        apy=apy,
+        deposited=round(entry_value, 2),
+        entry_value=round(entry_value, 2),
+        pnl=round(pnl, 2),
+        token0_symbol=lp["token0"],
+        token0_amount=round(token0_amount, 8),
+        token1_symbol=lp["token1"],
+        token1_amount=round(token1_amount, 6)
+    )
+
+
 async def fetch_lp_positions(user_address: str, agent_address: str) -> List[Position]:
     """Fetch LP positions directly from known Aerodrome pools"""
     try:
         if not agent_address:
             return []
         
-        # Known Aerodrome LP tokens on Base with pool addresses for APY lookup
-        LP_TOKENS = [
-            {"name": "cbBTC/USDC", "address": "0x9c38b55f9a9aba91bbcedeb12bf4428f47a6a0b8", "protocol": "Aerodrome", 
-             "token0": "cbBTC", "token0_decimals": 8, "token0_price": 100000,
-             "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
-            {"name": "WETH/USDC", "address": "0xb4cb800910B228ED3d0834cF79D697127BBB00e5", "protocol": "Aerodrome",
-             "token0": "WETH", "token0_decimals": 18, "token0_price": 3300,
-             "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
-            {"name": "AERO/USDC", "address": "0x6cDcb1C4A4D1C3C6d054b27AC5B77e89eAFb971d", "protocol": "Aerodrome",
-             "token0": "AERO", "token0_decimals": 18, "token0_price": 1.5,
-             "token1": "USDC", "token1_decimals": 6, "token1_price": 1.0},
-        ]
-        
         # Get real APY from The Graph or DeFiLlama
-        pool_apy_cache = {}
-        try:
-            from data_sources.thegraph import TheGraphClient
-            graph_client = TheGraphClient()
-            
-            for lp in LP_TOKENS:
-                try:
-                    apy = await graph_client.get_pool_apy(lp["address"])
-                    if apy is not None and apy > 0:
-                        pool_apy_cache[lp['address'].lower()] = round(apy, 2)
-                        print(f"[Portfolio] Got APY for {lp['name']}: {apy:.2f}%")
-                except Exception as e:
-                    print(f"[Portfolio] APY fetch error for {lp['name']}: {e}")
-        except Exception as e:
-            print(f"[Portfolio] TheGraphClient init error: {e}")
+        pool_apy_cache = await fetch_lp_apys()
         
         positions = []
-        agent_checksummed = Web3.to_checksum_address(agent_address)
         
         for lp in LP_TOKENS:
             try:
@@ -234,66 +307,32 @@ async def fetch_lp_positions(user_address: str, agent_address: str) -> List[Posi
                     'data': '0x70a08231' + agent_address[2:].lower().zfill(64)
                 })
                 balance = int(balance_call.hex(), 16)
+                if balance <= 1e12:
+                    continue
                 
-                # Skip dust amounts (less than 0.000001 LP tokens)
-                if balance > 1e12:  # At least 0.000001 LP tokens (1e12 of 1e18)
-                    lp_tokens = balance / 1e18
-                    
-                    # Get reserves and calculate USD value + token amounts
-                    token0_amount = 0
-                    token1_amount = 0
-                    try:
-                        reserves_call = w3.eth.call({
-                            'to': Web3.to_checksum_address(lp["address"]),
-                            'data': '0x0902f1ac'  # getReserves()
-                        })
-                        reserve0 = int(reserves_call.hex()[2:66], 16)
-                        reserve1 = int(reserves_call.hex()[66:130], 16)
-                        
-                        supply_call = w3.eth.call({
-                            'to': Web3.to_checksum_address(lp["address"]),
-                            'data': '0x18160ddd'  # totalSupply()
-                        })
-                        total_supply = int(supply_call.hex(), 16)
-                        
-                        if total_supply > 0:
-                            share = balance / total_supply
-                            # Original value calculation (proven to work)
-                            # reserve1 is USDC side, multiply by 2 for both sides
-                            estimated_value = (reserve1 / 1e6) * share * 2
-                            
-                            # Calculate token amounts for display only
-                            token0_amount = (reserve0 / (10 ** lp["token0_decimals"])) * share
-                            token1_amount = (reserve1 / (10 ** lp["token1_decimals"])) * share
-                        else:
-                            estimated_value = lp_tokens
-                    except Exception as e:
-                        print(f"[Portfolio] Reserve fetch error: {e}")
-                        estimated_value = lp_tokens * 1.0
-                    
-                    # Get real APY from cache, fallback to 0 (unknown)
-                    real_apy = pool_apy_cache.get(lp["address"].lower(), 0)
-                    
-                    # Entry value - for now use current value (no historical data)
-                    # TODO: Get real entry_value from user_positions table
-                    entry_value = estimated_value
-                    pnl = estimated_value - entry_value  # Will be 0 until we track entry
+                reserves, total_supply = None, None
+                try:
+                    reserves_call = w3.eth.call({
+                        'to': Web3.to_checksum_address(lp["address"]),
+                        'data': '0x0902f1ac'  # getReserves()
+                    })
+                    reserves = (int(reserves_call.hex()[2:66], 16), int(reserves_call.hex()[66:130], 16))
                     
-                    if estimated_value > 0.10:  # Only show if > $0.10
-                        positions.append(Position(
-                            id=f"lp_{len(positions)}",
-                            protocol=lp["protocol"],
-                            pool_name=lp["name"],
-                            value_usd=round(estimated_value, 2),
-                            apy=real_apy,
-                            deposited=round(entry_value, 2),
-                            entry_value=round(entry_value, 2),
-                            pnl=round(pnl, 2),
-                            token0_symbol=lp["token0"],
-                            token0_amount=round(token0_amount, 8),
-                            token1_symbol=lp["token1"],
-                            token1_amount=round(token1_amount, 6)
-                        ))
+                    supply_call = w3.eth.call({
+                        'to': Web3.to_checksum_address(lp["address"]),
+                        'data': '0x18160ddd'  # totalSupply()
+                    })
+                    total_supply = int(supply_call.hex(), 16)
+                except Exception as e:
+                    print(f"[Portfolio] Reserve fetch error: {e}")
+                    reserves, total_supply = None, None
+                
+                # Get real APY from cache, fallback to 0 (unknown)
+                real_apy = pool_apy_cache.get(lp["address"].lower(), 0)
+                
+                position = build_lp_position(lp, balance, reserves, total_supply, real_apy, len(positions))
+                if position:
+                    positions.append(position)
             except Exception as e:
                 print(f"[Portfolio] LP check error for {lp['name']}: {e}")
                 continue
@@ -381,8 +420,7 @@ async def get_portfolio(user_address: str, force: bool = False):
         # Fallback to Supabase
         if not agents:
             try:
-                from infrastructure.supabase_client import SupabaseClient
-                supabase = SupabaseClient()
+                from infrastructure.supabase_client import supabase
                 if supabase.is_available:
                     agents = await supabase.get_user_agents(user_address)
             except:
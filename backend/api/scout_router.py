@@ -10,8 +10,9 @@ import time
 import asyncio
 
 from agents.risk_intelligence import risk_engine, get_pool_risk, get_bulk_risk
-from artisan.data_sources import get_aggregated_pools
+from artisan.data_sources import get_aggregated_pools, get_multi_chain_pools
 from data_sources.onchain import onchain_client
+from data_sources.defillama_catalog import pool_catalog
 
 logger = logging.getLogger("ScoutRouter")
 
@@ -20,74 +21,39 @@ router = APIRouter(prefix="/api/scout", tags=["Scout Intelligence"])
 # Token price cache (simple in-memory, expires on restart)
 _price_cache = {}
 
-# DefiLlama pools cache (5-minute TTL to avoid fetching 4000 pools on every verify)
-DEFILLAMA_CACHE = {"data": None, "timestamp": 0, "ttl": 300}  # 5 min
-
-
 async def get_cached_defillama_pools():
-    """Get DefiLlama pools with caching. Huge performance win!"""
-    import httpx
-    now = time.time()
-    
-    # Return cached data if still valid
-    if DEFILLAMA_CACHE["data"] and now - DEFILLAMA_CACHE["timestamp"] < DEFILLAMA_CACHE["ttl"]:
-        logger.debug(f"DefiLlama cache hit ({len(DEFILLAMA_CACHE['data'])} pools)")
-        return DEFILLAMA_CACHE["data"]
-    
-    # Fetch fresh data
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get("https://yields.llama.fi/pools")
-            if response.status_code == 200:
-                data = response.json()
-                pools = data.get("data", [])
-                DEFILLAMA_CACHE["data"] = pools
-                DEFILLAMA_CACHE["timestamp"] = now
-                logger.info(f"DefiLlama cache refreshed: {len(pools)} pools")
-                return pools
-    except Exception as e:
-        logger.warning(f"DefiLlama fetch failed: {e}")
-        # Return stale cache if available
-        if DEFILLAMA_CACHE["data"]:
-            return DEFILLAMA_CACHE["data"]
-    return []
+    """Get DefiLlama pools from the shared, indexed catalog (5-min stale-while-revalidate)"""
+    return await pool_catalog.ensure_loaded()
 
 
 @router.get("/pool/{pool_id}")
 async def get_pool_by_id(pool_id: str):
     """
-    Fetch pool data directly from DefiLlama by pool UUID.
+    Fetch pool data from the DefiLlama catalog by pool UUID.
     Used by Verify Pools feature to bypass browser CSP restrictions.
     """
-    import httpx
-    
     try:
         logger.info(f"Searching for pool: {pool_id}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get("https://yields.llama.fi/pools")
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=502, detail="DefiLlama API unavailable")
-            
-            data = response.json()
-            pools = data.get("data", [])
-            
-            # Exact match on pool ID
-            pool = next((p for p in pools if p.get("pool") == pool_id), None)
-            
-            if pool:
-                logger.info(f"Found pool: {pool.get('symbol')} on {pool.get('chain')}")
-                return {"success": True, "pool": pool}
-            
-            # Partial match fallback
-            pool = next((p for p in pools if pool_id in p.get("pool", "")), None)
-            
-            if pool:
-                logger.info(f"Found partial match: {pool.get('symbol')}")
-                return {"success": True, "pool": pool}
-            
-            raise HTTPException(status_code=404, detail="Pool not found")
+        pools = await pool_catalog.ensure_loaded()
+        if not pools:
+            raise HTTPException(status_code=502, detail="DefiLlama API unavailable")
+        
+        # Exact match on pool ID
+        pool = pool_catalog.get_by_id(pool_id)
+        
+        if pool:
+            logger.info(f"Found pool: {pool.get('symbol')} on {pool.get('chain')}")
+            return {"success": True, "pool": pool}
+        
+        # Partial match fallback (only scanned when the exact lookup misses)
+        pool = next((p for p in pools if pool_id in p.get("pool", "")), None)
+        
+        if pool:
+            logger.info(f"Found partial match: {pool.get('symbol')}")
+            return {"success": True, "pool": pool}
+        
+        raise HTTPException(status_code=404, detail="Pool not found")
             
     except HTTPException:
         raise
@@ -99,41 +65,32 @@ async def get_pool_by_id(pool_id: str):
 @router.get("/pool/address/{address}")
 async def get_pool_by_address(address: str):
     """
-    Search for a pool by contract address in DefiLlama.
+    Search for a pool by contract address in the DefiLlama catalog.
     This endpoint is used when user inputs a contract address or Aerodrome/Uniswap URL.
     """
-    import httpx
-    
     try:
         address = address.lower()
         logger.info(f"Searching for pool by address: {address}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get("https://yields.llama.fi/pools")
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=502, detail="DefiLlama API unavailable")
-            
-            data = response.json()
-            pools = data.get("data", [])
-            
-            # Search for pool containing this address in pool ID
-            pool = next((p for p in pools if address in p.get("pool", "").lower()), None)
-            
-            if pool:
-                logger.info(f"Found pool by address: {pool.get('symbol')} on {pool.get('chain')}")
-                return {"success": True, "pool": pool}
-            
-            # Also check underlyingTokens if available
-            for p in pools:
-                underlying = p.get("underlyingTokens", [])
-                if isinstance(underlying, list):
-                    for token in underlying:
-                        if isinstance(token, str) and address in token.lower():
-                            logger.info(f"Found pool by underlying token: {p.get('symbol')}")
-                            return {"success": True, "pool": p}
-            
-            raise HTTPException(status_code=404, detail="Pool not found by address")
+        pools = await pool_catalog.ensure_loaded()
+        if not pools:
+            raise HTTPException(status_code=502, detail="DefiLlama API unavailable")
+        
+        # Search for pool containing this address in pool ID
+        matches = pool_catalog.find_by_address(address)
+        if matches:
+            pool = matches[0]
+            logger.info(f"Found pool by address: {pool.get('symbol')} on {pool.get('chain')}")
+            return {"success": True, "pool": pool}
+        
+        # Also check underlyingTokens
+        matches = pool_catalog.find_by_token(address)
+        if matches:
+            pool = matches[0]
+            logger.info(f"Found pool by underlying token: {pool.get('symbol')}")
+            return {"success": True, "pool": pool}
+        
+        raise HTTPException(status_code=404, detail="Pool not found by address")
             
     except HTTPException:
         raise
@@ -142,6 +99,12 @@ async def get_pool_by_address(address: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/catalog/stats")
+async def get_catalog_stats():
+    """DefiLlama pool catalog status (size, age, refreshes)"""
+    return pool_catalog.get_stats()
+
+
 @router.get("/resolve")
 async def resolve_input(
     input: str = Query(..., description="Any input: pool address, Aerodrome URL, Uniswap URL, DexScreener URL, etc."),
@@ -351,43 +314,29 @@ async def get_pool_by_pair(
         # STEP 3: DefiLlama (historical APY, more metadata)
         # =========================================
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get("https://yields.llama.fi/pools")
-                if response.status_code == 200:
-                    data = response.json()
-                    pools = data.get("data", [])
-                    
-                    # Filter by chain
-                    pools = [p for p in pools if chain_lower in p.get("chain", "").lower()]
-                    
-                    # Search for matching pool
-                    for p in pools:
-                        pool_id = (p.get("pool") or "").lower()
-                        underlying = [str(t).lower() for t in (p.get("underlyingTokens") or []) if t]
-                        
-                        has_token0 = token0 in underlying or token0 in pool_id
-                        has_token1 = token1 in underlying or token1 in pool_id
-                        
-                        if has_token0 and has_token1:
-                            logger.info(f"[Pool-Pair] DefiLlama found: {p.get('symbol')}")
-                            merged_data["sources"].append("defillama")
-                            
-                            # Add APY from DefiLlama if not already set or if DefiLlama has higher value
-                            defillama_apy = p.get("apy", 0)
-                            if defillama_apy and (not merged_data.get("apy") or defillama_apy > merged_data.get("apy", 0)):
-                                merged_data["apy"] = defillama_apy
-                                merged_data["apy_base"] = p.get("apyBase", 0)
-                                merged_data["apy_reward"] = p.get("apyReward", 0)
-                            
-                            # Add TVL change
-                            merged_data["tvl_change_1d"] = p.get("apyPct1D", 0)
-                            merged_data["tvl_change_7d"] = p.get("apyPct7D", 0)
-                            
-                            # Set project if not already set
-                            if not merged_data.get("project") or merged_data.get("project") == "Unknown":
-                                merged_data["project"] = p.get("project", "Unknown")
-                            
-                            break
+            await pool_catalog.ensure_loaded()
+            
+            # Indexed lookup: pools holding both tokens on this chain
+            for p in pool_catalog.find_by_tokens(token0, token1, chain=chain_lower):
+                logger.info(f"[Pool-Pair] DefiLlama found: {p.get('symbol')}")
+                merged_data["sources"].append("defillama")
+
+                # Add APY from DefiLlama if not already set or if DefiLlama has higher value
+                defillama_apy = p.get("apy", 0)
+                if defillama_apy and (not merged_data.get("apy") or defillama_apy > merged_data.get("apy", 0)):
+                    merged_data["apy"] = defillama_apy
+                    merged_data["apy_base"] = p.get("apyBase", 0)
+                    merged_data["apy_reward"] = p.get("apyReward", 0)
+
+                # Add TVL change
+                merged_data["tvl_change_1d"] = p.get("apyPct1D", 0)
+                merged_data["tvl_change_7d"] = p.get("apyPct7D", 0)
+
+                # Set project if not already set
+                if not merged_data.get("project") or merged_data.get("project") == "Unknown":
+                    merged_data["project"] = p.get("project", "Unknown")
+
+                break
         except Exception as e:
             logger.debug(f"DefiLlama lookup failed: {e}")
         
@@ -463,16 +412,8 @@ async def get_bulk_risk_scores(
     """
     try:
         chains = [chain.capitalize()] if chain != "all" else ["Base", "Ethereum", "Solana"]
-        
-        all_pools = []
-        for c in chains:
-            result = await get_aggregated_pools(
-                chain=c,
-                min_tvl=100000,
-                limit=limit,
-                blur=False
-            )
-            all_pools.extend(result.get("combined", []))
+        fetched = await get_multi_chain_pools(chains, min_tvl=100000, limit=limit, blur=False)
+        all_pools = fetched["combined"]
         
         # Get risk scores for all pools
         risk_scores = await get_bulk_risk(all_pools[:limit])
@@ -482,7 +423,8 @@ async def get_bulk_risk_scores(
         
         return {
             "count": len(risk_scores),
-            "pools": risk_scores
+            "pools": risk_scores,
+            "degraded": fetched["degraded"]
         }
         
     except Exception as e:
@@ -550,16 +492,8 @@ async def trigger_risk_scan(
     """
     try:
         chains = [chain.capitalize()] if chain != "all" else ["Base", "Ethereum", "Solana"]
-        
-        all_pools = []
-        for c in chains:
-            result = await get_aggregated_pools(
-                chain=c,
-                min_tvl=100000,
-                limit=50,
-                blur=False
-            )
-            all_pools.extend(result.get("combined", []))
+        fetched = await get_multi_chain_pools(chains, min_tvl=100000, limit=50, blur=False)
+        all_pools = fetched["combined"]
         
         # Check for alerts
         new_alerts = await risk_engine.check_for_alerts(all_pools)
@@ -567,7 +501,8 @@ async def trigger_risk_scan(
         return {
             "pools_scanned": len(all_pools),
             "new_alerts": len(new_alerts),
-            "alerts": new_alerts
+            "alerts": new_alerts,
+            "degraded": fetched["degraded"]
         }
         
     except Exception as e:
@@ -1155,40 +1090,36 @@ async def verify_pool_rpc_first(
     # PRIORITY 4: DefiLlama enrichment (ALWAYS run for historical data like tvl_change, exposure)
     if pool_data:
         try:
-            # Use cached DefiLlama pools (5-min TTL) - huge performance win!
-            pools = await get_cached_defillama_pools()
+            # Shared DefiLlama catalog (5-min TTL, indexed) - huge performance win!
+            await pool_catalog.ensure_loaded()
             
-            # Filter to chain first
-            chain_pools = [p for p in pools if chain in p.get("chain", "").lower()]
-            
-            # Strategy 1: Search by pool address
-            for p in chain_pools:
-                if pool_address in p.get("pool", "").lower():
-                    # APY only if not already set by on-chain
-                    if not pool_data.get("apy") or pool_data.get("apy", 0) == 0:
-                        pool_data["apy"] = p.get("apy", 0)
-                        pool_data["apy_base"] = p.get("apyBase", 0)
-                        pool_data["apy_reward"] = p.get("apyReward", 0)
-                    pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
-                    pool_data["il_risk"] = p.get("ilRisk", "unknown")
-                    # Historical metrics from DefiLlama (ALWAYS add)
-                    pool_data["tvl_change_1d"] = p.get("apyPct1D", 0)
-                    pool_data["tvl_change_7d"] = p.get("apyPct7D", 0)
-                    pool_data["tvl_change_30d"] = p.get("apyPct30D", 0)
-                    pool_data["tvl_stability"] = "stable" if abs(p.get("apyPct7D", 0) or 0) < 10 else "volatile"
-                    pool_data["stablecoin"] = p.get("stablecoin", False)
-                    pool_data["exposure"] = p.get("exposure", "single")
-                    pool_data["pool_meta"] = p.get("poolMeta")
-                    pool_data["underlying_tokens"] = p.get("underlyingTokens", [])
-                    pool_data["reward_tokens"] = p.get("rewardTokens", [])
-                    source = f"{source}+defillama"
-                    logger.info(f"DefiLlama enrichment: APY={pool_data['apy']:.2f}%, stablecoin={pool_data.get('stablecoin')}")
-                    break
+            # Strategy 1: Indexed lookup by pool address
+            for p in pool_catalog.find_by_address(pool_address, chain=chain):
+                # APY only if not already set by on-chain
+                if not pool_data.get("apy") or pool_data.get("apy", 0) == 0:
+                    pool_data["apy"] = p.get("apy", 0)
+                    pool_data["apy_base"] = p.get("apyBase", 0)
+                    pool_data["apy_reward"] = p.get("apyReward", 0)
+                pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
+                pool_data["il_risk"] = p.get("ilRisk", "unknown")
+                # Historical metrics from DefiLlama (ALWAYS add)
+                pool_data["tvl_change_1d"] = p.get("apyPct1D", 0)
+                pool_data["tvl_change_7d"] = p.get("apyPct7D", 0)
+                pool_data["tvl_change_30d"] = p.get("apyPct30D", 0)
+                pool_data["tvl_stability"] = "stable" if abs(p.get("apyPct7D", 0) or 0) < 10 else "volatile"
+                pool_data["stablecoin"] = p.get("stablecoin", False)
+                pool_data["exposure"] = p.get("exposure", "single")
+                pool_data["pool_meta"] = p.get("poolMeta")
+                pool_data["underlying_tokens"] = p.get("underlyingTokens", [])
+                pool_data["reward_tokens"] = p.get("rewardTokens", [])
+                source = f"{source}+defillama"
+                logger.info(f"DefiLlama enrichment: APY={pool_data['apy']:.2f}%, stablecoin={pool_data.get('stablecoin')}")
+                break
             
             # Strategy 2: Search by symbol if not found by address
             if pool_data.get("tvl_change_1d") is None and pool_data.get("symbol"):
                 symbol = pool_data["symbol"].upper().replace("/", "-")
-                for p in chain_pools:
+                for p in pool_catalog.find_by_symbol(symbol, chain=chain):
                     p_symbol = (p.get("symbol", "") or "").upper().replace("/", "-")
                     if symbol == p_symbol or set(symbol.split("-")) == set(p_symbol.split("-")):
                         # APY only if not already set by on-chain
@@ -1749,69 +1680,62 @@ async def verify_any_pool(
     defillama_apy = 0
     defillama_found = False
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get("https://yields.llama.fi/pools")
-            if response.status_code == 200:
-                data = response.json()
-                pools = data.get("data", [])
-                
-                # Filter to chain first
-                chain_pools = [p for p in pools if chain in p.get("chain", "").lower()]
-                
-                # Strategy 1: Search for pool by address in pool ID
-                for p in chain_pools:
-                    if pool_address in p.get("pool", "").lower():
-                        defillama_apy = p.get("apy", 0)
-                        defillama_found = True
-                        
-                        if pool_data:
-                            # Merge APY from DefiLlama with existing data
-                            if defillama_apy and (not pool_data.get("apy") or defillama_apy > pool_data.get("apy", 0)):
-                                pool_data["apy"] = defillama_apy
-                                pool_data["apy_base"] = p.get("apyBase", 0)
-                                pool_data["apy_reward"] = p.get("apyReward", 0)
-                            pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
-                            pool_data["il_risk"] = p.get("ilRisk", "no")
-                            source = f"{source}+defillama" if source != "unknown" else "defillama"
-                        else:
-                            pool_data = {
-                                "symbol": p.get("symbol", ""),
-                                "project": p.get("project", "Unknown"),
-                                "chain": p.get("chain", chain.capitalize()),
-                                "tvl": p.get("tvlUsd", 0),
-                                "apy": defillama_apy,
-                                "apy_base": p.get("apyBase", 0),
-                                "apy_reward": p.get("apyReward", 0),
-                                "pool_address": pool_address,
-                                "il_risk": p.get("ilRisk", "no"),
-                            }
-                            source = "defillama"
-                        
-                        logger.info(f"DefiLlama found by address, APY: {defillama_apy}%")
-                        break
-                
-                # Strategy 2: If not found by address, search by symbol (e.g., "SOL-USDC")
-                if not defillama_found and symbol_for_search:
-                    # Normalize symbol for matching (remove fee tier like "0.05%")
-                    clean_symbol = symbol_for_search.split(" ")[0].upper().replace("-", "")
-                    
-                    for p in chain_pools:
-                        pool_symbol = (p.get("symbol", "") or "").upper().replace("-", "")
-                        # Check if symbols match (order insensitive)
-                        if clean_symbol == pool_symbol or set(clean_symbol.split("/")) == set(pool_symbol.split("/")):
-                            defillama_apy = p.get("apy", 0)
-                            defillama_found = True
-                            
-                            if pool_data and defillama_apy:
-                                if not pool_data.get("apy") or defillama_apy > pool_data.get("apy", 0):
-                                    pool_data["apy"] = defillama_apy
-                                    pool_data["apy_base"] = p.get("apyBase", 0)
-                                    pool_data["apy_reward"] = p.get("apyReward", 0)
-                                pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
-                                source = f"{source}+defillama" if "defillama" not in source else source
-                            
-                            logger.info(f"DefiLlama found by symbol '{symbol_for_search}', APY: {defillama_apy}%")
-                            break
+        await pool_catalog.ensure_loaded()
+        
+        # Strategy 1: Indexed lookup by pool address in pool ID
+        for p in pool_catalog.find_by_address(pool_address, chain=chain):
+            defillama_apy = p.get("apy", 0)
+            defillama_found = True
+
+            if pool_data:
+                # Merge APY from DefiLlama with existing data
+                if defillama_apy and (not pool_data.get("apy") or defillama_apy > pool_data.get("apy", 0)):
+                    pool_data["apy"] = defillama_apy
+                    pool_data["apy_base"] = p.get("apyBase", 0)
+                    pool_data["apy_reward"] = p.get("apyReward", 0)
+                pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
+                pool_data["il_risk"] = p.get("ilRisk", "no")
+                source = f"{source}+defillama" if source != "unknown" else "defillama"
+            else:
+                pool_data = {
+                    "symbol": p.get("symbol", ""),
+                    "project": p.get("project", "Unknown"),
+                    "chain": p.get("chain", chain.capitalize()),
+                    "tvl": p.get("tvlUsd", 0),
+                    "apy": defillama_apy,
+                    "apy_base": p.get("apyBase", 0),
+                    "apy_reward": p.get("apyReward", 0),
+                    "pool_address": pool_address,
+                    "il_risk": p.get("ilRisk", "no"),
+                }
+                source = "defillama"
+
+            logger.info(f"DefiLlama found by address, APY: {defillama_apy}%")
+            break
+
+        # Strategy 2: If not found by address, search by symbol (e.g., "SOL-USDC")
+        if not defillama_found and symbol_for_search:
+            # Normalize symbol for matching (remove fee tier like "0.05%")
+            clean_symbol_key = symbol_for_search.split(" ")[0]
+            clean_symbol = clean_symbol_key.upper().replace("-", "")
+
+            for p in pool_catalog.find_by_symbol(clean_symbol_key, chain=chain):
+                pool_symbol = (p.get("symbol", "") or "").upper().replace("-", "")
+                # Check if symbols match (order insensitive)
+                if clean_symbol == pool_symbol or set(clean_symbol.split("/")) == set(pool_symbol.split("/")):
+                    defillama_apy = p.get("apy", 0)
+                    defillama_found = True
+
+                    if pool_data and defillama_apy:
+                        if not pool_data.get("apy") or defillama_apy > pool_data.get("apy", 0):
+                            pool_data["apy"] = defillama_apy
+                            pool_data["apy_base"] = p.get("apyBase", 0)
+                            pool_data["apy_reward"] = p.get("apyReward", 0)
+                        pool_data["project"] = p.get("project", pool_data.get("project", "Unknown"))
+                        source = f"{source}+defillama" if "defillama" not in source else source
+
+                    logger.info(f"DefiLlama found by symbol '{symbol_for_search}', APY: {defillama_apy}%")
+                    break
     except Exception as e:
         logger.debug(f"DefiLlama lookup failed: {e}")
     
@@ -124,19 +124,14 @@ async def get_rate_limit_status(request: Request):
         ip = forwarded.split(",")[0].strip()
     
     # Get current counts
-    import time
-    now = time.time()
-    minute_key = f"min_{int(now / 60)}"
-    hour_key = f"hour_{int(now / 3600)}"
-    
-    counts = rate_limiter.request_counts.get(ip, {})
+    usage = rate_limiter.get_usage(ip)
     
     return RateLimitStatus(
         ip=ip,
         is_blocked=ip in rate_limiter.blocked_ips,
         is_whitelisted=ip in rate_limiter.whitelisted_ips,
-        requests_this_minute=counts.get(minute_key, 0),
-        requests_this_hour=counts.get(hour_key, 0),
+        requests_this_minute=usage["minute"],
+        requests_this_hour=usage["hour"],
         limits={
             "per_minute": rate_limiter.config.requests_per_minute,
             "per_hour": rate_limiter.config.requests_per_hour,
@@ -174,8 +169,7 @@ async def get_security_status():
         "components": {
             "rate_limiter": {
                 "enabled": True,
-                "blocked_ips": len(rate_limiter.blocked_ips),
-                "whitelisted_ips": len(rate_limiter.whitelisted_ips),
+                **rate_limiter.get_stats(),
             },
             "api_key_auth": {
                 "enabled": True,
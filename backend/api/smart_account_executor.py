@@ -19,6 +19,9 @@ from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
 
+from infrastructure.rpc import run_rpc
+from infrastructure.tx_manager import tx_manager
+
 load_dotenv()
 
 # ============================================
@@ -257,22 +260,21 @@ class SmartAccountExecutor:
                     abi=legacy_abi
                 )
                 
-                tx = contract.functions.exitPosition(
+                tx = await run_rpc(contract.functions.exitPosition(
                     self.user_address,
                     Web3.to_checksum_address(AAVE_POOL)
-                ).build_transaction({
+                ).build_transaction, {
                     'from': account.address,
-                    'nonce': self.w3.eth.get_transaction_count(account.address),
+                    'nonce': 0,  # Placeholder - assigned by tx_manager
                     'gas': 300000,
-                    'gasPrice': self.w3.eth.gas_price
+                    'gasPrice': await run_rpc(lambda: self.w3.eth.gas_price)
                 })
                 
-                signed = account.sign_transaction(tx)
-                tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+                tx_hash = await tx_manager.send(self.w3, tx, account)
                 
                 print(f"[ExitPosition] Legacy TX sent: {tx_hash.hex()}")
                 
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                receipt = await tx_manager.wait_for_receipt(self.w3, tx_hash, timeout=120)
                 
                 if receipt.status == 1:
                     return {
@@ -319,23 +321,22 @@ class SmartAccountExecutor:
             # Withdraw max (type(uint256).max)
             MAX_UINT256 = 2**256 - 1
             
-            tx = pool.functions.withdraw(
+            tx = await run_rpc(pool.functions.withdraw(
                 Web3.to_checksum_address(USDC),
                 MAX_UINT256,
                 self.user_address
-            ).build_transaction({
+            ).build_transaction, {
                 'from': account.address,
-                'nonce': self.w3.eth.get_transaction_count(account.address),
+                'nonce': 0,  # Placeholder - assigned by tx_manager
                 'gas': 350000,
-                'gasPrice': self.w3.eth.gas_price
+                'gasPrice': await run_rpc(lambda: self.w3.eth.gas_price)
             })
             
-            signed = account.sign_transaction(tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            tx_hash = await tx_manager.send(self.w3, tx, account)
             
             print(f"[ExitPosition] Direct Aave withdraw TX: {tx_hash.hex()}")
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            receipt = await tx_manager.wait_for_receipt(self.w3, tx_hash, timeout=120)
             
             return {
                 "success": receipt.status == 1,
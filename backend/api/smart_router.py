@@ -1253,29 +1253,27 @@ class SmartRouter:
         Try to patch pool data with APY from DefiLlama.
         OPTIMIZED: Short timeout, skip only if already has APY.
         """
-        import httpx
+        import asyncio
+        from data_sources.defillama_catalog import pool_catalog
         
         # Skip only if already has APY (volume doesn't mean we have APY!)
         if pool_data.get("apy", 0) > 0:
             return pool_data
         
         try:
-            # Short timeout - DefiLlama pools endpoint is SLOW (1.5MB)
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get("https://yields.llama.fi/pools")
-                if response.status_code == 200:
-                    pools = response.json().get("data", [])
-                    
-                    # Search by address
-                    for p in pools:
-                        if pool_address.lower() in (p.get("pool", "") or "").lower():
-                            pool_data["apy"] = p.get("apy", 0)
-                            pool_data["apy_base"] = p.get("apyBase", 0)
-                            pool_data["apy_reward"] = p.get("apyReward", 0)
-                            pool_data["apy_source"] = "defillama"
-                            pool_data["project"] = p.get("project", pool_data.get("project"))
-                            logger.info(f"Patched APY from DefiLlama: {pool_data['apy']:.2f}%")
-                            break
+            # Shared indexed catalog; short timeout only matters on a cold start (1.5MB download
+            # keeps running in the background for the next request)
+            await asyncio.wait_for(pool_catalog.ensure_loaded(), timeout=3.0)
+            
+            # Search by address
+            for p in pool_catalog.find_by_address(pool_address):
+                pool_data["apy"] = p.get("apy", 0)
+                pool_data["apy_base"] = p.get("apyBase", 0)
+                pool_data["apy_reward"] = p.get("apyReward", 0)
+                pool_data["apy_source"] = "defillama"
+                pool_data["project"] = p.get("project", pool_data.get("project"))
+                logger.info(f"Patched APY from DefiLlama: {pool_data['apy']:.2f}%")
+                break
         except Exception as e:
             logger.debug(f"DefiLlama patch skipped (timeout): {e}")
         
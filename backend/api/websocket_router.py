@@ -6,7 +6,6 @@ Provides live updates for positions, transactions, and agent status
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, Set, List, Any
 import asyncio
-import json
 from datetime import datetime
 
 router = APIRouter(tags=["WebSocket"])
@@ -20,12 +19,14 @@ class ConnectionManager:
 
     async def connect(self, websocket: WebSocket, wallet: str):
         await websocket.accept()
+        wallet = wallet.lower()
         if wallet not in self.active_connections:
             self.active_connections[wallet] = set()
         self.active_connections[wallet].add(websocket)
         print(f"[WebSocket] Client connected: {wallet[:10]}...")
 
     def disconnect(self, websocket: WebSocket, wallet: str):
+        wallet = wallet.lower()
         if wallet in self.active_connections:
             self.active_connections[wallet].discard(websocket)
             if not self.active_connections[wallet]:
@@ -34,9 +35,10 @@ class ConnectionManager:
 
     async def send_personal(self, message: dict, wallet: str):
         """Send message to all connections for a specific wallet"""
+        wallet = wallet.lower()
         if wallet in self.active_connections:
             disconnected = []
-            for connection in self.active_connections[wallet]:
+            for connection in list(self.active_connections[wallet]):
                 try:
                     await connection.send_json(message)
                 except Exception:
@@ -72,13 +74,17 @@ async def websocket_portfolio(websocket: WebSocket, wallet: str):
     WebSocket endpoint for real-time portfolio updates.
     
     Sends:
-    - position_update: When position values change
+    - snapshot: Full portfolio on connect / refresh (with version)
+    - portfolio_patch: JSON Patch ops on top of base_version, pushed by the
+      shared PortfolioStream when a deposit, allocation or balance refresh changes it
     - transaction: New transactions
     - agent_status: Agent state changes
     - price_update: Token price changes
     - heartbeat: Every 30s to keep connection alive
     """
+    wallet = wallet.lower()
     await manager.connect(websocket, wallet)
+    heartbeat_task = None
     
     try:
         # Send initial state
@@ -87,13 +93,11 @@ async def websocket_portfolio(websocket: WebSocket, wallet: str):
             "wallet": wallet,
             "timestamp": datetime.utcnow().isoformat()
         })
+        await send_portfolio_snapshot(websocket, wallet)
         
-        # Start heartbeat task
+        # Start heartbeat task (updates are pushed by portfolio_stream - no polling)
         heartbeat_task = asyncio.create_task(send_heartbeat(websocket, wallet))
         
-        # Start portfolio polling task (checks for changes every 10s)
-        poll_task = asyncio.create_task(poll_portfolio_updates(websocket, wallet))
-        
         try:
             while True:
                 # Wait for messages from client
@@ -116,10 +120,11 @@ async def websocket_portfolio(websocket: WebSocket, wallet: str):
                     await send_portfolio_snapshot(websocket, wallet)
                     
         except WebSocketDisconnect:
-            heartbeat_task.cancel()
-            poll_task.cancel()
+            pass
             
     finally:
+        if heartbeat_task:
+            heartbeat_task.cancel()
         manager.disconnect(websocket, wallet)
 
 
@@ -136,58 +141,21 @@ async def send_heartbeat(websocket: WebSocket, wallet: str):
             break
 
 
-async def poll_portfolio_updates(websocket: WebSocket, wallet: str):
-    """Poll for portfolio changes every 10 seconds"""
-    last_hash = ""
-    
-    while True:
-        await asyncio.sleep(10)
-        try:
-            # Get current portfolio state
-            snapshot = await get_portfolio_snapshot(wallet)
-            
-            # Simple change detection using hash
-            current_hash = hash(json.dumps(snapshot, sort_keys=True, default=str))
-            
-            if current_hash != last_hash:
-                last_hash = current_hash
-                await websocket.send_json({
-                    "type": "portfolio_update",
-                    "data": snapshot,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-        except Exception as e:
-            print(f"[WebSocket] Poll error for {wallet[:10]}: {e}")
-            break
-
-
 async def send_portfolio_snapshot(websocket: WebSocket, wallet: str):
-    """Send full portfolio snapshot"""
-    snapshot = await get_portfolio_snapshot(wallet)
-    await websocket.send_json({
-        "type": "snapshot",
-        "data": snapshot,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    """Send full portfolio snapshot (shared, cached per wallet)"""
+    from services.portfolio_stream import portfolio_stream, snapshot_message
+    
+    snapshot, version = await portfolio_stream.get_snapshot(wallet)
+    await websocket.send_json(snapshot_message(snapshot, version))
 
 
 async def get_portfolio_snapshot(wallet: str) -> dict:
-    """Get current portfolio state from various sources"""
+    """Get current portfolio state (computed once per change by portfolio_stream)"""
     try:
-        # In production, this would:
-        # 1. Query on-chain balances
-        # 2. Get LP positions
-        # 3. Calculate current values
-        # 4. Get pending transactions
+        from services.portfolio_stream import portfolio_stream
         
-        return {
-            "wallet": wallet,
-            "totalValue": 0,
-            "positions": [],
-            "pendingTransactions": [],
-            "agentStatus": "active"
-        }
+        snapshot, _ = await portfolio_stream.get_snapshot(wallet)
+        return snapshot
         
     except Exception as e:
         return {
@@ -196,6 +164,15 @@ async def get_portfolio_snapshot(wallet: str) -> dict:
         }
 
 
+def _portfolio_changed(wallet: str, reason: str):
+    """Let the shared snapshot service recompute and push a delta"""
+    try:
+        from services.portfolio_stream import portfolio_stream
+        portfolio_stream.invalidate(wallet, reason=reason)
+    except Exception as e:
+        print(f"[WebSocket] Portfolio invalidate failed: {e}")
+
+
 # ============================================
 # BROADCAST FUNCTIONS (for other parts of app)
 # ============================================
@@ -238,6 +215,7 @@ async def broadcast_allocation(wallet: str, status: str, amount: float = 0, prot
         "tx_hash": tx_hash,
         "timestamp": datetime.utcnow().isoformat()
     }, wallet.lower())
+    _portfolio_changed(wallet, f"allocation_{status}")
     print(f"[WebSocket] Broadcast allocation_{status} to {wallet[:10]}...")
 
 
@@ -261,6 +239,7 @@ async def broadcast_position_exit(wallet: str, agent_id: str, position_id: str,
         "amount": amount,
         "timestamp": datetime.utcnow().isoformat()
     }, wallet.lower())
+    _portfolio_changed(wallet, "position_exit")
 
 
 async def broadcast_position_enter(wallet: str, agent_id: str, protocol: str, pool_address: str, amount: float, apy: float):
@@ -274,6 +253,7 @@ async def broadcast_position_enter(wallet: str, agent_id: str, protocol: str, po
         "apy": apy,
         "timestamp": datetime.utcnow().isoformat()
     }, wallet.lower())
+    _portfolio_changed(wallet, "position_enter")
 
 
 # ============================================
@@ -323,8 +303,10 @@ async def websocket_allocation(websocket: WebSocket, wallet: str):
 @router.get("/ws/stats")
 async def websocket_stats():
     """Get WebSocket connection statistics"""
+    from services.portfolio_stream import portfolio_stream
     return {
         "active_connections": manager.get_connection_count(),
         "wallets_connected": len(manager.active_connections),
+        "portfolio_stream": portfolio_stream.get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -5,9 +5,12 @@ Supported Chains: Base, Ethereum, Solana, Monad, Hyperliquid
 """
 
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from datetime import datetime, timedelta
 import asyncio
+import os
+
+from data_sources.pool_table import PoolTable
 
 # ============================================
 # CHAIN CONFIGURATION
@@ -434,87 +437,68 @@ PROJECT_WHITELIST = {
 # Now relying 100% on live DefiLlama API data for real-time APY/TVL.
 
 
+def _partition_defillama_yields(pools: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Whitelisted pools per chain (lowercase), tagged with source info"""
+    source = APIS["defillama"]
+    by_chain: Dict[str, List[Dict[str, Any]]] = {}
+    for pool in pools:
+        # STRICT WHITELIST CHECK
+        project = (pool.get("project") or "").lower()
+        if not any(allowed in project for allowed in PROJECT_WHITELIST):
+            continue
+
+        # Copy - the raw snapshot is shared with the scout endpoints
+        by_chain.setdefault((pool.get("chain") or "").lower(), []).append({
+            **pool,
+            "_source": "defillama",
+            "_source_badge": source["badge"],
+            "_source_color": source["color"],
+        })
+    return by_chain
+
+
 async def fetch_defillama_yields(chain: str = "Base") -> List[Dict[str, Any]]:
     """
-    Fetch yields from DefiLlama with advanced caching.
+    Fetch whitelisted yields for one chain from the shared DefiLlama snapshot.
     
     OPTIMIZATIONS:
-    - Stale-while-revalidate: Returns stale data instantly, refreshes in background
-    - Request coalescing: Multiple concurrent requests share one API call
-    - Rate limiting: Prevents API throttling
-    - Fallback to cache on errors
+    - One download + parse of yields.llama.fi/pools serves every chain
+      (previously each chain's cache miss re-downloaded the full payload)
+    - Stale-while-revalidate: all chains refresh together in the background
+    - Concurrent cold requests share one download
+    - Per-chain whitelisted views are built once per snapshot, not per request
+    - Previous snapshot keeps being served if a refresh fails
     """
-    cache_key = f"defillama_yields_{chain.lower()}"
-    
-    # Initialize basic cache entry if needed (fallback)
-    if cache_key not in _cache:
-        _cache[cache_key] = {"data": None, "timestamp": None}
-    
-    async def _do_fetch() -> List[Dict[str, Any]]:
-        """Actual API fetch - separated for coalescing."""
-        import time
-        from infrastructure.api_metrics import api_metrics
-        
-        start_time = time.time()
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(APIS["defillama"]["yields"])
-                response.raise_for_status()
-                api_metrics.record_call('defillama', '/pools', 'success', time.time() - start_time)
-                data = response.json()
-                
-                pools = data.get("data", [])
-                
-                # Filter by chain and add source info
-                filtered = []
-                for pool in pools:
-                    if pool.get("chain", "").lower() == chain.lower():
-                        # STRICT WHITELIST CHECK
-                        project = (pool.get("project") or "").lower()
-                        if not any(allowed in project for allowed in PROJECT_WHITELIST):
-                            continue
-
-                        pool["_source"] = "defillama"
-                        pool["_source_badge"] = APIS["defillama"]["badge"]
-                        pool["_source_color"] = APIS["defillama"]["color"]
-                        filtered.append(pool)
-                
-                # Update basic cache as backup
-                _cache[cache_key]["data"] = filtered
-                _cache[cache_key]["timestamp"] = datetime.now()
-                
-                return filtered
-        except Exception as e:
-            api_metrics.record_call('defillama', '/pools', 'error', time.time() - start_time,
-                                   error_message=str(e)[:200])
-            raise
-    
-    # Use advanced cache if available
-    if ADVANCED_CACHE_AVAILABLE:
-        try:
-            # Request coalescing: if 10 users request same data, only 1 API call
-            result = await request_coalescer.execute(
-                key=cache_key,
-                fetcher=lambda: cache_manager.get(
-                    endpoint=cache_key,
-                    endpoint_type=CacheEndpointType.POOLS,
-                    fetcher=_do_fetch
-                )
-            )
-            if result:
-                return result
-        except Exception as e:
-            print(f"[DefiLlama] Advanced cache error: {e}, falling back to basic")
-    
-    # Fallback to basic cache
-    if is_cache_valid(cache_key):
-        return _cache[cache_key]["data"]
-    
-    try:
-        return await _do_fetch()
-    except Exception as e:
-        print(f"[DefiLlama] Error: {e}")
-        return _cache[cache_key]["data"] or []
+    from data_sources.defillama_catalog import pool_catalog
+
+    await pool_catalog.ensure_loaded()
+    views = pool_catalog.view("artisan_yields_by_chain", _partition_defillama_yields)
+    return views.get(chain.lower(), [])
+
+
+def _build_defillama_table(views: Dict[str, List[Dict[str, Any]]]) -> PoolTable:
+    """Columnar table over the whitelisted pools of every chain"""
+    return PoolTable.from_pools(
+        (pool for chain_pools in views.values() for pool in chain_pools),
+        tvl_field="tvlUsd",
+        flags={
+            "single_sided": lambda p: get_pool_category(
+                (p.get("project") or "").lower(), p.get("symbol", "")
+            )["is_single_sided"]
+        }
+    )
+
+
+async def fetch_defillama_table() -> PoolTable:
+    """
+    Whitelisted DefiLlama pools of all chains as a PoolTable.
+    Rebuilt once per snapshot refresh; filter/rank it with vectorized queries.
+    """
+    from data_sources.defillama_catalog import pool_catalog
+
+    await pool_catalog.ensure_loaded()
+    views = pool_catalog.view("artisan_yields_by_chain", _partition_defillama_yields)
+    return pool_catalog.view("artisan_yields_table", lambda _: _build_defillama_table(views))
 
 
 
@@ -861,6 +845,25 @@ async def fetch_coingecko_prices(symbols: List[str] = None) -> Dict[str, float]:
 # AGGREGATOR - Combine all sources
 # ============================================
 
+# Per-source deadline: a slow source is reported as degraded instead of holding
+# up the response. Its fetch keeps running and warms the cache for the next call.
+SOURCE_TIMEOUT = float(os.getenv("AGGREGATOR_SOURCE_TIMEOUT", "8"))
+
+# In-flight source fetches, shared by concurrent callers (e.g. "geckoterminal:base")
+_source_fetches: Dict[str, asyncio.Task] = {}
+
+
+async def _fetch_with_deadline(key: str, fetcher: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+    """Await a shared fetch for at most `timeout` seconds without cancelling it."""
+    task = _source_fetches.get(key)
+    if task is None or task.done():
+        task = asyncio.ensure_future(fetcher())
+        # Retrieve late failures so they aren't reported as "never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _source_fetches[key] = task
+    return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+
 async def get_aggregated_pools(
     chain: str = "Base",
     min_tvl: float = 100000,
@@ -869,75 +872,74 @@ async def get_aggregated_pools(
     pool_type: str = "all",  # "single", "dual", "all"
     limit: int = 20,
     blur: bool = False,
-    protocol_filter: List[str] = None
+    protocol_filter: List[str] = None,
+    source_timeout: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Get pools from all available sources for a specific chain.
+    
+    Sources are fetched in parallel, each bounded by `source_timeout`
+    (default SOURCE_TIMEOUT). Sources that time out or fail are listed in
+    "degraded" and the result is built from the rest.
+    
+    DefiLlama pools are filtered and ranked on the columnar table
+    (fetch_defillama_table), so "defillama" holds only the top pools by APY
+    that can make it into "combined".
     """
     chain_config = get_chain_config(chain)
+    timeout = SOURCE_TIMEOUT if source_timeout is None else source_timeout
     
     results = {
         "defillama": [],
         "geckoterminal": [],
         "combined": [],
-        "sources_used": []
+        "sources_used": [],
+        "degraded": []
     }
     
-    # Fetch from both sources in parallel
-    try:
-        defillama_pools, gecko_pools = await asyncio.gather(
-            fetch_defillama_yields(chain),
-            fetch_geckoterminal_pools(chain),  # Pass chain parameter
-            return_exceptions=True
-        )
-    except Exception as e:
-        print(f"[Aggregator] Error: {e}")
-        defillama_pools, gecko_pools = [], []
-    
-    # Handle exceptions
-    if isinstance(defillama_pools, Exception):
-        print(f"[Aggregator] DefiLlama failed: {defillama_pools}")
-        defillama_pools = []
-    if isinstance(gecko_pools, Exception):
-        print(f"[Aggregator] GeckoTerminal failed: {gecko_pools}")
-        gecko_pools = []
-    
     # Normalise protocol filter
     allowed_protocols = set(p.lower() for p in (protocol_filter or []))
 
-    # Process DefiLlama pools
-    if defillama_pools:
-        results["sources_used"].append("defillama")
-        for pool in defillama_pools:
-            tvl = pool.get("tvlUsd", 0) or 0
-            apy = pool.get("apy", 0) or 0
-            is_stable = pool.get("stablecoin", False)
-            symbol = pool.get("symbol", "")
-            project = pool.get("project", "").lower()
-            
-            # Check protocol filter FIRST
-            if allowed_protocols:
-                # partial match allowed e.g. "lido" matches "lido" or "lido-finance"
-                if not any(ap in project for ap in allowed_protocols):
-                    continue
+    # If using protocol filter, we likely want ALL results, not just a small limit
+    # But keep limit if large to prevent overload
+    effective_limit = limit if not allowed_protocols else max(limit, 500)
 
-            # Use get_pool_category for proper single/dual-sided classification
-            category_info = get_pool_category(project, symbol)
-            is_single_sided = category_info["is_single_sided"]
-            
-            # Pool type filter
-            if pool_type == "single" and not is_single_sided:
-                continue
-            if pool_type == "dual" and is_single_sided:
-                continue
-            
-            if tvl >= min_tvl and apy >= min_apy:
-                # Stablecoin filter
-                if not stablecoin_only or is_stable:
-                    formatted = format_defillama_pool(pool, blur)
-                    results["defillama"].append(formatted)
+    # Fetch from both sources in parallel (one DefiLlama table serves every chain)
+    sources = {
+        "defillama": ("defillama", fetch_defillama_table),
+        "geckoterminal": (f"geckoterminal:{chain.lower()}", lambda: fetch_geckoterminal_pools(chain)),
+    }
+    fetched = await asyncio.gather(
+        *(_fetch_with_deadline(key, fetcher, timeout) for key, fetcher in sources.values()),
+        return_exceptions=True
+    )
+    
+    # Handle timeouts / exceptions
+    source_results = {}
+    for name, result in zip(sources, fetched):
+        if isinstance(result, BaseException):
+            reason = "timeout" if isinstance(result, asyncio.TimeoutError) else "error"
+            print(f"[Aggregator] {name} {reason} for {chain}: {result!r}")
+            results["degraded"].append({"source": name, "reason": reason})
+            result = None
+        source_results[name] = result
+    defillama_table, gecko_pools = source_results["defillama"], source_results["geckoterminal"] or []
+
+    # Process DefiLlama pools - vectorized filter + top-k by APY, only the winners get formatted
+    if defillama_table is not None:
+        chain_mask = defillama_table.mask(chain=chain)
+        if chain_mask.any():
+            results["sources_used"].append("defillama")
+            mask = chain_mask & defillama_table.mask(
+                min_tvl=min_tvl,
+                min_apy=min_apy,
+                stablecoin=True if stablecoin_only else None,
+                projects=allowed_protocols,  # partial match e.g. "lido" matches "lido-finance"
+                flags={"single_sided": pool_type == "single"} if pool_type in ("single", "dual") else None
+            )
+            top = defillama_table.top_k(effective_limit, mask, by="apy")
+            results["defillama"] = [format_defillama_pool(pool, blur) for pool in defillama_table.rows(top)]
 
-    
     # Process GeckoTerminal pools - skip for stablecoin_only (these are DEX LPs)
     if gecko_pools and not stablecoin_only:
         results["sources_used"].append("geckoterminal")
@@ -954,17 +956,12 @@ async def get_aggregated_pools(
                 formatted = format_gecko_pool(pool, blur)
                 results["geckoterminal"].append(formatted)
     
-    # Sort each source by APY
-    results["defillama"].sort(key=lambda x: x["apy"], reverse=True)
+    # Sort by APY (DefiLlama already ranked by top_k)
     results["geckoterminal"].sort(key=lambda x: x["volume_24h"] if "volume_24h" in x else x["apy"], reverse=True)
     
     # Combine - interleave sources for variety
     combined = []
     dl_idx, gt_idx = 0, 0
-    
-    # If using protocol filter, we likely want ALL results, not just a small limit
-    # But keep limit if large to prevent overload
-    effective_limit = limit if not allowed_protocols else max(limit, 500)
 
     while len(combined) < effective_limit:
         # Alternate between sources
@@ -988,6 +985,38 @@ async def get_aggregated_pools(
     return results
 
 
+async def get_multi_chain_pools(chains: List[str], **filters) -> Dict[str, Any]:
+    """
+    Aggregate several chains concurrently (same filters as get_aggregated_pools).
+    
+    Latency is the slowest chain - bounded by the per-source deadline - not the
+    sum over chains. A failed chain or source only shows up in "degraded".
+    """
+    results = await asyncio.gather(
+        *(get_aggregated_pools(chain=c, **filters) for c in chains),
+        return_exceptions=True
+    )
+    
+    combined = []
+    sources_used = []
+    degraded = []
+    for chain, result in zip(chains, results):
+        if isinstance(result, BaseException):
+            print(f"[Aggregator] {chain} failed: {result!r}")
+            degraded.append({"chain": chain, "source": "all", "reason": "error"})
+            continue
+        combined.extend(result["combined"])
+        sources_used.extend(s for s in result["sources_used"] if s not in sources_used)
+        degraded.extend({"chain": chain, **entry} for entry in result["degraded"])
+    
+    return {
+        "chains": chains,
+        "combined": combined,
+        "sources_used": sources_used,
+        "degraded": degraded
+    }
+
+
 # ============================================
 # CLI TEST
 # ============================================
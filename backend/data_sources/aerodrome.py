@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any
 from web3 import Web3
 import httpx
 from data_sources.multicall import Multicall3
+from infrastructure.rpc import get_web3, run_rpc, call_async
 
 logger = logging.getLogger("Aerodrome")
 
@@ -135,7 +136,7 @@ class AerodromeOnChain:
         
         try:
             rpc_url = RPC_ENDPOINTS[self.rpc_index]
-            self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': 15}))
+            self.w3 = get_web3(rpc_url, timeout=15)
             if not self.w3.is_connected():
                 raise ConnectionError(f"RPC not connected: {rpc_url}")
             logger.info(f"✅ Connected to {rpc_url}")
@@ -170,15 +171,17 @@ class AerodromeOnChain:
                 abi=POOL_ABI
             )
             
-            reserves = pool.functions.getReserves().call()
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
+            reserves, token0, token1 = await asyncio.gather(
+                call_async(pool.functions.getReserves()),
+                call_async(pool.functions.token0()),
+                call_async(pool.functions.token1())
+            )
             
             # Get decimals for both tokens
             token0_contract = self.w3.eth.contract(address=token0, abi=ERC20_ABI)
             token1_contract = self.w3.eth.contract(address=token1, abi=ERC20_ABI)
-            decimals0 = token0_contract.functions.decimals().call()
-            decimals1 = token1_contract.functions.decimals().call()
+            decimals0 = await call_async(token0_contract.functions.decimals())
+            decimals1 = await call_async(token1_contract.functions.decimals())
             
             # Convert reserves to human-readable
             reserve0 = reserves[0] / (10 ** decimals0)
@@ -248,8 +251,8 @@ class AerodromeOnChain:
                 abi=POOL_ABI
             )
             
-            reserves = pool.functions.getReserves().call()
-            token0 = pool.functions.token0().call()
+            reserves = await call_async(pool.functions.getReserves())
+            token0 = await call_async(pool.functions.token0())
             
             reserve0 = reserves[0] / 1e18  # WETH
             reserve1 = reserves[1] / 1e6   # USDC
@@ -288,16 +291,18 @@ class AerodromeOnChain:
             pool = self.w3.eth.contract(address=pool_address, abi=POOL_ABI)
             
             # Get pool data
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
-            reserves = pool.functions.getReserves().call()
-            total_supply = pool.functions.totalSupply().call()
+            token0, token1, reserves, total_supply = await asyncio.gather(
+                call_async(pool.functions.token0()),
+                call_async(pool.functions.token1()),
+                call_async(pool.functions.getReserves()),
+                call_async(pool.functions.totalSupply())
+            )
             
             # Get token decimals
             token0_contract = self.w3.eth.contract(address=token0, abi=ERC20_ABI)
             token1_contract = self.w3.eth.contract(address=token1, abi=ERC20_ABI)
-            decimals0 = token0_contract.functions.decimals().call()
-            decimals1 = token1_contract.functions.decimals().call()
+            decimals0 = await call_async(token0_contract.functions.decimals())
+            decimals1 = await call_async(token1_contract.functions.decimals())
             
             # Calculate reserves in human-readable format
             reserve0 = reserves[0] / (10 ** decimals0)
@@ -353,7 +358,7 @@ class AerodromeOnChain:
             pool_address = Web3.to_checksum_address(pool_address)
             
             # Step 1: Get gauge address from Voter
-            gauge_address = self.voter.functions.gauges(pool_address).call()
+            gauge_address = await call_async(self.voter.functions.gauges(pool_address))
             
             if gauge_address == ZERO_ADDRESS:
                 logger.debug(f"No gauge for pool {pool_address[:10]}...")
@@ -381,8 +386,8 @@ class AerodromeOnChain:
             if pool_type in ["v2", "unknown"]:
                 try:
                     v2_gauge = self.w3.eth.contract(address=gauge_checksum, abi=GAUGE_ABI)
-                    reward_rate = v2_gauge.functions.rewardRate().call()
-                    total_staked = v2_gauge.functions.totalSupply().call()
+                    reward_rate = await call_async(v2_gauge.functions.rewardRate())
+                    total_staked = await call_async(v2_gauge.functions.totalSupply())
                     
                     # V2 detection: totalSupply > 0 means LP tokens are staked
                     if reward_rate > 0 and total_staked > 0:
@@ -396,7 +401,7 @@ class AerodromeOnChain:
             if not v2_gauge_success:
                 try:
                     cl_gauge = self.w3.eth.contract(address=gauge_checksum, abi=CL_GAUGE_ABI)
-                    reward_rate = cl_gauge.functions.rewardRate().call()
+                    reward_rate = await call_async(cl_gauge.functions.rewardRate())
                     
                     if reward_rate > 0:
                         pool_type = "cl"
@@ -411,8 +416,8 @@ class AerodromeOnChain:
                             ]
                             pool_contract = self.w3.eth.contract(address=pool_checksum, abi=CL_POOL_ABI)
                             
-                            total_liquidity = pool_contract.functions.liquidity().call()
-                            staked_liquidity = pool_contract.functions.stakedLiquidity().call()
+                            total_liquidity = await call_async(pool_contract.functions.liquidity())
+                            staked_liquidity = await call_async(pool_contract.functions.stakedLiquidity())
                             
                             if total_liquidity > 0:
                                 staked_ratio = staked_liquidity / total_liquidity
@@ -432,7 +437,7 @@ class AerodromeOnChain:
                             # Fallback: try V2 gauge again with fresh call
                             try:
                                 v2_gauge = self.w3.eth.contract(address=gauge_checksum, abi=GAUGE_ABI)
-                                total_staked = v2_gauge.functions.totalSupply().call()
+                                total_staked = await call_async(v2_gauge.functions.totalSupply())
                                 if total_staked > 0:
                                     pool_type = "v2"
                                     logger.info(f"Re-detected as V2 (has totalSupply={total_staked})")
@@ -590,7 +595,7 @@ class AerodromeOnChain:
             voter_idx = mc.add_call(self.voter, 'gauges', (pool_address,))
             
             # Execute batch 1
-            results1 = mc.execute()
+            results1 = await run_rpc(mc.execute)
             
             # Parse gauge result
             if not results1[voter_idx][0]:
@@ -647,7 +652,7 @@ class AerodromeOnChain:
             pool_supply_idx = mc2.add_call(pool_v2, 'totalSupply')
             
             # Execute ALL in ONE call
-            results2 = mc2.execute()
+            results2 = await run_rpc(mc2.execute)
             
             # ================================================================
             # PARSE RESULTS
@@ -786,11 +791,11 @@ class AerodromeOnChain:
             token1 = Web3.to_checksum_address(token1)
             
             # Get pool address from factory
-            pool_address = self.v2_factory.functions.getPool(token0, token1, stable).call()
+            pool_address = await call_async(self.v2_factory.functions.getPool(token0, token1, stable))
             
             if pool_address == ZERO_ADDRESS:
                 # Try reverse order
-                pool_address = self.v2_factory.functions.getPool(token1, token0, stable).call()
+                pool_address = await call_async(self.v2_factory.functions.getPool(token1, token0, stable))
             
             if pool_address == ZERO_ADDRESS:
                 logger.warning(f"Pool not found for {token0[:10]}.../{token1[:10]}...")
@@ -810,18 +815,20 @@ class AerodromeOnChain:
             pool = self.w3.eth.contract(address=pool_address, abi=POOL_ABI)
             
             # Get basic pool info
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
-            reserves = pool.functions.getReserves().call()
-            total_supply = pool.functions.totalSupply().call()
+            token0, token1, reserves, total_supply = await asyncio.gather(
+                call_async(pool.functions.token0()),
+                call_async(pool.functions.token1()),
+                call_async(pool.functions.getReserves()),
+                call_async(pool.functions.totalSupply())
+            )
             
             try:
-                stable = pool.functions.stable().call()
+                stable = await call_async(pool.functions.stable())
             except:
                 stable = False
             
             try:
-                symbol = pool.functions.symbol().call()
+                symbol = await call_async(pool.functions.symbol())
             except:
                 symbol = "LP"
             
@@ -829,10 +836,10 @@ class AerodromeOnChain:
             token0_contract = self.w3.eth.contract(address=token0, abi=ERC20_ABI)
             token1_contract = self.w3.eth.contract(address=token1, abi=ERC20_ABI)
             
-            decimals0 = token0_contract.functions.decimals().call()
-            decimals1 = token1_contract.functions.decimals().call()
-            symbol0 = token0_contract.functions.symbol().call()
-            symbol1 = token1_contract.functions.symbol().call()
+            decimals0 = await call_async(token0_contract.functions.decimals())
+            decimals1 = await call_async(token1_contract.functions.decimals())
+            symbol0 = await call_async(token0_contract.functions.symbol())
+            symbol1 = await call_async(token1_contract.functions.symbol())
             
             reserve0 = reserves[0] / (10 ** decimals0)
             reserve1 = reserves[1] / (10 ** decimals1)
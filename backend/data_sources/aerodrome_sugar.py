@@ -7,10 +7,13 @@ Sugar v3 Contract: 0x68c19e13618C41158fE4bAba1B8fb3A9c74bDb0A
 
 import asyncio
 import os
-from datetime import datetime, timedelta
+import time
 from typing import Dict, List, Optional, Any
 from web3 import Web3
 
+from infrastructure.rpc import get_web3, call_async
+from infrastructure.request_coalescer import RequestCoalescer
+
 # Sugar v3 contract address on Base
 SUGAR_ADDRESS = "0x68c19e13618C41158fE4bAba1B8fb3A9c74bDb0A"
 
@@ -73,25 +76,38 @@ class AerodromeSugar:
     - Zero API cost (only RPC calls)
     - Live on-chain data (block-level accuracy)
     - No rate limits beyond RPC
+    
+    Keeps a full snapshot of all pools (paged through `all(limit, offset)`),
+    indexed by LP address, gauge and token pair:
+    - First lookup waits for the snapshot; after cache_ttl it is refreshed in
+      the background while callers keep reading the current one
+    - Pages are merged into the indexes as they arrive (incremental refresh)
+    - Concurrent refreshes are coalesced into one via RequestCoalescer
     """
     
-    def __init__(self, rpc_url: str = None):
+    def __init__(self, rpc_url: str = None, page_size: int = 300, max_concurrent_pages: int = 4):
         self.rpc_url = rpc_url or os.getenv("ALCHEMY_RPC_URL", "https://mainnet.base.org")
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        self.w3 = get_web3(self.rpc_url)
         self.sugar = self.w3.eth.contract(
             address=Web3.to_checksum_address(SUGAR_ADDRESS),
             abi=SUGAR_ABI
         )
+        self.page_size = page_size
+        self.max_concurrent_pages = max_concurrent_pages
         
-        # Cache with 5 min TTL
-        self.cache: Dict[str, Any] = {}
-        self.cache_time: Dict[str, datetime] = {}
+        # Snapshot with 5 min TTL
         self.cache_ttl = 300  # 5 minutes
+        self.pools: List[Dict] = []
+        self.by_lp: Dict[str, Dict] = {}
+        self.by_gauge: Dict[str, Dict] = {}
+        self.by_pair: Dict[frozenset, List[Dict]] = {}
+        self.loaded_at: float = 0.0  # time.monotonic() of last complete refresh
         
-    def _is_cache_valid(self, key: str) -> bool:
-        if key not in self.cache_time:
-            return False
-        return datetime.now() - self.cache_time[key] < timedelta(seconds=self.cache_ttl)
+        self._coalescer = RequestCoalescer(timeout=120.0)
+        self._background: Optional[asyncio.Task] = None
+    
+    def _is_snapshot_valid(self) -> bool:
+        return bool(self.pools) and time.monotonic() - self.loaded_at < self.cache_ttl
     
     def _parse_pool(self, raw_pool: tuple) -> Dict:
         """Parse raw tuple from Sugar v3 contract into dict (26 fields)"""
@@ -150,50 +166,114 @@ class AerodromeSugar:
         apr = (emissions_per_year * AERO_PRICE_USD) / tvl * 100
         return min(apr, 10000)  # Cap at 10000%
     
-    async def get_all_pools(self, limit: int = 300, offset: int = 0) -> List[Dict]:
-        """Fetch all Aerodrome pools from Sugar v3 contract."""
-        cache_key = f"all_pools_{limit}_{offset}"
+    async def _fetch_page(self, limit: int, offset: int) -> List[Dict]:
+        """One Sugar v3 `all(limit, offset)` page, parsed"""
+        # Sugar v3: all(limit, offset) - NO account parameter
+        raw_pools = await call_async(self.sugar.functions.all(limit, offset))
         
-        if self._is_cache_valid(cache_key):
-            return self.cache[cache_key]
+        pools = []
+        for raw in raw_pools:
+            pool = self._parse_pool(raw)
+            pool["tvlUsd"] = self._calculate_tvl(pool)
+            pool["apy"] = self._calculate_apr(pool)
+            pool["project"] = "aerodrome"
+            pool["chain"] = "Base"
+            pool["source"] = "sugar_v3"
+            pools.append(pool)
+        return pools
+    
+    def _index_pool(self, pool: Dict):
+        """Upsert one pool into the indexes"""
+        lp = pool["lp"].lower()
+        previous = self.by_lp.get(lp)
+        pair = self.by_pair.setdefault(self._pair_key(pool["token0"], pool["token1"]), [])
+        for i, existing in enumerate(pair):
+            if existing is previous:
+                pair[i] = pool
+                break
+        else:
+            pair.append(pool)
+        self.by_lp[lp] = pool
+        gauge = (pool.get("gauge") or "").lower()
+        if gauge and int(gauge, 16):
+            self.by_gauge[gauge] = pool
+    
+    @staticmethod
+    def _pair_key(token0: str, token1: str) -> frozenset:
+        return frozenset(((token0 or "").lower(), (token1 or "").lower()))
+    
+    async def _refresh_snapshot(self) -> List[Dict]:
+        """Page through every pool; waves of pages are fetched concurrently"""
+        seen = []
+        offset = 0
+        done = False
+        while not done:
+            offsets = [offset + i * self.page_size for i in range(self.max_concurrent_pages)]
+            pages = await asyncio.gather(*(self._fetch_page(self.page_size, o) for o in offsets))
+            for page in pages:
+                for pool in page:
+                    self._index_pool(pool)  # Readers see fresh pools page by page
+                seen.extend(page)
+                if len(page) < self.page_size:
+                    done = True
+                    break
+            offset = offsets[-1] + self.page_size
         
+        # Complete pass: drop pools that disappeared, keep registry order
+        self.pools = seen
+        self.by_lp = {p["lp"].lower(): p for p in seen}
+        self.by_gauge = {g: p for g, p in self.by_gauge.items() if self.by_lp.get(p["lp"].lower()) is p}
+        self.by_pair = {}
+        for pool in seen:
+            self.by_pair.setdefault(self._pair_key(pool["token0"], pool["token1"]), []).append(pool)
+        self.loaded_at = time.monotonic()
+        print(f"[AerodromeSugar] Snapshot refreshed: {len(seen)} pools")
+        return seen
+    
+    async def refresh_snapshot(self) -> List[Dict]:
+        """Refresh the snapshot now (concurrent callers share one refresh)"""
+        return await self._coalescer.execute("aerodrome_sugar:snapshot", self._refresh_snapshot)
+    
+    async def ensure_snapshot(self) -> List[Dict]:
+        """Current snapshot: wait for the first load, revalidate stale ones in the background"""
+        if not self.pools:
+            try:
+                await self.refresh_snapshot()
+            except Exception as e:
+                print(f"[AerodromeSugar] Error fetching pools: {e}")
+        elif not self._is_snapshot_valid() and (self._background is None or self._background.done()):
+            self._background = asyncio.create_task(self._background_refresh())
+        return self.pools
+    
+    async def _background_refresh(self):
         try:
-            # Sugar v3: all(limit, offset) - NO account parameter
-            raw_pools = self.sugar.functions.all(limit, offset).call()
-            
-            pools = []
-            for raw in raw_pools:
-                pool = self._parse_pool(raw)
-                pool["tvlUsd"] = self._calculate_tvl(pool)
-                pool["apy"] = self._calculate_apr(pool)
-                pool["project"] = "aerodrome"
-                pool["chain"] = "Base"
-                pool["source"] = "sugar_v3"
-                pools.append(pool)
-            
-            self.cache[cache_key] = pools
-            self.cache_time[cache_key] = datetime.now()
-            
-            return pools
-            
+            await self.refresh_snapshot()
         except Exception as e:
-            print(f"[AerodromeSugar] Error fetching pools: {e}")
-            return self.cache.get(cache_key, [])
+            print(f"[AerodromeSugar] Background refresh failed (serving previous snapshot): {e}")
+    
+    async def get_all_pools(self, limit: int = 300, offset: int = 0) -> List[Dict]:
+        """Fetch Aerodrome pools (registry order) from the Sugar v3 snapshot."""
+        pools = await self.ensure_snapshot()
+        return pools[offset:offset + limit]
     
     async def get_pool_by_address(self, pool_address: str) -> Optional[Dict]:
         """Get specific pool data by address."""
-        all_pools = await self.get_all_pools()
-        
-        pool_address = pool_address.lower()
-        for pool in all_pools:
-            if pool["lp"].lower() == pool_address:
-                return pool
-        
-        return None
+        await self.ensure_snapshot()
+        return self.by_lp.get(pool_address.lower())
+    
+    async def get_pool_by_gauge(self, gauge_address: str) -> Optional[Dict]:
+        """Get the pool staked into a gauge."""
+        await self.ensure_snapshot()
+        return self.by_gauge.get(gauge_address.lower())
+    
+    async def get_pools_by_tokens(self, token0: str, token1: str) -> List[Dict]:
+        """All pools (stable / volatile / CL tick spacings) for a token pair, any order."""
+        await self.ensure_snapshot()
+        return list(self.by_pair.get(self._pair_key(token0, token1), []))
     
     async def get_pools_for_tracking(self, min_tvl: float = 100000, min_apr: float = 5) -> List[Dict]:
         """Get pools suitable for tracking/investment."""
-        all_pools = await self.get_all_pools()
+        all_pools = await self.ensure_snapshot()
         
         return [
             p for p in all_pools 
@@ -201,6 +281,15 @@ class AerodromeSugar:
             and p["apy"] >= min_apr
             and p["gauge_alive"]
         ]
+    
+    def get_stats(self) -> Dict:
+        return {
+            "pools": len(self.pools),
+            "gauges": len(self.by_gauge),
+            "pairs": len(self.by_pair),
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+            "coalescer": self._coalescer.get_stats(),
+        }
 
 
 # Singleton instance
@@ -209,7 +298,7 @@ aerodrome_sugar = AerodromeSugar()
 
 async def get_aerodrome_pools_from_sugar(min_tvl: float = 100000) -> List[Dict]:
     """Convenience function for fetching Aerodrome pools via Sugar"""
-    pools = await aerodrome_sugar.get_all_pools()
+    pools = await aerodrome_sugar.ensure_snapshot()
     return [p for p in pools if p["tvlUsd"] >= min_tvl]
 
 
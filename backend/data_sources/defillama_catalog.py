@@ -0,0 +1,237 @@
+"""
+DefiLlama Pool Catalog
+Shared, periodically refreshed snapshot of yields.llama.fi/pools with hash indexes.
+
+WHY: Scout endpoints downloaded the full ~4000-pool payload (multi-MB) per request
+and scanned it linearly. One snapshot per process, indexed once per refresh,
+turns every lookup into a dict access.
+
+Indexes (all keys lowercase):
+- by_id:      pool UUID -> pool
+- by_address: any 0x address embedded in the pool id -> pools
+- by_token:   underlyingTokens entry -> pools
+- by_chain:   chain -> pools
+- by_project: project -> pools
+- by_symbol:  frozenset of symbol parts -> pools
+
+Consumers that need their own partitioning (e.g. whitelisted per-chain views)
+register it via view(name, build) - built once per snapshot, not per request.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+try:
+    from infrastructure.api_metrics import api_metrics
+except ImportError:
+    api_metrics = None
+
+logger = logging.getLogger("DefiLlamaCatalog")
+
+DEFILLAMA_POOLS_URL = "https://yields.llama.fi/pools"
+
+_ADDRESS_RE = re.compile(r"0x[0-9a-f]{40}")
+_SYMBOL_SPLIT_RE = re.compile(r"[-/]")
+
+
+def symbol_key(symbol: str) -> frozenset:
+    """Order-insensitive key for a pool symbol ("USDC-WETH" == "WETH/USDC")."""
+    return frozenset(part for part in _SYMBOL_SPLIT_RE.split((symbol or "").upper()) if part)
+
+
+class DefiLlamaPoolCatalog:
+    """
+    In-memory DefiLlama pool catalog with stale-while-revalidate refresh.
+
+    - First call blocks on the download; later calls serve the snapshot
+    - After `ttl` seconds a background refresh is started (callers keep the old data)
+    - Concurrent refreshes are coalesced into one download
+    - If a refresh fails the previous snapshot keeps being served
+    """
+
+    def __init__(self, ttl: float = 300, timeout: float = 30.0):
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self.pools: List[dict] = []
+        self.loaded_at: float = 0.0
+
+        self.by_id: Dict[str, dict] = {}
+        self.by_address: Dict[str, List[dict]] = {}
+        self.by_token: Dict[str, List[dict]] = {}
+        self.by_chain: Dict[str, List[dict]] = {}
+        self.by_project: Dict[str, List[dict]] = {}
+        self.by_symbol: Dict[frozenset, List[dict]] = {}
+        self._position: Dict[int, int] = {}  # id(pool) -> index in the DefiLlama payload
+        self._views: Dict[str, Any] = {}      # view name -> derived data for this snapshot
+
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stats = {"refreshes": 0, "refresh_errors": 0, "lookups": 0, "views_built": 0, "last_refresh_ms": 0.0}
+
+    # ==========================================
+    # REFRESH
+    # ==========================================
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self.pools)
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self.loaded_at >= self.ttl
+
+    async def _download(self) -> List[dict]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(DEFILLAMA_POOLS_URL)
+            response.raise_for_status()
+            return response.json().get("data", [])
+
+    async def _refresh(self) -> List[dict]:
+        start = time.time()
+        try:
+            pools = await self._download()
+            if api_metrics:
+                api_metrics.record_call('defillama', '/pools', 'success', time.time() - start)
+            if pools:
+                self.load(pools)
+                self._stats["refreshes"] += 1
+                self._stats["last_refresh_ms"] = round((time.time() - start) * 1000, 1)
+                logger.info(f"DefiLlama catalog refreshed: {len(pools)} pools in {self._stats['last_refresh_ms']:.0f}ms")
+        except Exception as e:
+            self._stats["refresh_errors"] += 1
+            if api_metrics:
+                api_metrics.record_call('defillama', '/pools', 'error', time.time() - start,
+                                        error_message=str(e)[:200])
+            logger.warning(f"DefiLlama catalog refresh failed: {e}")
+        return self.pools
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already in flight (coalescing)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def ensure_loaded(self) -> List[dict]:
+        """Return the current snapshot, downloading it if empty and revalidating if stale."""
+        if not self.is_loaded:
+            await asyncio.shield(self._start_refresh())
+        elif self.is_stale:
+            self._start_refresh()
+        return self.pools
+
+    def load(self, pools: List[dict]):
+        """Replace the snapshot and rebuild all indexes."""
+        by_id, by_address, by_token, by_chain, by_project, by_symbol = {}, {}, {}, {}, {}, {}
+        position = {}
+
+        for i, p in enumerate(pools):
+            position[id(p)] = i
+            pool_id = (p.get("pool") or "").lower()
+            chain = (p.get("chain") or "").lower()
+            if pool_id:
+                by_id[pool_id] = p
+                for addr in set(_ADDRESS_RE.findall(pool_id)):
+                    by_address.setdefault(addr, []).append(p)
+            for token in p.get("underlyingTokens") or []:
+                if isinstance(token, str) and token:
+                    by_token.setdefault(token.lower(), []).append(p)
+            by_chain.setdefault(chain, []).append(p)
+            by_project.setdefault((p.get("project") or "").lower(), []).append(p)
+            by_symbol.setdefault(symbol_key(p.get("symbol")), []).append(p)
+
+        # Swap atomically - readers never see a half-built index
+        self.by_id, self.by_address, self.by_token = by_id, by_address, by_token
+        self.by_chain, self.by_project, self.by_symbol = by_chain, by_project, by_symbol
+        self._position = position
+        self._views = {}
+        self.pools = pools
+        self.loaded_at = time.time()
+
+    # ==========================================
+    # LOOKUPS (call ensure_loaded() first)
+    # ==========================================
+
+    def get_by_id(self, pool_id: str) -> Optional[dict]:
+        self._stats["lookups"] += 1
+        return self.by_id.get((pool_id or "").lower())
+
+    def find_by_address(self, address: str, chain: str = None) -> List[dict]:
+        """Pools whose id contains this address, optionally restricted to a chain substring."""
+        self._stats["lookups"] += 1
+        address = (address or "").lower()
+        if _ADDRESS_RE.fullmatch(address):
+            pools = self.by_address.get(address, [])
+        else:
+            # Non-EVM ids (e.g. Solana) are not indexed - fall back to a scan
+            pools = [p for p in self.pools if address and address in (p.get("pool") or "").lower()]
+        return self._filter_chain(pools, chain)
+
+    def find_by_token(self, token: str, chain: str = None) -> List[dict]:
+        """Pools listing this address in underlyingTokens."""
+        self._stats["lookups"] += 1
+        pools = self.by_token.get((token or "").lower(), [])
+        return self._filter_chain(pools, chain)
+
+    def find_by_tokens(self, token0: str, token1: str, chain: str = None) -> List[dict]:
+        """Pools containing both tokens (as underlying tokens or inside the pool id)."""
+        self._stats["lookups"] += 1
+        token0, token1 = (token0 or "").lower(), (token1 or "").lower()
+
+        def candidates(token: str) -> Dict[int, dict]:
+            found = {id(p): p for p in self.by_token.get(token, [])}
+            found.update({id(p): p for p in self.by_address.get(token, [])})
+            return found
+
+        first, second = candidates(token0), candidates(token1)
+        if len(second) < len(first):
+            first, second = second, first
+        # Keep DefiLlama's ordering so "first match" means the same as a linear scan
+        pools = sorted((p for key, p in first.items() if key in second), key=lambda p: self._position.get(id(p), 0))
+        return self._filter_chain(pools, chain)
+
+    def get_chain(self, chain: str) -> List[dict]:
+        self._stats["lookups"] += 1
+        return self.by_chain.get((chain or "").lower(), [])
+
+    def get_project(self, project: str) -> List[dict]:
+        self._stats["lookups"] += 1
+        return self.by_project.get((project or "").lower(), [])
+
+    def find_by_symbol(self, symbol: str, chain: str = None) -> List[dict]:
+        """Pools whose symbol has the same parts in any order ("USDC-WETH" == "WETH/USDC")."""
+        self._stats["lookups"] += 1
+        return self._filter_chain(self.by_symbol.get(symbol_key(symbol), []), chain)
+
+    @staticmethod
+    def _filter_chain(pools: List[dict], chain: Optional[str]) -> List[dict]:
+        if not chain:
+            return pools
+        chain = chain.lower()
+        return [p for p in pools if chain in (p.get("chain") or "").lower()]
+
+    def view(self, name: str, build: Callable[[List[dict]], Any]) -> Any:
+        """Derived data computed by build(pools) once per snapshot (dropped on refresh)."""
+        views = self._views
+        if name not in views:
+            views[name] = build(self.pools)
+            self._stats["views_built"] += 1
+        return views[name]
+
+    def get_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "pools": len(self.pools),
+            "chains": len(self.by_chain),
+            "views": len(self._views),
+            "age_seconds": round(time.time() - self.loaded_at, 1) if self.loaded_at else None,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done(),
+        }
+
+
+# Global catalog instance
+pool_catalog = DefiLlamaPoolCatalog()
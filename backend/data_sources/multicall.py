@@ -6,6 +6,7 @@ Multicall3 is deployed at the same address on all EVMs:
 0xcA11bde05977b3631167028862bE2a173976CA11
 """
 
+import asyncio
 import logging
 from typing import List, Tuple, Any, Optional
 from web3 import Web3
@@ -42,6 +43,13 @@ MULTICALL3_ABI = [
         ],
         "stateMutability": "payable",
         "type": "function"
+    },
+    {
+        "inputs": [{"name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
     }
 ]
 
@@ -98,9 +106,10 @@ class Multicall3:
                 return [o.get('type') for o in outputs]
         return []
     
-    def execute(self) -> List[Tuple[bool, Any]]:
+    def execute(self, block_identifier=None) -> List[Tuple[bool, Any]]:
         """
         Execute all batched calls in ONE RPC request.
+        Pass block_identifier to read every call at the same block.
         Returns list of (success, decoded_result) tuples.
         """
         if not self.calls:
@@ -118,7 +127,11 @@ class Multicall3:
         
         # Execute ONE RPC call
         try:
-            raw_results = self.multicall.functions.aggregate3(call_data).call()
+            aggregate = self.multicall.functions.aggregate3(call_data)
+            if block_identifier is not None:
+                raw_results = aggregate.call(block_identifier=block_identifier)
+            else:
+                raw_results = aggregate.call()
         except Exception as e:
             logger.error(f"Multicall failed: {e}")
             return [(False, None) for _ in self.calls]
@@ -160,6 +173,49 @@ class Multicall3:
         self.calls = []
 
 
+async def execute_batched(
+    w3: Web3,
+    calls: List[Tuple[Any, str, tuple]],
+    chunk_size: int = 500,
+    max_concurrency: int = 4,
+    block_identifier=None
+) -> List[Tuple[bool, Any]]:
+    """
+    Execute an arbitrary number of (contract, function_name, args) calls.
+    
+    Calls are split into aggregate3 chunks of `chunk_size` (keeps each eth_call
+    under RPC gas / payload limits) and chunks run in parallel threads, at most
+    `max_concurrency` at a time. Results keep the order of `calls`.
+    Pin `block_identifier` to get one consistent snapshot across chunks.
+    Native ETH balances: use (Multicall3(w3).multicall, 'getEthBalance', (addr,)).
+    """
+    if not calls:
+        return []
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    
+    def run_chunk(chunk) -> List[Tuple[bool, Any]]:
+        mc = Multicall3(w3)
+        for contract, function_name, args in chunk:
+            mc.add_call(contract, function_name, args)
+        return mc.execute(block_identifier=block_identifier)
+    
+    async def run_bounded(chunk) -> List[Tuple[bool, Any]]:
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(None, run_chunk, chunk)
+            except Exception as e:
+                logger.error(f"Multicall chunk failed: {e}")
+                return [(False, None) for _ in chunk]
+    
+    chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+    chunk_results = await asyncio.gather(*(run_bounded(c) for c in chunks))
+    
+    logger.info(f"🚀 Multicall: {len(calls)} calls in {len(chunks)} RPC requests")
+    return [result for chunk in chunk_results for result in chunk]
+
+
 async def batch_aerodrome_calls(
     w3: Web3,
     pool_address: str,
@@ -0,0 +1,274 @@
+"""
+Pool History Store
+Local SQLite store of DefiLlama daily pool history + concurrent bulk downloader
+
+WHY: The backtest scripts fetched yields.llama.fi/chart/{pool} one pool at a
+time with a new HTTP client per call, on every run.
+
+DESIGN:
+- One row per (pool, day): apy, tvl. Days are integer days since the epoch,
+  so a panel is a direct scatter into a pools x days NumPy array
+- Pool metadata (chain, project, symbol, stablecoin) from /pools is kept
+  alongside, for PoolTable filters in the backtest engine
+- download_histories(): one shared httpx client, a semaphore bounding
+  concurrency, and only pools whose stored history is stale are fetched
+- load_panel() returns a HistoryPanel (pools x days; NaN = no data point)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+POOLS_URL = "https://yields.llama.fi/pools"
+CHART_URL = "https://yields.llama.fi/chart/{pool_id}"
+DEFAULT_DB_PATH = os.getenv("POOL_HISTORY_DB", str(Path(__file__).parent.parent / "data" / "pool_history.db"))
+DOWNLOAD_CONCURRENCY = int(os.getenv("POOL_HISTORY_CONCURRENCY", "16"))
+
+META_FIELDS = ("chain", "project", "symbol", "stablecoin")
+
+
+def _epoch_day(timestamp: str) -> int:
+    """'2024-05-01T23:01:39.384Z' -> days since 1970-01-01"""
+    return int(np.datetime64(timestamp[:10], "D").astype(np.int64))
+
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+
+@dataclass
+class HistoryPanel:
+    """Daily pool history as pools x days arrays (NaN = no data point)"""
+    pool_ids: List[str]
+    days: np.ndarray        # datetime64[D], ascending
+    apy: np.ndarray         # float64 [pools, days]
+    tvl: np.ndarray         # float64 [pools, days]
+    pools: List[dict]       # metadata rows, "pool" + META_FIELDS
+
+    def __len__(self) -> int:
+        return len(self.pool_ids)
+
+
+class PoolHistoryStore:
+    """
+    SQLite-backed daily history.
+
+    USAGE:
+        store = PoolHistoryStore()
+        await download_histories(pool_ids, store)
+        panel = store.load_panel(pool_ids, start="2025-01-01")
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pools (
+                pool TEXT PRIMARY KEY,
+                meta TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                pool TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                apy REAL,
+                tvl REAL,
+                PRIMARY KEY (pool, day)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    # ==========================================
+    # WRITES
+    # ==========================================
+
+    def upsert_pools(self, pools: Iterable[dict]) -> int:
+        """Store metadata for DefiLlama /pools rows"""
+        rows = [
+            (p["pool"], json.dumps({k: p.get(k) for k in META_FIELDS}))
+            for p in pools if p.get("pool")
+        ]
+        self._conn.executemany("INSERT OR REPLACE INTO pools (pool, meta) VALUES (?, ?)", rows)
+        self._conn.commit()
+        return len(rows)
+
+    def save_history(self, pool_id: str, points: List[dict]) -> int:
+        """Store /chart/{pool} points (one per day; the last point of a day wins)"""
+        rows = [
+            (pool_id, _epoch_day(p["timestamp"]), p.get("apy"), p.get("tvlUsd"))
+            for p in points if p.get("timestamp")
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO history (pool, day, apy, tvl) VALUES (?, ?, ?, ?)", rows
+        )
+        self._conn.commit()
+        return len(rows)
+
+    # ==========================================
+    # READS
+    # ==========================================
+
+    def last_days(self, pool_ids: Iterable[str]) -> Dict[str, int]:
+        """Latest stored day per pool (pools without history are absent)"""
+        rows = self._conn.execute("SELECT pool, MAX(day) FROM history GROUP BY pool").fetchall()
+        wanted = set(pool_ids)
+        return {pool: day for pool, day in rows if pool in wanted}
+
+    def history(self, pool_id: str) -> List[dict]:
+        """Stored points in the /chart format the scripts read (apy, tvlUsd)"""
+        rows = self._conn.execute(
+            "SELECT day, apy, tvl FROM history WHERE pool = ? ORDER BY day", (pool_id,)
+        ).fetchall()
+        return [
+            {"timestamp": str(np.datetime64(day, "D")), "apy": apy, "tvlUsd": tvl}
+            for day, apy, tvl in rows
+        ]
+
+    def pool_meta(self, pool_ids: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        rows = self._conn.execute("SELECT pool, meta FROM pools").fetchall()
+        wanted = set(pool_ids) if pool_ids is not None else None
+        return {pool: json.loads(meta) for pool, meta in rows if wanted is None or pool in wanted}
+
+    def load_panel(self, pool_ids: Optional[Iterable[str]] = None,
+                   start: Optional[str] = None, end: Optional[str] = None) -> HistoryPanel:
+        """
+        Pools x days panel over [start, end] (ISO dates, inclusive).
+
+        pool_ids=None loads every pool with history. Rows follow pool_ids order.
+        """
+        lo = _epoch_day(start) if start else -(2 ** 31)
+        hi = _epoch_day(end) if end else 2 ** 31
+        rows = self._conn.execute(
+            "SELECT pool, day, apy, tvl FROM history WHERE day BETWEEN ? AND ?", (lo, hi)
+        ).fetchall()
+
+        if pool_ids is None:
+            pool_ids = sorted({r[0] for r in rows})
+        pool_ids = list(pool_ids)
+        row_of = {pool: i for i, pool in enumerate(pool_ids)}
+        rows = [r for r in rows if r[0] in row_of]
+
+        meta = self.pool_meta(pool_ids)
+        pools = [{"pool": pool, **meta.get(pool, {})} for pool in pool_ids]
+
+        if not rows:
+            empty = np.empty((len(pool_ids), 0))
+            return HistoryPanel(pool_ids, np.array([], dtype="datetime64[D]"), empty, empty.copy(), pools)
+
+        pool_idx = np.fromiter((row_of[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        day = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        apy = np.array([np.nan if r[2] is None else r[2] for r in rows], dtype=np.float64)
+        tvl = np.array([np.nan if r[3] is None else r[3] for r in rows], dtype=np.float64)
+
+        first = day.min()
+        n_days = int(day.max() - first) + 1
+        apy_panel = np.full((len(pool_ids), n_days), np.nan)
+        tvl_panel = np.full((len(pool_ids), n_days), np.nan)
+        apy_panel[pool_idx, day - first] = apy
+        tvl_panel[pool_idx, day - first] = tvl
+
+        days = np.arange(first, first + n_days).astype("datetime64[D]")
+        return HistoryPanel(pool_ids, days, apy_panel, tvl_panel, pools)
+
+    def get_stats(self) -> Dict:
+        pools, points = self._conn.execute("SELECT COUNT(DISTINCT pool), COUNT(*) FROM history").fetchone()
+        return {"db_path": self.db_path, "pools": pools, "points": points}
+
+
+# ==========================================
+# BULK DOWNLOAD
+# ==========================================
+
+async def download_pool_list(store: PoolHistoryStore, client: Optional[httpx.AsyncClient] = None) -> List[dict]:
+    """Fetch the current DefiLlama /pools list and store its metadata"""
+    if client is None:
+        async with httpx.AsyncClient(timeout=60) as own_client:
+            return await download_pool_list(store, own_client)
+    resp = await client.get(POOLS_URL)
+    resp.raise_for_status()
+    pools = resp.json().get("data", [])
+    store.upsert_pools(pools)
+    return pools
+
+
+async def download_histories(
+    pool_ids: Iterable[str],
+    store: Optional[PoolHistoryStore] = None,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    max_age_days: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, int]:
+    """
+    Download /chart history for pools whose stored data is older than
+    max_age_days. Returns {downloaded, skipped, failed, points}.
+    """
+    store = store or get_pool_history_store()
+    if client is None:
+        async with httpx.AsyncClient(timeout=30) as own_client:
+            return await download_histories(pool_ids, store, concurrency, max_age_days, own_client)
+
+    pool_ids = list(dict.fromkeys(pool_ids))
+    last = store.last_days(pool_ids)
+    fresh_after = _today() - max_age_days
+    stale = [p for p in pool_ids if last.get(p, -1) < fresh_after]
+    stats = {"downloaded": 0, "skipped": len(pool_ids) - len(stale), "failed": 0, "points": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(pool_id: str):
+        async with semaphore:
+            try:
+                resp = await client.get(CHART_URL.format(pool_id=pool_id))
+                resp.raise_for_status()
+                points = resp.json().get("data", [])
+            except Exception as e:
+                logger.warning(f"[PoolHistory] {pool_id}: {e}")
+                stats["failed"] += 1
+                return
+        stats["points"] += store.save_history(pool_id, points)
+        stats["downloaded"] += 1
+
+    await asyncio.gather(*(fetch(p) for p in stale))
+    logger.info(f"[PoolHistory] {stats}")
+    return stats
+
+
+async def fetch_pool_histories(pool_ids: Iterable[str],
+                               store: Optional[PoolHistoryStore] = None) -> Dict[str, List[dict]]:
+    """Bring histories up to date, then return {pool_id: points} from the store"""
+    store = store or get_pool_history_store()
+    pool_ids = list(pool_ids)
+    await download_histories(pool_ids, store)
+    return {pool_id: store.history(pool_id) for pool_id in pool_ids}
+
+
+# Global store instance (opened on first use)
+_store: Optional[PoolHistoryStore] = None
+
+
+def get_pool_history_store() -> PoolHistoryStore:
+    global _store
+    if _store is None:
+        _store = PoolHistoryStore()
+    return _store
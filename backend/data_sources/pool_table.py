@@ -0,0 +1,189 @@
+"""
+Columnar Pool Table
+NumPy-backed view over a list of pool dicts for vectorized filtering and ranking
+
+WHY: Pool endpoints and the strategy executor filtered and sorted lists of pool
+dicts with Python loops (substring checks on project/symbol, APY/TVL bounds,
+asset heuristics) and redid that work on every request.
+
+DESIGN:
+- Built once per data refresh (e.g. via DefiLlamaPoolCatalog.view()), queried
+  many times
+- Numeric columns: apy, tvl, risk_score (float64; NaN = no numeric score)
+- Categorical columns: chain, project, symbol as int codes into a vocabulary -
+  substring filters test the few hundred distinct names once, then index the
+  result by code
+- Flag columns: stablecoin, lp, asset tags (bitmask) plus caller-defined
+  flags computed at build time (e.g. single-sided classification)
+- top_k() uses argpartition, and ties keep row order, so results equal a
+  stable sort + slice
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Asset tags (bitmask)
+TAG_ETH = 1
+TAG_SOL = 2
+
+ETH_SYMBOLS = ("ETH", "STETH", "WETH", "RETH", "CBETH", "WEETH", "EZETH")
+SOL_SYMBOLS = ("SOL", "MSOL", "JITOSOL", "BSOL")
+
+
+def asset_tags(pool: dict) -> int:
+    """Asset tag bitmask for one pool (ETH-related, SOL-related)"""
+    symbol = (pool.get("symbol") or "").upper()
+    chain = (pool.get("chain") or "").lower()
+    tags = 0
+    if any(s in symbol for s in ETH_SYMBOLS):
+        tags |= TAG_ETH
+    if chain == "solana" or any(s in symbol for s in SOL_SYMBOLS):
+        tags |= TAG_SOL
+    return tags
+
+
+def top_k_indices(values: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indices of the k largest values, descending - ties keep row order (like a stable sort)"""
+    idx = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+    if k <= 0 or not len(idx):
+        return idx[:0]
+    vals = values[idx]
+    if k < len(idx):
+        # O(n) partition to the k-th largest value; keep everything tied with it
+        kth = vals[np.argpartition(vals, len(vals) - k)[len(vals) - k]]
+        keep = vals >= kth
+        idx, vals = idx[keep], vals[keep]
+    return idx[np.lexsort((idx, -vals))[:k]]
+
+
+def _encode(values: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """Strings -> (int codes, vocabulary)"""
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(vocab)
+
+
+def _numeric(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+class PoolTable:
+    """
+    Immutable columnar snapshot of pools.
+
+    USAGE:
+        table = PoolTable.from_pools(pools, tvl_field="tvlUsd", flags={"single_sided": is_single})
+        mask = table.mask(chain="base", min_tvl=1e6, projects=["aave"], flags={"single_sided": True})
+        best = table.rows(table.top_k(10, mask))
+    """
+
+    def __init__(self, pools: List[dict], tvl_field: str = "tvl",
+                 flags: Optional[Dict[str, Callable[[dict], bool]]] = None):
+        self.pools = pools
+        n = len(pools)
+
+        self.apy = np.nan_to_num(np.fromiter((_numeric(p.get("apy") or 0) for p in pools), dtype=np.float64, count=n))
+        self.tvl = np.nan_to_num(np.fromiter((_numeric(p.get(tvl_field) or 0) for p in pools), dtype=np.float64, count=n))
+        self.risk_score = np.fromiter((_numeric(p.get("risk_score")) for p in pools), dtype=np.float64, count=n)
+
+        self.chain, self.chains = _encode([(p.get("chain") or "").lower() for p in pools])
+        self.project, self.projects = _encode([(p.get("project") or "").lower() for p in pools])
+        self.symbol, self.symbols = _encode([(p.get("symbol") or "").upper() for p in pools])
+        self._chain_codes = {name: code for code, name in enumerate(self.chains)}
+
+        self.stablecoin = np.fromiter((bool(p.get("stablecoin")) for p in pools), dtype=bool, count=n)
+        symbol_is_lp = np.array([("-" in s or "/" in s) for s in self.symbols], dtype=bool)
+        self.lp = symbol_is_lp[self.symbol] if n else np.zeros(0, dtype=bool)
+        self.tags = np.fromiter((asset_tags(p) for p in pools), dtype=np.int8, count=n)
+
+        self.flags: Dict[str, np.ndarray] = {
+            name: np.fromiter((bool(fn(p)) for p in pools), dtype=bool, count=n)
+            for name, fn in (flags or {}).items()
+        }
+
+    @classmethod
+    def from_pools(cls, pools: Iterable[dict], **kwargs) -> "PoolTable":
+        return cls(list(pools), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    # ==========================================
+    # QUERIES
+    # ==========================================
+
+    @staticmethod
+    def _vocab_mask(vocab: List[str], codes: np.ndarray, terms: List[str]) -> np.ndarray:
+        """Rows whose name contains any of the terms (tested once per distinct name)"""
+        hits = np.array([any(t in name for t in terms) for name in vocab], dtype=bool)
+        return hits[codes] if len(codes) else np.zeros(0, dtype=bool)
+
+    def mask(
+        self,
+        chain: Optional[str] = None,
+        min_apy: Optional[float] = None,
+        max_apy: Optional[float] = None,
+        min_tvl: Optional[float] = None,
+        max_tvl: Optional[float] = None,
+        stablecoin: Optional[bool] = None,
+        lp: Optional[bool] = None,
+        projects: Optional[Iterable[str]] = None,
+        symbols: Optional[Iterable[str]] = None,
+        tags: int = 0,
+        flags: Optional[Dict[str, bool]] = None,
+    ) -> np.ndarray:
+        """
+        Boolean row mask; None/empty arguments don't filter.
+
+        chain is an exact (case-insensitive) match, bounds are inclusive,
+        projects/symbols match if any term is a substring (lower/upper-cased
+        like the columns), tags requires all given bits.
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if chain is not None:
+            code = self._chain_codes.get(chain.lower())
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.chain == code
+        if min_apy is not None:
+            mask &= self.apy >= min_apy
+        if max_apy is not None:
+            mask &= self.apy <= max_apy
+        if min_tvl is not None:
+            mask &= self.tvl >= min_tvl
+        if max_tvl is not None:
+            mask &= self.tvl <= max_tvl
+        if stablecoin is not None:
+            mask &= self.stablecoin == stablecoin
+        if lp is not None:
+            mask &= self.lp == lp
+
+        projects = [t.lower() for t in projects or []]
+        if projects:
+            mask &= self._vocab_mask(self.projects, self.project, projects)
+        symbols = [t.upper() for t in symbols or []]
+        if symbols:
+            mask &= self._vocab_mask(self.symbols, self.symbol, symbols)
+
+        if tags:
+            mask &= (self.tags & tags) == tags
+        for name, wanted in (flags or {}).items():
+            mask &= self.flags[name] == wanted
+
+        return mask
+
+    def top_k(self, k: int, mask: Optional[np.ndarray] = None,
+              by: Union[str, np.ndarray] = "apy") -> np.ndarray:
+        """Row indices of the k best rows by a column name or score array (descending)"""
+        values = getattr(self, by) if isinstance(by, str) else by
+        return top_k_indices(values, k, mask)
+
+    def rows(self, indices: Iterable[int], copy: bool = False) -> List[dict]:
+        """Pool dicts for row indices (shallow copies if the caller will annotate them)"""
+        if copy:
+            return [dict(self.pools[i]) for i in indices]
+        return [self.pools[i] for i in indices]
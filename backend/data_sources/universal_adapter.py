@@ -2,13 +2,24 @@
 UniversalScanner - Auto-Detection Pool/Vault Analyzer
 Fingerprints contracts to identify type (CLAMM, V2, ERC4626, Lending) via method calls.
 Works with ANY pool on supported chains without hardcoding protocols.
+
+Fingerprinting sends every probe (slot0, getReserves, asset, underlying) for
+every address in ONE Multicall3 aggregate3 with allowFailure, and remembers
+the result per address on disk - a deployed contract's type never changes.
 """
+import asyncio
+import json
 import logging
+import os
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 from web3 import Web3
 import httpx
 
+from data_sources.multicall import Multicall3
+from infrastructure.rpc import run_rpc
+
 logger = logging.getLogger("UniversalScanner")
 
 
@@ -67,6 +78,22 @@ LENDING_ABI = [
     {"inputs": [], "name": "exchangeRateStored", "outputs": [{"type": "uint256"}], "stateMutability": "view", "type": "function"},
 ]
 
+# Probes in priority order: (type, signature, output types). A probe matches
+# when the call succeeds AND its return data decodes as the expected outputs.
+FINGERPRINT_PROBES = [
+    (ContractType.CLAMM, "slot0()", ["uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool"]),
+    (ContractType.V2_LP, "getReserves()", ["uint112", "uint112", "uint32"]),
+    (ContractType.ERC4626, "asset()", ["address"]),
+    (ContractType.LENDING, "underlying()", ["address"]),
+]
+PROBE_SELECTORS = [bytes(Web3.keccak(text=signature)[:4]) for _, signature, _ in FINGERPRINT_PROBES]
+
+# Addresses per aggregate3 (4 probes each - keeps one eth_call under RPC gas limits)
+FINGERPRINT_CHUNK_SIZE = int(os.getenv("FINGERPRINT_CHUNK_SIZE", "125"))
+FINGERPRINT_MAX_CONCURRENCY = 4
+
+DEFAULT_TYPE_CACHE_FILE = Path(__file__).parent.parent / "data" / "contract_types.json"
+
 # Common token ABI
 ERC20_ABI = [
     {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"type": "uint8"}], "type": "function"},
@@ -111,14 +138,69 @@ STABLECOINS = {
 }
 
 
+class ContractTypeCache:
+    """
+    Persistent chain:address -> ContractType map (JSON file, atomic rewrite).
+    
+    Only positive detections are stored: GENERIC is also what a failed probe or a
+    not-yet-deployed (CREATE2) address looks like, so it is re-probed next time.
+    """
+    
+    def __init__(self, path: Path = None):
+        self.path = Path(path or os.getenv("CONTRACT_TYPE_CACHE", DEFAULT_TYPE_CACHE_FILE))
+        self._types: Optional[Dict[str, ContractType]] = None
+    
+    @staticmethod
+    def _key(address: str, chain: str) -> str:
+        return f"{chain.lower()}:{address.lower()}"
+    
+    def _load(self) -> Dict[str, ContractType]:
+        if self._types is None:
+            self._types = {}
+            try:
+                if self.path.exists():
+                    for key, value in json.loads(self.path.read_text()).items():
+                        self._types[key] = ContractType(value)
+            except Exception as e:
+                logger.warning(f"Contract type cache unreadable, starting empty: {e}")
+        return self._types
+    
+    def get(self, address: str, chain: str) -> Optional[ContractType]:
+        return self._load().get(self._key(address, chain))
+    
+    def update(self, detected: Dict[str, ContractType], chain: str):
+        """Store new detections and persist once for the whole batch"""
+        types = self._load()
+        changed = False
+        for address, contract_type in detected.items():
+            key = self._key(address, chain)
+            if contract_type != ContractType.GENERIC_TOKEN_HOLDER and types.get(key) != contract_type:
+                types[key] = contract_type
+                changed = True
+        if not changed:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({k: v.value for k, v in types.items()}))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.error(f"Contract type cache write failed: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._load())
+
+
 class UniversalScanner:
     """
     Universal contract scanner that auto-detects pool/vault types.
     Uses "fingerprinting" by trying to call specific view functions.
     """
     
-    def __init__(self):
+    def __init__(self, type_cache: ContractTypeCache = None):
         self.web3_cache: Dict[str, Web3] = {}
+        self.type_cache = type_cache if type_cache is not None else ContractTypeCache()
+        self._stats = {"cache_hits": 0, "probed": 0, "rpc_calls": 0, "rpc_failures": 0}
         logger.info("🔍 UniversalScanner initialized")
     
     def _get_web3(self, chain: str) -> Optional[Web3]:
@@ -149,46 +231,99 @@ class UniversalScanner:
         Identify contract type by trying to call fingerprint methods.
         Returns the detected ContractType.
         """
+        types = await self.identify_contract_types([address], chain)
+        return types[address.lower()]
+    
+    async def identify_contract_types(self, addresses: List[str], chain: str = "base") -> Dict[str, ContractType]:
+        """
+        Fingerprint many addresses at once: cached types are returned directly,
+        the rest are probed in one aggregate3 per FINGERPRINT_CHUNK_SIZE addresses.
+        Returns {lowercase address: ContractType}.
+        """
+        results: Dict[str, ContractType] = {}
+        pending: List[str] = []
+        for address in addresses:
+            address = address.lower()
+            if address in results or address in pending:
+                continue
+            cached = self.type_cache.get(address, chain)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                results[address] = cached
+            else:
+                pending.append(address)
+        
+        if not pending:
+            return results
+        
         w3 = self._get_web3(chain)
         if not w3:
             logger.warning(f"No RPC for chain {chain}")
-            return ContractType.GENERIC_TOKEN_HOLDER
+            results.update({address: ContractType.GENERIC_TOKEN_HOLDER for address in pending})
+            return results
         
-        address = Web3.to_checksum_address(address)
+        semaphore = asyncio.Semaphore(FINGERPRINT_MAX_CONCURRENCY)
         
-        # Check 1: CLAMM (slot0)
-        if self._try_call(w3, address, "slot0", SLOT0_ABI):
-            logger.info(f"🔍 Detected CLAMM (V3-style): {address[:10]}...")
-            return ContractType.CLAMM
+        async def probe(chunk: List[str]) -> Optional[Dict[str, ContractType]]:
+            async with semaphore:
+                try:
+                    return await run_rpc(self._probe_chunk, w3, chunk)
+                except Exception as e:
+                    self._stats["rpc_failures"] += 1
+                    logger.warning(f"Fingerprint multicall failed for {len(chunk)} addresses: {e}")
+                    return None
         
-        # Check 2: V2 LP (getReserves)
-        if self._try_call(w3, address, "getReserves", GET_RESERVES_ABI):
-            logger.info(f"🔍 Detected V2 LP: {address[:10]}...")
-            return ContractType.V2_LP
+        chunks = [pending[i:i + FINGERPRINT_CHUNK_SIZE] for i in range(0, len(pending), FINGERPRINT_CHUNK_SIZE)]
+        detected: Dict[str, ContractType] = {}
+        for chunk, chunk_types in zip(chunks, await asyncio.gather(*(probe(c) for c in chunks))):
+            if chunk_types is None:
+                # Round-trip failed: answer GENERIC (as before) but don't remember it
+                results.update({address: ContractType.GENERIC_TOKEN_HOLDER for address in chunk})
+            else:
+                detected.update(chunk_types)
         
-        # Check 3: ERC-4626 (asset)
-        if self._try_call(w3, address, "asset", ERC4626_ABI):
-            logger.info(f"🔍 Detected ERC4626 Vault: {address[:10]}...")
-            return ContractType.ERC4626
+        self._stats["probed"] += len(pending)
+        self._stats["rpc_calls"] += len(chunks)
+        self.type_cache.update(detected, chain)
+        results.update(detected)
         
-        # Check 4: Lending (underlying)
-        if self._try_call(w3, address, "underlying", LENDING_ABI):
-            logger.info(f"🔍 Detected Lending Protocol: {address[:10]}...")
-            return ContractType.LENDING
+        for address, contract_type in detected.items():
+            logger.info(f"🔍 Detected {contract_type.value}: {address[:10]}...")
+        return results
+    
+    def _probe_chunk(self, w3: Web3, addresses: List[str]) -> Dict[str, ContractType]:
+        """All fingerprint probes for `addresses` in ONE aggregate3 (blocking - run via run_rpc)"""
+        calls = [
+            {"target": Web3.to_checksum_address(address), "allowFailure": True, "callData": selector}
+            for address in addresses
+            for selector in PROBE_SELECTORS
+        ]
+        raw = self._aggregate3(w3, calls)
         
-        # Fallback: Generic token holder
-        logger.info(f"🔍 Unknown contract type, treating as GENERIC: {address[:10]}...")
+        detected = {}
+        width = len(FINGERPRINT_PROBES)
+        for i, address in enumerate(addresses):
+            detected[address] = self._match_probes(w3, raw[i * width:(i + 1) * width])
+        return detected
+    
+    def _aggregate3(self, w3: Web3, calls: List[dict]) -> List[Tuple[bool, bytes]]:
+        return Multicall3(w3).multicall.functions.aggregate3(calls).call()
+    
+    @staticmethod
+    def _match_probes(w3: Web3, probe_results: List[Tuple[bool, bytes]]) -> ContractType:
+        """First probe (in priority order) that succeeded with decodable return data"""
+        for (contract_type, _, output_types), (success, return_data) in zip(FINGERPRINT_PROBES, probe_results):
+            if not success or not return_data:
+                continue
+            try:
+                w3.codec.decode(output_types, return_data)
+            except Exception:
+                continue
+            return contract_type
         return ContractType.GENERIC_TOKEN_HOLDER
     
-    def _try_call(self, w3: Web3, address: str, method: str, abi: list) -> bool:
-        """Try to call a method on a contract. Returns True if successful."""
-        try:
-            contract = w3.eth.contract(address=address, abi=abi)
-            func = getattr(contract.functions, method)
-            func().call()
-            return True
-        except Exception:
-            return False
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "cached_types": len(self.type_cache)}
     
     # =========================================================================
     # MAIN SCAN METHOD
@@ -275,10 +275,15 @@ class APIMetricsTracker:
                         error_count=m.error_count,
                         avg_response_ms=m.avg_response_time_ms,
                         min_response_ms=m.min_response_time_ms,
-                        max_response_ms=m.max_response_time_ms
+                        max_response_ms=m.max_response_time_ms,
+                        defer=True
                     )
                     saved_count += 1
             
+            # All services go out as one bulk upsert
+            from infrastructure.write_behind import write_behind
+            await write_behind.flush()
+            
             logger.info(f"[APIMetrics] Persisted {saved_count} services to daily metrics")
             return True
         except Exception as e:
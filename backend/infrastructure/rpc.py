@@ -2,10 +2,28 @@
 """
 Centralized RPC configuration for Techne Finance.
 Uses Alchemy as primary RPC for Base chain.
+
+Non-blocking reads: web3.py contract `.call()` is synchronous, so inside
+`async def` code it stalls the event loop for the whole round-trip.
+Use `await call_async(contract.functions.x())` / `await run_rpc(fn)` instead -
+calls run on a dedicated thread pool and share one pooled HTTP session
+(keep-alive, no TCP/TLS handshake per call).
 """
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
-from typing import Optional
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Threads for blocking RPC calls (also the per-host connection pool size)
+RPC_MAX_WORKERS = int(os.getenv("RPC_MAX_WORKERS", "32"))
+
+_rpc_executor: Optional[ThreadPoolExecutor] = None
+_http_session: Optional[requests.Session] = None
 
 
 def get_rpc_url() -> str:
@@ -13,10 +31,42 @@ def get_rpc_url() -> str:
     return os.getenv("ALCHEMY_RPC_URL") or os.getenv("BASE_RPC_URL") or "https://mainnet.base.org"
 
 
-def get_web3(rpc_url: Optional[str] = None) -> Web3:
-    """Get a Web3 instance connected to Base mainnet."""
+def get_http_session() -> requests.Session:
+    """Shared keep-alive session for all HTTPProviders (sized to the RPC thread pool)."""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=RPC_MAX_WORKERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _http_session = session
+    return _http_session
+
+
+def get_web3(rpc_url: Optional[str] = None, timeout: Optional[float] = None) -> Web3:
+    """Get a Web3 instance connected to Base mainnet (pooled HTTP session)."""
     url = rpc_url or get_rpc_url()
-    return Web3(Web3.HTTPProvider(url))
+    request_kwargs = {"timeout": timeout} if timeout else None
+    return Web3(Web3.HTTPProvider(url, request_kwargs=request_kwargs, session=get_http_session()))
+
+
+def get_rpc_executor() -> ThreadPoolExecutor:
+    """Dedicated pool so slow RPC calls don't starve the default executor."""
+    global _rpc_executor
+    if _rpc_executor is None:
+        _rpc_executor = ThreadPoolExecutor(max_workers=RPC_MAX_WORKERS, thread_name_prefix="rpc")
+    return _rpc_executor
+
+
+async def run_rpc(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking web3 call on the RPC thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_rpc_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def call_async(contract_function, **kwargs) -> Any:
+    """`await call_async(c.functions.x(args))` == `c.functions.x(args).call()` without blocking the loop."""
+    return await run_rpc(contract_function.call, **kwargs)
 
 
 # Pre-configured instance for quick imports
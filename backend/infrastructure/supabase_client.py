@@ -14,6 +14,13 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 class SupabaseClient:
     """
@@ -35,6 +42,18 @@ class SupabaseClient:
         self.key = os.getenv("SUPABASE_KEY", "")
         self._initialized = bool(self.url and self.key)
         
+        # Shared connection pool - one client per process, closed on app shutdown
+        self._client: Optional[httpx.AsyncClient] = None
+        self._max_connections = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+        self._max_keepalive = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+        self._pool_stats = {
+            "requests": 0,
+            "pool_hits": 0,        # Requests served on an already-open connection
+            "tcp_connects": 0,     # New TCP connections opened
+            "tls_handshakes": 0,   # TLS handshakes performed
+            "clients_created": 0,
+        }
+        
         if self._initialized:
             logger.info(f"[Supabase] Configured for {self.url[:40]}...")
         else:
@@ -44,6 +63,61 @@ class SupabaseClient:
     def is_available(self) -> bool:
         return self._initialized
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared AsyncClient, creating it on first use.
+        
+        Keep-alive connections are reused across all calls, so only the first
+        request (or one after an idle timeout) pays the TCP + TLS handshake.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_keepalive,
+                    keepalive_expiry=60.0
+                ),
+                event_hooks={"request": [self._on_request]}
+            )
+            self._pool_stats["clients_created"] += 1
+            logger.info(f"[Supabase] HTTP pool created (http2={HTTP2_AVAILABLE}, max={self._max_connections})")
+        return self._client
+    
+    async def _on_request(self, request: httpx.Request):
+        """Attach an httpcore trace to count new connections vs. pool reuse"""
+        self._pool_stats["requests"] += 1
+        state = {"connected": False}
+        
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                state["connected"] = True
+                self._pool_stats["tcp_connects"] += 1
+            elif event_name == "connection.start_tls.complete":
+                self._pool_stats["tls_handshakes"] += 1
+            elif event_name.endswith("send_request_headers.started") and not state["connected"]:
+                self._pool_stats["pool_hits"] += 1
+        
+        request.extensions["trace"] = trace
+    
+    def get_pool_stats(self) -> dict:
+        """Connection pool counters (pool hits vs. handshakes)"""
+        requests = self._pool_stats["requests"]
+        return {
+            **self._pool_stats,
+            "http2": HTTP2_AVAILABLE,
+            "open": self._client is not None and not self._client.is_closed,
+            "reuse_rate": f"{self._pool_stats['pool_hits'] / max(1, requests):.1%}",
+        }
+    
+    async def close(self):
+        """Close the shared HTTP client (call from app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("[Supabase] HTTP pool closed")
+        self._client = None
+    
     def _headers(self) -> dict:
         return {
             "apikey": self.key,
@@ -69,35 +143,84 @@ class SupabaseClient:
         url = f"{self.url}/rest/v1/{table}"
         start_time = time.time()
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                if method == "GET":
-                    resp = await client.get(url, headers=self._headers(), params=params)
-                elif method == "POST":
-                    resp = await client.post(url, headers=self._headers(), json=data)
-                elif method == "PATCH":
-                    resp = await client.patch(url, headers=self._headers(), json=data, params=params)
-                elif method == "DELETE":
-                    resp = await client.delete(url, headers=self._headers(), params=params)
-                else:
-                    return None
-                
-                response_time = time.time() - start_time
-                
-                if resp.status_code in [200, 201, 204]:
-                    api_metrics.record_call('supabase', f'{method} /{table}', 'success', response_time)
-                    return resp.json() if resp.text else []
-                else:
-                    api_metrics.record_call('supabase', f'{method} /{table}', 'error', response_time,
-                                           error_message=f"HTTP {resp.status_code}", status_code=resp.status_code)
-                    logger.error(f"[Supabase] {method} {table}: {resp.status_code}")
-                    return None
-                    
-            except Exception as e:
-                api_metrics.record_call('supabase', f'{method} /{table}', 'error', time.time() - start_time,
-                                       error_message=str(e)[:200])
-                logger.error(f"[Supabase] Request failed: {e}")
+        client = self._get_client()
+        try:
+            if method == "GET":
+                resp = await client.get(url, headers=self._headers(), params=params)
+            elif method == "POST":
+                resp = await client.post(url, headers=self._headers(), json=data)
+            elif method == "PATCH":
+                resp = await client.patch(url, headers=self._headers(), json=data, params=params)
+            elif method == "DELETE":
+                resp = await client.delete(url, headers=self._headers(), params=params)
+            else:
+                return None
+            
+            response_time = time.time() - start_time
+            
+            if resp.status_code in [200, 201, 204]:
+                api_metrics.record_call('supabase', f'{method} /{table}', 'success', response_time)
+                return resp.json() if resp.text else []
+            else:
+                api_metrics.record_call('supabase', f'{method} /{table}', 'error', response_time,
+                                       error_message=f"HTTP {resp.status_code}", status_code=resp.status_code)
+                logger.error(f"[Supabase] {method} {table}: {resp.status_code}")
                 return None
+                
+        except Exception as e:
+            api_metrics.record_call('supabase', f'{method} /{table}', 'error', time.time() - start_time,
+                                   error_message=str(e)[:200])
+            logger.error(f"[Supabase] Request failed: {e}")
+            return None
+    
+    async def bulk_upsert(
+        self,
+        table: str,
+        rows: List[dict],
+        on_conflict: str = None
+    ) -> Optional[int]:
+        """
+        Insert (or upsert when on_conflict is set) many rows in one request.
+        Returns the HTTP status code, or None on network error.
+        Used by the write-behind queue (infrastructure/write_behind.py).
+        """
+        import time
+        from infrastructure.api_metrics import api_metrics
+        
+        if not self.is_available or not rows:
+            return None
+        
+        headers = self._headers()
+        # missing=default: rows in one batch may not share all keys
+        prefer = ["return=minimal", "missing=default"]
+        if on_conflict:
+            prefer.append("resolution=merge-duplicates")
+        headers["Prefer"] = ",".join(prefer)
+        
+        params = {"columns": ",".join(sorted({k for r in rows for k in r.keys()}))}
+        if on_conflict:
+            params["on_conflict"] = on_conflict
+        
+        start_time = time.time()
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                f"{self.url}/rest/v1/{table}",
+                headers=headers,
+                json=rows,
+                params=params
+            )
+            status = 'success' if resp.status_code in [200, 201, 204] else 'error'
+            api_metrics.record_call('supabase', f'BULK /{table}', status, time.time() - start_time,
+                                   status_code=resp.status_code)
+            if status == 'error':
+                logger.error(f"[Supabase] Bulk {table} ({len(rows)} rows): {resp.status_code} - {resp.text[:200]}")
+            return resp.status_code
+        except Exception as e:
+            api_metrics.record_call('supabase', f'BULK /{table}', 'error', time.time() - start_time,
+                                   error_message=str(e)[:200])
+            logger.error(f"[Supabase] Bulk {table} failed: {e}")
+            return None
     
     # ==========================================
     # POSITIONS (legacy table)
@@ -127,20 +250,21 @@ class SupabaseClient:
         headers = self._headers()
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/positions",
-                    headers=headers,
-                    json=data
-                )
-                if resp.status_code in [200, 201]:
-                    logger.info(f"[Supabase] Position saved: {user_address[:10]}... @ {protocol}")
-                    return resp.json()[0] if resp.text else data
-                return None
-            except Exception as e:
-                logger.error(f"[Supabase] Save position failed: {e}")
-                return None
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                f"{self.url}/rest/v1/positions",
+                headers=headers,
+                json=data,
+                timeout=30.0
+            )
+            if resp.status_code in [200, 201]:
+                logger.info(f"[Supabase] Position saved: {user_address[:10]}... @ {protocol}")
+                return resp.json()[0] if resp.text else data
+            return None
+        except Exception as e:
+            logger.error(f"[Supabase] Save position failed: {e}")
+            return None
     
     async def get_positions(self, user_address: str) -> List[dict]:
         """Get all positions for a user"""
@@ -199,23 +323,24 @@ class SupabaseClient:
         headers = self._headers()
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/user_positions",
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "user_address,protocol"}
-                )
-                if resp.status_code in [200, 201]:
-                    logger.info(f"[Supabase] User position saved: {user_address[:10]}... @ {protocol}")
-                    return resp.json()[0] if resp.text else data
-                else:
-                    logger.error(f"[Supabase] Save user position failed: {resp.status_code} - {resp.text}")
-                return None
-            except Exception as e:
-                logger.error(f"[Supabase] Save user position error: {e}")
-                return None
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                f"{self.url}/rest/v1/user_positions",
+                headers=headers,
+                json=data,
+                params={"on_conflict": "user_address,protocol"},
+                timeout=30.0
+            )
+            if resp.status_code in [200, 201]:
+                logger.info(f"[Supabase] User position saved: {user_address[:10]}... @ {protocol}")
+                return resp.json()[0] if resp.text else data
+            else:
+                logger.error(f"[Supabase] Save user position failed: {resp.status_code} - {resp.text}")
+            return None
+        except Exception as e:
+            logger.error(f"[Supabase] Save user position error: {e}")
+            return None
     
     async def get_user_positions(self, user_address: str) -> List[dict]:
         """Get all active positions for a user from user_positions table - FAST"""
@@ -301,9 +426,10 @@ class SupabaseClient:
         action_type: str,
         tx_hash: Optional[str],
         details: dict,
-        status: str = "completed"
+        status: str = "completed",
+        defer: bool = False
     ) -> Optional[dict]:
-        """Log a transaction to audit trail"""
+        """Log a transaction to audit trail (defer=True batches it via the write-behind queue)"""
         data = {
             "user_address": user_address.lower(),
             "action_type": action_type,
@@ -312,6 +438,10 @@ class SupabaseClient:
             "status": status,
             "created_at": datetime.utcnow().isoformat()
         }
+        if defer and self.is_available:
+            from infrastructure.write_behind import write_behind
+            write_behind.put_nowait("transactions", data)
+            return data
         result = await self._request("POST", "transactions", data=data)
         return result[0] if result else None
     
@@ -394,16 +524,17 @@ class SupabaseClient:
         headers = self._headers()
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/leverage_positions",
-                    headers=headers,
-                    json=data
-                )
-                return resp.json()[0] if resp.status_code in [200, 201] else None
-            except:
-                return None
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                f"{self.url}/rest/v1/leverage_positions",
+                headers=headers,
+                json=data,
+                timeout=30.0
+            )
+            return resp.json()[0] if resp.status_code in [200, 201] else None
+        except:
+            return None
     
     async def get_leverage_positions(self, user_address: str) -> List[dict]:
         """Get leverage positions for user"""
@@ -428,16 +559,17 @@ class SupabaseClient:
         headers = self._headers()
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/agent_configs",
-                    headers=headers,
-                    json=data
-                )
-                return resp.json()[0] if resp.status_code in [200, 201] else None
-            except:
-                return None
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                f"{self.url}/rest/v1/agent_configs",
+                headers=headers,
+                json=data,
+                timeout=30.0
+            )
+            return resp.json()[0] if resp.status_code in [200, 201] else None
+        except:
+            return None
     
     async def get_agent_config(self, user_address: str) -> Optional[dict]:
         """Get agent configuration"""
@@ -480,11 +612,13 @@ class SupabaseClient:
         user_address: str,
         holdings: list,
         positions: list,
-        total_value_usd: float
+        total_value_usd: float,
+        defer: bool = False
     ) -> bool:
         """
         Save/update cached portfolio balances.
         Called by background job every 10 min.
+        With defer=True the row is queued and upserted in bulk by the write-behind queue.
         """
         if not self.is_available:
             return False
@@ -499,6 +633,11 @@ class SupabaseClient:
                 "fetched_at": datetime.utcnow().isoformat()
             }
             
+            if defer:
+                from infrastructure.write_behind import write_behind
+                await write_behind.put("agent_balances", data, on_conflict="agent_address")
+                return True
+            
             # Upsert on agent_address
             result = await self._request(
                 "POST", "agent_balances",
@@ -702,12 +841,14 @@ class SupabaseClient:
         error_count: int,
         avg_response_ms: float,
         min_response_ms: float = 0,
-        max_response_ms: float = 0
+        max_response_ms: float = 0,
+        defer: bool = False
     ) -> bool:
         """
         Upsert daily API metrics for a service.
         Called periodically to persist aggregates.
         Data is keyed by (date, service) - resets each day automatically.
+        With defer=True the row is queued for a bulk upsert instead of sent now.
         """
         if not self.is_available:
             return False
@@ -726,19 +867,25 @@ class SupabaseClient:
             "updated_at": datetime.utcnow().isoformat()
         }
         
+        if defer:
+            from infrastructure.write_behind import write_behind
+            await write_behind.put("api_metrics_daily", data, on_conflict="date,service")
+            return True
+        
         # Upsert by (date, service)
         headers = self._headers()
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/api_metrics_daily",
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "date,service"}
-                )
-                return resp.status_code in [200, 201]
+            client = self._get_client()
+            resp = await client.post(
+                f"{self.url}/rest/v1/api_metrics_daily",
+                headers=headers,
+                json=data,
+                params={"on_conflict": "date,service"},
+                timeout=10.0
+            )
+            return resp.status_code in [200, 201]
         except Exception:
             return False
     
@@ -834,17 +981,18 @@ class SupabaseClient:
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/smart_accounts",
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "user_address"}
-                )
-                if resp.status_code in [200, 201]:
-                    logger.info(f"[Supabase] Smart Account saved: {user_address[:10]}... -> {smart_account_address[:10]}...")
-                    return resp.json()[0] if resp.text else data
-                return None
+            client = self._get_client()
+            resp = await client.post(
+                f"{self.url}/rest/v1/smart_accounts",
+                headers=headers,
+                json=data,
+                params={"on_conflict": "user_address"},
+                timeout=10.0
+            )
+            if resp.status_code in [200, 201]:
+                logger.info(f"[Supabase] Smart Account saved: {user_address[:10]}... -> {smart_account_address[:10]}...")
+                return resp.json()[0] if resp.text else data
+            return None
         except Exception as e:
             logger.error(f"[Supabase] Save Smart Account failed: {e}")
             return None
@@ -923,20 +1071,21 @@ class SupabaseClient:
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/user_agents",
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "agent_address"}
-                )
-                if resp.status_code in [200, 201]:
-                    logger.info(f"[Supabase] Agent saved: {agent_address[:10]}... for {user_address[:10]}...")
-                    result = resp.json()
-                    return result[0] if result else data
-                else:
-                    logger.error(f"[Supabase] Save agent failed: {resp.status_code} - {resp.text[:200]}")
-                return None
+            client = self._get_client()
+            resp = await client.post(
+                f"{self.url}/rest/v1/user_agents",
+                headers=headers,
+                json=data,
+                params={"on_conflict": "agent_address"},
+                timeout=15.0
+            )
+            if resp.status_code in [200, 201]:
+                logger.info(f"[Supabase] Agent saved: {agent_address[:10]}... for {user_address[:10]}...")
+                result = resp.json()
+                return result[0] if result else data
+            else:
+                logger.error(f"[Supabase] Save agent failed: {resp.status_code} - {resp.text[:200]}")
+            return None
         except Exception as e:
             logger.error(f"[Supabase] Save agent error: {e}")
             return None
@@ -1043,7 +1192,8 @@ class SupabaseClient:
         tx_hash: str = None,
         destination: str = None,
         pool_id: str = None,
-        metadata: dict = None
+        metadata: dict = None,
+        defer: bool = False
     ) -> Optional[dict]:
         """Log an agent transaction (deposit, withdraw, claim, etc)"""
         if not self.is_available:
@@ -1062,6 +1212,13 @@ class SupabaseClient:
             "metadata": json.dumps(metadata or {})
         }
         
+        if defer:
+            # Keep the event time - the row may reach Supabase a few seconds later
+            data["created_at"] = datetime.utcnow().isoformat()
+            from infrastructure.write_behind import write_behind
+            await write_behind.put("agent_transactions", data)
+            return data
+        
         result = await self._request("POST", "agent_transactions", data=data)
         if result:
             logger.info(f"[Supabase] Transaction logged: {tx_type} {amount} {token} for {agent_address[:10]}...")
@@ -1125,16 +1282,17 @@ class SupabaseClient:
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
         
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.post(
-                    f"{self.url}/rest/v1/agent_positions",
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "agent_address,protocol,pool_address"}
-                )
-                if resp.status_code in [200, 201]:
-                    logger.info(f"[Supabase] Position saved: {protocol} for {agent_address[:10]}...")
-                    return resp.json()[0] if resp.text else data
+            client = self._get_client()
+            resp = await client.post(
+                f"{self.url}/rest/v1/agent_positions",
+                headers=headers,
+                json=data,
+                params={"on_conflict": "agent_address,protocol,pool_address"},
+                timeout=15.0
+            )
+            if resp.status_code in [200, 201]:
+                logger.info(f"[Supabase] Position saved: {protocol} for {agent_address[:10]}...")
+                return resp.json()[0] if resp.text else data
             return None
         except Exception as e:
             logger.error(f"[Supabase] Save position failed: {e}")
@@ -0,0 +1,222 @@
+"""
+Async Transaction Manager
+Non-blocking transaction submission and receipt tracking for all signers
+
+WHY: Write paths called w3.eth.wait_for_transaction_receipt() inside async
+handlers - a synchronous polling loop that blocks the event loop for up to
+120s per transaction, so one agent's deposit froze every other request.
+
+DESIGN:
+- send(): nonce allocation, signing and send_raw_transaction under a
+  per-(chain, signer) lock; blocking RPC runs on the RPC thread pool
+- Nonces: max(local counter, chain "pending" count). Consecutive sends from
+  one signer pipeline (approve + supply go out back to back) without waiting
+  for receipts. A failed send - or a counter idle for NONCE_RESYNC_AFTER
+  seconds - resyncs from the chain
+- One receipt poller per RPC endpoint: on every new block it fetches the
+  receipts of all pending hashes concurrently and resolves their futures,
+  then exits once nothing is pending
+- wait_for_receipt() raises web3's TimeExhausted on timeout, like the sync call
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from .rpc import run_rpc
+
+logger = logging.getLogger(__name__)
+
+TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", "1.0"))    # Base produces a block every 2s
+NONCE_RESYNC_AFTER = float(os.getenv("TX_NONCE_RESYNC_AFTER", "60"))
+DEFAULT_RECEIPT_TIMEOUT = 120
+
+Signer = Union[str, LocalAccount]
+
+
+def _endpoint_key(w3) -> str:
+    return getattr(w3.provider, "endpoint_uri", None) or f"w3-{id(w3)}"
+
+
+def _hash_key(tx_hash) -> str:
+    value = tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+class ReceiptPoller:
+    """Block-driven receipt lookups for every pending hash on one RPC endpoint."""
+
+    def __init__(self, w3, poll_interval: float, stats: Dict):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self._stats = stats
+
+        self.pending: Dict[str, Tuple[asyncio.Future, Any]] = {}  # hash -> (future, hash as sent)
+        self._waiters: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_block: Optional[int] = None
+
+    def watch(self, tx_hash) -> asyncio.Future:
+        key = _hash_key(tx_hash)
+        if key not in self.pending:
+            self.pending[key] = (asyncio.get_running_loop().create_future(), tx_hash)
+            self._waiters[key] = 0
+        self._waiters[key] += 1
+
+        if self._task is None or self._task.done():
+            self._last_block = None
+            self._task = asyncio.create_task(self._run())
+        return self.pending[key][0]
+
+    def release(self, tx_hash):
+        """A waiter gave up (timeout/cancel) - stop polling once nobody waits."""
+        key = _hash_key(tx_hash)
+        if key in self._waiters:
+            self._waiters[key] -= 1
+            if self._waiters[key] <= 0:
+                self.pending.pop(key, None)
+                self._waiters.pop(key, None)
+
+    async def _run(self):
+        while self.pending:
+            try:
+                block = await run_rpc(lambda: self.w3.eth.block_number)
+                if block != self._last_block:
+                    self._last_block = block
+                    await self._check_pending()
+            except Exception as e:
+                logger.warning(f"Receipt poll failed: {e}")
+            if self.pending:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _check_pending(self):
+        entries = [(key, sent_hash) for key, (_, sent_hash) in self.pending.items()]
+        self._stats["receipt_lookups"] += len(entries)
+        results = await asyncio.gather(
+            *(run_rpc(self.w3.eth.get_transaction_receipt, sent_hash) for _, sent_hash in entries),
+            return_exceptions=True
+        )
+
+        for (key, _), result in zip(entries, results):
+            if result is None or isinstance(result, TransactionNotFound):
+                continue  # Not mined yet
+            if isinstance(result, Exception):
+                logger.debug(f"Receipt lookup for {key} failed: {result}")
+                continue
+            entry = self.pending.pop(key, None)
+            self._waiters.pop(key, None)
+            if entry and not entry[0].done():
+                entry[0].set_result(result)
+                self._stats["confirmed"] += 1
+
+
+class TransactionManager:
+    """
+    Shared async transaction sender + receipt tracker.
+
+    USAGE:
+        tx_hash = await tx_manager.send(w3, tx, private_key)       # nonce filled in
+        receipt = await tx_manager.wait_for_receipt(w3, tx_hash, timeout=120)
+        tx_hash, receipt = await tx_manager.send_and_wait(w3, tx, account)
+    """
+
+    def __init__(self, poll_interval: float = TX_POLL_INTERVAL, nonce_resync_after: float = NONCE_RESYNC_AFTER):
+        self.poll_interval = poll_interval
+        self.nonce_resync_after = nonce_resync_after
+
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        self._next_nonce: Dict[Tuple[int, str], Tuple[int, float]] = {}  # -> (nonce, last used)
+        self._chain_ids: Dict[str, int] = {}
+        self._pollers: Dict[str, ReceiptPoller] = {}
+
+        self._stats = {
+            "sent": 0, "send_errors": 0, "nonce_resyncs": 0,
+            "confirmed": 0, "timeouts": 0, "receipt_lookups": 0
+        }
+
+    # ==========================================
+    # SUBMISSION
+    # ==========================================
+
+    async def _chain_id(self, w3) -> int:
+        key = _endpoint_key(w3)
+        if key not in self._chain_ids:
+            self._chain_ids[key] = await run_rpc(lambda: w3.eth.chain_id)
+        return self._chain_ids[key]
+
+    async def send(self, w3, tx: Dict, signer: Signer) -> Any:
+        """Assign the signer's next nonce, sign and broadcast. Returns the tx hash."""
+        account = Account.from_key(signer) if isinstance(signer, str) else signer
+        tx = dict(tx)
+        chain_id = tx.get("chainId") or await self._chain_id(w3)
+        key = (chain_id, account.address.lower())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            chain_nonce = await run_rpc(w3.eth.get_transaction_count, account.address, "pending")
+            local_nonce, last_used = self._next_nonce.get(key, (0, 0.0))
+            if local_nonce > chain_nonce and time.time() - last_used > self.nonce_resync_after:
+                # Nothing sent for a while and the chain disagrees - a tx was dropped
+                local_nonce = chain_nonce
+                self._stats["nonce_resyncs"] += 1
+            tx["nonce"] = max(chain_nonce, local_nonce)
+
+            signed = account.sign_transaction(tx)
+            try:
+                tx_hash = await run_rpc(w3.eth.send_raw_transaction, signed.raw_transaction)
+            except Exception:
+                # Unknown whether the nonce was consumed - trust the chain next time
+                self._next_nonce.pop(key, None)
+                self._stats["send_errors"] += 1
+                raise
+            self._next_nonce[key] = (tx["nonce"] + 1, time.time())
+
+        self._stats["sent"] += 1
+        return tx_hash
+
+    # ==========================================
+    # RECEIPTS
+    # ==========================================
+
+    def _poller(self, w3) -> ReceiptPoller:
+        key = _endpoint_key(w3)
+        if key not in self._pollers:
+            self._pollers[key] = ReceiptPoller(w3, self.poll_interval, self._stats)
+        return self._pollers[key]
+
+    async def wait_for_receipt(self, w3, tx_hash, timeout: float = DEFAULT_RECEIPT_TIMEOUT) -> Any:
+        """Await the receipt without blocking the event loop (TimeExhausted on timeout)."""
+        poller = self._poller(w3)
+        future = poller.watch(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise TimeExhausted(f"Transaction {_hash_key(tx_hash)} is not in the chain after {timeout} seconds")
+        finally:
+            if not future.done():
+                poller.release(tx_hash)
+
+    async def send_and_wait(self, w3, tx: Dict, signer: Signer,
+                            timeout: float = DEFAULT_RECEIPT_TIMEOUT) -> Tuple[Any, Any]:
+        tx_hash = await self.send(w3, tx, signer)
+        return tx_hash, await self.wait_for_receipt(w3, tx_hash, timeout)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "pending": sum(len(p.pending) for p in self._pollers.values()),
+            "endpoints": len(self._pollers),
+            "signers": len(self._next_nonce),
+        }
+
+
+# Global transaction manager instance
+tx_manager = TransactionManager()
@@ -0,0 +1,318 @@
+"""
+Write-Behind Queue - Batched Supabase persistence
+
+WHY: Balance refreshes, audit logs and metrics send one REST request per row.
+A refresh of 500 agents = 500 round-trips to Supabase.
+SOLUTION: Buffer rows per table and flush them as one bulk PostgREST insert/upsert.
+
+DESIGN:
+- One buffer per (table, on_conflict); flushed when batch_size rows are waiting
+  or the oldest row is older than flush_interval
+- Upsert buffers are keyed by the conflict columns (last write wins), because
+  Postgres rejects a batch that touches the same conflict key twice
+- Backpressure: put() waits while max_pending rows are buffered; put_nowait()
+  (for sync callers) spills to disk instead of growing memory
+- Retries with exponential backoff on network errors / 5xx / 429
+- Durable spill file (JSONL): rows that cannot be delivered are appended there
+  and replayed into the buffers on next start, so they survive a restart
+- 4xx responses are not retryable - rows go to a dead-letter file for inspection
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data" / "write_behind"
+
+
+@dataclass
+class TableBuffer:
+    """
+    Pending rows for one (table, on_conflict) target.
+    WHY dict for upserts: duplicate conflict keys inside one batch make Postgres fail.
+    """
+    table: str
+    on_conflict: Optional[str]
+    rows: Dict[Any, dict] = field(default_factory=dict)
+    oldest_at: float = 0.0
+    _seq: int = 0
+
+    def add(self, row: dict):
+        if not self.rows:
+            self.oldest_at = time.time()
+        if self.on_conflict:
+            key = tuple(row.get(col.strip()) for col in self.on_conflict.split(","))
+        else:
+            self._seq += 1
+            key = self._seq
+        self.rows[key] = row
+
+    def drain(self, limit: int) -> List[dict]:
+        keys = list(self.rows.keys())[:limit]
+        batch = [self.rows.pop(k) for k in keys]
+        self.oldest_at = time.time() if self.rows else 0.0
+        return batch
+
+
+class WriteBehindQueue:
+    """
+    Collects Supabase writes and flushes them in bulk.
+
+    USAGE:
+        await write_behind.put("agent_balances", row, on_conflict="agent_address")
+        write_behind.put_nowait("transactions", row)   # from sync code
+        await write_behind.flush()                      # e.g. end of a refresh cycle
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_pending: int = 10_000,
+        max_retries: int = 4,
+        retry_delay: float = 0.5,
+        data_dir: Path = None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.data_dir = Path(data_dir or os.getenv("WRITE_BEHIND_DIR", DEFAULT_DATA_DIR))
+        self.spill_file = self.data_dir / "spill.jsonl"
+        self.dead_letter_file = self.data_dir / "dead_letter.jsonl"
+
+        self._buffers: Dict[Tuple[str, Optional[str]], TableBuffer] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._space: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Statistics
+        self._stats = {
+            "enqueued": 0,
+            "flushed_rows": 0,
+            "flush_requests": 0,   # Bulk HTTP requests sent
+            "retries": 0,
+            "spilled_rows": 0,
+            "replayed_rows": 0,
+            "dead_letter_rows": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        return sum(len(b.rows) for b in self._buffers.values())
+
+    def _add(self, table: str, row: dict, on_conflict: Optional[str]):
+        key = (table, on_conflict)
+        if key not in self._buffers:
+            self._buffers[key] = TableBuffer(table=table, on_conflict=on_conflict)
+        self._buffers[key].add(row)
+        self._stats["enqueued"] += 1
+
+    async def put(self, table: str, row: dict, on_conflict: str = None):
+        """Queue a row, waiting (backpressure) while the queue is full."""
+        if self._space is None:
+            self._space = asyncio.Condition()
+
+        if self.pending >= self.max_pending:
+            # Make room ourselves if no background flusher is running
+            if not self._running:
+                await self.flush()
+            async with self._space:
+                await self._space.wait_for(lambda: self.pending < self.max_pending)
+
+        self._add(table, row, on_conflict)
+        self._ensure_started()
+
+    def put_nowait(self, table: str, row: dict, on_conflict: str = None):
+        """Queue a row from sync code. Spills to disk instead of blocking when full."""
+        if self.pending >= self.max_pending:
+            self._spill([(table, on_conflict, row)])
+            return
+        self._add(table, row, on_conflict)
+        self._ensure_started()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        """Start the background flusher lazily on first write inside a running loop."""
+        if self._running:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.start()
+
+    def start(self):
+        """Start the background flusher and replay rows spilled by a previous run."""
+        if self._running:
+            return
+        self._running = True
+        self._replay_spill()
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"[WriteBehind] Started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self):
+        """Stop the flusher and drain everything; undeliverable rows are spilled."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info(f"[WriteBehind] Stopped ({self.pending} rows left pending)")
+
+    async def _flush_loop(self):
+        while self._running:
+            await asyncio.sleep(min(self.flush_interval, 0.5))
+            try:
+                await self.flush(only_due=True)
+            except Exception as e:
+                logger.error(f"[WriteBehind] Flush loop error: {e}")
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def _is_due(self, buf: TableBuffer) -> bool:
+        if len(buf.rows) >= self.batch_size:
+            return True
+        return bool(buf.rows) and time.time() - buf.oldest_at >= self.flush_interval
+
+    async def flush(self, only_due: bool = False) -> int:
+        """Flush buffered rows. Returns number of rows delivered."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        delivered = 0
+        async with self._flush_lock:
+            for buf in list(self._buffers.values()):
+                if only_due and not self._is_due(buf):
+                    continue
+                while buf.rows:
+                    batch = buf.drain(self.batch_size)
+                    delivered += await self._send(buf.table, buf.on_conflict, batch)
+                    if only_due and not self._is_due(buf):
+                        break
+
+        if self._space is not None:
+            async with self._space:
+                self._space.notify_all()
+        return delivered
+
+    async def _send(self, table: str, on_conflict: Optional[str], rows: List[dict]) -> int:
+        """Send one bulk request with retries. Returns rows delivered."""
+        from infrastructure.supabase_client import supabase
+
+        if not supabase.is_available:
+            self._spill([(table, on_conflict, r) for r in rows])
+            return 0
+
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            status = await supabase.bulk_upsert(table, rows, on_conflict=on_conflict)
+            self._stats["flush_requests"] += 1
+
+            if status in (200, 201, 204):
+                self._stats["flushed_rows"] += len(rows)
+                return len(rows)
+
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable:
+                logger.error(f"[WriteBehind] {table}: HTTP {status} - {len(rows)} rows to dead letter")
+                self._write_jsonl(self.dead_letter_file, [(table, on_conflict, r) for r in rows])
+                self._stats["dead_letter_rows"] += len(rows)
+                return 0
+
+            if attempt < self.max_retries:
+                self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        logger.warning(f"[WriteBehind] {table}: giving up after {self.max_retries} retries - spilling {len(rows)} rows")
+        self._spill([(table, on_conflict, r) for r in rows])
+        return 0
+
+    # ------------------------------------------------------------------
+    # Durable spill
+    # ------------------------------------------------------------------
+
+    def _write_jsonl(self, path: Path, items: List[Tuple[str, Optional[str], dict]]):
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as f:
+                for table, on_conflict, row in items:
+                    f.write(json.dumps({"table": table, "on_conflict": on_conflict, "row": row}, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logger.error(f"[WriteBehind] Could not write {path.name}: {e}")
+
+    def _spill(self, items: List[Tuple[str, Optional[str], dict]]):
+        self._write_jsonl(self.spill_file, items)
+        self._stats["spilled_rows"] += len(items)
+
+    def _replay_spill(self):
+        """Load spilled rows back into the buffers (the file is consumed)."""
+        replay_file = self.spill_file.with_suffix(".replay")
+        if not self.spill_file.exists() and not replay_file.exists():
+            return
+        try:
+            # A leftover .replay file means the previous replay was interrupted
+            if self.spill_file.exists():
+                if replay_file.exists():
+                    with open(replay_file, "a") as dst, open(self.spill_file) as src:
+                        dst.write(src.read())
+                    self.spill_file.unlink()
+                else:
+                    self.spill_file.replace(replay_file)
+            count = 0
+            with open(replay_file) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._add(item["table"], item["row"], item.get("on_conflict"))
+                    count += 1
+            replay_file.unlink()
+            self._stats["replayed_rows"] += count
+            if count:
+                logger.info(f"[WriteBehind] Replayed {count} spilled rows")
+        except Exception as e:
+            logger.error(f"[WriteBehind] Spill replay failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get queue statistics."""
+        return {
+            **self._stats,
+            "pending": self.pending,
+            "tables": sorted({t for t, _ in self._buffers.keys()}),
+            "rows_per_request": round(self._stats["flushed_rows"] / max(1, self._stats["flush_requests"]), 1),
+        }
+
+
+# Global queue instance
+write_behind = WriteBehindQueue()
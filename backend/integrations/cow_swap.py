@@ -352,6 +352,8 @@ class CowSwapClient:
         try:
             from web3 import Web3
             from eth_account import Account
+            from infrastructure.rpc import run_rpc
+            from infrastructure.tx_manager import tx_manager
             
             COW_VAULT_RELAYER = "0xC92E8bdf79f0507f65a392b0ab4667716BFE0110"
             RPC_URL = os.environ.get("BASE_RPC_URL", "https://mainnet.base.org")
@@ -368,24 +370,21 @@ class CowSwapClient:
             amount_padded = hex(max_uint256)[2:].zfill(64)
             approve_data = approve_selector + spender_padded + amount_padded
             
-            nonce = w3.eth.get_transaction_count(from_address, 'latest')
-            
+            gas_price = await run_rpc(lambda: w3.eth.gas_price)
             approve_tx = {
                 'to': Web3.to_checksum_address(sell_token),
                 'data': approve_data,
                 'from': from_address,
-                'nonce': nonce,
                 'gas': 60000,
-                'gasPrice': int(w3.eth.gas_price * 1.5),
+                'gasPrice': int(gas_price * 1.5),
                 'chainId': 8453
             }
             
-            signed_approve = account.sign_transaction(approve_tx)
-            approve_hash = w3.eth.send_raw_transaction(signed_approve.raw_transaction)
+            approve_hash = await tx_manager.send(w3, approve_tx, account)
             print(f"[CowSwap] Approve TX sent: {approve_hash.hex()}")
             
-            # Wait for approval
-            receipt = w3.eth.wait_for_transaction_receipt(approve_hash, timeout=60)
+            # Wait for approval without blocking the event loop
+            receipt = await tx_manager.wait_for_receipt(w3, approve_hash, timeout=60)
             if receipt.status != 1:
                 print(f"[CowSwap] ❌ Approve TX failed")
                 return None
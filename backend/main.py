@@ -11,6 +11,7 @@ from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
 from typing import Optional, List
 import os
+import sys
 
 # Initialize Sentry FIRST (before any other imports that could fail)
 try:
@@ -22,7 +23,8 @@ except ImportError as e:
 
 
 from artisan import get_top_yields, fetch_yields, filter_yields
-from artisan.data_sources import get_aggregated_pools, fetch_geckoterminal_pools, format_gecko_pool, SUPPORTED_CHAINS
+from data_sources.pool_table import PoolTable, TAG_ETH, TAG_SOL
+from artisan.data_sources import get_aggregated_pools, get_multi_chain_pools, fetch_geckoterminal_pools, format_gecko_pool, SUPPORTED_CHAINS
 from artisan.scout_agent import get_scout_pools, TOP_PROTOCOLS
 from artisan.guardian_agent import analyze_pool_risk, get_quick_risk
 from artisan.airdrop_agent import get_airdrop_opportunities, get_pool_airdrop_info
@@ -280,6 +282,14 @@ async def startup_event():
             except Exception as e:
                 print(f"[Metrics] Persistence error: {e}")
     
+    # Start write-behind queue (batched Supabase writes, replays spilled rows)
+    try:
+        from infrastructure.write_behind import write_behind
+        write_behind.start()
+        print("[Startup] ✅ Write-behind queue started (bulk Supabase writes)")
+    except Exception as e:
+        print(f"[Startup] Write-behind queue failed: {e}")
+    
     asyncio.create_task(metrics_persistence_loop())
     print("[Startup] ✅ API Metrics persistence started (every 5 min → Supabase)")
     
@@ -292,6 +302,41 @@ async def startup_event():
         print(f"[Startup] Balance refresh job failed: {e}")
 
 
+# Shutdown event - release pooled connections
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain queued writes, then close shared HTTP clients"""
+    try:
+        from services.portfolio_stream import portfolio_stream
+        await portfolio_stream.stop()
+    except Exception as e:
+        print(f"[Shutdown] Portfolio stream stop failed: {e}")
+    
+    try:
+        from infrastructure.write_behind import write_behind
+        await write_behind.stop()
+    except Exception as e:
+        print(f"[Shutdown] Write-behind drain failed: {e}")
+    
+    try:
+        if "agents.memory_engine" in sys.modules:
+            await sys.modules["agents.memory_engine"].memory_engine.close()
+    except Exception as e:
+        print(f"[Shutdown] Memory engine close failed: {e}")
+    
+    try:
+        if "agents.observability_engine" in sys.modules:
+            sys.modules["agents.observability_engine"].observability.close()
+    except Exception as e:
+        print(f"[Shutdown] Observability flush failed: {e}")
+    
+    try:
+        from infrastructure.supabase_client import supabase
+        await supabase.close()
+    except Exception as e:
+        print(f"[Shutdown] Supabase client close failed: {e}")
+
+
 # Include agent wallet routes
 if AGENT_WALLET_AVAILABLE:
     app.include_router(agent_wallet_router)
@@ -836,45 +881,31 @@ async def get_pools(
         if protocols and protocols.strip():
             protocol_list = [p.strip().lower() for p in protocols.split(",") if p.strip()]
 
-        for c in chains:
-            result = await get_aggregated_pools(
-                chain=c,
-                min_tvl=min_tvl,
-                min_apy=min_apy,
-                stablecoin_only=stablecoin_only or asset_type == "stablecoin",
-                pool_type=pool_type,
-                limit=per_chain_limit,
-                blur=False,
-                protocol_filter=protocol_list
-            )
-            all_pools.extend(result["combined"])
-            sources_used.update(result["sources_used"])
+        # All chains in parallel; a slow source degrades the result instead of stalling it
+        result = await get_multi_chain_pools(
+            chains,
+            min_tvl=min_tvl,
+            min_apy=min_apy,
+            stablecoin_only=stablecoin_only or asset_type == "stablecoin",
+            pool_type=pool_type,
+            limit=per_chain_limit,
+            blur=False,
+            protocol_filter=protocol_list
+        )
+        all_pools.extend(result["combined"])
+        sources_used.update(result["sources_used"])
 
         
-        # Filter by asset type
-        if asset_type == "eth":
-            all_pools = [p for p in all_pools if is_eth_pool(p)]
-        elif asset_type == "sol":
-            all_pools = [p for p in all_pools if is_sol_pool(p)]
-        elif asset_type == "stablecoin":
-            all_pools = [p for p in all_pools if p.get("stablecoin", False)]
-        
-        # Filter by max APY (remove pools above the threshold)
-        if max_apy and max_apy < 10000:
-            all_pools = [p for p in all_pools if p.get("apy", 0) <= max_apy]
-        
-        # Filter by protocols (comma-separated list)
-        if protocols and protocols.strip():
-            protocol_list = [p.strip().lower() for p in protocols.split(",") if p.strip()]
-            if protocol_list:
-                all_pools = [
-                    pool for pool in all_pools
-                    if any(proto in (pool.get("project", "") or "").lower() for proto in protocol_list)
-                ]
-        
-        # Sort by APY and limit to requested amount
-        all_pools.sort(key=lambda p: p.get("apy", 0), reverse=True)
-        all_pools = all_pools[:limit]
+        # Filter by asset type / max APY / protocols, then top-N by APY - vectorized
+        table = PoolTable.from_pools(all_pools)
+        mask = table.mask(
+            tags={"eth": TAG_ETH, "sol": TAG_SOL}.get(asset_type, 0),
+            stablecoin=True if asset_type == "stablecoin" else None,
+            # Filter by max APY (remove pools above the threshold)
+            max_apy=max_apy if max_apy and max_apy < 10000 else None,
+            projects=protocol_list
+        )
+        all_pools = table.rows(table.top_k(limit, mask, by="apy"))
         
         # Add risk scores to each pool (lightweight scoring without full analysis)
         try:
@@ -915,6 +946,7 @@ async def get_pools(
             "asset_type": asset_type,
             "chains": chains,
             "sources": list(sources_used),
+            "degraded": result["degraded"],
             "combined": all_pools
         }
 
@@ -924,19 +956,6 @@ async def get_pools(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def is_eth_pool(pool):
-    """Check if pool is ETH-related"""
-    symbol = (pool.get("symbol") or "").upper()
-    return any(s in symbol for s in ["ETH", "STETH", "WETH", "RETH", "CBETH", "WEETH", "EZETH"])
-
-
-def is_sol_pool(pool):
-    """Check if pool is SOL-related"""
-    symbol = (pool.get("symbol") or "").upper()
-    chain = (pool.get("chain") or "").lower()
-    return chain == "solana" or any(s in symbol for s in ["SOL", "MSOL", "JITOSOL", "BSOL"])
-
-
 # ============================================
 # BEEFY FINANCE - Auto-compounding Vaults
 # ============================================
@@ -8,6 +8,9 @@ from web3 import Web3
 from eth_account import Account
 import os
 
+from infrastructure.rpc import run_rpc
+from infrastructure.tx_manager import tx_manager
+
 logger = logging.getLogger(__name__)
 
 # ==========================================
@@ -442,22 +445,20 @@ class AaveV3Protocol:
             amount_wei = int(amount_usdc * 1e6)  # USDC has 6 decimals
             user = Web3.to_checksum_address(user_address)
             
-            # Step 1: Approve if needed
-            nonce = self.w3.eth.get_transaction_count(user)
-            approve_tx = self.build_approve_tx(user, amount_wei, nonce)
-            
+            # Step 1: Approve if needed (tx_manager assigns nonces)
+            approve_tx = await run_rpc(self.build_approve_tx, user, amount_wei)
+            approve_hash = None
             if approve_tx:
-                signed_approve = Account.sign_transaction(approve_tx, private_key)
-                approve_hash = self.w3.eth.send_raw_transaction(signed_approve.raw_transaction)
-                self.w3.eth.wait_for_transaction_receipt(approve_hash)
-                logger.info(f"✅ USDC approved for Aave: {approve_hash.hex()}")
-                nonce += 1
+                approve_hash = await tx_manager.send(self.w3, approve_tx, private_key)
             
-            # Step 2: Supply
-            supply_tx = self.build_supply_tx(user, amount_wei, nonce)
-            signed_supply = Account.sign_transaction(supply_tx, private_key)
-            supply_hash = self.w3.eth.send_raw_transaction(signed_supply.raw_transaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(supply_hash)
+            # Step 2: Supply - fixed gas, so it can follow the approve without waiting for it
+            supply_tx = await run_rpc(self.build_supply_tx, user, amount_wei)
+            supply_hash = await tx_manager.send(self.w3, supply_tx, private_key)
+            
+            if approve_hash:
+                await tx_manager.wait_for_receipt(self.w3, approve_hash)
+                logger.info(f"✅ USDC approved for Aave: {approve_hash.hex()}")
+            receipt = await tx_manager.wait_for_receipt(self.w3, supply_hash)
             
             logger.info(f"✅ Aave supply successful: {supply_hash.hex()}")
             
@@ -503,11 +504,8 @@ class AaveV3Protocol:
             else:
                 amount_wei = int(amount_usdc * 1e6)
             
-            nonce = self.w3.eth.get_transaction_count(user)
-            withdraw_tx = self.build_withdraw_tx(user, amount_wei, nonce)
-            signed_tx = Account.sign_transaction(withdraw_tx, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            withdraw_tx = await run_rpc(self.build_withdraw_tx, user, amount_wei)
+            tx_hash, receipt = await tx_manager.send_and_wait(self.w3, withdraw_tx, private_key)
             
             logger.info(f"✅ Aave withdraw successful: {tx_hash.hex()}")
             
@@ -547,11 +545,8 @@ class AaveV3Protocol:
         try:
             user = Web3.to_checksum_address(user_address)
             
-            nonce = self.w3.eth.get_transaction_count(user)
-            withdraw_tx = self.build_withdraw_percent_tx(user, percent, nonce)
-            signed_tx = Account.sign_transaction(withdraw_tx, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            withdraw_tx = await run_rpc(self.build_withdraw_percent_tx, user, percent)
+            tx_hash, receipt = await tx_manager.send_and_wait(self.w3, withdraw_tx, private_key)
             
             logger.info(f"✅ Aave {percent}% withdraw successful: {tx_hash.hex()}")
             
@@ -12,6 +12,9 @@ from web3 import Web3
 from eth_account import Account
 import os
 
+from infrastructure.rpc import call_async, run_rpc
+from infrastructure.tx_manager import tx_manager
+
 logger = logging.getLogger(__name__)
 
 # ==========================================
@@ -494,7 +497,7 @@ class MorphoBlueProtocol:
         
         return tx
     
-    def supply(
+    async def supply(
         self,
         user_address: str,
         amount: int,
@@ -515,26 +518,25 @@ class MorphoBlueProtocol:
         """
         try:
             user = Web3.to_checksum_address(user_address)
-            nonce = self.w3.eth.get_transaction_count(user)
             
             # Check allowance
-            allowance = self.usdc.functions.allowance(user, MORPHO_BLUE).call()
+            allowance = await call_async(self.usdc.functions.allowance(user, MORPHO_BLUE))
             
+            # Nonce 0 is a placeholder - tx_manager assigns the signer's next nonce
+            approve_hash = None
             if allowance < amount:
                 logger.info(f"[MorphoBlue] Approving USDC for Morpho...")
-                approve_tx = self.build_approve_tx(user, amount * 10, nonce)
-                signed_approve = self.w3.eth.account.sign_transaction(approve_tx, private_key)
-                approve_hash = self.w3.eth.send_raw_transaction(signed_approve.raw_transaction)
-                self.w3.eth.wait_for_transaction_receipt(approve_hash, timeout=60)
-                logger.info(f"[MorphoBlue] Approval tx: {approve_hash.hex()}")
-                nonce += 1
+                approve_tx = await run_rpc(self.build_approve_tx, user, amount * 10, 0)
+                approve_hash = await tx_manager.send(self.w3, approve_tx, private_key)
             
-            # Supply
-            supply_tx = self.build_supply_tx(user, amount, market_params, nonce)
-            signed_supply = self.w3.eth.account.sign_transaction(supply_tx, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_supply.raw_transaction)
+            # Supply - fixed gas, so it can follow the approve without waiting for it
+            supply_tx = await run_rpc(self.build_supply_tx, user, amount, market_params, 0)
+            tx_hash = await tx_manager.send(self.w3, supply_tx, private_key)
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            if approve_hash:
+                await tx_manager.wait_for_receipt(self.w3, approve_hash, timeout=60)
+                logger.info(f"[MorphoBlue] Approval tx: {approve_hash.hex()}")
+            receipt = await tx_manager.wait_for_receipt(self.w3, tx_hash, timeout=120)
             
             return {
                 "success": receipt.status == 1,
@@ -0,0 +1,95 @@
+"""
+Backtest Parameter Sweep
+Replays StrategyExecutor + PositionMonitor over stored DefiLlama history for
+a grid of agent configs (see agents/backtest_engine.py)
+
+Usage:
+    python scripts/backtest_sweep.py --chain Base --start 2025-01-01 --days 90
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.backtest_engine import BacktestEngine
+from data_sources.pool_history import download_histories, download_pool_list, get_pool_history_store
+
+# Parameter grid - every combination is one agent config
+GRID = {
+    "min_apy": [5, 10, 20, 50, 100],
+    "max_apy": [200, 1000],
+    "vault_count": [1, 3, 5, 10],
+    "risk_level": ["low", "medium", "high"],
+    "pool_type": ["all", "single", "dual"],
+    "stop_loss": [None, 10, 15],
+}
+
+
+def grid_configs(chain: str, min_tvl: float, duration_days: int):
+    keys = list(GRID)
+    for values in itertools.product(*GRID.values()):
+        params = dict(zip(keys, values))
+        stop_loss = params.pop("stop_loss")
+        yield {
+            **params,
+            "chain": chain.lower(),
+            "min_tvl": min_tvl,
+            "max_allocation": 100,
+            "duration": {"days": duration_days},
+            "pro_config": {"stopLossEnabled": stop_loss is not None, "stopLossPercent": stop_loss or 0},
+        }
+
+
+async def main(args):
+    store = get_pool_history_store()
+
+    print(f"🔍 Fetching {args.chain} pool list...")
+    pools = await download_pool_list(store)
+    pool_ids = [
+        p["pool"] for p in pools
+        if (p.get("chain") or "").lower() == args.chain.lower() and (p.get("tvlUsd") or 0) >= args.min_tvl
+    ]
+    print(f"   {len(pool_ids)} pools with TVL >= ${args.min_tvl:,.0f}")
+
+    print(f"📜 Updating history store ({store.db_path})...")
+    stats = await download_histories(pool_ids, store)
+    print(f"   downloaded={stats['downloaded']} skipped={stats['skipped']} failed={stats['failed']}")
+
+    panel = store.load_panel(pool_ids, start=args.start)
+    engine = BacktestEngine(panel)
+    configs = list(grid_configs(args.chain, args.min_tvl, args.days))
+
+    print(f"🎮 Sweeping {len(configs)} configs over {len(panel)} pools x {panel.apy.shape[1]} days...")
+    started = time.perf_counter()
+    results = engine.sweep(configs, capital=args.capital, days=args.days)
+    print(f"   done in {time.perf_counter() - started:.1f}s")
+
+    results.sort(key=lambda r: r.net_yield, reverse=True)
+    print("\n📈 Top 10 configs:")
+    for r in results[:10]:
+        a = r.agent
+        print(f"   min_apy={a['min_apy']:>4} max_apy={a['max_apy']:>5} vaults={a['vault_count']:>2} "
+              f"risk={a['risk_level']:6} type={a['pool_type']:6} "
+              f"stop_loss={a['pro_config']['stopLossPercent'] or '-':>3} | "
+              f"ROI {r.roi_percent:6.2f}%  APY {r.annualized_apy:6.1f}%  exits {r.exits}")
+
+    with open(args.output, "w") as f:
+        json.dump([r.to_dict() for r in results], f, indent=2, default=str)
+    print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep agent configs over historical pool data")
+    parser.add_argument("--chain", default="Base")
+    parser.add_argument("--start", default=None, help="First day (YYYY-MM-DD); default: all stored history")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--min-tvl", type=float, default=500_000)
+    parser.add_argument("--capital", type=float, default=10_000)
+    parser.add_argument("--output", default="backtest_sweep.json")
+    asyncio.run(main(parser.parse_args()))
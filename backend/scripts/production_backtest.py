@@ -9,6 +9,11 @@ import httpx
 from datetime import datetime
 from typing import Dict, List
 import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.pool_history import fetch_pool_histories
 
 # Production-like config (matches strategy_executor.py)
 CONFIG = {
@@ -71,18 +76,6 @@ async def fetch_pools() -> List[Dict]:
         return resp.json()["data"]
 
 
-async def fetch_pool_history(pool_id: str) -> List[Dict]:
-    """Fetch historical APY data"""
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            resp = await client.get(f"https://yields.llama.fi/chart/{pool_id}")
-            if resp.status_code == 200:
-                return resp.json().get("data", [])[-4:]  # Last 4 days
-        except:
-            pass
-        return []
-
-
 def filter_pools_production(pools: List[Dict], config: Dict) -> List[Dict]:
     """Filter pools EXACTLY like strategy_executor.py does"""
     filtered = []
@@ -173,8 +166,9 @@ async def run_production_backtest(config: Dict) -> Dict:
     
     # Fetch historical data for simulation
     print(f"\n📜 Fetching 4-day historical APY data...")
+    histories = await fetch_pool_histories(pool["pool"] for pool in selected)
     for pool in selected:
-        history = await fetch_pool_history(pool["pool"])
+        history = histories.get(pool["pool"], [])[-4:]  # Last 4 days
         pool["daily_apys"] = [h.get("apy", pool["apy"]) for h in history] if history else [pool["apy"]] * 4
         pool["il_estimate"] = estimate_il(pool["symbol"], config["simulation_days"])
     
@@ -16,6 +16,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
 import statistics
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.pool_history import fetch_pool_histories
 
 # Configuration
 CONFIG = {
@@ -92,20 +97,6 @@ async def fetch_defillama_pools(chain: str = "Base", protocol: str = None) -> Li
         return pools
 
 
-async def fetch_pool_history(pool_id: str, days: int = 14) -> List[Dict]:
-    """Fetch historical APY data for a pool"""
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            resp = await client.get(f"https://yields.llama.fi/chart/{pool_id}")
-            if resp.status_code == 200:
-                data = resp.json().get("data", [])
-                # Return last N days
-                return data[-days:] if data else []
-        except Exception as e:
-            print(f"  [!] Error fetching {pool_id}: {e}")
-        return []
-
-
 def analyze_pool_history(history: List[Dict]) -> Dict:
     """Analyze pool's historical behavior"""
     if len(history) < 3:
@@ -251,14 +242,10 @@ async def run_backtest(config: Dict) -> Dict:
     # Fetch historical data
     print(f"\n📜 Fetching 14-day historical data...")
     histories = {}
-    for i, p in enumerate(prefiltered[:30]):  # Top 30 by TVL
-        pool_id = p.get("pool")
-        history = await fetch_pool_history(pool_id, 14)
+    stored = await fetch_pool_histories(p.get("pool") for p in prefiltered[:30])  # Top 30 by TVL
+    for pool_id, history in stored.items():
         if history:
-            analysis = analyze_pool_history(history)
-            histories[pool_id] = analysis
-        if (i + 1) % 10 == 0:
-            print(f"   Analyzed {i + 1}/{min(30, len(prefiltered))} pools...")
+            histories[pool_id] = analyze_pool_history(history[-14:])
     
     print(f"   Got valid history for {sum(1 for h in histories.values() if h.get('valid'))} pools")
     
@@ -17,6 +17,11 @@ import httpx
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_sources.pool_history import fetch_pool_histories
 
 # Configuration
 CONFIG = {
@@ -53,18 +58,6 @@ async def fetch_defillama_pools(chain: str = "Base", protocol: str = None) -> Li
         return pools
 
 
-async def fetch_pool_history(pool_id: str) -> List[Dict]:
-    """Fetch historical APY data for a pool (last 30 days)"""
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            resp = await client.get(f"https://yields.llama.fi/chart/{pool_id}")
-            if resp.status_code == 200:
-                return resp.json().get("data", [])
-        except Exception as e:
-            print(f"  [!] Could not fetch history for {pool_id}: {e}")
-        return []
-
-
 def filter_pools(pools: List[Dict], config: Dict) -> List[Dict]:
     """Filter pools by config criteria"""
     filtered = []
@@ -133,8 +126,9 @@ async def simulate_strategy(config: Dict) -> Dict:
     # Fetch historical data for top pools
     print(f"\n📜 Fetching historical data...")
     pool_histories = {}
-    for p in eligible_pools[:20]:  # Top 20 for history
-        history = await fetch_pool_history(p["pool"])
+    histories = await fetch_pool_histories(p["pool"] for p in eligible_pools[:20])  # Top 20 for history
+    for p in eligible_pools[:20]:
+        history = histories.get(p["pool"])
         if history:
             pool_histories[p["pool"]] = {
                 "pool": p,
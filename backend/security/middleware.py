@@ -15,10 +15,13 @@ Features:
 import time
 import hashlib
 import logging
+import math
+import os
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set, Callable, Any
+from typing import Dict, List, Optional, Set, Callable, Any
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from functools import wraps
 import re
 import json
@@ -42,20 +45,134 @@ class RateLimitConfig:
     requests_per_hour: int = 1000
     requests_per_day: int = 10000
     burst_limit: int = 10  # Max requests in 1 second
+    # SQLite file shared by all uvicorn workers on the host (None = per-process memory)
+    shared_db_path: Optional[str] = field(default_factory=lambda: os.getenv("RATE_LIMIT_DB") or None)
+    max_tracked_ips: int = 100_000
+
+
+# Order of the per-IP TATs in every store
+RATE_LIMIT_WINDOWS = ("burst", "minute", "hour", "day")
+
+
+class MemoryRateLimitStore:
+    """
+    Per-process GCRA state: IP -> one theoretical arrival time (TAT) per window.
+    LRU-bounded; idle IPs (every TAT in the past) are dropped on sweep - their
+    state is identical to a fresh IP, so nothing is lost.
+    """
+    
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._tats: "OrderedDict[str, List[float]]" = OrderedDict()
+    
+    def update(self, ip: str, decide: Callable[[Optional[List[float]]], Optional[List[float]]]) -> Optional[List[float]]:
+        tats = self._tats.get(ip)
+        new_tats = decide(tats)
+        if new_tats is not None:
+            self._tats[ip] = new_tats
+            self._tats.move_to_end(ip)
+            if len(self._tats) > self.max_entries:
+                self._tats.popitem(last=False)
+        return new_tats
+    
+    def get(self, ip: str) -> Optional[List[float]]:
+        return self._tats.get(ip)
+    
+    def sweep(self, now: float) -> int:
+        idle = [ip for ip, tats in self._tats.items() if max(tats) <= now]
+        for ip in idle:
+            del self._tats[ip]
+        return len(idle)
+    
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class SQLiteRateLimitStore:
+    """
+    GCRA state in a local SQLite file so every worker process enforces the same
+    limits. One row per IP; read-decide-write runs inside BEGIN IMMEDIATE, so
+    concurrent workers serialize on the row update (WAL keeps readers unblocked).
+    """
+    
+    def __init__(self, db_path: str):
+        import sqlite3
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")  # Limiter state, not records - speed over durability
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "ip TEXT PRIMARY KEY, burst REAL, minute REAL, hour REAL, day REAL)"
+        )
+    
+    def update(self, ip: str, decide: Callable[[Optional[List[float]]], Optional[List[float]]]) -> Optional[List[float]]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT burst, minute, hour, day FROM rate_limits WHERE ip = ?", (ip,)
+                ).fetchone()
+                new_tats = decide(list(row) if row else None)
+                if new_tats is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO rate_limits (ip, burst, minute, hour, day) VALUES (?, ?, ?, ?, ?)",
+                        (ip, *new_tats)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return new_tats
+    
+    def get(self, ip: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT burst, minute, hour, day FROM rate_limits WHERE ip = ?", (ip,)
+            ).fetchone()
+        return list(row) if row else None
+    
+    def sweep(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM rate_limits WHERE MAX(burst, minute, hour, day) <= ?", (now,))
+            return cursor.rowcount
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
 
 
 class RateLimiter:
     """
-    Token bucket rate limiter with multiple time windows.
+    GCRA (generic cell rate algorithm) rate limiter with multiple time windows.
     Protects against DDoS and abuse.
+    
+    Each window keeps a single float per IP - the theoretical arrival time (TAT).
+    A request is allowed when TAT - tolerance <= now, then TAT advances by
+    period / limit. That is a sliding-window limit of `limit` per `period`
+    with fixed-size state and O(1) checks (no per-window counters to evict).
     """
     
     def __init__(self, config: RateLimitConfig = None):
         self.config = config or RateLimitConfig()
         
-        # Tracking: IP -> {window: count}
-        self.request_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        self.last_request: Dict[str, float] = {}
+        # (period seconds, limit, rejection reason) - same order as the stored TATs
+        self.windows = [
+            (1, self.config.burst_limit, f"Burst limit exceeded ({self.config.burst_limit}/sec)"),
+            (60, self.config.requests_per_minute, f"Rate limit exceeded ({self.config.requests_per_minute}/min)"),
+            (3600, self.config.requests_per_hour, f"Rate limit exceeded ({self.config.requests_per_hour}/hour)"),
+            (86400, self.config.requests_per_day, f"Daily limit exceeded ({self.config.requests_per_day}/day)"),
+        ]
+        # Emission interval T and burst tolerance per window
+        self._intervals = [period / limit for period, limit, _ in self.windows]
+        self._tolerances = [period - interval for (period, _, _), interval in zip(self.windows, self._intervals)]
+        
+        if self.config.shared_db_path:
+            self.store = SQLiteRateLimitStore(self.config.shared_db_path)
+        else:
+            self.store = MemoryRateLimitStore(self.config.max_tracked_ips)
+        
         self.blocked_ips: Set[str] = set()
         self.whitelisted_ips: Set[str] = {"127.0.0.1", "::1"}
         
@@ -77,40 +194,33 @@ class RateLimiter:
         now = time.time()
         self._cleanup_if_needed(now)
         
-        # Get time windows
-        minute_key = f"min_{int(now / 60)}"
-        hour_key = f"hour_{int(now / 3600)}"
-        day_key = f"day_{int(now / 86400)}"
-        
-        counts = self.request_counts[ip]
-        
-        # Check burst (1 second window)
-        last = self.last_request.get(ip, 0)
-        if now - last < 1:
-            counts["burst"] = counts.get("burst", 0) + 1
-            if counts["burst"] > self.config.burst_limit:
-                return False, f"Burst limit exceeded ({self.config.burst_limit}/sec)"
-        else:
-            counts["burst"] = 1
-        
-        # Check minute limit
-        counts[minute_key] += 1
-        if counts[minute_key] > self.config.requests_per_minute:
-            return False, f"Rate limit exceeded ({self.config.requests_per_minute}/min)"
-        
-        # Check hour limit
-        counts[hour_key] += 1
-        if counts[hour_key] > self.config.requests_per_hour:
-            return False, f"Rate limit exceeded ({self.config.requests_per_hour}/hour)"
-        
-        # Check day limit
-        counts[day_key] += 1
-        if counts[day_key] > self.config.requests_per_day:
-            return False, f"Daily limit exceeded ({self.config.requests_per_day}/day)"
-        
-        self.last_request[ip] = now
+        rejected = None
+        
+        def decide(tats: Optional[List[float]]) -> Optional[List[float]]:
+            nonlocal rejected
+            new_tats = []
+            for i, interval in enumerate(self._intervals):
+                tat = max(tats[i], now) if tats else now
+                if tat - self._tolerances[i] > now + 1e-6:  # Slack for float error at epoch magnitudes
+                    rejected = self.windows[i][2]
+                    return None  # Rejected requests don't consume quota
+                new_tats.append(tat + interval)
+            return new_tats
+        
+        self.store.update(ip, decide)
+        if rejected:
+            return False, rejected
         return True, "ok"
     
+    def get_usage(self, ip: str) -> Dict[str, int]:
+        """Requests currently counted against each window for an IP"""
+        tats = self.store.get(ip) or [0.0] * len(self.windows)
+        now = time.time()
+        return {
+            name: max(0, math.ceil((tat - now) / interval - 1e-9))
+            for name, tat, interval in zip(RATE_LIMIT_WINDOWS, tats, self._intervals)
+        }
+    
     def block_ip(self, ip: str, reason: str = "manual"):
         """Block an IP address"""
         self.blocked_ips.add(ip)
@@ -126,24 +236,21 @@ class RateLimiter:
         self.whitelisted_ips.add(ip)
     
     def _cleanup_if_needed(self, now: float):
-        """Clean up old tracking data"""
+        """Drop state of IPs that have gone idle (every window fully refilled)"""
         if now - self.last_cleanup > self.cleanup_interval:
-            current_minute = int(now / 60)
-            current_hour = int(now / 3600)
-            current_day = int(now / 86400)
-            
-            for ip in list(self.request_counts.keys()):
-                counts = self.request_counts[ip]
-                # Remove old keys
-                for key in list(counts.keys()):
-                    if key.startswith("min_") and int(key.split("_")[1]) < current_minute - 2:
-                        del counts[key]
-                    elif key.startswith("hour_") and int(key.split("_")[1]) < current_hour - 2:
-                        del counts[key]
-                    elif key.startswith("day_") and int(key.split("_")[1]) < current_day - 2:
-                        del counts[key]
-            
+            try:
+                self.store.sweep(now)
+            except Exception as e:
+                logger.warning(f"Rate limit sweep failed: {e}")
             self.last_cleanup = now
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "sqlite" if isinstance(self.store, SQLiteRateLimitStore) else "memory",
+            "tracked_ips": len(self.store),
+            "blocked_ips": len(self.blocked_ips),
+            "whitelisted_ips": len(self.whitelisted_ips),
+        }
 
 
 # ============================================
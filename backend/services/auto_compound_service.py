@@ -23,6 +23,8 @@ from web3 import Web3
 from eth_account import Account
 from datetime import datetime, timedelta
 
+from infrastructure.rpc import run_rpc
+from infrastructure.tx_manager import tx_manager
 from integrations.cow_swap import cow_client, TOKENS
 from services.aerodrome_lp import get_aerodrome_lp, LPResult
 from services.dual_lp_service import get_dual_lp_service
@@ -242,25 +244,23 @@ class AutoCompoundService:
             gauge = self._get_gauge_contract(gauge_address)
             account = Account.from_key(private_key)
             
-            # Build getReward transaction
-            nonce = self.w3.eth.get_transaction_count(agent_address, 'latest')
-            
-            claim_tx = gauge.functions.getReward(
+            # Build getReward transaction (nonce assigned by tx_manager)
+            gas_price = await run_rpc(lambda: self.w3.eth.gas_price)
+            claim_tx = await run_rpc(gauge.functions.getReward(
                 Web3.to_checksum_address(agent_address)
-            ).build_transaction({
+            ).build_transaction, {
                 'from': Web3.to_checksum_address(agent_address),
-                'nonce': nonce,
+                'nonce': 0,
                 'gas': 200000,
-                'gasPrice': int(self.w3.eth.gas_price * 1.2),
+                'gasPrice': int(gas_price * 1.2),
                 'chainId': 8453
             })
             
-            signed = account.sign_transaction(claim_tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            tx_hash = await tx_manager.send(self.w3, claim_tx, account)
             
             print(f"[AutoCompound] Claim TX: {tx_hash.hex()}")
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+            receipt = await tx_manager.wait_for_receipt(self.w3, tx_hash, timeout=60)
             
             if receipt.status == 1:
                 print(f"[AutoCompound] ✅ Rewards claimed!")
@@ -0,0 +1,268 @@
+"""
+Portfolio Stream - Shared, event-driven portfolio snapshots for WebSockets
+
+WHY: Every /ws/portfolio socket ran its own 10s polling loop that rebuilt the
+snapshot and hashed it. N dashboards = N x the backend work, even when nothing
+changed.
+
+DESIGN:
+- One snapshot per wallet, recomputed once per change (not per socket)
+- Changes come from events: balance refresh (publish_agent_balances),
+  deposits and allocations (invalidate)
+- Bursts are debounced, then each dirty wallet is recomputed once and a
+  JSON Patch (RFC 6902) delta is pushed to every subscriber via ConnectionManager
+- Snapshots are built from in-memory state (no RPC); the Supabase balance cache
+  is only consulted for agents not seen since startup
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def make_json_patch(old: Any, new: Any, path: str = "") -> List[dict]:
+    """
+    Minimal RFC 6902 diff: recurses into dicts, replaces any other changed value.
+    Lists are replaced whole (positions lists are short).
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_json_patch(old[key], value, child))
+        return ops
+    if old != new or type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+class PortfolioStream:
+    """
+    Computes wallet snapshots once per change and fans deltas out to sockets.
+
+    USAGE:
+        portfolio_stream.publish_agent_balances(user, agent, holdings, positions, total)
+        portfolio_stream.invalidate(user, reason="deposit")
+        snapshot, version = await portfolio_stream.get_snapshot(user)
+    """
+
+    def __init__(self, debounce: float = 0.25):
+        self.debounce = debounce
+
+        # wallet -> (snapshot, version)
+        self.snapshots: Dict[str, dict] = {}
+        self.versions: Dict[str, int] = {}
+        # agent_address -> last published balances
+        self.agent_balances: Dict[str, dict] = {}
+
+        self._dirty: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "events": 0,
+            "recomputes": 0,
+            "patches_pushed": 0,
+            "unchanged": 0,
+        }
+
+    # ==========================================
+    # EVENTS
+    # ==========================================
+
+    def publish_agent_balances(
+        self,
+        user_address: str,
+        agent_address: str,
+        holdings: List[dict],
+        positions: List[dict],
+        total_value_usd: float
+    ):
+        """Balance refresh result for one agent (holdings/positions as dicts)"""
+        self.agent_balances[agent_address.lower()] = {
+            "holdings": holdings,
+            "positions": positions,
+            "total_value_usd": total_value_usd,
+            "fetched_at": datetime.utcnow().isoformat(),
+        }
+        self.invalidate(user_address, reason="balance_refresh")
+
+    def invalidate(self, wallet: str, reason: str = ""):
+        """Mark a wallet's snapshot as changed (deposit, allocation, exit...)"""
+        if not wallet:
+            return
+        self._stats["events"] += 1
+        self._dirty.add(wallet.lower())
+        self._ensure_started()
+        if self._wake is not None:
+            self._wake.set()
+
+    # ==========================================
+    # SNAPSHOTS
+    # ==========================================
+
+    async def get_snapshot(self, wallet: str) -> tuple:
+        """Current (snapshot, version) for a wallet - computed at most once until it changes"""
+        wallet = wallet.lower()
+        if wallet not in self.snapshots:
+            self.snapshots[wallet] = await self._compute(wallet)
+            self.versions[wallet] = 1
+        return self.snapshots[wallet], self.versions[wallet]
+
+    async def _compute(self, wallet: str) -> dict:
+        """Build the snapshot from deployed agents + last known balances (no RPC)"""
+        self._stats["recomputes"] += 1
+        try:
+            from api.agent_config_router import DEPLOYED_AGENTS
+            agents = DEPLOYED_AGENTS.get(wallet) or next(
+                (v for k, v in DEPLOYED_AGENTS.items() if k.lower() == wallet), []
+            )
+        except ImportError:
+            agents = []
+
+        total = 0.0
+        holdings, positions, pending, agent_status = [], [], [], {}
+        for agent in agents:
+            agent_address = (agent.get("agent_address") or agent.get("address") or "").lower()
+            if not agent_address:
+                continue
+
+            balances = self.agent_balances.get(agent_address)
+            if balances is None:
+                balances = await self._load_cached_balances(agent_address)
+
+            if balances:
+                total += balances.get("total_value_usd") or 0
+                holdings.extend({**h, "agent_address": agent_address} for h in balances.get("holdings") or [])
+                positions.extend({**p, "agent_address": agent_address} for p in balances.get("positions") or [])
+
+            agent_status[agent_address] = "active" if agent.get("is_active", True) else "paused"
+            if agent.get("pending_allocation"):
+                pending.append({"agent_address": agent_address, **agent["pending_allocation"]})
+
+        return {
+            "wallet": wallet,
+            "totalValue": round(total, 2),
+            "holdings": holdings,
+            "positions": positions,
+            "pendingTransactions": pending,
+            "agentStatus": agent_status,
+        }
+
+    async def _load_cached_balances(self, agent_address: str) -> Optional[dict]:
+        """First sight of an agent: seed from the Supabase balance cache"""
+        try:
+            from infrastructure.supabase_client import supabase
+            cached = await supabase.get_agent_balances(agent_address)
+        except Exception as e:
+            logger.debug(f"[PortfolioStream] Cache lookup failed for {agent_address[:10]}: {e}")
+            cached = None
+        if cached:
+            self.agent_balances[agent_address] = cached
+        return cached
+
+    # ==========================================
+    # FAN-OUT
+    # ==========================================
+
+    def _ensure_started(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.debounce)  # Coalesce bursts (e.g. a whole refresh cycle)
+            self._wake.clear()
+            try:
+                await self.process_dirty()
+            except Exception as e:
+                logger.error(f"[PortfolioStream] Update error: {e}")
+
+    async def process_dirty(self) -> int:
+        """Recompute every dirty wallet once and push deltas. Returns patches pushed."""
+        from api.websocket_router import manager
+
+        dirty, self._dirty = self._dirty, set()
+        pushed = 0
+        for wallet in dirty:
+            previous = self.snapshots.get(wallet)
+            if previous is None and wallet not in manager.active_connections:
+                continue  # Nobody has asked for it yet - compute lazily on subscribe
+
+            snapshot = await self._compute(wallet)
+            ops = make_json_patch(previous, snapshot) if previous is not None else None
+            if ops == []:
+                self._stats["unchanged"] += 1
+                continue
+
+            base_version = self.versions.get(wallet, 0)
+            self.snapshots[wallet] = snapshot
+            self.versions[wallet] = base_version + 1
+
+            if wallet in manager.active_connections:
+                if ops is None:
+                    message = snapshot_message(snapshot, base_version + 1)
+                else:
+                    message = {
+                        "type": "portfolio_patch",
+                        "version": base_version + 1,
+                        "base_version": base_version,
+                        "ops": ops,
+                        "timestamp": datetime.utcnow().isoformat()
+                    }
+                await manager.send_personal(message, wallet)
+                pushed += 1
+
+        self._stats["patches_pushed"] += pushed
+        return pushed
+
+    def get_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "wallets": len(self.snapshots),
+            "agents_tracked": len(self.agent_balances),
+            "pending": len(self._dirty),
+        }
+
+
+def snapshot_message(snapshot: dict, version: int) -> dict:
+    """Full snapshot message (on connect / refresh); patches apply on top of `version`"""
+    return {
+        "type": "snapshot",
+        "version": version,
+        "data": snapshot,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+# Global stream instance
+portfolio_stream = PortfolioStream()
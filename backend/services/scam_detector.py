@@ -7,15 +7,20 @@ Features:
 - Pattern matching for scam signatures
 - Risk scoring (0-100)
 - Supabase pgvector integration for fingerprint storage
+- Single-pass precompiled scanner + content-addressed analysis cache
+- Local similarity index (services/scam_index.py) - no network on the check path
 """
 
 import os
 import re
 import httpx
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import hashlib
 
+from .scam_index import scam_index
+
 # Basescan API
 BASESCAN_API = "https://api.basescan.org/api"
 BASESCAN_API_KEY = os.getenv("BASESCAN_API_KEY", "")
@@ -114,6 +119,136 @@ SAFE_PATTERNS = {
 }
 
 
+# ==========================================
+# PRECOMPILED SCANNER
+# ==========================================
+# Each pattern is reduced to the literal runs any match must contain (e.g.
+# "msg.sender" and "owner"). The source is lowercased once; a category's
+# precompiled regex only runs when all literals of one of its patterns occur,
+# so most categories are ruled out by substring checks. (One big alternation
+# was measured ~2x slower than per-pattern searches: Python's re loses its
+# literal-prefix fast path on large alternations.)
+
+def _required_literals(regex: str) -> Optional[List[str]]:
+    """
+    Literal runs every match of `regex` contains (lowercased), or None if the
+    pattern has a top-level alternation and cannot be reduced.
+    """
+    runs, run = [], []
+    depth = 0
+    i = 0
+
+    def end_run():
+        if len(run) >= 2:
+            runs.append("".join(run).lower())
+        run.clear()
+
+    while i < len(regex):
+        ch = regex[i]
+        if ch == "\\" and i + 1 < len(regex):
+            nxt = regex[i + 1]
+            i += 2
+            if nxt.isalnum():       # \s, \w, \d ... character classes
+                end_run()
+                continue
+            literal = nxt            # \( \. \[ ... escaped punctuation
+        elif ch in "([":
+            end_run()
+            depth += 1
+            i += 1
+            continue
+        elif ch in ")]":
+            depth -= 1
+            i += 1
+            continue
+        elif ch == "|" and depth == 0:
+            return None
+        elif ch in ".^$*+?":
+            end_run()                # Wildcards / quantifiers after a class or group
+            i += 1
+            continue
+        elif ch == "{":
+            end_run()
+            i = regex.find("}", i) + 1 or len(regex)
+            continue
+        else:
+            literal = ch
+            i += 1
+        if depth:
+            continue
+        if i < len(regex) and regex[i] in "*?{":
+            end_run()                # Optional / repeated char: drop it
+            continue
+        run.append(literal)
+        if i < len(regex) and regex[i] == "+":
+            end_run()
+    end_run()
+    return runs
+
+
+def _compile_category(kind: str, name: str, patterns: List[str]) -> Tuple[Tuple[str, str], Optional[List[List[str]]], "re.Pattern"]:
+    literals = [_required_literals(p) for p in patterns]
+    regex = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    # None: some pattern cannot be prefiltered - always run the regex
+    return (kind, name), (None if any(not lits for lits in literals) else literals), regex
+
+
+_SCANNER: List[Tuple[Tuple[str, str], Optional[List[List[str]]], "re.Pattern"]] = (
+    [_compile_category("risk", name, data["patterns"]) for name, data in SCAM_PATTERNS.items()]
+    + [_compile_category("safe", name, data["patterns"]) for name, data in SAFE_PATTERNS.items()]
+)
+
+# Fingerprint normalization (same three steps as always - stored hashes must not change)
+_LINE_COMMENT_RE = re.compile(r'//.*')
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Embedding feature extraction
+_FUNCTION_SIG_RE = re.compile(r'function\s+\w+\s*\([^)]*\)')
+_REQUIRE_RE = re.compile(r'require\s*\([^)]+\)')
+_MAPPING_RE = re.compile(r'mapping\s*\([^)]+\)')
+
+# Content-addressed cache: sha256(source) -> analysis / fingerprint.
+# Keyed by the exact source (not the normalized fingerprint) because safe
+# patterns like "OpenZeppelin Contracts" live in comments.
+ANALYSIS_CACHE_SIZE = 2048
+_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Sentence-transformers model, loaded once (False = not installed)
+_embedding_model = None
+
+
+def scan_categories(source_code: str) -> set:
+    """Return the set of (kind, name) pattern categories present in the source"""
+    lowered = source_code.lower()
+    found = set()
+    for key, literals, regex in _SCANNER:
+        if literals is not None and not any(
+            all(lit in lowered for lit in pattern_literals) for pattern_literals in literals
+        ):
+            continue
+        if regex.search(source_code):
+            found.add(key)
+    return found
+
+
+def content_hash(source_code: str) -> str:
+    return hashlib.sha256(source_code.encode()).hexdigest()
+
+
+def _cache_entry(source_code: str) -> Dict[str, Any]:
+    """LRU entry for this exact source (created empty on first sight)"""
+    key = content_hash(source_code)
+    entry = _analysis_cache.get(key)
+    if entry is None:
+        entry = _analysis_cache[key] = {"content_hash": key}
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    else:
+        _analysis_cache.move_to_end(key)
+    return entry
+
+
 class ScamDetector:
     """
     AI-powered scam detection for smart contracts.
@@ -154,35 +289,40 @@ class ScamDetector:
             return None
     
     def analyze_source(self, source_code: str) -> Dict[str, Any]:
-        """Analyze source code for scam patterns."""
+        """Analyze source code for scam patterns (one scan; repeated sources are free)."""
+        entry = _cache_entry(source_code)
+        if "analysis" not in entry:
+            entry["analysis"] = self._scan_source(source_code)
+        
+        analysis = entry["analysis"]
+        return {**analysis, "findings": [dict(f) for f in analysis["findings"]]}
+    
+    def _scan_source(self, source_code: str) -> Dict[str, Any]:
         findings = []
         risk_score = 0
+        found = scan_categories(source_code)
         
-        # Check scam patterns
+        # Check scam patterns (counted once per pattern type)
         for pattern_name, pattern_data in SCAM_PATTERNS.items():
-            for regex in pattern_data["patterns"]:
-                if re.search(regex, source_code, re.IGNORECASE):
-                    findings.append({
-                        "type": "risk",
-                        "name": pattern_name,
-                        "description": pattern_data["description"],
-                        "weight": pattern_data["risk_weight"]
-                    })
-                    risk_score += pattern_data["risk_weight"]
-                    break  # Only count once per pattern type
+            if ("risk", pattern_name) in found:
+                findings.append({
+                    "type": "risk",
+                    "name": pattern_name,
+                    "description": pattern_data["description"],
+                    "weight": pattern_data["risk_weight"]
+                })
+                risk_score += pattern_data["risk_weight"]
         
         # Check safe patterns (reduce risk)
         for pattern_name, pattern_data in SAFE_PATTERNS.items():
-            for regex in pattern_data["patterns"]:
-                if re.search(regex, source_code, re.IGNORECASE):
-                    findings.append({
-                        "type": "safe",
-                        "name": pattern_name,
-                        "description": pattern_data["description"],
-                        "weight": -pattern_data["risk_reduction"]
-                    })
-                    risk_score -= pattern_data["risk_reduction"]
-                    break
+            if ("safe", pattern_name) in found:
+                findings.append({
+                    "type": "safe",
+                    "name": pattern_name,
+                    "description": pattern_data["description"],
+                    "weight": -pattern_data["risk_reduction"]
+                })
+                risk_score -= pattern_data["risk_reduction"]
         
         # Clamp score to 0-100
         risk_score = max(0, min(100, risk_score))
@@ -251,7 +391,7 @@ class ScamDetector:
             analysis = self.analyze_source(source)
             result["risk_score"] = analysis["risk_score"]
             result["findings"] = analysis["findings"]
-            result["source_hash"] = hashlib.sha256(source.encode()).hexdigest()[:16]
+            result["source_hash"] = _cache_entry(source)["content_hash"][:16]
         else:
             # Unverified contracts are suspicious
             result["risk_score"] = 60
@@ -313,64 +453,85 @@ class ScamDetector:
         return result["risk_score"] <= max_risk
     
     def get_fingerprint(self, source_code: str) -> str:
-        """Generate fingerprint hash for quick matching."""
-        # Remove whitespace and comments for consistent hashing
-        clean = re.sub(r'//.*', '', source_code)
-        clean = re.sub(r'/\*.*?\*/', '', clean, flags=re.DOTALL)
-        clean = re.sub(r'\s+', '', clean)
-        
-        return hashlib.sha256(clean.encode()).hexdigest()
+        """Generate fingerprint hash for quick matching (memoized per source)."""
+        entry = _cache_entry(source_code)
+        if "fingerprint" not in entry:
+            # Remove whitespace and comments for consistent hashing
+            clean = _LINE_COMMENT_RE.sub('', source_code)
+            clean = _BLOCK_COMMENT_RE.sub('', clean)
+            clean = _WHITESPACE_RE.sub('', clean)
+            entry["fingerprint"] = hashlib.sha256(clean.encode()).hexdigest()
+        return entry["fingerprint"]
     
     def get_embedding(self, source_code: str) -> Optional[List[float]]:
         """
-        Generate embedding vector for similarity search.
+        Generate embedding vector for similarity search (memoized per source).
         Uses sentence-transformers all-MiniLM-L6-v2 (384 dimensions).
-        Falls back to hash-based pseudo-embedding if transformer unavailable.
+        Returns None if the transformer is unavailable.
         """
+        entry = _cache_entry(source_code)
+        if "embedding" not in entry:
+            entry["embedding"] = self._compute_embedding(source_code)
+        return entry["embedding"]
+    
+    def _compute_embedding(self, source_code: str) -> Optional[List[float]]:
+        global _embedding_model
+        if _embedding_model is False:
+            return None
         try:
-            from sentence_transformers import SentenceTransformer
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+                _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
             
             # Extract key code patterns for embedding
             # Focus on function signatures and critical logic
             patterns = []
-            patterns.extend(re.findall(r'function\s+\w+\s*\([^)]*\)', source_code))
-            patterns.extend(re.findall(r'require\s*\([^)]+\)', source_code))
-            patterns.extend(re.findall(r'mapping\s*\([^)]+\)', source_code))
+            patterns.extend(_FUNCTION_SIG_RE.findall(source_code))
+            patterns.extend(_REQUIRE_RE.findall(source_code))
+            patterns.extend(_MAPPING_RE.findall(source_code))
             
             text = ' '.join(patterns[:50])  # Limit to 50 patterns
             if not text:
                 text = source_code[:2000]  # Fallback to raw code
             
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            embedding = model.encode(text).tolist()
-            return embedding
+            return _embedding_model.encode(text).tolist()
             
         except ImportError:
-            print("[ScamDetector] sentence-transformers not installed, using hash-based embedding")
+            print("[ScamDetector] sentence-transformers not installed, similarity search limited to exact fingerprints")
+            _embedding_model = False
             return None
         except Exception as e:
             print(f"[ScamDetector] Embedding error: {e}")
             return None
     
     async def store_fingerprint(self, address: str, result: Dict[str, Any], source_code: str) -> bool:
-        """Store contract fingerprint in Supabase for future similarity matching."""
+        """Store contract fingerprint locally and in Supabase for future similarity matching."""
         try:
-            import httpx
+            # Generate embedding
+            embedding = self.get_embedding(source_code)
+            source_hash = self.get_fingerprint(source_code)
+            
+            # Local index first - similarity checks work even if Supabase is down
+            scam_index.add(
+                address,
+                embedding,
+                source_hash=source_hash,
+                risk_score=result.get("risk_score", 50),
+                risk_level=result.get("risk_level", "UNKNOWN"),
+                is_scam=result.get("risk_score", 0) >= 70
+            )
             
             supabase_url = os.getenv("SUPABASE_URL")
             supabase_key = os.getenv("SUPABASE_ANON_KEY")
             
             if not supabase_url or not supabase_key:
-                print("[ScamDetector] Supabase not configured, skipping fingerprint storage")
+                print("[ScamDetector] Supabase not configured, fingerprint stored locally only")
                 return False
             
-            # Generate embedding
-            embedding = self.get_embedding(source_code)
-            
             data = {
                 "contract_address": address.lower(),
                 "chain": "base",
-                "source_hash": self.get_fingerprint(source_code),
+                "source_hash": source_hash,
                 "embedding": embedding,
                 "risk_score": result.get("risk_score", 50),
                 "risk_level": result.get("risk_level", "UNKNOWN"),
@@ -381,73 +542,52 @@ class ScamDetector:
                 "analyzed_by": "ai" if result.get("ai_enhanced") else "regex"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{supabase_url}/rest/v1/scam_fingerprints",
-                    json=data,
-                    headers={
-                        "apikey": supabase_key,
-                        "Authorization": f"Bearer {supabase_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=minimal"
-                    }
-                )
+            response = await self.client.post(
+                f"{supabase_url}/rest/v1/scam_fingerprints",
+                json=data,
+                headers={
+                    "apikey": supabase_key,
+                    "Authorization": f"Bearer {supabase_key}",
+                    "Content-Type": "application/json",
+                    "Prefer": "return=minimal"
+                }
+            )
+            
+            if response.status_code in [200, 201]:
+                print(f"[ScamDetector] ✅ Stored fingerprint for {address[:10]}...")
+                return True
+            else:
+                print(f"[ScamDetector] Fingerprint storage failed: {response.status_code}")
+                return False
                 
-                if response.status_code in [200, 201]:
-                    print(f"[ScamDetector] ✅ Stored fingerprint for {address[:10]}...")
-                    return True
-                else:
-                    print(f"[ScamDetector] Fingerprint storage failed: {response.status_code}")
-                    return False
-                    
         except Exception as e:
             print(f"[ScamDetector] Store fingerprint error: {e}")
             return False
     
     async def find_similar_scam(self, source_code: str, threshold: float = 0.95) -> Optional[Dict]:
         """
-        Check if contract is similar to known scams using pgvector similarity search.
+        Check if contract is similar to known scams using the local fingerprint index.
+        The index is refreshed from Supabase in the background (never on this path).
         
         Returns matching scam info if similarity > threshold, else None.
         """
         try:
-            import httpx
+            scam_index.schedule_sync()
             
-            supabase_url = os.getenv("SUPABASE_URL")
-            supabase_key = os.getenv("SUPABASE_ANON_KEY")
+            # Identical normalized source - no embedding needed
+            match = scam_index.find_by_source_hash(self.get_fingerprint(source_code))
             
-            if not supabase_url or not supabase_key:
-                return None
+            if not (match and match.get("is_scam")):
+                embedding = self.get_embedding(source_code)
+                if not embedding:
+                    return None
+                match = scam_index.search(embedding, threshold)
             
-            embedding = self.get_embedding(source_code)
-            if not embedding:
-                return None
+            if match and match.get("is_scam"):
+                print(f"[ScamDetector] ⚠️ Similar to known scam: {match['contract_address'][:10]}... (similarity: {match['similarity']:.2%})")
+                return match
             
-            # Call Supabase RPC function
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{supabase_url}/rest/v1/rpc/find_similar_scams",
-                    json={
-                        "query_embedding": embedding,
-                        "similarity_threshold": threshold,
-                        "max_results": 1
-                    },
-                    headers={
-                        "apikey": supabase_key,
-                        "Authorization": f"Bearer {supabase_key}",
-                        "Content-Type": "application/json"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    results = response.json()
-                    if results and len(results) > 0:
-                        match = results[0]
-                        if match.get("is_scam"):
-                            print(f"[ScamDetector] ⚠️ Similar to known scam: {match['contract_address'][:10]}... (similarity: {match['similarity']:.2%})")
-                            return match
-                
-                return None
+            return None
                 
         except Exception as e:
             print(f"[ScamDetector] Similarity search error: {e}")
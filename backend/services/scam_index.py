@@ -0,0 +1,314 @@
+"""
+Scam Fingerprint Index
+Local nearest-neighbor search over stored contract embeddings
+
+WHY: find_similar_scam() made a Supabase pgvector RPC (fresh HTTP client, full
+round-trip) for every contract checked, and failed open whenever Supabase was
+slow or down.
+
+DESIGN:
+- NumPy matrix of L2-normalized embeddings (float32, grown by doubling) -
+  cosine similarity is one matrix-vector product; search_batch() screens many
+  contracts with one matrix-matrix product
+- Exact-match map source_hash -> row (identical normalized source = similarity 1.0);
+  rows without an embedding get a zero vector and are only found this way
+- One row per contract address (re-analysis replaces the row)
+- Persisted under data/scam_index/: snapshot.npz (matrix + metadata) plus an
+  append-only tail.jsonl; every add() appends one line, and the tail is folded
+  into a new snapshot every `compact_every` rows (atomic replace)
+- sync_from_supabase() pulls rows created since the last sync, so fingerprints
+  stored by other instances show up locally
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data" / "scam_index"
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+
+
+class ScamFingerprintIndex:
+    """
+    In-memory cosine index over scam fingerprints with disk persistence.
+
+    USAGE:
+        scam_index.add("0x...", embedding, source_hash=h, risk_score=85, risk_level="CRITICAL", is_scam=True)
+        match = scam_index.search(embedding, threshold=0.95)
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = None,
+        dim: int = EMBEDDING_DIM,
+        compact_every: int = 500,
+        sync_interval: float = 300
+    ):
+        self.data_dir = Path(data_dir or os.getenv("SCAM_INDEX_DIR", DEFAULT_DATA_DIR))
+        self.snapshot_file = self.data_dir / "snapshot.npz"
+        self.tail_file = self.data_dir / "tail.jsonl"
+        self.dim = dim
+        self.compact_every = compact_every
+        self.sync_interval = sync_interval
+
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._meta: List[Dict[str, Any]] = []
+        self._size = 0
+        self._by_address: Dict[str, int] = {}
+        self._by_source_hash: Dict[str, int] = {}
+        self._tail_rows = 0
+        self._loaded = False
+        self.last_synced_at: Optional[str] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._last_sync_attempt = 0.0
+
+        self._stats = {"searches": 0, "hits": 0, "exact_hits": 0, "added": 0, "synced": 0, "compactions": 0}
+
+    # ==========================================
+    # PERSISTENCE
+    # ==========================================
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if self.snapshot_file.exists():
+                with np.load(self.snapshot_file, allow_pickle=False) as data:
+                    vectors = data["vectors"]
+                    header = json.loads(str(data["meta"]))
+                for meta, vector in zip(header["rows"], vectors):
+                    self._put(meta, vector)
+                self.last_synced_at = header.get("last_synced_at")
+            if self.tail_file.exists():
+                with open(self.tail_file) as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Torn last line after a crash
+                        self._put(item["meta"], np.asarray(item["embedding"], dtype=np.float32))
+                        self._tail_rows += 1
+                        if item.get("synced_at"):
+                            self.last_synced_at = max(self.last_synced_at or "", item["synced_at"])
+            if self._size:
+                logger.info(f"[ScamIndex] Loaded {self._size} fingerprints")
+        except Exception as e:
+            logger.error(f"[ScamIndex] Load failed, starting empty: {e}")
+
+    def _append_tail(self, meta: Dict[str, Any], vector: np.ndarray, synced_at: str = None):
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.tail_file, "a") as f:
+                f.write(json.dumps({
+                    "meta": meta,
+                    "embedding": [round(float(x), 6) for x in vector],
+                    "synced_at": synced_at
+                }) + "\n")
+            self._tail_rows += 1
+        except Exception as e:
+            logger.error(f"[ScamIndex] Could not persist {meta.get('contract_address', '')[:10]}: {e}")
+        if self._tail_rows >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Fold the tail into a fresh snapshot (atomic replace)"""
+        try:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_file.with_suffix(".tmp.npz")
+            header = json.dumps({"rows": self._meta[:self._size], "last_synced_at": self.last_synced_at})
+            np.savez(tmp, vectors=self._vectors[:self._size], meta=np.array(header))
+            os.replace(tmp, self.snapshot_file)
+            self.tail_file.unlink(missing_ok=True)
+            self._tail_rows = 0
+            self._stats["compactions"] += 1
+        except Exception as e:
+            logger.error(f"[ScamIndex] Compaction failed: {e}")
+
+    # ==========================================
+    # WRITES
+    # ==========================================
+
+    def _normalize(self, embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _put(self, meta: Dict[str, Any], vector: np.ndarray):
+        """Insert or replace the row for meta['contract_address'] (vector already normalized)"""
+        address = meta["contract_address"].lower()
+        row = self._by_address.get(address)
+        if row is None:
+            if self._size == len(self._vectors):
+                grown = np.zeros((max(64, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            row = self._size
+            self._size += 1
+            self._meta.append(meta)
+            self._by_address[address] = row
+        else:
+            old_hash = self._meta[row].get("source_hash")
+            if old_hash and self._by_source_hash.get(old_hash) == row:
+                del self._by_source_hash[old_hash]
+            self._meta[row] = meta
+        self._vectors[row] = vector
+        if meta.get("source_hash"):
+            self._by_source_hash[meta["source_hash"]] = row
+
+    def add(
+        self,
+        contract_address: str,
+        embedding,
+        source_hash: str = None,
+        risk_score: int = 50,
+        risk_level: str = "UNKNOWN",
+        is_scam: bool = False,
+        synced_at: str = None
+    ) -> bool:
+        """Add (or replace) one contract's fingerprint and persist it"""
+        self.ensure_loaded()
+        vector = self._normalize(embedding) if embedding is not None else None
+        if vector is None:
+            if not source_hash:
+                return False
+            vector = np.zeros(self.dim, dtype=np.float32)  # Exact-hash matches only
+        meta = {
+            "contract_address": contract_address.lower(),
+            "source_hash": source_hash,
+            "risk_score": risk_score,
+            "risk_level": risk_level,
+            "is_scam": bool(is_scam),
+        }
+        self._put(meta, vector)
+        self._append_tail(meta, vector, synced_at)
+        self._stats["added"] += 1
+        return True
+
+    # ==========================================
+    # SEARCH
+    # ==========================================
+
+    def _result(self, row: int, similarity: float) -> Dict[str, Any]:
+        return {**self._meta[row], "similarity": float(similarity)}
+
+    def find_by_source_hash(self, source_hash: str) -> Optional[Dict[str, Any]]:
+        """Exact match on the normalized-source fingerprint"""
+        self.ensure_loaded()
+        row = self._by_source_hash.get(source_hash)
+        if row is None:
+            return None
+        self._stats["exact_hits"] += 1
+        return self._result(row, 1.0)
+
+    def search(self, embedding, threshold: float = 0.95) -> Optional[Dict[str, Any]]:
+        """Most similar stored contract with cosine similarity >= threshold"""
+        return self.search_batch([embedding], threshold)[0]
+
+    def search_batch(self, embeddings: List, threshold: float = 0.95) -> List[Optional[Dict[str, Any]]]:
+        """Nearest stored contract per query (one matrix product for the whole batch)"""
+        self.ensure_loaded()
+        self._stats["searches"] += len(embeddings)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(embeddings)
+        if not self._size:
+            return results
+
+        queries, positions = [], []
+        for i, embedding in enumerate(embeddings):
+            vector = self._normalize(embedding) if embedding is not None else None
+            if vector is not None:
+                queries.append(vector)
+                positions.append(i)
+        if not queries:
+            return results
+
+        similarities = np.stack(queries) @ self._vectors[:self._size].T
+        best = similarities.argmax(axis=1)
+        for q, i in enumerate(positions):
+            score = similarities[q, best[q]]
+            if score >= threshold:
+                results[i] = self._result(int(best[q]), score)
+                self._stats["hits"] += 1
+        return results
+
+    # ==========================================
+    # SUPABASE SYNC
+    # ==========================================
+
+    async def sync_from_supabase(self, page_size: int = 1000) -> int:
+        """Pull fingerprints created since the last sync. Returns rows added."""
+        from infrastructure.supabase_client import supabase
+
+        self.ensure_loaded()
+        added = 0
+        while True:
+            params = {
+                "select": "contract_address,source_hash,embedding,risk_score,risk_level,is_scam,created_at",
+                "embedding": "not.is.null",
+                "order": "created_at.asc",
+                "limit": str(page_size),
+            }
+            if self.last_synced_at:
+                params["created_at"] = f"gt.{self.last_synced_at}"
+            rows = await supabase._request("GET", "scam_fingerprints", params=params)
+            if not rows:
+                break
+            for row in rows:
+                embedding = row.get("embedding")
+                if isinstance(embedding, str):
+                    embedding = json.loads(embedding)  # pgvector is returned as "[0.1,...]"
+                if self.add(
+                    row["contract_address"], embedding,
+                    source_hash=row.get("source_hash"),
+                    risk_score=row.get("risk_score", 50),
+                    risk_level=row.get("risk_level", "UNKNOWN"),
+                    is_scam=row.get("is_scam", False),
+                    synced_at=row.get("created_at")
+                ):
+                    added += 1
+                self.last_synced_at = row.get("created_at") or self.last_synced_at
+            if len(rows) < page_size:
+                break
+
+        self._stats["synced"] += added
+        if added:
+            logger.info(f"[ScamIndex] Synced {added} fingerprints from Supabase")
+        return added
+
+    def schedule_sync(self):
+        """Start a background sync if the last one is older than sync_interval (never blocks)"""
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        if self._last_sync_attempt and time.monotonic() - self._last_sync_attempt < self.sync_interval:
+            return
+        self._last_sync_attempt = time.monotonic()
+        self._sync_task = asyncio.create_task(self._sync_quietly())
+
+    async def _sync_quietly(self):
+        try:
+            await self.sync_from_supabase()
+        except Exception as e:
+            logger.warning(f"[ScamIndex] Supabase sync failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "fingerprints": self._size,
+            "scams": sum(1 for m in self._meta[:self._size] if m.get("is_scam")),
+            "tail_rows": self._tail_rows,
+            "last_synced_at": self.last_synced_at,
+        }
+
+
+# Global index instance
+scam_index = ScamFingerprintIndex()
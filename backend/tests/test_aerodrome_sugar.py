@@ -0,0 +1,77 @@
+"""
+Aerodrome Sugar Snapshot Tests
+==============================
+
+Full paged snapshot with LP / gauge / token-pair indexes, shared refresh
+and background revalidation. Sugar RPC pages are faked.
+
+Run: python -m pytest tests/test_aerodrome_sugar.py -v
+"""
+
+import asyncio
+import pytest
+
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+WETH = "0x4200000000000000000000000000000000000006"
+ZERO = "0x" + "0" * 40
+
+
+def make_pool(i):
+    return {
+        "lp": f"0x{i:040X}",
+        "token0": WETH if i % 2 else USDC,
+        "token1": USDC if i % 2 else WETH,
+        "gauge": f"0x{i + 1000:040x}" if i != 3 else ZERO,
+        "tvlUsd": 1_000_000, "apy": 10, "gauge_alive": True,
+    }
+
+
+POOLS = [make_pool(i) for i in range(7)]
+
+
+@pytest.fixture
+def sugar():
+    from data_sources.aerodrome_sugar import AerodromeSugar
+    s = AerodromeSugar(rpc_url="http://localhost:1", page_size=3, max_concurrent_pages=2)
+    s.page_calls = []
+
+    async def fake_fetch_page(limit, offset):
+        s.page_calls.append(offset)
+        await asyncio.sleep(0.01)
+        return [dict(p) for p in POOLS[offset:offset + limit]]
+
+    s._fetch_page = fake_fetch_page
+    return s
+
+
+@pytest.mark.asyncio
+async def test_snapshot_pages_and_indexes(sugar):
+    pool = await sugar.get_pool_by_address(POOLS[5]["lp"].lower())
+
+    assert sorted(sugar.page_calls) == [0, 3, 6, 9]
+    assert pool["lp"] == POOLS[5]["lp"]
+    assert [p["lp"] for p in await sugar.get_all_pools(limit=2, offset=1)] == [POOLS[1]["lp"], POOLS[2]["lp"]]
+    assert (await sugar.get_pool_by_gauge(POOLS[2]["gauge"].upper()))["lp"] == POOLS[2]["lp"]
+    assert ZERO not in sugar.by_gauge
+    assert len(await sugar.get_pools_by_tokens(USDC, WETH)) == 7
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_refresh(sugar):
+    await asyncio.gather(*(sugar.get_pool_by_address(p["lp"]) for p in POOLS))
+    assert len(sugar.page_calls) == 4, "One paged refresh for all callers"
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_served_while_refreshing(sugar):
+    await sugar.ensure_snapshot()
+    sugar.loaded_at -= sugar.cache_ttl + 1
+    old_pool = sugar.by_lp[POOLS[0]["lp"].lower()]
+
+    assert await sugar.get_pool_by_address(POOLS[0]["lp"]) is old_pool
+    await sugar._background
+
+    assert len(sugar.page_calls) == 8
+    assert sugar.by_lp[POOLS[0]["lp"].lower()] is not old_pool
+    assert sugar.get_stats()["pools"] == 7
+    assert len(sugar.by_pair[sugar._pair_key(USDC, WETH)]) == 7, "Upserts must not duplicate pair entries"
@@ -0,0 +1,133 @@
+"""
+Telegram Alert Dispatcher Tests
+===============================
+
+Messages fan out concurrently but stay ordered per chat, flood-control
+errors are retried after the server-given delay, and only delivered alerts
+are logged - in one batch. Fake bot and store; no aiogram needed.
+
+Run: python -m pytest tests/test_alert_dispatcher.py -v
+"""
+
+import importlib.util
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Loaded from its file: tg_handlers/__init__ starts the aiogram bot
+_spec = importlib.util.spec_from_file_location(
+    "alert_dispatcher_under_test",
+    Path(__file__).parent.parent / "tg_handlers" / "services" / "alert_dispatcher.py",
+)
+alert_dispatcher = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(alert_dispatcher)
+
+AlertDispatcher = alert_dispatcher.AlertDispatcher
+OutboundMessage = alert_dispatcher.OutboundMessage
+
+
+class RetryAfter(Exception):
+    """Shaped like aiogram's TelegramRetryAfter"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Flood control: retry after {retry_after}")
+        self.retry_after = retry_after
+
+
+class FakeBot:
+
+    def __init__(self):
+        self.sent = []        # (chat_id, text, monotonic time)
+        self.failures = {}    # text -> list of exceptions to raise before succeeding
+
+    async def send_message(self, chat_id, text, **options):
+        pending = self.failures.get(text)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+class FakeStore:
+
+    def __init__(self):
+        self.calls = []
+
+    async def log_alerts(self, rows):
+        self.calls.append(list(rows))
+
+
+@pytest.fixture
+def dispatcher():
+    return AlertDispatcher(global_rate=1000, private_interval=0.01, group_interval=0.02, max_retries=2)
+
+
+def texts_for(bot, chat_id):
+    return [text for chat, text, _ in bot.sent if chat == chat_id]
+
+
+class TestAlertDispatcher:
+
+    @pytest.mark.asyncio
+    async def test_messages_to_one_chat_stay_in_order(self, dispatcher):
+        bot, store = FakeBot(), FakeStore()
+        messages = [OutboundMessage(chat, f"{chat}-{i}") for i in range(5) for chat in (1, 2, -100)]
+
+        sent = await dispatcher.dispatch(bot, messages, store=store)
+
+        assert sent == 15
+        for chat in (1, 2, -100):
+            assert texts_for(bot, chat) == [f"{chat}-{i}" for i in range(5)]
+        assert store.calls == []  # No alert_type - nothing to log
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pushes_chat_slot_back(self, dispatcher):
+        bot = FakeBot()
+        bot.failures["first"] = [RetryAfter(0.2)]
+        bot.failures["other"] = [RetryAfter(timedelta(milliseconds=50))]
+        started = time.monotonic()
+
+        sent = await dispatcher.dispatch(bot, [
+            OutboundMessage(1, "first"), OutboundMessage(1, "second"), OutboundMessage(2, "other"),
+        ], store=FakeStore())
+
+        assert sent == 3
+        assert texts_for(bot, 1) == ["first", "second"]
+        first_at = next(t for _, text, t in bot.sent if text == "first")
+        assert first_at - started >= 0.2           # Waited the server-given delay
+        assert dispatcher.get_stats()["retries"] == 2
+
+        # The other chat isn't held up by chat 1's back-off
+        other_at = next(t for _, text, t in bot.sent if text == "other")
+        assert other_at < first_at
+
+    @pytest.mark.asyncio
+    async def test_retries_are_bounded(self, dispatcher):
+        bot = FakeBot()
+        bot.failures["flood"] = [RetryAfter(0.01) for _ in range(5)]
+
+        assert await dispatcher.send(bot, 1, "flood") is False
+        assert dispatcher.get_stats()["retries"] == 2
+        assert dispatcher.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_delivered_alerts_are_logged_once(self, dispatcher):
+        bot, store = FakeBot(), FakeStore()
+        bot.failures["blocked"] = [RuntimeError("Forbidden: bot was blocked by the user")]
+
+        sent = await dispatcher.dispatch(bot, [
+            OutboundMessage(1, "new pool A", "new_pool", "pool-a"),
+            OutboundMessage(2, "blocked", "new_pool", "pool-a"),
+            OutboundMessage(3, "new pool B", "new_pool", "pool-b", log_message="B summary"),
+            OutboundMessage(3, "digest"),  # Not an alert
+        ], store=store)
+
+        assert sent == 3
+        assert len(store.calls) == 1
+        assert sorted(store.calls[0]) == [
+            (1, "new_pool", "pool-a", "new pool A"),
+            (3, "new_pool", "pool-b", "B summary"),
+        ]
+        assert dispatcher.get_stats()["logged"] == 2
+        assert dispatcher.get_stats()["failed"] == 1
@@ -0,0 +1,138 @@
+"""
+Backtest Engine Tests
+=====================
+
+History store round-trips DefiLlama chart points into a pools x days panel,
+the bulk downloader only fetches stale pools, and the engine replays
+rank_and_select and PositionMonitor exit rules. No network needed.
+
+Run: python -m pytest tests/test_backtest_engine.py -v
+"""
+
+import httpx
+import numpy as np
+import pytest
+
+from agents.backtest_engine import BacktestEngine, classify_pair
+from agents.position_monitor import PositionMonitor
+from agents.strategy_executor import StrategyExecutor
+from data_sources.pool_history import PoolHistoryStore, download_histories
+
+DAYS = 30
+
+
+def points(apys, tvl=5_000_000, start="2025-01-01"):
+    day0 = np.datetime64(start, "D")
+    return [{"timestamp": f"{day0 + i}T23:00:00.000Z", "apy": apy, "tvlUsd": tvl}
+            for i, apy in enumerate(apys)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PoolHistoryStore(str(tmp_path / "history.db"))
+    store.upsert_pools([
+        {"pool": "steady", "chain": "Base", "project": "aave-v3", "symbol": "USDC", "stablecoin": True},
+        {"pool": "fading", "chain": "Base", "project": "aerodrome-v2", "symbol": "WETH-USDC", "stablecoin": False},
+        {"pool": "backup", "chain": "Base", "project": "morpho-blue", "symbol": "USDC", "stablecoin": True},
+        {"pool": "mainnet", "chain": "Ethereum", "project": "aave-v3", "symbol": "USDC", "stablecoin": True},
+    ])
+    store.save_history("steady", points([20.0] * DAYS))
+    store.save_history("fading", points([80.0] * 10 + [5.0] * (DAYS - 10)))
+    store.save_history("backup", points([15.0] * DAYS))
+    store.save_history("mainnet", points([90.0] * DAYS))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def engine(store):
+    return BacktestEngine(store.load_panel(["steady", "fading", "backup", "mainnet"]),
+                          executor=StrategyExecutor(), monitor=PositionMonitor())
+
+
+AGENT = {"chain": "base", "min_apy": 10, "min_tvl": 1_000_000, "vault_count": 2,
+         "risk_level": "high", "duration": {"days": 0}}
+
+
+class TestHistoryStore:
+
+    def test_panel_scatter(self, store):
+        store.save_history("late", points([7.0, None], start="2025-01-29"))
+        panel = store.load_panel(["late", "steady"], start="2025-01-28")
+
+        assert panel.days[0] == np.datetime64("2025-01-28")
+        assert panel.apy.shape == (2, 3)
+        assert np.isnan(panel.apy[0, 0]) and panel.apy[0, 1] == 7.0 and np.isnan(panel.apy[0, 2])
+        assert panel.apy[1].tolist() == [20.0, 20.0, 20.0]
+        assert panel.pools[1]["project"] == "aave-v3"
+
+    @pytest.mark.asyncio
+    async def test_downloader_skips_fresh_pools(self, store):
+        requested = []
+
+        def handler(request):
+            requested.append(request.url.path)
+            return httpx.Response(200, json={"data": points([1.0, 2.0], start=str(np.datetime64("today", "D") - 1))})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await download_histories(["new-a", "new-b", "steady"], store, client=client)
+            second = await download_histories(["new-a", "new-b"], store, client=client)
+
+        # "steady" ends in 2025-01 -> stale; new pools are current after one download
+        assert first["downloaded"] == 3 and first["points"] == 6
+        assert second["skipped"] == 2 and second["downloaded"] == 0
+        assert sorted(requested) == ["/chart/new-a", "/chart/new-b", "/chart/steady"]
+        assert [p["apy"] for p in store.history("new-a")] == [1.0, 2.0]
+
+
+class TestBacktestEngine:
+
+    def test_apy_exit_reinvests_into_next_best(self, engine):
+        result = engine.run(AGENT, capital=10_000)
+
+        first = [t["pool"] for t in result.trades if t["entry_day"] == 0]
+        assert first == ["fading", "steady"]  # Ranked by rank_and_select, Ethereum filtered out
+
+        fading = result.trades[0]
+        assert fading["trigger"] == "apy" and fading["exit_day"] == 10  # APY 5% < min 10%
+        reinvest = [t for t in result.trades if t["entry_day"] == 10]
+        assert [t["pool"] for t in reinvest] == ["steady"]  # Best pool except the one exited
+        assert result.exits == {"apy": 1, "end": 2}
+        assert result.final_value > 10_000
+
+    def test_duration_expiry_closes_everything(self, engine):
+        result = engine.run({**AGENT, "duration": {"days": 5}}, capital=10_000)
+        assert result.days == 5
+        assert result.exits == {"duration": 2}
+        assert all(t["exit_day"] == 5 for t in result.trades)
+
+    def test_value_matches_compounded_daily_yield(self, engine):
+        result = engine.run({**AGENT, "protocols": ["aave"], "vault_count": 1, "max_allocation": 100}, capital=1_000)
+        (trade,) = result.trades
+        entry = 1_000 - engine.gas_cost_usd
+        assert trade["exit_value"] == pytest.approx(entry * (1 + 20 / 365 / 100) ** (DAYS - 1))
+        assert result.final_value == pytest.approx(trade["exit_value"] - engine.gas_cost_usd)
+
+    def test_stop_loss_from_pro_config(self, store):
+        store.save_history("fading", points([80.0] * DAYS))
+        engine = BacktestEngine(store.load_panel(["fading"]), il_monthly={"volatile": 60.0},
+                                executor=StrategyExecutor(), monitor=PositionMonitor())
+        agent = {**AGENT, "vault_count": 1, "pro_config": {"stopLossPercent": 10}}
+        result = engine.run(agent)
+        assert result.trades[0]["trigger"] == "stop_loss"
+
+    def test_sweep(self, engine):
+        configs = [{**AGENT, "min_apy": m, "vault_count": v} for m in (10, 50, 100) for v in (1, 2)]
+        results = engine.sweep(configs, capital=10_000)
+        assert len(results) == 6
+        assert all(r.trades == [] and r.final_value == 10_000 for r in results if r.agent["min_apy"] == 100)
+
+    def test_selection_is_silent(self, engine, capsys):
+        engine.run({**AGENT, "avoid_il": True})
+        assert "[StrategyExecutor]" not in capsys.readouterr().out
+
+    def test_classify_pair(self):
+        assert classify_pair("USDC") == "single"
+        assert classify_pair("USDC-USDT") == "stablecoin"
+        assert classify_pair("WETH/CBBTC") == "correlated"
+        assert classify_pair("USDC-DEGEN") == "volatile"
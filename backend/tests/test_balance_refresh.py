@@ -0,0 +1,126 @@
+"""
+Balance Refresh Pipeline Tests
+==============================
+
+All agents' balances are read through chunked Multicall3 requests and
+persisted in one write-behind flush. RPC and Supabase are faked.
+
+Run: python -m pytest tests/test_balance_refresh.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+WETH_USDC_LP = "0xb4cb800910B228ED3d0834cF79D697127BBB00e5"
+LP_HOLDER = "0x" + "1" * 40
+
+
+def fake_results(calls):
+    """Every agent holds 5 USDC; LP_HOLDER also holds 1% of the WETH/USDC LP"""
+    results = []
+    for contract, fn, args in calls:
+        if fn == "getReserves":
+            results.append((True, (10 * 10**18, 40_000 * 10**6, 0)))
+        elif fn == "totalSupply":
+            results.append((True, 100 * 10**18))
+        elif fn == "balanceOf" and contract.address.lower() == USDC.lower():
+            results.append((True, 5 * 10**6))
+        elif fn == "balanceOf" and contract.address.lower() == WETH_USDC_LP.lower() and args[0] == LP_HOLDER:
+            results.append((True, 1 * 10**18))
+        else:
+            results.append((True, 0))
+    return results
+
+
+@pytest.mark.asyncio
+async def test_refresh_batches_all_agents():
+    from agents import balance_refresh_job
+
+    agents = {
+        "0xuser1": [{"agent_address": LP_HOLDER}, {"agent_address": "0x" + "2" * 40}],
+        "0xuser2": [{"agent_address": "0x" + "3" * 40}, {"name": "no address"}],
+    }
+    batched_calls = []
+
+    async def fake_execute_batched(w3, calls, chunk_size, max_concurrency):
+        batched_calls.append(len(calls))
+        return fake_results(calls)
+
+    supabase = MagicMock()
+    supabase.save_agent_balances = AsyncMock(return_value=True)
+    write_behind = MagicMock()
+    write_behind.flush = AsyncMock(return_value=3)
+
+    with patch("api.agent_config_router.DEPLOYED_AGENTS", agents), \
+         patch("data_sources.multicall.execute_batched", fake_execute_batched), \
+         patch("api.portfolio_router.fetch_lp_apys", AsyncMock(return_value={WETH_USDC_LP.lower(): 12.5})), \
+         patch("infrastructure.supabase_client.supabase", supabase), \
+         patch("infrastructure.write_behind.write_behind", write_behind):
+        stats = await balance_refresh_job.refresh_agent_balances()
+
+    assert len(batched_calls) == 1, "All agents must share one batched multicall pass"
+    assert stats["agents"] == 3 and stats["refreshed"] == 3 and stats["errors"] == 0
+    assert {"collect_ms", "rpc_ms", "apy_ms", "build_ms", "persist_ms"} <= set(stats["stages"])
+    write_behind.flush.assert_awaited_once()
+
+    saved = {c.kwargs["agent_address"]: c.kwargs for c in supabase.save_agent_balances.await_args_list}
+    assert saved["0x" + "2" * 40]["total_value_usd"] == 5.0
+    lp = saved[LP_HOLDER]["positions"][0]
+    assert lp["pool_name"] == "WETH/USDC" and lp["value_usd"] == 800.0 and lp["apy"] == 12.5
+
+
+@pytest.mark.asyncio
+async def test_failed_rpc_does_not_overwrite_balances():
+    from agents import balance_refresh_job
+
+    async def failing_execute_batched(w3, calls, chunk_size, max_concurrency):
+        return [(False, None) for _ in calls]
+
+    supabase = MagicMock()
+    supabase.save_agent_balances = AsyncMock()
+    with patch("api.agent_config_router.DEPLOYED_AGENTS", {"0xuser": [{"agent_address": LP_HOLDER}]}), \
+         patch("data_sources.multicall.execute_batched", failing_execute_batched), \
+         patch("api.portfolio_router.fetch_lp_apys", AsyncMock(return_value={})), \
+         patch("infrastructure.supabase_client.supabase", supabase), \
+         patch("infrastructure.write_behind.write_behind", MagicMock(flush=AsyncMock())):
+        stats = await balance_refresh_job.refresh_agent_balances()
+
+    assert stats["errors"] == 1
+    supabase.save_agent_balances.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_agent_spanning_a_failed_chunk_is_skipped():
+    from agents import balance_refresh_job
+    from api.portfolio_router import ALL_TOKENS, LP_TOKENS
+
+    per_agent = len(ALL_TOKENS) + 1 + len(LP_TOKENS)
+    # LP state, then agent 1, then half of agent 2 - the rest of agent 2 is in chunk 2
+    chunk_size = 2 * len(LP_TOKENS) + per_agent + per_agent // 2
+    spanning = "0x" + "2" * 40
+    agent_results = {}
+
+    async def second_chunk_fails(w3, calls, chunk_size, max_concurrency):
+        results = fake_results(calls)
+        failed = [(False, None)] * len(results[chunk_size:2 * chunk_size])
+        results[chunk_size:2 * chunk_size] = failed
+        agent_results["spanning"] = results[-per_agent:]
+        return results
+
+    supabase = MagicMock()
+    supabase.save_agent_balances = AsyncMock(return_value=True)
+    agents = {"0xuser": [{"agent_address": LP_HOLDER}, {"agent_address": spanning}]}
+    with patch("api.agent_config_router.DEPLOYED_AGENTS", agents), \
+         patch.object(balance_refresh_job, "CHUNK_SIZE", chunk_size), \
+         patch("data_sources.multicall.execute_batched", second_chunk_fails), \
+         patch("api.portfolio_router.fetch_lp_apys", AsyncMock(return_value={})), \
+         patch("infrastructure.supabase_client.supabase", supabase), \
+         patch("infrastructure.write_behind.write_behind", MagicMock(flush=AsyncMock())):
+        stats = await balance_refresh_job.refresh_agent_balances()
+
+    oks = {ok for ok, _ in agent_results["spanning"]}
+    assert oks == {True, False}, "Agent 2 must straddle the failed chunk"
+    assert stats["refreshed"] == 1 and stats["errors"] == 1
+    saved = [c.kwargs["agent_address"] for c in supabase.save_agent_balances.await_args_list]
+    assert saved == [LP_HOLDER]
@@ -0,0 +1,120 @@
+"""
+DefiLlama Pool Catalog Tests
+============================
+
+Index lookups must return the same pools (in the same order) as the old
+linear scans over the DefiLlama payload, and every chain's yields view comes
+from one shared download. No network needed.
+
+Run: python -m pytest tests/test_defillama_catalog.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+WETH = "0x4200000000000000000000000000000000000006"
+POOL_A = "0x" + "a" * 40
+POOL_B = "0x" + "b" * 40
+
+POOLS = [
+    {"pool": f"{POOL_A}-base", "chain": "Base", "project": "aerodrome-v1", "symbol": "WETH-USDC",
+     "underlyingTokens": [WETH, USDC], "apy": 12.0},
+    {"pool": "uuid-1234", "chain": "Ethereum", "project": "aave-v3", "symbol": "USDC",
+     "underlyingTokens": [USDC.upper()], "apy": 4.0},
+    {"pool": f"{POOL_B}-base", "chain": "Base", "project": "uniswap-v3", "symbol": "USDC/WETH",
+     "underlyingTokens": [USDC, WETH], "apy": 20.0},
+    {"pool": "So1anaPoolId-solana", "chain": "Solana", "project": "raydium", "symbol": "SOL-USDC",
+     "underlyingTokens": None, "apy": 30.0},
+]
+
+
+@pytest.fixture
+def catalog():
+    from data_sources.defillama_catalog import DefiLlamaPoolCatalog
+    c = DefiLlamaPoolCatalog()
+    c.load(POOLS)
+    return c
+
+
+class TestCatalogLookups:
+
+    def test_id_and_address(self, catalog):
+        assert catalog.get_by_id("UUID-1234")["project"] == "aave-v3"
+        assert catalog.find_by_address(POOL_A.upper()) == [POOLS[0]]
+        assert catalog.find_by_address(POOL_A, chain="ethereum") == []
+        # Non-EVM ids fall back to a substring scan
+        assert catalog.find_by_address("so1anapoolid") == [POOLS[3]]
+
+    def test_pair_lookup_keeps_payload_order(self, catalog):
+        assert catalog.find_by_tokens(WETH, USDC) == [POOLS[0], POOLS[2]]
+        assert catalog.find_by_tokens(USDC, WETH, chain="base") == [POOLS[0], POOLS[2]]
+        assert catalog.find_by_token(USDC) == [POOLS[0], POOLS[1], POOLS[2]]
+
+    def test_symbol_is_order_insensitive(self, catalog):
+        assert catalog.find_by_symbol("usdc-weth") == [POOLS[0], POOLS[2]]
+        assert catalog.get_chain("base") == [POOLS[0], POOLS[2]]
+        assert catalog.get_project("Raydium") == [POOLS[3]]
+
+
+class TestCatalogRefresh:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_loads_share_one_download(self):
+        import asyncio
+        from data_sources.defillama_catalog import DefiLlamaPoolCatalog
+        c = DefiLlamaPoolCatalog()
+        c._download = AsyncMock(return_value=POOLS)
+
+        results = await asyncio.gather(*(c.ensure_loaded() for _ in range(5)))
+
+        assert c._download.await_count == 1
+        assert all(r is POOLS for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_old_snapshot(self, catalog):
+        catalog.loaded_at = 0  # stale
+        catalog._download = AsyncMock(side_effect=RuntimeError("timeout"))
+
+        assert await catalog.ensure_loaded() is POOLS
+        await catalog._refresh_task
+
+        assert catalog.pools is POOLS
+        assert catalog.get_stats()["refresh_errors"] == 1
+
+
+class TestChainViews:
+
+    def test_view_built_once_per_snapshot(self, catalog):
+        build = lambda pools: {"count": len(pools)}
+        assert catalog.view("count", build) is catalog.view("count", build)
+        assert catalog.get_stats()["views_built"] == 1
+
+        catalog.load(POOLS[:2])
+        assert catalog.view("count", build) == {"count": 2}
+
+    @pytest.mark.asyncio
+    async def test_all_chains_served_from_one_download(self, monkeypatch):
+        import asyncio
+        import data_sources.defillama_catalog as catalog_module
+        from artisan.data_sources import fetch_defillama_yields
+
+        c = catalog_module.DefiLlamaPoolCatalog()
+        c._download = AsyncMock(return_value=POOLS + [
+            {"pool": "not-whitelisted", "chain": "Base", "project": "random-farm", "symbol": "XYZ"},
+        ])
+        monkeypatch.setattr(catalog_module, "pool_catalog", c)
+
+        base, eth, sol, arb = await asyncio.gather(*(
+            fetch_defillama_yields(chain) for chain in ["Base", "Ethereum", "Solana", "Arbitrum"]
+        ))
+
+        assert c._download.await_count == 1
+        assert [p["project"] for p in base] == ["aerodrome-v1", "uniswap-v3"]
+        assert [p["project"] for p in eth] == ["aave-v3"]
+        assert [p["project"] for p in sol] == ["raydium"]
+        assert arb == []
+        assert base[0]["_source"] == "defillama"
+        # Tagging copies - the shared snapshot stays untouched
+        assert "_source" not in c.pools[0]
+        assert await fetch_defillama_yields("base") is base
@@ -0,0 +1,55 @@
+"""
+Deposit Monitor Balance Tests
+=============================
+
+Balances for all agents come from one batched Multicall3 pass pinned to a
+block; failed reads must not show up as phantom deposits.
+
+Run: python -m pytest tests/test_deposit_monitor.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+AGENT_A = "0x" + "a" * 40
+AGENT_B = "0x" + "b" * 40
+
+
+@pytest.fixture
+def monitor():
+    from agents.deposit_monitor import DepositMonitor
+    m = DepositMonitor()
+    m.w3 = MagicMock()
+    m.w3.eth.block_number = 123
+    return m
+
+
+@pytest.mark.asyncio
+async def test_balances_for_all_agents_in_one_batch(monitor):
+    seen = {}
+
+    async def fake_execute_batched(w3, calls, block_identifier=None, **kwargs):
+        seen["calls"], seen["block"] = len(calls), block_identifier
+        # ETH + 4 tokens per agent; agent B's USDC read fails
+        return [(True, 1), (True, 10), (True, 0), (True, 0), (True, 0),
+                (True, 2), (False, None), (True, 0), (True, 0), (True, 0)]
+
+    with patch("data_sources.multicall.Multicall3", MagicMock()), \
+         patch("data_sources.multicall.execute_batched", fake_execute_batched), \
+         patch("agents.deposit_monitor.Web3.to_checksum_address", side_effect=lambda a: a):
+        balances = await monitor.get_balances_batch([AGENT_A, AGENT_B])
+
+    assert seen == {"calls": 10, "block": 123}
+    assert balances[AGENT_A]["USDC"] == 10
+    assert "USDC" not in balances[AGENT_B] and balances[AGENT_B]["ETH"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_read_keeps_previous_balance(monitor):
+    monitor.last_balances[AGENT_A] = {"ETH": 1, "USDC": 10}
+    monitor.trigger_allocation = AsyncMock()
+
+    await monitor.check_agent_balance({"agent_address": AGENT_A}, {"ETH": 1})
+
+    monitor.trigger_allocation.assert_not_awaited()
+    assert monitor.last_balances[AGENT_A]["USDC"] == 10
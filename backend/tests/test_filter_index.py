@@ -0,0 +1,215 @@
+"""
+Telegram User Filter Index Tests
+================================
+
+UserFilterIndex.match must return exactly the users a full scan with
+pool_matches_filters() returns, in user order - checked on randomized users
+and pools around every bucket edge. Alert generation and new-pool detection
+through the index need the bot's dependencies (aiogram, aiosqlite) and skip
+without them.
+
+Run: python -m pytest tests/test_filter_index.py -v
+"""
+
+import importlib.util
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+# Loaded from its file: tg_handlers/__init__ starts the aiogram bot, this module is stdlib-only
+_spec = importlib.util.spec_from_file_location(
+    "filter_index_under_test",
+    Path(__file__).parent.parent / "tg_handlers" / "services" / "filter_index.py",
+)
+filter_index = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(filter_index)
+
+UserFilterIndex = filter_index.UserFilterIndex
+pool_matches_filters = filter_index.pool_matches_filters
+
+CHAINS = ["Base", "Ethereum", "Arbitrum", "Solana"]
+PROJECTS = ["aerodrome-v2", "aerodrome-slipstream", "aave-v3", "morpho-blue", "uniswap-v3", "curve-dex"]
+PROTOCOL_TERMS = ["aero", "aerodrome", "aave", "morpho", "uni", "v3", "curve", "slip"]
+SYMBOLS = ["USDC", "WETH", "WETH-USDC", "USDC/USDT", "AERO-WETH", "DAI", "cbBTC", "FRAX-USDC"]
+RISKS = ["Low", "Medium", "High"]
+
+# Values straddling bucket boundaries (powers of 10 for TVL, powers of 2 for APY)
+TVL_EDGES = [-5, 0, 0.5, 1, 9.99, 10, 10.01, 999_999, 1_000_000, 1_000_001, 1e7, 5e7, 1e13, 1e14]
+APY_EDGES = [-1, 0, 0.5, 1, 1.99, 2, 2.01, 3.99, 4, 16, 63.9, 64, 100, 4096, 8192, 20000]
+
+
+@dataclass
+class User:
+    """The UserConfig fields the index reads"""
+    telegram_id: int
+    chain: str = "all"
+    min_tvl: float = 100000
+    max_tvl: Optional[float] = None
+    min_apy: float = 3.0
+    max_apy: float = 500.0
+    risk_level: str = "all"
+    protocols: List[str] = field(default_factory=list)
+    stablecoin_only: bool = False
+    pool_type: str = "all"
+
+
+def random_users(rng, n=300):
+    return [User(
+        telegram_id=1000 + i,
+        chain=rng.choice(["all", "all"] + [c.lower() for c in CHAINS] + ["Base"]),
+        min_tvl=rng.choice(TVL_EDGES + [rng.uniform(-10, 1e8)]),
+        max_tvl=rng.choice([None, None, 1e6, 1e9, rng.uniform(0, 1e9)]),
+        min_apy=rng.choice(APY_EDGES + [rng.uniform(-5, 500)]),
+        max_apy=rng.choice([500.0, 50.0, 10_000.0, rng.uniform(0, 1000)]),
+        risk_level=rng.choice(["all", "low", "medium", "high"]),
+        protocols=rng.sample(PROTOCOL_TERMS, rng.choice([0, 0, 1, 2])),
+        stablecoin_only=rng.random() < 0.2,
+        pool_type=rng.choice(["all", "all", "single", "dual"]),
+    ) for i in range(n)]
+
+
+def random_pools(rng, n=400):
+    return [{
+        "pool": f"p{i}",
+        "chain": rng.choice(CHAINS),
+        "project": rng.choice(PROJECTS),
+        "symbol": rng.choice(SYMBOLS),
+        "tvl": rng.choice(TVL_EDGES + [rng.uniform(0, 1e8)]),
+        "apy": rng.choice(APY_EDGES + [rng.uniform(0, 1000)]),
+        "risk_level": rng.choice(RISKS),
+    } for i in range(n)]
+
+
+class TestUserFilterIndex:
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_match_equals_full_scan(self, seed):
+        rng = random.Random(seed)
+        users, pools = random_users(rng), random_pools(rng)
+        index = UserFilterIndex(users)
+
+        for pool in pools:
+            expected = [u.telegram_id for u in users if pool_matches_filters(pool, u)]
+            assert [u.telegram_id for u in index.match(pool)] == expected, pool
+
+    def test_bucket_edges_and_negative_minimums(self):
+        users = [User(telegram_id=i, min_tvl=tvl, min_apy=apy)
+                 for i, (tvl, apy) in enumerate((t, a) for t in TVL_EDGES for a in APY_EDGES)]
+        index = UserFilterIndex(users)
+
+        for tvl in TVL_EDGES:
+            for apy in APY_EDGES:
+                pool = {"chain": "Base", "project": "aave-v3", "symbol": "USDC", "tvl": tvl, "apy": apy}
+                expected = [u.telegram_id for u in users if pool_matches_filters(pool, u)]
+                assert [u.telegram_id for u in index.match(pool)] == expected, (tvl, apy)
+
+    def test_chain_all_and_protocol_substrings(self):
+        users = [
+            User(1, chain="all", protocols=["aero"]),
+            User(2, chain="base", protocols=["AERODROME"]),
+            User(3, chain="ethereum"),
+            User(4, chain="Base", protocols=["slip", "morpho"]),
+        ]
+        index = UserFilterIndex(users)
+        pool = {"chain": "Base", "project": "aerodrome-slipstream", "symbol": "WETH-USDC", "tvl": 1e6, "apy": 20}
+
+        assert [u.telegram_id for u in index.match_scope(pool)] == [1, 2, 4]
+        assert [u.telegram_id for u in index.match_scope({**pool, "project": "morpho-blue"})] == [4]
+        assert [u.telegram_id for u in index.match_scope({**pool, "chain": "Ethereum"})] == [1, 3]
+        assert index.match_scope({**pool, "chain": "Solana", "project": "kamino"}) == []
+
+    def test_asset_class_filters(self):
+        users = [
+            User(1, pool_type="single"),
+            User(2, pool_type="dual"),
+            User(3, stablecoin_only=True),
+            User(4, stablecoin_only=True, pool_type="dual"),
+        ]
+        index = UserFilterIndex(users)
+        base = {"chain": "Base", "project": "aave-v3", "tvl": 1e6, "apy": 20}
+
+        assert [u.telegram_id for u in index.match({**base, "symbol": "USDC"})] == [1, 3]
+        assert [u.telegram_id for u in index.match({**base, "symbol": "USDC/USDT"})] == [2, 3, 4]
+        assert [u.telegram_id for u in index.match({**base, "symbol": "WETH"})] == [1]
+        assert [u.telegram_id for u in index.match({**base, "symbol": "AERO-WETH"})] == [2]
+
+
+# ==========================================
+# ALERTS + NEW-POOL DETECTION (bot dependencies)
+# ==========================================
+
+@pytest.fixture
+def bot_modules():
+    pytest.importorskip("aiogram")
+    pytest.importorskip("aiosqlite")
+    from tg_handlers.models.user_config import UserConfig
+    from tg_handlers.services import alerts, new_pool_alert
+    return UserConfig, alerts, new_pool_alert
+
+
+class TestAlertGeneration:
+
+    def test_match_scope_and_per_user_thresholds(self, bot_modules):
+        UserConfig, alerts, _ = bot_modules
+        users = [
+            UserConfig(1, apy_spike_threshold=10, tvl_change_threshold=50),
+            UserConfig(2, apy_spike_threshold=60, tvl_change_threshold=5),
+            UserConfig(3, chain="ethereum", apy_spike_threshold=1),
+            UserConfig(4, protocols=["morpho"], apy_spike_threshold=1, tvl_change_threshold=1),
+            UserConfig(5, alerts_enabled=False, apy_spike_threshold=1),
+        ]
+        previous = {
+            "spike": {"apy": 10.0, "tvl": 1e6, "risk_level": "Low"},
+            "drain": {"apy": 10.0, "tvl": 1e6, "risk_level": "Low"},
+            "risky": {"apy": 10.0, "tvl": 1e6, "risk_level": "Low"},
+        }
+        current = [
+            {"pool": "spike", "chain": "Base", "project": "aave-v3", "symbol": "USDC",
+             "apy": 13.0, "tvl": 1e6, "risk_level": "Low"},         # +30% APY
+            {"pool": "drain", "chain": "Base", "project": "aave-v3", "symbol": "USDC",
+             "apy": 10.0, "tvl": 0.9e6, "risk_level": "Low"},       # -10% TVL
+            {"pool": "risky", "chain": "Base", "project": "morpho-blue", "symbol": "USDC",
+             "apy": 10.0, "tvl": 1e6, "risk_level": "High"},        # Risk increased
+            {"pool": "new", "chain": "Base", "project": "aave-v3", "symbol": "USDC",
+             "apy": 99.0, "tvl": 1e6},                               # No baseline
+        ]
+
+        result = alerts.generate_alerts_for_users(users, previous, current)
+        summary = {tid: [(a["type"], a["pool_id"]) for a in items] for tid, items in result.items()}
+
+        assert summary == {
+            1: [("apy_spike", "spike"), ("risk_change", "risky")],
+            2: [("tvl_change", "drain"), ("risk_change", "risky")],
+            4: [("risk_change", "risky")],
+        }
+        # One message per pool change, shared by every recipient
+        assert result[1][1] is result[2][1]
+
+
+class TestNewPoolDetector:
+
+    def test_unchanged_pools_are_not_rematched(self, bot_modules):
+        UserConfig, _, new_pool_alert = bot_modules
+        detector = new_pool_alert.NewPoolDetector()
+        users = [UserConfig(1, min_tvl=0, min_apy=0), UserConfig(2, chain="ethereum", min_tvl=0, min_apy=0)]
+        pools = [{"pool": f"p{i}", "chain": "Base", "project": "aave-v3", "symbol": "USDC",
+                  "tvl": 1e6, "apy": 5.0, "risk_level": "Low"} for i in range(3)]
+
+        assert detector.detect_new_pools(users, pools) == {}  # First run only marks pools seen
+        detector._last_check = object()
+
+        matched = []
+        original_match = detector._index.match
+        detector._index.match = lambda pool: matched.append(pool["pool"]) or original_match(pool)
+
+        assert detector.detect_new_pools(users, pools) == {}
+        assert matched == []  # Every pool was _evaluated with the same fields
+
+        changed = {**pools[0], "apy": 6.0}
+        fresh = {**pools[0], "pool": "p9"}
+        result = detector.detect_new_pools(users, [changed, pools[1], pools[2], fresh])
+        assert matched == ["p0", "p9"]
+        assert result == {1: [fresh]}  # p0 was already seen by user 1
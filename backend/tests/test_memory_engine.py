@@ -0,0 +1,126 @@
+"""
+Memory Engine Tests
+===================
+
+Persistent storage backend: FTS5 recall, upserts keeping the index in sync,
+outcome scoring, batched access counts and FTS backfill of old databases.
+
+Run: python -m pytest tests/test_memory_engine.py -v
+"""
+
+import sqlite3
+import pytest
+
+from agents.memory_engine import OutcomeBasedMemory, MemoryTier, MemoryType
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = OutcomeBasedMemory(db_path=str(tmp_path / "memory.db"))
+    yield engine
+    engine._store.close()
+
+
+class TestMemoryRecall:
+
+    @pytest.mark.asyncio
+    async def test_recall_uses_full_text_index(self, engine):
+        assert engine._store.fts_enabled
+        await engine.store(MemoryType.POOL_OUTCOME, {"project": "aerodrome", "symbol": "USDC-WETH"},
+                           tags=["base"])
+        await engine.store(MemoryType.POOL_OUTCOME, {"project": "morpho", "symbol": "USDC"})
+
+        found = await engine.recall("aerodrome")
+        assert [m.content["project"] for m in found] == ["aerodrome"]
+
+        # Prefix + multi-term (AND) matching, tags are indexed too
+        assert len(await engine.recall("aero base")) == 1
+        assert len(await engine.recall("USDC")) == 2
+        assert await engine.recall("curve") == []
+
+    @pytest.mark.asyncio
+    async def test_query_syntax_is_not_interpreted(self, engine):
+        await engine.store(MemoryType.POOL_OUTCOME, {"note": 'say "hi" OR NOT'})
+        assert len(await engine.recall('"hi" OR')) == 1
+        assert await engine.recall("(*") == []
+
+    @pytest.mark.asyncio
+    async def test_content_update_reindexes(self, engine):
+        memory = await engine.store(MemoryType.AGENT_INSIGHT, {"pattern": "alpha"}, tags=["x"])
+        await engine.store(MemoryType.AGENT_INSIGHT, {"pattern": "omega"})
+        await engine._store.execute(
+            "UPDATE memories SET content = ? WHERE id = ?", ('{"pattern": "beta"}', memory.id)
+        )
+
+        assert await engine.recall("alpha") == []
+        assert len(await engine.recall("beta")) == 1
+        assert len(await engine.recall("omega")) == 1
+
+
+class TestMemoryOutcomes:
+
+    @pytest.mark.asyncio
+    async def test_success_promotes_failure_forgets(self, engine):
+        good = await engine.store(MemoryType.STRATEGY_RESULT, {"s": "good"})
+        bad = await engine.store(MemoryType.STRATEGY_RESULT, {"s": "bad"})
+
+        assert await engine.record_outcome(good.id, success=True) == pytest.approx(0.7)
+        assert await engine.record_outcome(good.id, success=True) == pytest.approx(0.9)
+        assert await engine.record_outcome(bad.id, success=False) == pytest.approx(0.2)
+
+        rows = dict(await engine._store.fetchall("SELECT id, tier FROM memories"))
+        assert rows == {good.id: MemoryTier.PATTERN.value}
+        assert await engine.recall("bad", min_score=0) == [], "Forgotten memory must leave the FTS index"
+
+    @pytest.mark.asyncio
+    async def test_unknown_memory_scores_zero(self, engine):
+        assert await engine.record_outcome("missing", success=True) == 0.0
+
+
+class TestAccessBatching:
+
+    @pytest.mark.asyncio
+    async def test_access_counts_flushed_in_one_batch(self, engine):
+        engine.ACCESS_FLUSH_DELAY = 60
+        memory = await engine.store(MemoryType.POOL_OUTCOME, {"project": "aerodrome"})
+
+        for _ in range(3):
+            await engine.recall("aerodrome")
+        assert engine._pending_access[memory.id][0] == 3
+
+        await engine.get_stats()  # Not a flush point - counts stay pending
+        await engine._update_access()
+        engine._access_flush_task.cancel()
+
+        rows = await engine._store.fetchall("SELECT access_count FROM memories WHERE id = ?", (memory.id,))
+        assert rows == [(3,)]
+        assert engine._pending_access == {}
+
+
+class TestSchemaMigration:
+
+    @pytest.mark.asyncio
+    async def test_existing_rows_backfilled_into_fts(self, tmp_path):
+        db_path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE memories (
+                id TEXT PRIMARY KEY, tier TEXT NOT NULL, memory_type TEXT NOT NULL,
+                content TEXT NOT NULL, score REAL DEFAULT 0.5, created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL, access_count INTEGER DEFAULT 0,
+                user_id TEXT, agent_id TEXT, tags TEXT
+            )
+        """)
+        conn.execute(
+            "INSERT INTO memories VALUES ('m1', 'history', 'pool_outcome', '{\"project\": \"velodrome\"}',"
+            " 0.5, '2026-01-01T00:00:00', '2026-01-01T00:00:00', 0, 'default', NULL, '[]')"
+        )
+        conn.commit()
+        conn.close()
+
+        engine = OutcomeBasedMemory(db_path=db_path)
+        try:
+            found = await engine.recall("velodrome")
+            assert [m.id for m in found] == ["m1"]
+        finally:
+            engine._store.close()
@@ -0,0 +1,197 @@
+"""
+Observability Engine Tests
+==========================
+
+Buffered span export: no writes on the hot path, batched flushes,
+sampling and the ring buffer drop policies. Rollups, percentiles and retention.
+
+Run: python -m pytest tests/test_observability_engine.py -v
+"""
+
+import sqlite3
+import time
+import pytest
+
+from agents.observability_engine import (
+    ObservabilityEngine, SpanExporter, SpanStatus, MetricsRollup, histogram_percentile
+)
+
+
+def count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "obs.db")
+
+
+@pytest.fixture
+def engine(db_path):
+    exporter = SpanExporter(db_path, flush_interval=3600)
+    engine = ObservabilityEngine(db_path=db_path, exporter=exporter)
+    yield engine
+    engine.close()
+
+
+class TestBufferedExport:
+
+    def test_hot_path_does_not_write(self, engine, db_path):
+        trace_id = engine.start_trace("scout", "find_pools")
+        span_id = engine.start_span(trace_id, "scout", "fetch")
+        engine.end_span(span_id)
+        engine.log_event("scout", "pool_discovered", "50 pools", trace_id=trace_id)
+        engine.end_trace(trace_id)
+
+        assert count(db_path, "spans") == 0
+        # root + child span, trace, event (metrics live in the rollups)
+        assert engine.exporter.pending == 4
+
+        assert engine.exporter.flush() == 4
+        assert count(db_path, "traces") == 1
+        assert count(db_path, "spans") == 2
+        assert count(db_path, "rollups") == 6, "2 operations x 3 resolutions"
+        assert engine.exporter.get_stats()["flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reads_see_unflushed_and_running_spans(self, engine):
+        trace_id = engine.start_trace("guardian", "analyze")
+        done = engine.start_span(trace_id, "guardian", "score")
+        engine.end_span(done, SpanStatus.ERROR, error="boom")
+        engine.start_span(trace_id, "guardian", "still_running")
+
+        details = await engine.get_trace_details(trace_id)
+        assert details["status"] == "running"
+        statuses = {s["operation"]: s["status"] for s in details["spans"]}
+        assert statuses == {"score": "error", "analyze": "running", "still_running": "running"}
+
+        metrics = await engine.get_agent_metrics("guardian")
+        assert metrics["error_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_traced_decorator_exports_on_close(self, db_path):
+        engine = ObservabilityEngine(db_path=db_path, exporter=SpanExporter(db_path, flush_interval=3600))
+
+        @engine.traced("merchant", "quote")
+        async def quote():
+            return 42
+
+        assert await quote() == 42
+        engine.close()
+        assert count(db_path, "traces") == 1
+
+
+class TestSamplingAndDrops:
+
+    def test_unsampled_traces_keep_metrics_and_errors(self, db_path):
+        engine = ObservabilityEngine(
+            db_path=db_path, sample_rate=0.0, exporter=SpanExporter(db_path, flush_interval=3600)
+        )
+        trace_id = engine.start_trace("engineer", "execute")
+        span_id = engine.start_span(trace_id, "engineer", "swap")
+        engine.end_span(span_id)
+        engine.log_event("engineer", "step", "ignored", trace_id=trace_id)
+        engine.log_error(trace_id, span_id, "engineer", "reverted")
+        engine.end_trace(trace_id, SpanStatus.ERROR)
+        engine.close()
+
+        assert count(db_path, "traces") == 0
+        assert count(db_path, "spans") == 0
+        assert count(db_path, "rollups") == 6
+        assert count(db_path, "events") == 1
+
+    def test_drop_oldest_keeps_newest_rows(self, db_path):
+        exporter = SpanExporter(db_path, max_buffer=3, drop_policy="drop_oldest", flush_interval=3600)
+        ObservabilityEngine(db_path=db_path, exporter=exporter)
+        for i in range(5):
+            exporter.record("metric", ("a", "op", "latency_ms", i, "2026-01-01T00:00:00"))
+
+        assert [row[3] for _, row in exporter._buffer] == [2, 3, 4]
+        assert exporter.get_stats()["dropped"] == 2
+        exporter.close()
+
+    def test_drop_newest_rejects_when_full(self, db_path):
+        exporter = SpanExporter(db_path, max_buffer=3, drop_policy="drop_newest", flush_interval=3600)
+        for i in range(5):
+            exporter.record("metric", ("a", "op", "latency_ms", i, "2026-01-01T00:00:00"))
+
+        assert [row[3] for _, row in exporter._buffer] == [0, 1, 2]
+        assert exporter.get_stats()["dropped"] == 2
+        exporter._buffer.clear()
+        exporter.close()
+
+    def test_unknown_drop_policy_rejected(self, db_path):
+        with pytest.raises(ValueError):
+            SpanExporter(db_path, drop_policy="block")
+
+
+class TestRollups:
+
+    @pytest.mark.asyncio
+    async def test_agent_metrics_from_rollups(self, engine):
+        for latency in [3] * 90 + [150] * 9 + [4000]:
+            engine.rollups.observe("scout", "fetch", latency, error=False)
+        engine.rollups.observe("scout", "fetch", 20, error=True)
+
+        metrics = await engine.get_agent_metrics("scout", hours=1)
+        assert metrics["resolution"] == "1m"
+        assert metrics["total_operations"] == 101
+        assert metrics["error_count"] == 1
+        assert metrics["p50_latency_ms"] == 5
+        assert metrics["p95_latency_ms"] == 200
+        assert metrics["p99_latency_ms"] == 200
+        assert metrics["operations"]["fetch"]["max_latency_ms"] == 4000
+
+    @pytest.mark.asyncio
+    async def test_flushes_merge_into_existing_rows(self, engine, db_path):
+        engine.rollups.observe("guardian", "score", 10, error=False)
+        engine.exporter.flush()
+        engine.rollups.observe("guardian", "score", 30, error=True)
+        engine.exporter.flush()
+
+        assert count(db_path, "rollups") == 3
+        dashboard = await engine.get_dashboard_data()
+        [guardian] = dashboard["agents"]
+        assert (guardian["success"], guardian["errors"]) == (1, 1)
+        assert guardian["avg_latency_ms"] == 20
+        assert dashboard["total_errors"] == 1
+
+    def test_percentile_capped_at_observed_max(self):
+        histogram = [0] * 16
+        histogram[15] = 2  # Beyond the last bound
+        assert histogram_percentile(histogram, 0.99, max_ms=90000) == 90000
+        assert histogram_percentile([0] * 16, 0.5) == 0.0
+        assert MetricsRollup.summarize([])["count"] == 0
+
+
+class TestRetention:
+
+    def test_prune_downsamples_then_expires(self, engine, db_path):
+        now = time.time()
+        day = 86400
+        spans = [
+            ("s1", "0aaa", now - 2 * day, "success"),   # kept: downsampled trace
+            ("s2", "baaa", now - 2 * day, "success"),   # dropped after a day
+            ("s3", "caaa", now - 2 * day, "error"),     # errors kept for a week
+            ("s4", "daaa", now - 8 * day, "error"),     # everything gone after a week
+            ("s5", "eaaa", now - 60, "success"),        # fresh
+        ]
+        for span_id, trace_id, start, status in spans:
+            engine.exporter.record("span", (span_id, trace_id, None, "a", "op", status, start,
+                                            start + 1, 1000.0, "{}", None))
+        engine.rollups.observe("a", "op", 5, error=False, ts=now - 2 * day)
+
+        engine.exporter.flush()
+        deleted = engine.exporter.prune(now)
+
+        conn = sqlite3.connect(db_path)
+        kept = {r[0] for r in conn.execute("SELECT span_id FROM spans")}
+        resolutions = {r[0] for r in conn.execute("SELECT resolution FROM rollups")}
+        conn.close()
+        assert kept == {"s1", "s3", "s5"}
+        assert resolutions == {"1h", "1d"}, "1m rollups expire after a day"
+        assert deleted == 3
@@ -0,0 +1,100 @@
+"""
+Multi-Chain Pool Aggregator Tests
+=================================
+
+Chains are aggregated concurrently, each source is bounded by a deadline,
+and slow sources are reported as degraded while their fetch keeps warming
+the cache. No network needed.
+
+Run: python -m pytest tests/test_pool_aggregator.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import artisan.data_sources as ds
+
+DELAY = 0.2
+
+
+def llama_pool(chain, i):
+    return {"pool": f"{chain}-{i}", "chain": chain, "project": "aave-v3", "symbol": "USDC",
+            "tvlUsd": 5_000_000, "apy": 4.0 + i, "stablecoin": True}
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Fake sources: DefiLlama answers after DELAY, GeckoTerminal per `gecko_delay`."""
+    calls = {"defillama": 0, "geckoterminal": 0, "gecko_delay": 0.0}
+
+    async def fake_defillama_table():
+        calls["defillama"] += 1
+        await asyncio.sleep(DELAY)
+        return ds._build_defillama_table({
+            chain.lower(): [llama_pool(chain, i) for i in range(2)]
+            for chain in ["Base", "Ethereum", "Arbitrum", "Solana"]
+        })
+
+    async def fake_gecko(chain="Base", page=1):
+        calls["geckoterminal"] += 1
+        await asyncio.sleep(calls["gecko_delay"])
+        return []
+
+    monkeypatch.setattr(ds, "fetch_defillama_table", fake_defillama_table)
+    monkeypatch.setattr(ds, "fetch_geckoterminal_pools", fake_gecko)
+    fetches = {}
+    monkeypatch.setattr(ds, "_source_fetches", fetches)
+    yield calls
+    for task in fetches.values():
+        task.cancel()
+
+
+class TestMultiChain:
+
+    @pytest.mark.asyncio
+    async def test_chains_fetched_concurrently(self, sources):
+        chains = ["Base", "Ethereum", "Arbitrum", "Solana"]
+        start = time.perf_counter()
+        result = await ds.get_multi_chain_pools(chains, min_tvl=0, limit=10, blur=False)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < DELAY * 2  # Slowest chain, not the sum of four
+        assert sources["defillama"] == 1  # One table serves every chain
+        assert len(result["combined"]) == 8
+        assert result["sources_used"] == ["defillama"]
+        assert result["degraded"] == []
+
+    @pytest.mark.asyncio
+    async def test_slow_source_is_degraded_not_awaited(self, sources):
+        sources["gecko_delay"] = 5.0
+        start = time.perf_counter()
+        result = await ds.get_multi_chain_pools(["Base"], min_tvl=0, limit=10, blur=False,
+                                                source_timeout=DELAY * 2)
+
+        assert time.perf_counter() - start < 1.0
+        assert len(result["combined"]) == 2  # DefiLlama results still served
+        assert result["degraded"] == [{"chain": "Base", "source": "geckoterminal", "reason": "timeout"}]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_fetch_keeps_running_and_is_shared(self, sources):
+        sources["gecko_delay"] = DELAY * 2
+        first = await ds.get_aggregated_pools("Base", min_tvl=0, source_timeout=DELAY * 1.5)
+        assert first["degraded"] == [{"source": "geckoterminal", "reason": "timeout"}]
+
+        # The second call joins the in-flight fetch instead of starting a new one
+        second = await ds.get_aggregated_pools("Base", min_tvl=0, source_timeout=DELAY * 2)
+        assert second["degraded"] == []
+        assert sources["geckoterminal"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_source_is_degraded(self, sources, monkeypatch):
+        async def broken():
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(ds, "fetch_defillama_table", broken)
+        result = await ds.get_aggregated_pools("Base", min_tvl=0)
+
+        assert result["degraded"] == [{"source": "defillama", "reason": "error"}]
+        assert result["combined"] == []
@@ -0,0 +1,111 @@
+"""
+Columnar Pool Table Tests
+=========================
+
+Vectorized masks and top-k must select the same pools, in the same order,
+as the Python loops they replaced (filter + stable sort + slice).
+
+Run: python -m pytest tests/test_pool_table.py -v
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from data_sources.pool_table import PoolTable, TAG_ETH, TAG_SOL, top_k_indices
+
+CHAINS = ["Base", "Ethereum", "Solana", "Arbitrum"]
+PROJECTS = ["aave-v3", "aerodrome-v2", "morpho-blue", "kamino", "lido", "uniswap-v3"]
+SYMBOLS = ["USDC", "WETH-USDC", "MSOL", "STETH", "SOL/USDC", "cbETH", "DAI"]
+
+
+def random_pools(n=500, seed=7):
+    rng = random.Random(seed)
+    return [{
+        "pool": f"p{i}",
+        "chain": rng.choice(CHAINS),
+        "project": rng.choice(PROJECTS),
+        "symbol": rng.choice(SYMBOLS),
+        "apy": rng.choice([rng.uniform(0, 300), 5.0, 10.0, None]),  # repeated values -> ties
+        "tvl": rng.choice([rng.uniform(0, 5e7), 1e6]),
+        "stablecoin": rng.random() < 0.3,
+    } for i in range(n)]
+
+
+@pytest.fixture
+def pools():
+    return random_pools()
+
+
+class TestPoolTable:
+
+    def test_mask_matches_python_filters(self, pools):
+        table = PoolTable.from_pools(pools)
+        mask = table.mask(chain="base", min_apy=5, max_apy=200, min_tvl=1e6,
+                          projects=["AERO", "morpho"], lp=True)
+
+        expected = [
+            p for p in pools
+            if p["chain"] == "Base" and 5 <= (p["apy"] or 0) <= 200 and p["tvl"] >= 1e6
+            and any(t in p["project"] for t in ["aero", "morpho"])
+            and ("-" in p["symbol"] or "/" in p["symbol"])
+        ]
+        assert table.rows(np.flatnonzero(mask)) == expected
+
+    def test_asset_tags(self, pools):
+        table = PoolTable.from_pools(pools)
+        eth = table.rows(np.flatnonzero(table.mask(tags=TAG_ETH)))
+        sol = table.rows(np.flatnonzero(table.mask(tags=TAG_SOL)))
+
+        assert eth == [p for p in pools if "ETH" in p["symbol"].upper()]
+        assert sol == [p for p in pools if p["chain"] == "Solana" or "SOL" in p["symbol"].upper()]
+
+    def test_top_k_equals_stable_sort(self, pools):
+        table = PoolTable.from_pools(pools)
+        mask = table.mask(stablecoin=True)
+        for k in (0, 1, 10, 37, 10_000):
+            expected = sorted((p for p in pools if p["stablecoin"]), key=lambda p: p["apy"] or 0, reverse=True)[:k]
+            assert table.rows(table.top_k(k, mask)) == expected
+
+    def test_custom_flags_and_unknown_chain(self, pools):
+        table = PoolTable.from_pools(pools, flags={"lending": lambda p: p["project"] in ("aave-v3", "morpho-blue")})
+        lending = table.rows(np.flatnonzero(table.mask(flags={"lending": True})))
+        assert lending == [p for p in pools if p["project"] in ("aave-v3", "morpho-blue")]
+        assert not table.mask(chain="monad").any()
+
+    def test_empty_table(self):
+        table = PoolTable.from_pools([])
+        assert len(table) == 0
+        assert table.rows(table.top_k(5, table.mask(chain="base", projects=["aave"]))) == []
+
+
+class TestTopK:
+
+    def test_ties_keep_row_order(self):
+        values = np.array([1.0, 3.0, 3.0, 2.0, 3.0])
+        assert top_k_indices(values, 2).tolist() == [1, 2]
+        assert top_k_indices(values, 4).tolist() == [1, 2, 4, 3]
+
+
+class TestStrategyRanking:
+
+    def test_rank_and_select_matches_reference(self, pools):
+        from agents.strategy_executor import StrategyExecutor
+        executor = StrategyExecutor()
+
+        def reference(pools, style):
+            def score(p):
+                apy, tvl = p["apy"] or 0, p["tvl"]
+                s = min(apy, 100) * 0.4 + (30 if tvl > 10_000_000 else 20 if tvl > 1_000_000 else 10 if tvl > 100_000 else 0)
+                if style == "conservative":
+                    s = (s - 20 if apy > 100 else s) * 0.7 + (30 - min(apy, 30))
+                elif style == "aggressive":
+                    s *= 1.3
+                return s
+            return [p["pool"] for p in sorted(pools, key=score, reverse=True)[:5]]
+
+        for risk, style in [("low", "conservative"), ("medium", "moderate"), ("high", "aggressive")]:
+            selected = executor.rank_and_select([dict(p) for p in pools], {"risk_level": risk, "vault_count": 5})
+            assert [p["pool"] for p in selected] == reference(pools, style)
+            assert all(p["_trading_style"] == style and p["_allocation"] == 20 for p in selected)
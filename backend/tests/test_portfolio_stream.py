@@ -0,0 +1,197 @@
+"""
+Portfolio Stream Tests
+======================
+
+Snapshots are computed once per change (not per socket) and pushed to
+subscribers as JSON Patch deltas. The dashboard client (frontend/portfolio.js)
+handles every message the stream sends and rebuilds the server snapshot from
+them - run under Node when it is installed.
+
+Run: python -m pytest tests/test_portfolio_stream.py -v
+"""
+
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+USER = "0xUser"
+AGENT = "0x" + "a" * 40
+OTHER_AGENT = "0x" + "b" * 40
+
+PORTFOLIO_JS = Path(__file__).parent.parent.parent / "frontend" / "portfolio.js"
+
+# Loads portfolio.js with DOM stubs, feeds it messages from stdin and prints
+# the dashboard's live snapshot, its version and what it sent back
+CLIENT_HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+// Any DOM element / property / method call is another stub
+const stub = () => new Proxy(function () {}, {
+    get: (t, k) => (k === Symbol.toPrimitive ? () => '' : k in t ? t[k] : (t[k] = stub())),
+    apply: () => stub(),
+});
+const element = stub();
+const context = {
+    console: { log() {}, warn() {}, error() {} },
+    document: { getElementById: () => element, addEventListener() {} },
+    window: {},
+    WebSocket: { OPEN: 1 },
+    Toast: undefined,
+    JSON, Number, Math, Error,
+};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), context);
+
+const dash = context.window.PortfolioDash;
+const sent = [];
+dash.ws = { readyState: 1, send: (m) => sent.push(JSON.parse(m)) };
+for (const message of JSON.parse(fs.readFileSync(0, 'utf8'))) {
+    dash.handleWebSocketMessage(message);
+}
+console.log = (...a) => process.stdout.write(a.join(' '));
+console.log(JSON.stringify({ snapshot: dash.liveSnapshot, version: dash.liveVersion, sent }));
+"""
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def test_json_patch_ops():
+    from services.portfolio_stream import make_json_patch
+
+    old = {"totalValue": 1, "agentStatus": {"0xa": "active"}, "gone": True}
+    new = {"totalValue": 2, "agentStatus": {"0xa": "active", "0xb/c": "paused"}}
+
+    assert make_json_patch(old, new) == [
+        {"op": "remove", "path": "/gone"},
+        {"op": "replace", "path": "/totalValue", "value": 2},
+        {"op": "add", "path": "/agentStatus/0xb~1c", "value": "paused"},
+    ]
+    assert make_json_patch(new, new) == []
+
+
+@pytest.mark.asyncio
+async def test_one_recompute_fans_out_to_all_sockets():
+    from services.portfolio_stream import PortfolioStream
+    from api.websocket_router import ConnectionManager
+
+    manager = ConnectionManager()
+    sockets = [FakeSocket() for _ in range(3)]
+    manager.active_connections[USER.lower()] = set(sockets)
+    stream = PortfolioStream()
+    stream._load_cached_balances = AsyncMock(return_value=None)
+
+    with patch("api.agent_config_router.DEPLOYED_AGENTS", {USER: [{"agent_address": AGENT}]}), \
+         patch("api.websocket_router.manager", manager):
+        _, version = await stream.get_snapshot(USER)
+        stream.publish_agent_balances(USER, AGENT, [{"asset": "USDC", "value_usd": 5.0}], [], 5.0)
+        recomputes = stream.get_stats()["recomputes"]
+        assert await stream.process_dirty() == 1
+        assert stream.get_stats()["recomputes"] == recomputes + 1
+
+        # Same balances again: nothing is pushed
+        stream.publish_agent_balances(USER, AGENT, [{"asset": "USDC", "value_usd": 5.0}], [], 5.0)
+        assert await stream.process_dirty() == 0
+        await stream.stop()
+
+    for ws in sockets:
+        assert len(ws.sent) == 1
+        message = ws.sent[0]
+        assert message["type"] == "portfolio_patch" and message["base_version"] == version
+        assert {"op": "replace", "path": "/totalValue", "value": 5.0} in message["ops"]
+
+
+async def stream_messages():
+    """Snapshot + the patches pushed for a balance change, a new agent and a removed one"""
+    from services.portfolio_stream import PortfolioStream, snapshot_message
+    from api.websocket_router import ConnectionManager
+
+    manager = ConnectionManager()
+    ws = FakeSocket()
+    manager.active_connections[USER.lower()] = {ws}
+    stream = PortfolioStream()
+    stream._load_cached_balances = AsyncMock(return_value=None)
+    agents = {USER: [{"agent_address": AGENT}]}
+
+    with patch("api.agent_config_router.DEPLOYED_AGENTS", agents), \
+         patch("api.websocket_router.manager", manager):
+        ws.sent.append(snapshot_message(*await stream.get_snapshot(USER)))
+
+        stream.publish_agent_balances(USER, AGENT, [{"asset": "USDC", "value_usd": 5.0}], [], 5.0)
+        await stream.process_dirty()
+
+        agents[USER].append({"agent_address": OTHER_AGENT, "is_active": False})
+        stream.publish_agent_balances(USER, OTHER_AGENT, [{"asset": "WETH", "value_usd": 7.0}], [], 7.0)
+        await stream.process_dirty()
+
+        agents[USER].pop(0)
+        stream.invalidate(USER, reason="position_exit")
+        await stream.process_dirty()
+        await stream.stop()
+
+    final, version = await stream.get_snapshot(USER)
+    return json.loads(json.dumps(ws.sent)), final, version
+
+
+def run_client(messages):
+    result = subprocess.run(
+        ["node", "-e", CLIENT_HARNESS, str(PORTFOLIO_JS)],
+        input=json.dumps(messages), capture_output=True, text=True, timeout=30
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+@pytest.mark.asyncio
+async def test_client_handles_every_stream_message_type():
+    messages, _, _ = await stream_messages()
+    source = PORTFOLIO_JS.read_text()
+    switch = source[source.index("handleWebSocketMessage(data) {"):]
+    switch = switch[:switch.index("\n    }\n")]
+    handled = set(re.findall(r"case '(\w+)':", switch))
+
+    sent_types = {m["type"] for m in messages}
+    assert sent_types == {"snapshot", "portfolio_patch"}
+    assert sent_types <= handled
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+async def test_client_rebuilds_server_snapshot():
+    messages, final, version = await stream_messages()
+    assert [m["type"] for m in messages] == ["snapshot"] + ["portfolio_patch"] * 3
+
+    state = run_client(messages)
+
+    assert state["sent"] == []
+    assert state["version"] == version
+    assert state["snapshot"] == final
+    assert state["snapshot"]["agentStatus"] == {OTHER_AGENT: "paused"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+async def test_client_resyncs_on_version_gap():
+    messages, _, _ = await stream_messages()
+    snapshot, first_patch, second_patch = messages[:3]
+
+    # Missed a patch: nothing is applied, one refresh is requested
+    state = run_client([snapshot, second_patch, messages[3]])
+    assert state["snapshot"] == snapshot["data"] and state["version"] == snapshot["version"]
+    assert state["sent"] == [{"type": "refresh"}]
+
+    # The refreshed snapshot resumes patching
+    fresh = {**snapshot, "version": first_patch["version"], "data": run_client(messages[:2])["snapshot"]}
+    state = run_client([snapshot, second_patch, fresh, second_patch])
+    assert state["version"] == second_patch["version"]
+    assert state["sent"] == [{"type": "refresh"}]
@@ -0,0 +1,131 @@
+"""
+Security Rate Limiter Tests
+===========================
+
+GCRA limits per window, fixed-size per-IP state, idle sweeps, and the
+SQLite backend shared between limiter instances (= uvicorn workers).
+
+Run: python -m pytest tests/test_rate_limiter.py -v
+"""
+
+import pytest
+from unittest.mock import patch
+
+from security.middleware import RateLimiter, RateLimitConfig
+
+IP = "203.0.113.7"
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch("security.middleware.time.time", clock):
+        yield clock
+
+
+def make_limiter(db_path=None, **limits):
+    config = RateLimitConfig(
+        requests_per_minute=limits.get("minute", 60),
+        requests_per_hour=limits.get("hour", 1000),
+        requests_per_day=limits.get("day", 10000),
+        burst_limit=limits.get("burst", 10),
+        shared_db_path=db_path,
+    )
+    return RateLimiter(config)
+
+
+class TestGCRA:
+
+    def test_burst_limit(self, clock):
+        limiter = make_limiter(burst=5)
+        assert all(limiter.is_allowed(IP)[0] for _ in range(5))
+        assert limiter.is_allowed(IP) == (False, "Burst limit exceeded (5/sec)")
+
+        clock.now += 0.2  # One emission interval later one more request fits
+        assert limiter.is_allowed(IP)[0]
+        assert not limiter.is_allowed(IP)[0]
+
+    def test_minute_window_slides(self, clock):
+        limiter = make_limiter(burst=100, minute=6)
+        for _ in range(6):
+            assert limiter.is_allowed(IP)[0]
+        assert limiter.is_allowed(IP) == (False, "Rate limit exceeded (6/min)")
+
+        clock.now += 10  # 60s / 6 = one request regained every 10s
+        assert limiter.is_allowed(IP)[0]
+        assert not limiter.is_allowed(IP)[0]
+
+    def test_rejected_requests_do_not_consume_quota(self, clock):
+        limiter = make_limiter(burst=100, minute=2)
+        limiter.is_allowed(IP)
+        limiter.is_allowed(IP)
+        for _ in range(50):
+            assert not limiter.is_allowed(IP)[0]
+        clock.now += 30
+        assert limiter.is_allowed(IP)[0]
+
+    def test_usage_reports_requests_in_window(self, clock):
+        limiter = make_limiter(burst=100, minute=60)
+        for _ in range(3):
+            limiter.is_allowed(IP)
+        usage = limiter.get_usage(IP)
+        assert usage["minute"] == 3
+        assert usage["hour"] == 3
+        assert limiter.get_usage("198.51.100.1") == {"burst": 0, "minute": 0, "hour": 0, "day": 0}
+
+    def test_whitelist_and_block(self, clock):
+        limiter = make_limiter(burst=1)
+        assert limiter.is_allowed("127.0.0.1") == (True, "whitelisted")
+        limiter.block_ip(IP)
+        assert limiter.is_allowed(IP) == (False, "IP is blocked")
+
+
+class TestState:
+
+    def test_idle_ips_are_swept(self, clock):
+        limiter = make_limiter()
+        for i in range(100):
+            limiter.is_allowed(f"10.0.0.{i}")
+        assert len(limiter.store) == 100
+
+        clock.now += 86400 + limiter.cleanup_interval + 1
+        limiter.is_allowed(IP)
+        assert len(limiter.store) == 1
+
+    def test_memory_store_is_bounded(self, clock):
+        limiter = RateLimiter(RateLimitConfig(max_tracked_ips=10, shared_db_path=None))
+        for i in range(50):
+            limiter.is_allowed(f"10.0.0.{i}")
+        assert len(limiter.store) == 10
+
+
+class TestSharedBackend:
+
+    def test_limits_hold_across_workers(self, clock, tmp_path):
+        db_path = str(tmp_path / "rate_limits.db")
+        worker_a = make_limiter(db_path, burst=100, minute=4)
+        worker_b = make_limiter(db_path, burst=100, minute=4)
+
+        assert worker_a.is_allowed(IP)[0]
+        assert worker_b.is_allowed(IP)[0]
+        assert worker_a.is_allowed(IP)[0]
+        assert worker_b.is_allowed(IP)[0]
+        assert not worker_a.is_allowed(IP)[0]
+        assert not worker_b.is_allowed(IP)[0]
+        assert worker_b.get_stats() == {
+            "backend": "sqlite", "tracked_ips": 1, "blocked_ips": 0, "whitelisted_ips": 2
+        }
+
+    def test_sqlite_sweep(self, clock, tmp_path):
+        limiter = make_limiter(str(tmp_path / "rate_limits.db"))
+        limiter.is_allowed(IP)
+        assert limiter.store.sweep(clock.now) == 0
+        assert limiter.store.sweep(clock.now + 86401) == 1
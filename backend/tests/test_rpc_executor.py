@@ -0,0 +1,61 @@
+"""
+Non-blocking RPC Tests
+======================
+
+Blocking web3 `.call()`s run on the RPC thread pool, so the event loop
+keeps serving other work during a slow round-trip.
+
+Run: python -m pytest tests/test_rpc_executor.py -v
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+
+
+class SlowFunction:
+    """Stands in for contract.functions.x(...) with a 200ms blocking RPC"""
+
+    def __init__(self, result=42):
+        self.result = result
+
+    def call(self, **kwargs):
+        time.sleep(0.2)
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_call_async_does_not_block_loop():
+    from infrastructure.rpc import call_async
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(call_async(SlowFunction()) for _ in range(4)))
+    task.cancel()
+
+    assert results == [42] * 4
+    assert ticks >= 10, "Event loop was blocked during the RPC calls"
+
+
+@pytest.mark.asyncio
+async def test_sugar_reads_off_loop():
+    from data_sources.aerodrome_sugar import AerodromeSugar
+
+    sugar = AerodromeSugar(rpc_url="http://localhost:1")
+    sugar.sugar = MagicMock()
+    sugar.sugar.functions.all.return_value = SlowFunction(result=[("0xpool",)])
+    sugar._parse_pool = lambda raw: {"lp": raw[0]}
+    sugar._calculate_tvl = lambda pool: 0
+    sugar._calculate_apr = lambda pool: 0
+
+    pools, _ = await asyncio.gather(sugar._fetch_page(1, 0), asyncio.sleep(0.05))
+    sugar.sugar.functions.all.assert_called_once_with(1, 0)
+    assert [p["lp"] for p in pools] == ["0xpool"]
@@ -0,0 +1,90 @@
+"""
+Scam Detector Scanner Tests
+===========================
+
+The single-pass scanner must report exactly what one re.search per pattern
+reported, and repeated sources must hit the content-addressed cache.
+
+Run: python -m pytest tests/test_scam_detector.py -v
+"""
+
+import hashlib
+import re
+import pytest
+from unittest.mock import patch
+
+import services.scam_detector as scam_detector
+from services.scam_detector import ScamDetector, SCAM_PATTERNS, SAFE_PATTERNS
+
+
+def naive_categories(source):
+    """Reference: the original per-pattern re.search loop"""
+    found = set()
+    for kind, table in (("risk", SCAM_PATTERNS), ("safe", SAFE_PATTERNS)):
+        for name, data in table.items():
+            if any(re.search(regex, source, re.IGNORECASE) for regex in data["patterns"]):
+                found.add((kind, name))
+    return found
+
+
+SOURCES = [
+    "// SPDX\nimport '@openzeppelin/contracts/token/ERC20/ERC20.sol';\ncontract T is ERC20 {}",
+    # honeypot and antibot both match at the same offset
+    "function f() { require(tx.origin == msg.sender); }",
+    "mapping(address => bool) private blacklist; uint256 public maxTxAmount; sellFee = 99;",
+    "function _mint(address, uint256) private {} onlyOwner returns transfer renounceOwnership()",
+    "address private _owner; ERC1967Proxy; _taxFee = 25; require(!blacklist[from]);",
+    "contract Clean { function add(uint a, uint b) public pure returns (uint) { return a + b; } }",
+    "REQUIRE ( MSG.SENDER != TX.ORIGIN ) ; owner = address(0); function setFee() { fee = 100; }",
+    "require(amount <= maxTx); import {X} from \"@OpenZeppelin/x.sol\"; address internal hiddenOwner;",
+    "",
+]
+
+
+@pytest.fixture
+def detector():
+    scam_detector._analysis_cache.clear()
+    with patch.object(scam_detector.httpx, "AsyncClient"):
+        yield ScamDetector()
+
+
+class TestScanner:
+
+    @pytest.mark.parametrize("source", SOURCES)
+    def test_matches_per_pattern_search(self, source):
+        assert scam_detector.scan_categories(source) == naive_categories(source)
+
+    def test_required_literals(self):
+        assert scam_detector._required_literals(r"require\s*\(\s*msg\.sender\s*==\s*owner") == [
+            "require", "msg.sender", "==", "owner"
+        ]
+        assert scam_detector._required_literals(r"ab?cd{2}(x|y)+ef") == ["ef"]
+        assert scam_detector._required_literals(r"a|b") is None
+
+    def test_findings_keep_pattern_order(self, detector):
+        result = detector.analyze_source(SOURCES[2] + "\nrenounceOwnership()")
+        assert [f["name"] for f in result["findings"]] == ["blacklist", "max_tx", "fee_manipulation", "renounced"]
+        assert result["risk_score"] == 25 + 10 + 25 - 20
+
+    def test_fingerprint_unchanged(self, detector):
+        source = "uint a; // note\n/* block\n comment */  uint   b;"
+        clean = re.sub(r'\s+', '', re.sub(r'/\*.*?\*/', '', re.sub(r'//.*', '', source), flags=re.DOTALL))
+        assert detector.get_fingerprint(source) == hashlib.sha256(clean.encode()).hexdigest()
+
+
+class TestAnalysisCache:
+
+    def test_repeated_source_is_not_rescanned(self, detector):
+        with patch.object(scam_detector, "scan_categories", wraps=scam_detector.scan_categories) as scan:
+            first = detector.analyze_source(SOURCES[2])
+            first["findings"].clear()  # Callers may mutate their copy
+            second = ScamDetector().analyze_source(SOURCES[2])
+
+        assert scan.call_count == 1
+        assert len(second["findings"]) == 3
+
+    def test_cache_is_bounded(self, detector):
+        with patch.object(scam_detector, "ANALYSIS_CACHE_SIZE", 3):
+            for i in range(5):
+                detector.analyze_source(f"contract C{i} {{}}")
+        assert len(scam_detector._analysis_cache) == 3
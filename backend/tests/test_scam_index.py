@@ -0,0 +1,118 @@
+"""
+Scam Fingerprint Index Tests
+============================
+
+Local cosine search, exact fingerprint matches, persistence (snapshot + tail)
+and ScamDetector using the index instead of the Supabase RPC.
+
+Run: python -m pytest tests/test_scam_index.py -v
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from services.scam_index import ScamFingerprintIndex
+
+
+def vec(seed, dim=384):
+    return np.random.default_rng(seed).normal(size=dim).tolist()
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ScamFingerprintIndex(data_dir=tmp_path, compact_every=3)
+
+
+class TestSearch:
+
+    def test_nearest_above_threshold(self, index):
+        index.add("0xSCAM", vec(1), source_hash="h1", risk_score=90, risk_level="CRITICAL", is_scam=True)
+        index.add("0xsafe", vec(2), source_hash="h2", risk_score=10, risk_level="LOW")
+
+        near = (np.array(vec(1)) + 0.05 * np.array(vec(3))).tolist()
+        match = index.search(near, threshold=0.95)
+        assert match["contract_address"] == "0xscam" and match["is_scam"]
+        assert 0.95 <= match["similarity"] <= 1.0
+
+        assert index.search(vec(4), threshold=0.95) is None
+
+    def test_batch_search_and_bad_inputs(self, index):
+        index.add("0xa", vec(1), is_scam=True)
+        results = index.search_batch([vec(1), None, [1.0, 2.0], vec(5)], threshold=0.9)
+        assert [r and r["contract_address"] for r in results] == ["0xa", None, None, None]
+
+    def test_exact_fingerprint_without_embedding(self, index):
+        assert index.add("0xnoembed", None, source_hash="deadbeef", is_scam=True)
+        assert not index.add("0xnothing", None)
+        assert index.find_by_source_hash("deadbeef")["similarity"] == 1.0
+        assert index.search(vec(1), threshold=0.0)["contract_address"] == "0xnoembed"
+
+    def test_readd_replaces_row(self, index):
+        index.add("0xa", vec(1), source_hash="old", is_scam=True)
+        index.add("0xA", vec(2), source_hash="new", is_scam=False)
+        assert index.get_stats()["fingerprints"] == 1
+        assert index.find_by_source_hash("old") is None
+        assert index.search(vec(2))["is_scam"] is False
+
+
+class TestPersistence:
+
+    def test_snapshot_and_tail_survive_restart(self, index, tmp_path):
+        for i in range(4):  # compact_every=3 -> snapshot + 1 tail row
+            index.add(f"0x{i}", vec(i), source_hash=f"h{i}", is_scam=i % 2 == 0)
+        assert index.snapshot_file.exists()
+        assert index.get_stats()["tail_rows"] == 1
+
+        with open(index.tail_file, "a") as f:
+            f.write('{"meta": {"contract_address": "0xtorn"')  # Crash mid-write
+
+        restarted = ScamFingerprintIndex(data_dir=tmp_path, compact_every=3)
+        assert restarted.search(vec(3))["contract_address"] == "0x3"
+        assert restarted.find_by_source_hash("h0")["is_scam"] is True
+        assert restarted.get_stats()["fingerprints"] == 4
+
+    @pytest.mark.asyncio
+    async def test_incremental_supabase_sync(self, index):
+        pages = [
+            [{"contract_address": "0xremote", "source_hash": "r", "embedding": str(vec(7)),
+              "risk_score": 95, "risk_level": "CRITICAL", "is_scam": True, "created_at": "2026-01-02"}],
+        ]
+        calls = []
+
+        async def fake_request(method, table, data=None, params=None):
+            calls.append(params)
+            return pages.pop(0) if pages else []
+
+        with patch("infrastructure.supabase_client.supabase._request", fake_request):
+            assert await index.sync_from_supabase(page_size=1) == 1
+            assert await index.sync_from_supabase(page_size=1) == 0
+
+        assert calls[-1]["created_at"] == "gt.2026-01-02"
+        assert index.search(vec(7))["contract_address"] == "0xremote"
+
+
+class TestDetectorUsesIndex:
+
+    @pytest.mark.asyncio
+    async def test_find_similar_scam_is_local(self, tmp_path, monkeypatch):
+        import services.scam_detector as scam_detector
+
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+
+        local = ScamFingerprintIndex(data_dir=tmp_path)
+        local._last_sync_attempt = 1e12  # No background sync
+        with patch.object(scam_detector.httpx, "AsyncClient"), \
+                patch.object(scam_detector, "scam_index", local), \
+                patch.object(scam_detector.ScamDetector, "_compute_embedding", return_value=vec(9)):
+            detector = scam_detector.ScamDetector()
+            source = "contract Rug { function drain() {} }"
+            await detector.store_fingerprint("0xrug", {"risk_score": 90, "risk_level": "CRITICAL"}, source)
+
+            match = await detector.find_similar_scam(source + "\n// different comment")
+            assert match["contract_address"] == "0xrug"
+            assert match["similarity"] == 1.0, "Same normalized source = exact fingerprint hit"
+
+            assert await detector.find_similar_scam("contract Other {}") is not None  # Same (mocked) embedding
+            assert local.get_stats()["exact_hits"] == 1
+            assert detector.client.post.call_count == 0, "Supabase not configured - stored locally only"
@@ -667,6 +667,91 @@ class TestParkLogicStrict:
         print(f"✅ Park lock correctly blocks reallocation")
 
 
+# =============================================================================
+# TEST: CYCLE SCHEDULER (CONCURRENCY)
+# =============================================================================
+
+class TestCycleSchedulerStrict:
+    """Testy schedulera cyklu - limity współbieżności i współdzielenie Scout"""
+    
+    @pytest.mark.asyncio
+    async def test_cycle_respects_global_and_per_user_caps(self):
+        """Nie więcej niż max_concurrent_agents naraz, 1 agent na usera"""
+        from agents import strategy_executor as se
+        
+        executor = se.StrategyExecutor()
+        executor.max_concurrent_agents = 3
+        executor.max_concurrent_per_user = 1
+        
+        agents = {
+            f"0xuser{u}": [
+                {"id": f"agent_{u}_{i}", "user_address": f"0xuser{u}", "is_active": True}
+                for i in range(2)
+            ]
+            for u in range(5)
+        }
+        running = {"total": 0, "peak": 0}
+        per_user: Dict[str, int] = {}
+        per_user_peak: Dict[str, int] = {}
+        
+        async def fake_cycle(agent):
+            user = agent["user_address"]
+            running["total"] += 1
+            per_user[user] = per_user.get(user, 0) + 1
+            running["peak"] = max(running["peak"], running["total"])
+            per_user_peak[user] = max(per_user_peak.get(user, 0), per_user[user])
+            await asyncio.sleep(0.01)
+            running["total"] -= 1
+            per_user[user] -= 1
+            return "executed"
+        
+        with patch.object(se, "DEPLOYED_AGENTS", agents), \
+             patch.object(executor, "_run_agent_cycle", side_effect=fake_cycle):
+            await executor.execute_all_agents()
+        
+        assert running["peak"] <= 3, "❌ Global cap exceeded"
+        assert max(per_user_peak.values()) == 1, "❌ Per-user cap exceeded"
+        assert executor.last_cycle_stats["agents"] == 10
+        assert executor.last_cycle_stats["executed"] == 10
+        assert executor.last_cycle_stats["wall_time_s"] >= 0
+        
+        print(f"✅ Scheduler peak concurrency: {running['peak']}")
+    
+    
+    @pytest.mark.asyncio
+    async def test_scout_result_shared_between_identical_filters(self, valid_agent_config):
+        """Agenci z tym samym filtrem chain/protocol współdzielą jeden fetch Scout"""
+        from agents import strategy_executor as se
+        
+        executor = se.StrategyExecutor()
+        calls = []
+        
+        async def fake_scout(**kwargs):
+            calls.append(kwargs)
+            await asyncio.sleep(0.01)
+            return {"pools": [{"symbol": "USDC-WETH", "apy": 25.0, "tvl": 5_000_000, "project": "aerodrome"}]}
+        
+        agents = {
+            f"0xuser{u}": [{**valid_agent_config, "id": f"agent_{u}", "user_address": f"0xuser{u}"}]
+            for u in range(4)
+        }
+        
+        async def scan_only(agent):
+            pools = await executor.find_matching_pools(agent)
+            executor.rank_and_select(pools, agent)
+            return "executed"
+        
+        with patch.object(se, "DEPLOYED_AGENTS", agents), \
+             patch.object(se, "get_scout_pools", side_effect=fake_scout), \
+             patch.object(executor, "_run_agent_cycle", side_effect=scan_only):
+            await executor.execute_all_agents()
+        
+        assert len(calls) == 1, f"❌ Expected 1 Scout fetch, got {len(calls)}"
+        assert executor.last_cycle_stats["scout_fetches"] == 1
+        
+        print(f"✅ 4 agents shared 1 Scout fetch")
+
+
 # =============================================================================
 # CLI RUNNER
 # =============================================================================
@@ -0,0 +1,157 @@
+"""
+Transaction Manager Tests
+=========================
+
+Pipelined sends get consecutive nonces per signer, one poller resolves all
+pending receipts on new blocks, and timeouts / failed sends clean up. Uses
+a fake Web3 - no network needed.
+
+Run: python -m pytest tests/test_tx_manager.py -v
+"""
+
+import asyncio
+
+import pytest
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from infrastructure.tx_manager import TransactionManager
+
+KEY = "0x" + "11" * 32
+TO = Web3.to_checksum_address("0x" + "ab" * 20)
+OTHER_KEY = "0x" + "22" * 32
+
+
+class FakeEth:
+
+    def __init__(self):
+        self.block_number = 100
+        self.chain_id = 8453
+        self.confirmed_nonce = {}   # address -> nonce mined so far
+        self.sent = []              # (sender, raw tx, hash)
+        self.mined = {}             # hash -> block
+        self.receipt_calls = 0
+        self.fail_next_send = False
+
+    def get_transaction_count(self, address, block_identifier="latest"):
+        return self.confirmed_nonce.get(address, 0)
+
+    def send_raw_transaction(self, raw):
+        if self.fail_next_send:
+            self.fail_next_send = False
+            raise ValueError("replacement transaction underpriced")
+        tx_hash = HexBytes(bytes([len(self.sent) + 1]) * 32)
+        self.sent.append((Account.recover_transaction(raw), raw, tx_hash))
+        return tx_hash
+
+    def get_transaction_receipt(self, tx_hash):
+        self.receipt_calls += 1
+        block = self.mined.get(bytes(tx_hash))
+        if block is None or block > self.block_number:
+            raise TransactionNotFound("not yet")
+        return {"transactionHash": tx_hash, "blockNumber": block, "status": 1, "gasUsed": 21000}
+
+    def mine(self, *hashes):
+        self.block_number += 1
+        for h in hashes:
+            self.mined[bytes(h)] = self.block_number
+
+
+class FakeProvider:
+    endpoint_uri = "http://fake-rpc"
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+        self.provider = FakeProvider()
+
+
+def make_tx(i=0):
+    return {"to": TO, "value": i, "gas": 21000, "gasPrice": 10**9, "chainId": 8453}
+
+
+def sent_nonces(w3):
+    from eth_account._utils.legacy_transactions import Transaction
+    return [Transaction.from_bytes(raw).nonce for _, raw, _ in w3.eth.sent]
+
+
+@pytest.fixture
+def manager():
+    return TransactionManager(poll_interval=0.01)
+
+
+class TestNonces:
+
+    @pytest.mark.asyncio
+    async def test_pipelined_sends_get_consecutive_nonces(self, manager):
+        w3 = FakeWeb3()
+        await asyncio.gather(*(manager.send(w3, make_tx(i), KEY) for i in range(5)))
+        await manager.send(w3, make_tx(), OTHER_KEY)
+
+        assert sent_nonces(w3) == [0, 1, 2, 3, 4, 0]
+        assert manager.get_stats()["signers"] == 2
+
+    @pytest.mark.asyncio
+    async def test_chain_nonce_wins_when_ahead(self, manager):
+        w3 = FakeWeb3()
+        await manager.send(w3, make_tx(), KEY)
+        w3.eth.confirmed_nonce[Account.from_key(KEY).address] = 7  # Sent elsewhere
+        await manager.send(w3, make_tx(), KEY)
+        assert sent_nonces(w3) == [0, 7]
+
+    @pytest.mark.asyncio
+    async def test_failed_send_resyncs_from_chain(self, manager):
+        w3 = FakeWeb3()
+        await manager.send(w3, make_tx(), KEY)
+        w3.eth.fail_next_send = True
+        with pytest.raises(ValueError):
+            await manager.send(w3, make_tx(), KEY)
+
+        # Nonce 0 was never mined (chain says 0) - the local counter is dropped
+        await manager.send(w3, make_tx(), KEY)
+        assert sent_nonces(w3) == [0, 0]
+
+
+class TestReceipts:
+
+    @pytest.mark.asyncio
+    async def test_one_poller_resolves_all_pending(self, manager):
+        w3 = FakeWeb3()
+        hashes = [await manager.send(w3, make_tx(i), KEY) for i in range(3)]
+        waits = asyncio.gather(*(manager.wait_for_receipt(w3, h, timeout=5) for h in hashes))
+
+        await asyncio.sleep(0.05)
+        lookups_before = w3.eth.receipt_calls
+        await asyncio.sleep(0.05)
+        assert w3.eth.receipt_calls == lookups_before  # No new block - no lookups
+
+        w3.eth.mine(*hashes)
+        receipts = await waits
+        assert [r["transactionHash"] for r in receipts] == hashes
+        assert manager.get_stats()["confirmed"] == 3
+        assert manager.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_send_and_wait(self, manager):
+        w3 = FakeWeb3()
+
+        async def miner():
+            while not w3.eth.sent:
+                await asyncio.sleep(0.01)
+            w3.eth.mine(w3.eth.sent[0][2])
+
+        (tx_hash, receipt), _ = await asyncio.gather(manager.send_and_wait(w3, make_tx(), KEY, timeout=5), miner())
+        assert receipt["status"] == 1 and receipt["transactionHash"] == tx_hash
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_and_stops_polling(self, manager):
+        w3 = FakeWeb3()
+        tx_hash = await manager.send(w3, make_tx(), KEY)
+
+        with pytest.raises(TimeExhausted):
+            await manager.wait_for_receipt(w3, tx_hash, timeout=0.05)
+        assert manager.get_stats()["pending"] == 0
+        assert manager.get_stats()["timeouts"] == 1
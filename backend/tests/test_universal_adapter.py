@@ -0,0 +1,120 @@
+"""
+UniversalScanner Fingerprinting Tests
+=====================================
+
+All probes for all addresses go out in one aggregate3, probe priority is kept,
+and detected types are remembered on disk.
+
+Run: python -m pytest tests/test_universal_adapter.py -v
+"""
+
+import pytest
+from eth_abi import encode
+from web3 import Web3
+
+from data_sources.universal_adapter import (
+    ContractType, ContractTypeCache, UniversalScanner, PROBE_SELECTORS
+)
+
+CLAMM_POOL = "0x" + "11" * 20
+V2_POOL = "0x" + "22" * 20
+VAULT = "0x" + "33" * 20
+EOA = "0x" + "44" * 20
+
+SLOT0, GET_RESERVES, ASSET, UNDERLYING = PROBE_SELECTORS
+
+# What each fake contract answers per selector (missing = revert)
+CONTRACTS = {
+    CLAMM_POOL: {
+        SLOT0: encode(["uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool"], [2**96, 5, 0, 1, 1, 0, True]),
+        # Some CL pools also expose a V2-looking getter - slot0 must win
+        GET_RESERVES: encode(["uint112", "uint112", "uint32"], [1, 2, 3]),
+    },
+    V2_POOL: {
+        GET_RESERVES: encode(["uint112", "uint112", "uint32"], [10**18, 5 * 10**18, 1700000000]),
+        # Fallback function answering with too few bytes is not a vault
+        ASSET: b"\x01",
+    },
+    VAULT: {
+        ASSET: encode(["address"], ["0x" + "ab" * 20]),
+    },
+}
+
+
+class FakeScanner(UniversalScanner):
+
+    def __init__(self, type_cache, fail=False):
+        super().__init__(type_cache=type_cache)
+        self.batches = []
+        self.fail = fail
+
+    def _get_web3(self, chain):
+        return Web3()
+
+    def _aggregate3(self, w3, calls):
+        self.batches.append(calls)
+        if self.fail:
+            raise ConnectionError("rpc down")
+        results = []
+        for call in calls:
+            answers = CONTRACTS.get(call["target"].lower())
+            if answers is None:
+                results.append((True, b""))  # EOA: call "succeeds" with no data
+            elif call["callData"] in answers:
+                results.append((True, answers[call["callData"]]))
+            else:
+                results.append((False, b""))
+        return results
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "contract_types.json"
+
+
+class TestFingerprinting:
+
+    @pytest.mark.asyncio
+    async def test_batch_detection_in_one_call(self, cache_path):
+        scanner = FakeScanner(ContractTypeCache(cache_path))
+
+        types = await scanner.identify_contract_types([CLAMM_POOL, V2_POOL, VAULT, EOA, V2_POOL.upper().replace("0X", "0x")])
+
+        assert types == {
+            CLAMM_POOL: ContractType.CLAMM,
+            V2_POOL: ContractType.V2_LP,
+            VAULT: ContractType.ERC4626,
+            EOA: ContractType.GENERIC_TOKEN_HOLDER,
+        }
+        assert len(scanner.batches) == 1
+        assert len(scanner.batches[0]) == 4 * len(PROBE_SELECTORS)
+
+    @pytest.mark.asyncio
+    async def test_detected_types_persist_across_instances(self, cache_path):
+        first = FakeScanner(ContractTypeCache(cache_path))
+        await first.identify_contract_types([CLAMM_POOL, EOA])
+
+        second = FakeScanner(ContractTypeCache(cache_path))
+        assert await second.identify_contract_type(CLAMM_POOL) == ContractType.CLAMM
+        assert second.batches == []
+
+        # GENERIC is never remembered - the EOA may get code later
+        assert await second.identify_contract_type(EOA) == ContractType.GENERIC_TOKEN_HOLDER
+        assert len(second.batches) == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_per_chain(self, cache_path):
+        scanner = FakeScanner(ContractTypeCache(cache_path))
+        await scanner.identify_contract_type(V2_POOL, "base")
+        await scanner.identify_contract_type(V2_POOL, "arbitrum")
+        assert len(scanner.batches) == 2
+
+    @pytest.mark.asyncio
+    async def test_rpc_failure_is_generic_and_not_cached(self, cache_path):
+        scanner = FakeScanner(ContractTypeCache(cache_path), fail=True)
+        assert await scanner.identify_contract_type(V2_POOL) == ContractType.GENERIC_TOKEN_HOLDER
+        assert scanner.get_stats()["rpc_failures"] == 1
+        assert not cache_path.exists()
+
+        scanner.fail = False
+        assert await scanner.identify_contract_type(V2_POOL) == ContractType.V2_LP
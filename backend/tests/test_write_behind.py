@@ -0,0 +1,124 @@
+"""
+Write-Behind Queue Tests
+========================
+
+Batching, upsert de-duplication, retries, durable spill and replay.
+Supabase is replaced by a fake bulk_upsert - no network needed.
+
+Run: python -m pytest tests/test_write_behind.py -v
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+
+class FakeSupabase:
+    """Records bulk_upsert calls and answers with scripted status codes"""
+
+    def __init__(self, statuses=None):
+        self.is_available = True
+        self.calls = []
+        self.statuses = list(statuses or [])
+
+    async def bulk_upsert(self, table, rows, on_conflict=None):
+        self.calls.append((table, list(rows), on_conflict))
+        return self.statuses.pop(0) if self.statuses else 201
+
+
+@pytest.fixture
+def queue(tmp_path):
+    from infrastructure.write_behind import WriteBehindQueue
+    return WriteBehindQueue(batch_size=100, flush_interval=60, max_retries=2, retry_delay=0, data_dir=tmp_path)
+
+
+class TestWriteBehindBatching:
+
+    @pytest.mark.asyncio
+    async def test_rows_flush_as_bulk_requests(self, queue):
+        fake = FakeSupabase()
+        for i in range(250):
+            queue.put_nowait("transactions", {"user_address": f"0x{i}", "action_type": "deposit"})
+
+        with patch("infrastructure.supabase_client.supabase", fake):
+            delivered = await queue.flush()
+
+        assert delivered == 250
+        assert [len(rows) for _, rows, _ in fake.calls] == [100, 100, 50]
+        assert queue.pending == 0
+        assert queue.get_stats()["rows_per_request"] == pytest.approx(83.3, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_upserts_deduplicated_by_conflict_key(self, queue):
+        fake = FakeSupabase()
+        for value in (1, 2, 3):
+            await queue.put("agent_balances", {"agent_address": "0xabc", "total_value_usd": value},
+                            on_conflict="agent_address")
+        await queue.put("agent_balances", {"agent_address": "0xdef", "total_value_usd": 9},
+                        on_conflict="agent_address")
+
+        with patch("infrastructure.supabase_client.supabase", fake):
+            await queue.flush()
+        await queue.stop()
+
+        table, rows, on_conflict = fake.calls[0]
+        assert table == "agent_balances" and on_conflict == "agent_address"
+        assert sorted(r["total_value_usd"] for r in rows) == [3, 9], "Last write per key must win"
+
+
+class TestWriteBehindDurability:
+
+    @pytest.mark.asyncio
+    async def test_retries_then_succeeds(self, queue):
+        fake = FakeSupabase(statuses=[None, 503, 201])
+        queue.put_nowait("transactions", {"action_type": "swap"})
+
+        with patch("infrastructure.supabase_client.supabase", fake):
+            delivered = await queue.flush()
+
+        assert delivered == 1
+        assert len(fake.calls) == 3
+        assert queue.get_stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_spill_and_replay(self, queue, tmp_path):
+        down = FakeSupabase(statuses=[500, 500, 500])
+        queue.put_nowait("transactions", {"action_type": "withdraw"})
+
+        with patch("infrastructure.supabase_client.supabase", down):
+            assert await queue.flush() == 0
+
+        spilled = [json.loads(l) for l in queue.spill_file.read_text().splitlines()]
+        assert spilled == [{"table": "transactions", "on_conflict": None, "row": {"action_type": "withdraw"}}]
+
+        # "Restart": a fresh queue picks the spilled row back up
+        from infrastructure.write_behind import WriteBehindQueue
+        restarted = WriteBehindQueue(batch_size=100, flush_interval=60, data_dir=tmp_path)
+        up = FakeSupabase()
+        with patch("infrastructure.supabase_client.supabase", up):
+            restarted.start()
+            await restarted.stop()
+
+        assert up.calls == [("transactions", [{"action_type": "withdraw"}], None)]
+        assert not queue.spill_file.exists()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_go_to_dead_letter(self, queue):
+        fake = FakeSupabase(statuses=[400])
+        queue.put_nowait("transactions", {"bad": "row"})
+
+        with patch("infrastructure.supabase_client.supabase", fake):
+            await queue.flush()
+
+        assert len(fake.calls) == 1, "4xx must not be retried"
+        assert queue.dead_letter_file.exists()
+        assert not queue.spill_file.exists()
+
+    def test_put_nowait_spills_when_full(self, tmp_path):
+        from infrastructure.write_behind import WriteBehindQueue
+        small = WriteBehindQueue(max_pending=2, data_dir=tmp_path)
+        for i in range(3):
+            small.put_nowait("transactions", {"i": i})
+
+        assert small.pending == 2
+        assert small.get_stats()["spilled_rows"] == 1
@@ -7,7 +7,7 @@ import json
 import os
 import aiosqlite
 from dataclasses import dataclass, field, asdict
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -167,6 +167,16 @@ class UserConfigStore:
             """, (telegram_id, alert_type, pool_id, message, datetime.utcnow().isoformat()))
             await db.commit()
     
+    async def log_alerts(self, rows: List[tuple]):
+        """Log many sent alerts in one transaction: rows of (telegram_id, alert_type, pool_id, message)"""
+        sent_at = datetime.utcnow().isoformat()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT INTO alert_history (telegram_id, alert_type, pool_id, message, sent_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(*row, sent_at) for row in rows])
+            await db.commit()
+    
     async def get_recent_alerts(self, telegram_id: int, minutes: int = 60) -> List[dict]:
         """Get recent alerts to prevent spam"""
         from datetime import timedelta
@@ -178,6 +188,32 @@ class UserConfigStore:
                 WHERE telegram_id = ? AND sent_at > ?
             """, (telegram_id, cutoff)) as cursor:
                 return [{"type": r[0], "pool_id": r[1], "sent_at": r[2]} async for r in cursor]
+    
+    async def get_recent_alerts_for_users(self, intervals: Dict[int, int]) -> Dict[int, List[dict]]:
+        """
+        Recent alerts for many users in one query per 500 users.
+        intervals: {telegram_id: window in minutes} - each user gets their own window
+        """
+        from datetime import timedelta
+        now = datetime.utcnow()
+        cutoffs = {tid: (now - timedelta(minutes=m)).isoformat() for tid, m in intervals.items()}
+        recent: Dict[int, List[dict]] = {tid: [] for tid in intervals}
+        if not cutoffs:
+            return recent
+        
+        ids = list(cutoffs)
+        async with aiosqlite.connect(self.db_path) as db:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(f"""
+                    SELECT telegram_id, alert_type, pool_id, sent_at FROM alert_history
+                    WHERE telegram_id IN ({placeholders}) AND sent_at > ?
+                """, (*chunk, min(cutoffs[t] for t in chunk))) as cursor:
+                    async for r in cursor:
+                        if r[3] > cutoffs[r[0]]:
+                            recent[r[0]].append({"type": r[1], "pool_id": r[2], "sent_at": r[3]})
+        return recent
 
 
 # Global store instance
@@ -13,8 +13,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from .models.user_config import user_store, UserConfig
-from .services.alerts import generate_alerts_for_user, fetch_all_pools_for_alerts
+from .services.alerts import generate_alerts_for_users, fetch_all_pools_for_alerts
 from .services.new_pool_alert import new_pool_detector
+from .services.alert_dispatcher import alert_dispatcher, OutboundMessage
 from .services.channel_poster import channel_poster
 
 logger = logging.getLogger(__name__)
@@ -119,8 +120,11 @@ async def check_new_pools():
     logger.info("🆕 Checking for new pools...")
     
     try:
-        bot = get_bot()
-        alerts_sent = await new_pool_detector.check_all_users(bot.bot)
+        bot = get_scheduler_bot()
+        if not bot:
+            logger.error("No bot available for new pool check")
+            return
+        alerts_sent = await new_pool_detector.check_all_users(bot)
         
         if alerts_sent > 0:
             logger.info(f"🆕 Sent {alerts_sent} new pool alerts")
@@ -213,38 +217,32 @@ async def check_and_send_alerts():
         current_pools = await fetch_all_pools_for_alerts()
         current_pool_map = {p.get("pool", p.get("id", "")): p for p in current_pools if p.get("pool") or p.get("id")}
         
-        alerts_sent = 0
+        # One pass over the changed pools, matched only against users whose filters apply
+        alerts_by_user = generate_alerts_for_users(users, _previous_pools, current_pools)
         
-        for user in users:
-            try:
-                # Check rate limiting
-                recent = await user_store.get_recent_alerts(
-                    user.telegram_id, 
-                    user.alert_interval_minutes
-                )
-                
-                # Generate alerts for this user
-                alerts = await generate_alerts_for_user(user, _previous_pools)
-                
-                # Filter out already-sent alerts
-                recent_pool_ids = {r["pool_id"] for r in recent}
-                new_alerts = [a for a in alerts if a["pool_id"] not in recent_pool_ids]
-                
-                # Send alerts
-                bot = get_bot()
-                for alert in new_alerts[:3]:  # Max 3 alerts per check
-                    await bot.send_alert(user.telegram_id, alert["message"])
-                    await user_store.log_alert(
-                        user.telegram_id,
-                        alert["type"],
-                        alert["pool_id"],
-                        alert["message"][:200]
-                    )
-                    alerts_sent += 1
-                    await asyncio.sleep(0.1)  # Rate limit
-                    
-            except Exception as e:
-                logger.error(f"Error processing alerts for {user.telegram_id}: {e}")
+        # Check rate limiting (one query for everyone with pending alerts)
+        recent_by_user = await user_store.get_recent_alerts_for_users({
+            user.telegram_id: user.alert_interval_minutes
+            for user in users if user.telegram_id in alerts_by_user
+        })
+        
+        messages = []
+        for telegram_id, alerts in alerts_by_user.items():
+            # Filter out already-sent alerts
+            recent_pool_ids = {r["pool_id"] for r in recent_by_user.get(telegram_id, [])}
+            new_alerts = [a for a in alerts if a["pool_id"] not in recent_pool_ids]
+            
+            for alert in new_alerts[:3]:  # Max 3 alerts per check
+                messages.append(OutboundMessage(
+                    chat_id=telegram_id,
+                    text=alert["message"],
+                    alert_type=alert["type"],
+                    pool_id=alert["pool_id"],
+                    log_message=alert["message"][:200]
+                ))
+        
+        # Send all alerts concurrently (rate limited) and log them in one batch
+        alerts_sent = await alert_dispatcher.dispatch(get_scheduler_bot(), messages, store=user_store)
         
         # Update previous pool states
         _previous_pools = current_pool_map
@@ -288,15 +286,12 @@ async def send_daily_digest():
 _Use /pools to explore opportunities_
 """
         
-        bot = get_bot()
-        for user in premium_users:
-            try:
-                await bot.send_alert(user.telegram_id, digest)
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                logger.warning(f"Failed to send digest to {user.telegram_id}: {e}")
+        sent = await alert_dispatcher.dispatch(
+            get_scheduler_bot(),
+            [OutboundMessage(chat_id=user.telegram_id, text=digest) for user in premium_users]
+        )
         
-        logger.info(f"📊 Daily digest sent to {len(premium_users)} premium users")
+        logger.info(f"📊 Daily digest sent to {sent}/{len(premium_users)} premium users")
         
     except Exception as e:
         logger.error(f"Daily digest failed: {e}")
@@ -0,0 +1,170 @@
+"""
+Techne Telegram Bot - Alert Dispatcher
+Fans messages out concurrently within Telegram's rate limits
+
+WHY: Alert jobs sent one message at a time (send -> log -> next user) with
+fixed sleeps in between, so a cycle took users x round-trip and grew
+linearly with the premium user base.
+
+DESIGN:
+- One sender task per chat (messages to the same chat stay in order),
+  at most `max_concurrency` chats in flight
+- Global pacing (global_rate, 25 msg/s by default - under Telegram's ~30/s)
+  and per-chat pacing (1 msg/s private, 20 msg/min groups/channels) - both
+  as "next free slot" timestamps, no polling
+- Flood-control errors (RetryAfter) wait the server-given delay and retry
+- Alert history rows for the whole batch are written in one transaction
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ChatId = Union[int, str]
+
+
+@dataclass
+class OutboundMessage:
+    """One message to send; alert_type set = log it to alert_history once sent"""
+    chat_id: ChatId
+    text: str
+    alert_type: Optional[str] = None
+    pool_id: str = ""
+    log_message: str = ""
+    options: Dict = field(default_factory=lambda: {"parse_mode": "Markdown"})
+
+
+class AlertDispatcher:
+    """
+    Concurrent, rate-limited Telegram sender.
+
+    USAGE:
+        sent = await alert_dispatcher.dispatch(bot, [OutboundMessage(chat_id, text, "new_pool", pool_id)])
+        ok = await alert_dispatcher.send(bot, CHANNEL_NEWS, text, parse_mode="Markdown")
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 25.0,        # Telegram allows ~30/s per bot; keep headroom
+        private_interval: float = 1.0,    # 1 msg/s per private chat
+        group_interval: float = 3.0,      # 20 msg/min per group/channel
+        max_concurrency: int = 16,
+        max_retries: int = 2
+    ):
+        self.global_interval = 1.0 / global_rate
+        self.private_interval = private_interval
+        self.group_interval = group_interval
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._next_global = 0.0
+        self._next_chat: Dict[ChatId, float] = {}
+
+        self._stats = {"sent": 0, "failed": 0, "retries": 0, "logged": 0}
+
+    # ==========================================
+    # PACING
+    # ==========================================
+
+    def _chat_interval(self, chat_id: ChatId) -> float:
+        # Private chats have positive ids; groups are negative, channels "@name" or -100...
+        if isinstance(chat_id, int) and chat_id > 0:
+            return self.private_interval
+        return self.group_interval
+
+    async def _wait_for_slot(self, chat_id: ChatId):
+        """Wait for this chat's next slot, then claim the next bot-wide slot"""
+        now = time.monotonic()
+        chat_slot = max(now, self._next_chat.get(chat_id, 0.0))
+        self._next_chat[chat_id] = chat_slot + self._chat_interval(chat_id)
+        if chat_slot > now:
+            await asyncio.sleep(chat_slot - now)
+
+        # Claimed only once the chat is ready, so a waiting chat never holds up others
+        now = time.monotonic()
+        global_slot = max(now, self._next_global)
+        self._next_global = global_slot + self.global_interval
+        if global_slot > now:
+            await asyncio.sleep(global_slot - now)
+
+    def _prune_chats(self):
+        """Forget per-chat slots that are already in the past"""
+        if len(self._next_chat) > 10_000:
+            now = time.monotonic()
+            self._next_chat = {c: t for c, t in self._next_chat.items() if t > now}
+
+    # ==========================================
+    # SENDING
+    # ==========================================
+
+    async def send(self, bot, chat_id: ChatId, text: str, **options) -> bool:
+        """Send one message respecting rate limits (retries on flood control)"""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_slot(chat_id)
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, **options)
+                self._stats["sent"] += 1
+                return True
+            except Exception as e:
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is None or attempt == self.max_retries:
+                    self._stats["failed"] += 1
+                    logger.warning(f"Failed to send to {chat_id}: {e}")
+                    return False
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                self._stats["retries"] += 1
+                # Telegram asked us to back off: push this chat's next slot out
+                self._next_chat[chat_id] = time.monotonic() + float(retry_after)
+        return False
+
+    async def dispatch(self, bot, messages: List[OutboundMessage], store=None) -> int:
+        """
+        Send all messages concurrently (ordered per chat) and batch-log alerts.
+        Returns number of messages sent.
+        """
+        if not messages:
+            return 0
+
+        by_chat: Dict[ChatId, List[OutboundMessage]] = {}
+        for message in messages:
+            by_chat.setdefault(message.chat_id, []).append(message)
+
+        async def send_chat(chat_messages: List[OutboundMessage]) -> List[OutboundMessage]:
+            async with self._semaphore:
+                delivered = []
+                for message in chat_messages:
+                    if await self.send(bot, message.chat_id, message.text, **message.options):
+                        delivered.append(message)
+                return delivered
+
+        results = await asyncio.gather(*(send_chat(m) for m in by_chat.values()), return_exceptions=True)
+        delivered = [m for result in results if isinstance(result, list) for m in result]
+        self._prune_chats()
+
+        rows = [
+            (m.chat_id, m.alert_type, m.pool_id, m.log_message or m.text[:200])
+            for m in delivered if m.alert_type
+        ]
+        if rows:
+            try:
+                if store is None:
+                    from ..models.user_config import user_store as store
+                await store.log_alerts(rows)
+                self._stats["logged"] += len(rows)
+            except Exception as e:
+                logger.error(f"Failed to log {len(rows)} alerts: {e}")
+
+        return len(delivered)
+
+    def get_stats(self) -> Dict:
+        return {**self._stats, "chats_tracked": len(self._next_chat)}
+
+
+# Global dispatcher instance
+alert_dispatcher = AlertDispatcher()
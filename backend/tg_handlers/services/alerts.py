@@ -7,6 +7,7 @@ import httpx
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from ..models.user_config import UserConfig, user_store
+from .filter_index import UserFilterIndex
 
 
 # Cache for previous pool states (for comparison)
@@ -116,75 +117,110 @@ def check_risk_change(pool: Dict, previous_pool: Optional[Dict]) -> Optional[Tup
     return None
 
 
-async def generate_alerts_for_user(config: UserConfig, previous_pools: Dict[str, Dict]) -> List[Dict[str, Any]]:
-    """
-    Generate alerts for a specific user based on their config
+def _change_percent(old_value, new_value) -> Optional[float]:
+    """Percent change, None when there is no positive baseline"""
+    if not old_value or old_value <= 0:
+        return None
+    return ((new_value - old_value) / old_value) * 100
+
+
+def generate_alerts_for_users(
+    users: List[UserConfig],
+    previous_pools: Dict[str, Dict],
+    current_pools: List[Dict[str, Any]],
+    index: Optional[UserFilterIndex] = None
+) -> Dict[int, List[Dict[str, Any]]]:
     """
-    if not config.alerts_enabled:
-        return []
+    Generate alerts for all users in one pass over the pools.
+    Returns {telegram_id: [alerts]} (users without alerts omitted)
     
-    # Get fresh pools
-    current_pools = await fetch_all_pools_for_alerts()
+    Changes (APY / TVL / risk) are computed once per pool; a pool is only
+    matched against users - via the filter index - if its change could cross
+    somebody's threshold. Alert messages are shared by all recipients.
+    """
+    users = [u for u in users if u.alerts_enabled]
+    if not users:
+        return {}
+    index = index or UserFilterIndex(users)
+    min_apy_threshold = min(u.apy_spike_threshold for u in users)
+    min_tvl_threshold = min(u.tvl_change_threshold for u in users)
     
-    alerts = []
+    alerts_by_user: Dict[int, List[Dict[str, Any]]] = {}
     
     for pool in current_pools:
         pool_id = pool.get("pool", pool.get("id"))
         if not pool_id:
             continue
         
-        # Filter by user preferences
-        chain = pool.get("chain", "").lower()
-        project = pool.get("project", "").lower()
-        
-        # Chain filter
-        if config.chain != "all" and chain != config.chain.lower():
-            continue
-        
-        # Protocol filter
-        if config.protocols and not any(p.lower() in project for p in config.protocols):
+        previous = previous_pools.get(pool_id)
+        if not previous:
             continue
         
-        previous = previous_pools.get(pool_id)
+        apy_change = _change_percent(previous.get("apy", 0), pool.get("apy", 0))
+        tvl_change = _change_percent(previous.get("tvl", 0), pool.get("tvl", 0))
+        risk_result = check_risk_change(pool, previous)
         
-        # Check APY spike
-        apy_result = check_apy_spike(pool, previous, config.apy_spike_threshold)
-        if apy_result:
-            alerts.append({
+        apy_alert = tvl_alert = risk_alert = None
+        if apy_change is not None and apy_change >= min_apy_threshold:
+            old_apy, new_apy = previous.get("apy", 0), pool.get("apy", 0)
+            apy_alert = {
                 "type": "apy_spike",
-                "pool_id": apy_result[0],
+                "pool_id": pool_id,
                 "pool": pool,
-                "old_value": apy_result[1],
-                "new_value": apy_result[2],
-                "message": format_apy_alert(pool, apy_result[1], apy_result[2])
-            })
-        
-        # Check TVL change
-        tvl_result = check_tvl_change(pool, previous, config.tvl_change_threshold)
-        if tvl_result:
-            alerts.append({
+                "old_value": old_apy,
+                "new_value": new_apy,
+                "message": format_apy_alert(pool, old_apy, new_apy)
+            }
+        if tvl_change is not None and abs(tvl_change) >= min_tvl_threshold:
+            old_tvl, new_tvl = previous.get("tvl", 0), pool.get("tvl", 0)
+            direction = "increase" if tvl_change > 0 else "decrease"
+            tvl_alert = {
                 "type": "tvl_change",
-                "pool_id": tvl_result[0],
+                "pool_id": pool_id,
                 "pool": pool,
-                "old_value": tvl_result[1],
-                "new_value": tvl_result[2],
-                "direction": tvl_result[3],
-                "message": format_tvl_alert(pool, tvl_result[1], tvl_result[2], tvl_result[3])
-            })
-        
-        # Check risk change
-        risk_result = check_risk_change(pool, previous)
+                "old_value": old_tvl,
+                "new_value": new_tvl,
+                "direction": direction,
+                "message": format_tvl_alert(pool, old_tvl, new_tvl, direction)
+            }
         if risk_result:
-            alerts.append({
+            risk_alert = {
                 "type": "risk_change",
                 "pool_id": risk_result[0],
                 "pool": pool,
                 "old_value": risk_result[1],
                 "new_value": risk_result[2],
                 "message": format_risk_alert(pool, risk_result[1], risk_result[2])
-            })
+            }
+        
+        if not (apy_alert or tvl_alert or risk_alert):
+            continue  # Unchanged for everyone - no user lookups
+        
+        for user in index.match_scope(pool):
+            user_alerts = []
+            if apy_alert and apy_change >= user.apy_spike_threshold:
+                user_alerts.append(apy_alert)
+            if tvl_alert and abs(tvl_change) >= user.tvl_change_threshold:
+                user_alerts.append(tvl_alert)
+            if risk_alert:
+                user_alerts.append(risk_alert)
+            if user_alerts:
+                alerts_by_user.setdefault(user.telegram_id, []).extend(user_alerts)
+    
+    return alerts_by_user
+
+
+async def generate_alerts_for_user(config: UserConfig, previous_pools: Dict[str, Dict]) -> List[Dict[str, Any]]:
+    """
+    Generate alerts for a specific user based on their config
+    """
+    if not config.alerts_enabled:
+        return []
+    
+    # Get fresh pools
+    current_pools = await fetch_all_pools_for_alerts()
     
-    return alerts
+    return generate_alerts_for_users([config], previous_pools, current_pools).get(config.telegram_id, [])
 
 
 def format_apy_alert(pool: Dict, old_apy: float, new_apy: float) -> str:
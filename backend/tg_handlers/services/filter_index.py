@@ -0,0 +1,220 @@
+"""
+Techne Telegram Bot - User Filter Index
+Matches a pool against every user's alert filters without scanning every user
+
+WHY: Alert jobs checked each pool against each UserConfig separately -
+O(users x pools) per cycle, even though most users can't possibly match
+most pools (wrong chain, wrong protocol, TVL/APY floor too high).
+
+DESIGN:
+- Users are bucketed by chain, protocol term, asset class (stablecoin-only,
+  single/dual) and min TVL / min APY (log-scale buckets, stored cumulatively:
+  bucket k holds every user whose minimum falls in a bucket <= k)
+- A pool looks up one set per key and intersects them (smallest first);
+  only the survivors run the exact pool_matches_filters() check, so results
+  are identical to the full scan
+- Protocol filters are substring matches ("aero" matches "aerodrome-v2"), so a
+  pool tests the few distinct protocol terms, not the users
+"""
+
+import math
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+STABLECOINS = ["USDC", "USDT", "DAI", "FRAX", "LUSD", "TUSD", "BUSD"]
+
+TVL_BUCKETS = 14   # log10: $1 .. $10T
+APY_BUCKETS = 14   # log2: 1% .. 8192%
+
+_RISK_ALLOWED = {
+    "low": ["low"],
+    "medium": ["low", "medium"],
+    "high": ["low", "medium", "high"]
+}
+
+
+def pool_matches_filters(pool: Dict, config) -> bool:
+    """Check if pool matches user's filter configuration"""
+    # Chain filter
+    if config.chain != "all":
+        pool_chain = pool.get("chain", "").lower()
+        if pool_chain != config.chain.lower():
+            return False
+
+    # TVL filter
+    tvl = pool.get("tvl", 0)
+    if tvl < config.min_tvl:
+        return False
+    if config.max_tvl and tvl > config.max_tvl:
+        return False
+
+    # APY filter
+    apy = pool.get("apy", 0)
+    if apy < config.min_apy:
+        return False
+    if apy > config.max_apy:
+        return False
+
+    # Protocol filter
+    if config.protocols:
+        pool_protocol = pool.get("project", "").lower()
+        if not any(p.lower() in pool_protocol for p in config.protocols):
+            return False
+
+    # Pool type filter (single/dual)
+    if config.pool_type != "all":
+        is_dual = _is_dual(pool.get("symbol", ""))
+        if config.pool_type == "dual" and not is_dual:
+            return False
+        if config.pool_type == "single" and is_dual:
+            return False
+
+    # Stablecoin filter
+    if config.stablecoin_only and not _is_stable(pool.get("symbol", "")):
+        return False
+
+    # Risk filter
+    if config.risk_level != "all":
+        pool_risk = pool.get("risk_level", "Medium").lower()
+        if pool_risk not in _RISK_ALLOWED.get(config.risk_level.lower(), ["low", "medium", "high"]):
+            return False
+
+    return True
+
+
+def _is_dual(symbol: str) -> bool:
+    return "/" in symbol or "-" in symbol
+
+
+def _is_stable(symbol: str) -> bool:
+    symbol = symbol.upper()
+    return any(s in symbol for s in STABLECOINS)
+
+
+def _log_bucket(value, base: float, buckets: int) -> int:
+    """Monotonic bucket: a <= b implies bucket(a) <= bucket(b)"""
+    if not value or value <= 0:
+        return 0
+    return min(max(int(math.floor(math.log(value, base))) + 1, 0), buckets - 1)
+
+
+def filter_signature(users: List) -> Tuple:
+    """Everything the index depends on - rebuild when this changes"""
+    return tuple(
+        (u.telegram_id, u.chain, u.min_tvl, u.max_tvl, u.min_apy, u.max_apy,
+         tuple(u.protocols), u.pool_type, u.stablecoin_only, u.risk_level)
+        for u in users
+    )
+
+
+class UserFilterIndex:
+    """
+    Inverted index over user filters.
+
+    USAGE:
+        index = UserFilterIndex(users)
+        for user in index.match(pool): ...          # full filter (new-pool alerts)
+        for user in index.match_scope(pool): ...    # chain + protocol only (change alerts)
+    """
+
+    def __init__(self, users: List):
+        self.users = list(users)
+        self._order = {u.telegram_id: i for i, u in enumerate(self.users)}
+        self._by_id = {u.telegram_id: u for u in self.users}
+        everyone = frozenset(self._by_id)
+
+        # Chain: users of that chain + users on "all"
+        any_chain: Set[int] = set()
+        by_chain: Dict[str, Set[int]] = {}
+        # Protocol: users with no protocol filter + per-term sets
+        self._any_protocol: Set[int] = set()
+        self._by_protocol: Dict[str, Set[int]] = {}
+        # Asset class
+        stable_only: Set[int] = set()
+        single_only: Set[int] = set()
+        dual_only: Set[int] = set()
+        tvl_buckets = [set() for _ in range(TVL_BUCKETS)]
+        apy_buckets = [set() for _ in range(APY_BUCKETS)]
+
+        for u in self.users:
+            tid = u.telegram_id
+            if u.chain == "all":
+                any_chain.add(tid)
+            else:
+                by_chain.setdefault(u.chain.lower(), set()).add(tid)
+
+            if u.protocols:
+                for term in u.protocols:
+                    self._by_protocol.setdefault(term.lower(), set()).add(tid)
+            else:
+                self._any_protocol.add(tid)
+
+            if u.stablecoin_only:
+                stable_only.add(tid)
+            if u.pool_type == "single":
+                single_only.add(tid)
+            elif u.pool_type == "dual":
+                dual_only.add(tid)
+
+            tvl_buckets[_log_bucket(u.min_tvl, 10, TVL_BUCKETS)].add(tid)
+            apy_buckets[_log_bucket(u.min_apy, 2, APY_BUCKETS)].add(tid)
+
+        self._any_chain: FrozenSet[int] = frozenset(any_chain)
+        self._chain_sets: Dict[str, FrozenSet[int]] = {
+            chain: frozenset(ids | any_chain) for chain, ids in by_chain.items()
+        }
+        # (is_stable, is_dual) -> users whose asset filters admit such a pool
+        self._asset_sets: Dict[Tuple[bool, bool], FrozenSet[int]] = {
+            (is_stable, is_dual): frozenset(
+                everyone
+                - (set() if is_stable else stable_only)
+                - (single_only if is_dual else dual_only)
+            )
+            for is_stable in (True, False) for is_dual in (True, False)
+        }
+        self._tvl_prefix = self._cumulative(tvl_buckets)
+        self._apy_prefix = self._cumulative(apy_buckets)
+
+    @staticmethod
+    def _cumulative(buckets: List[Set[int]]) -> List[FrozenSet[int]]:
+        prefix, running = [], set()
+        for ids in buckets:
+            running |= ids
+            prefix.append(frozenset(running))
+        return prefix
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    # ==========================================
+    # LOOKUPS
+    # ==========================================
+
+    def _scope_sets(self, pool: Dict) -> List:
+        chain = pool.get("chain", "").lower()
+        project = pool.get("project", "").lower()
+
+        protocol_ids = self._any_protocol
+        matched_terms = [term for term in self._by_protocol if term in project]
+        if matched_terms:
+            protocol_ids = protocol_ids.union(*(self._by_protocol[t] for t in matched_terms))
+
+        return [self._chain_sets.get(chain, self._any_chain), protocol_ids]
+
+    def _resolve(self, sets: List) -> List:
+        sets = sorted(sets, key=len)
+        candidates = sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+        return [self._by_id[tid] for tid in sorted(candidates, key=self._order.__getitem__)]
+
+    def match_scope(self, pool: Dict) -> List:
+        """Users whose chain + protocol filters cover this pool (in user order)"""
+        return self._resolve(self._scope_sets(pool))
+
+    def match(self, pool: Dict) -> List:
+        """Users whose full filter configuration matches this pool (in user order)"""
+        symbol = pool.get("symbol", "")
+        sets = self._scope_sets(pool) + [
+            self._asset_sets[(_is_stable(symbol), _is_dual(symbol))],
+            self._tvl_prefix[_log_bucket(pool.get("tvl", 0), 10, TVL_BUCKETS)],
+            self._apy_prefix[_log_bucket(pool.get("apy", 0), 2, APY_BUCKETS)],
+        ]
+        return [u for u in self._resolve(sets) if pool_matches_filters(pool, u)]
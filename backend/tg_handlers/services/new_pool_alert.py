@@ -10,6 +10,8 @@ import logging
 
 from ..models.user_config import UserConfig, user_store
 from .pools import fetch_pools
+from .alert_dispatcher import alert_dispatcher, OutboundMessage
+from .filter_index import UserFilterIndex, filter_signature, pool_matches_filters
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,12 @@ class NewPoolDetector:
         
         # Last update time
         self._last_check: Optional[datetime] = None
+        
+        # Filter index over the current user set + the pool fields it was evaluated on
+        # Format: {pool_id: (chain, project, symbol, tvl, apy, risk_level)}
+        self._index: Optional[UserFilterIndex] = None
+        self._index_signature: Optional[tuple] = None
+        self._evaluated: Dict[str, tuple] = {}
     
     def _get_pool_id(self, pool: Dict) -> str:
         """Generate unique pool identifier"""
@@ -36,60 +44,7 @@ class NewPoolDetector:
     
     def _pool_matches_filters(self, pool: Dict, config: UserConfig) -> bool:
         """Check if pool matches user's filter configuration"""
-        # Chain filter
-        if config.chain != "all":
-            pool_chain = pool.get("chain", "").lower()
-            if pool_chain != config.chain.lower():
-                return False
-        
-        # TVL filter
-        tvl = pool.get("tvl", 0)
-        if tvl < config.min_tvl:
-            return False
-        if config.max_tvl and tvl > config.max_tvl:
-            return False
-        
-        # APY filter
-        apy = pool.get("apy", 0)
-        if apy < config.min_apy:
-            return False
-        if apy > config.max_apy:
-            return False
-        
-        # Protocol filter
-        if config.protocols:
-            pool_protocol = pool.get("project", "").lower()
-            if not any(p.lower() in pool_protocol for p in config.protocols):
-                return False
-        
-        # Pool type filter (single/dual)
-        if config.pool_type != "all":
-            symbol = pool.get("symbol", "")
-            is_dual = "/" in symbol or "-" in symbol
-            if config.pool_type == "dual" and not is_dual:
-                return False
-            if config.pool_type == "single" and is_dual:
-                return False
-        
-        # Stablecoin filter
-        if config.stablecoin_only:
-            symbol = pool.get("symbol", "").upper()
-            stables = ["USDC", "USDT", "DAI", "FRAX", "LUSD", "TUSD", "BUSD"]
-            if not any(s in symbol for s in stables):
-                return False
-        
-        # Risk filter
-        if config.risk_level != "all":
-            pool_risk = pool.get("risk_level", "Medium").lower()
-            allowed_risks = {
-                "low": ["low"],
-                "medium": ["low", "medium"],
-                "high": ["low", "medium", "high"]
-            }
-            if pool_risk not in allowed_risks.get(config.risk_level.lower(), ["low", "medium", "high"]):
-                return False
-        
-        return True
+        return pool_matches_filters(pool, config)
     
     async def detect_new_pools_for_user(self, config: UserConfig, all_pools: List[Dict]) -> List[Dict]:
         """
@@ -124,6 +79,49 @@ class NewPoolDetector:
         
         return new_pools
     
+    def detect_new_pools(self, users: List[UserConfig], all_pools: List[Dict]) -> Dict[int, List[Dict]]:
+        """
+        Detect new matching pools for all users in one pass over the pools.
+        Returns {telegram_id: [new pools]} (users without new pools omitted)
+        
+        Each pool is matched only against the users the filter index admits,
+        and a pool whose filter-relevant fields haven't changed since it was
+        last evaluated (same user filters) is skipped - every user it matched
+        has already seen it.
+        """
+        signature = filter_signature(users)
+        if signature != self._index_signature:
+            self._index = UserFilterIndex(users)
+            self._index_signature = signature
+            self._evaluated = {}
+        
+        new_by_user: Dict[int, List[Dict]] = {}
+        for pool in all_pools:
+            pool_id = self._get_pool_id(pool)
+            state = (pool.get("chain"), pool.get("project"), pool.get("symbol"),
+                     pool.get("tvl"), pool.get("apy"), pool.get("risk_level"))
+            if self._evaluated.get(pool_id) == state:
+                continue
+            self._evaluated[pool_id] = state
+            
+            try:
+                matched = self._index.match(pool)
+            except Exception as e:
+                logger.error(f"Error matching pool {pool_id}: {e}")
+                continue
+            
+            for user in matched:
+                seen = self._seen_pools.setdefault(user.telegram_id, set())
+                if pool_id in seen:
+                    continue
+                # Only notify if we've done at least one check before
+                # (prevents spam on first run)
+                if self._last_check is not None:
+                    new_by_user.setdefault(user.telegram_id, []).append(pool)
+                seen.add(pool_id)
+        
+        return new_by_user
+    
     def format_new_pool_alert(self, pool: Dict) -> str:
         """Format a new pool alert message"""
         symbol = pool.get("symbol", "?")
@@ -200,8 +198,6 @@ Use /pool to see more details
             if not users:
                 return 0
             
-            alerts_sent = 0
-            
             # Fetch pools once (all chains, broad filters)
             from .pools import API_BASE
             import httpx
@@ -224,28 +220,21 @@ Use /pool to see more details
             if not all_pools:
                 return 0
             
-            # Check each user
-            for user in users:
-                try:
-                    new_pools = await self.detect_new_pools_for_user(user, all_pools)
-                    
-                    if new_pools:
-                        message = self.format_new_pools_summary(new_pools)
-                        await bot.send_message(user.telegram_id, message, parse_mode="Markdown")
-                        
-                        # Log alert
-                        pool_ids = ",".join(self._get_pool_id(p) for p in new_pools[:3])
-                        await user_store.log_alert(
-                            user.telegram_id,
-                            "new_pool",
-                            pool_ids,
-                            f"Found {len(new_pools)} new pools"
-                        )
-                        
-                        alerts_sent += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error checking user {user.telegram_id}: {e}")
+            # One pass: match each pool against the users whose filters could apply
+            new_by_user = self.detect_new_pools(users, all_pools)
+            messages = [
+                OutboundMessage(
+                    chat_id=telegram_id,
+                    text=self.format_new_pools_summary(new_pools),
+                    alert_type="new_pool",
+                    pool_id=",".join(self._get_pool_id(p) for p in new_pools[:3]),
+                    log_message=f"Found {len(new_pools)} new pools"
+                )
+                for telegram_id, new_pools in new_by_user.items()
+            ]
+            
+            # Fan out concurrently (rate limited), alerts logged in one batch
+            alerts_sent = await alert_dispatcher.dispatch(bot, messages, store=user_store)
             
             # Update last check time
             self._last_check = datetime.utcnow()
@@ -8,7 +8,6 @@ Features:
 - Posts immediately to News channel when something new appears
 """
 
-import asyncio
 import logging
 import re
 import hashlib
@@ -17,6 +16,8 @@ from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
 from difflib import SequenceMatcher
 
+from .alert_dispatcher import alert_dispatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -230,21 +231,21 @@ class NewsMonitor:
         # Format and post
         message = self._format_news_post(item)
         
-        try:
-            await bot.send_message(
-                chat_id=channel_id,
-                text=message,
-                parse_mode="Markdown",
-                disable_web_page_preview=True
-            )
-            
-            self._mark_as_posted(item)
-            logger.info(f"📰 Posted: {item.title[:50]}...")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to post news: {e}")
+        # Dispatcher paces posts per channel (Telegram: 20/min) - no fixed sleeps
+        posted = await alert_dispatcher.send(
+            bot,
+            channel_id,
+            message,
+            parse_mode="Markdown",
+            disable_web_page_preview=True
+        )
+        if not posted:
+            logger.error(f"Failed to post news: {item.title[:50]}")
             return False
+        
+        self._mark_as_posted(item)
+        logger.info(f"📰 Posted: {item.title[:50]}...")
+        return True
     
     async def check_and_post_news(self, news_items: List[NewsItem], bot, channel_id: str) -> int:
         """
@@ -260,8 +261,6 @@ class NewsMonitor:
         for item in sorted_items:
             if await self.process_news_item(item, bot, channel_id):
                 posted += 1
-                # Small delay between posts
-                await asyncio.sleep(2)
         
         return posted
     
@@ -23,6 +23,11 @@ class PortfolioDashboard {
         this.ws = null;
         this.wsReconnectAttempts = 0;
 
+        // Server portfolio snapshot + version that portfolio_patch ops apply to
+        this.liveSnapshot = null;
+        this.liveVersion = 0;
+        this.resyncRequested = false;
+
         // Performance chart data
         this.performanceData = {
             '7d': [],
@@ -2373,8 +2378,11 @@ class PortfolioDashboard {
 
     handleWebSocketMessage(data) {
         switch (data.type) {
-            case 'portfolio_update':
-                this.handlePortfolioUpdate(data.data);
+            case 'snapshot':
+                this.handleSnapshot(data);
+                break;
+            case 'portfolio_patch':
+                this.handlePortfolioPatch(data);
                 break;
             case 'transaction':
                 this.handleNewTransaction(data.data);
@@ -2400,11 +2408,95 @@ class PortfolioDashboard {
         }
     }
 
+    handleSnapshot(message) {
+        // Full state on connect / refresh - patches apply on top of its version
+        this.liveSnapshot = message.data;
+        this.liveVersion = message.version;
+        this.resyncRequested = false;
+        this.handlePortfolioUpdate(message.data);
+    }
+
+    handlePortfolioPatch(message) {
+        if (this.resyncRequested) return;  // Waiting for a fresh snapshot
+
+        if (!this.liveSnapshot || message.base_version !== this.liveVersion) {
+            console.log(`[Portfolio] Patch for v${message.base_version}, have v${this.liveVersion} - resyncing`);
+            this.requestSnapshot();
+            return;
+        }
+
+        try {
+            this.liveSnapshot = this.applyJsonPatch(this.liveSnapshot, message.ops);
+        } catch (e) {
+            console.warn('[Portfolio] Patch failed - resyncing:', e);
+            this.requestSnapshot();
+            return;
+        }
+        this.liveVersion = message.version;
+        this.handlePortfolioUpdate(this.liveSnapshot);
+    }
+
+    requestSnapshot() {
+        this.resyncRequested = true;
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.ws.send(JSON.stringify({ type: 'refresh' }));
+        }
+    }
+
+    /**
+     * Apply RFC 6902 ops (add / remove / replace) to a copy of doc.
+     * Throws if a path doesn't exist, so the caller can resync.
+     */
+    applyJsonPatch(doc, ops) {
+        const root = { '': JSON.parse(JSON.stringify(doc)) };
+
+        for (const op of ops) {
+            const keys = op.path === '' ? [] : op.path.slice(1).split('/')
+                .map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+            let parent = root;
+            let key = '';
+            for (const next of keys) {
+                parent = parent[key];
+                key = next;
+                if (parent === null || typeof parent !== 'object') {
+                    throw new Error(`Invalid patch path ${op.path}`);
+                }
+            }
+
+            if (Array.isArray(parent)) {
+                const index = key === '-' ? parent.length : Number(key);
+                if (!Number.isInteger(index) || index < 0 || index > parent.length) {
+                    throw new Error(`Invalid patch index ${op.path}`);
+                }
+                if (op.op === 'add') parent.splice(index, 0, op.value);
+                else if (op.op === 'remove') parent.splice(index, 1);
+                else if (op.op === 'replace') parent[index] = op.value;
+                else throw new Error(`Unsupported patch op ${op.op}`);
+            } else {
+                if (op.op !== 'add' && !(key in parent)) {
+                    throw new Error(`Missing patch path ${op.path}`);
+                }
+                if (op.op === 'add' || op.op === 'replace') parent[key] = op.value;
+                else if (op.op === 'remove') delete parent[key];
+                else throw new Error(`Unsupported patch op ${op.op}`);
+            }
+        }
+        return root[''];
+    }
+
     handlePortfolioUpdate(data) {
         if (data.totalValue !== undefined) {
             this.portfolio.totalValue = data.totalValue;
             this.updateUI();
         }
+
+        // agentStatus: { agent_address: 'active' | 'paused' } - show the selected agent's
+        const agent = this.agents.find(a => a.id === this.selectedAgentId);
+        const agentAddr = (agent?.agent_address || agent?.address || '').toLowerCase();
+        const status = data.agentStatus?.[agentAddr];
+        if (status) {
+            this.handleAgentStatusChange({ status: status.charAt(0).toUpperCase() + status.slice(1) });
+        }
     }
 
     handleNewTransaction(tx) {